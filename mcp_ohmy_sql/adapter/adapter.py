@@ -5,13 +5,40 @@ Adapter integration layer that coordinates configuration, database operations, a
 """
 
 import typing as T
+import threading
+from functools import cached_property
+from contextlib import contextmanager
 
 from pydantic import BaseModel, Field
 
 from ..config.api import Database, Schema, Config
+from ..admission import PriorityEnum, AdmissionController
+from ..cursor import CursorRegistry
+from ..jobs import JobManager
+from ..local_engine import LocalEngine
+from ..table_version import TableVersionProbe
+from ..materialize import MaterializedStore, MaterializationScheduler
+from ..profiling import ProfileStore
+from ..explain.api import PlanCache
+from ..rewrite.api import T_COLUMN_INDEX, T_PARTITION_KEY_INDEX, T_TABLE_INDEX
+from ..result.api import SpillStore, ResultCache
 
 from .relational_adapter import RelationalAdapterMixin
 from .aws_redshift_adapter import AwsRedshiftAdapterMixin
+from .preflight_adapter import PreflightAdapterMixin
+from .rewrite_adapter import RewriteAdapterMixin
+from .spill_adapter import SpillAdapterMixin
+from .cursor_adapter import CursorAdapterMixin
+from .job_adapter import JobAdapterMixin
+from .local_adapter import LocalAdapterMixin
+from .batch_adapter import BatchAdapterMixin
+from .fanout_adapter import FanOutAdapterMixin
+from .federated_adapter import FederatedAdapterMixin
+from .export_adapter import ExportAdapterMixin
+from .result_cache_adapter import ResultCacheAdapterMixin
+from .materialize_adapter import MaterializeAdapterMixin
+from .summarize_adapter import SummarizeAdapterMixin
+from .profile_adapter import ProfileAdapterMixin
 from .tool_adapter import ToolAdapterMixin
 
 
@@ -19,6 +46,20 @@ class Adapter(
     BaseModel,
     RelationalAdapterMixin,
     AwsRedshiftAdapterMixin,
+    PreflightAdapterMixin,
+    RewriteAdapterMixin,
+    SpillAdapterMixin,
+    CursorAdapterMixin,
+    JobAdapterMixin,
+    LocalAdapterMixin,
+    BatchAdapterMixin,
+    FanOutAdapterMixin,
+    FederatedAdapterMixin,
+    ExportAdapterMixin,
+    ResultCacheAdapterMixin,
+    MaterializeAdapterMixin,
+    SummarizeAdapterMixin,
+    ProfileAdapterMixin,
     ToolAdapterMixin,
 ):
     """
@@ -73,3 +114,169 @@ class Adapter(
             )
         schema = database.schemas_mapping[schema_name]
         return True, "", database, schema
+
+    @cached_property
+    def admission_controllers(self) -> dict[str, AdmissionController]:
+        """
+        Create one :class:`~mcp_ohmy_sql.admission.AdmissionController` per database.
+
+        Database level ``admission`` settings take precedence over the global
+        ``settings.admission``.
+        """
+        controllers = dict()
+        for database in self.config.databases:
+            admission = database.admission or self.config.settings.admission
+            controllers[database.identifier] = AdmissionController(
+                name=database.identifier,
+                max_concurrency=admission.max_concurrency,
+                max_queue_size=admission.max_queue_size,
+                queue_timeout=admission.queue_timeout,
+            )
+        return controllers
+
+    @cached_property
+    def thread_rs_conns(self) -> threading.local:
+        """
+        Redshift connections of each thread, see :meth:`~mcp_ohmy_sql.adapter.preflight_adapter.PreflightAdapterMixin.get_rs_conn`.
+        """
+        return threading.local()
+
+    @cached_property
+    def plan_cache(self) -> PlanCache:
+        """
+        Query plan cache used by the pre-flight cost guard.
+        """
+        return PlanCache(max_size=self.config.settings.preflight.cache_size)
+
+    @cached_property
+    def column_indexes(self) -> dict[str, tuple[float, T_COLUMN_INDEX]]:
+        """
+        Per database cache of ``(created_at, column_index)`` used to truncate
+        large values, see :meth:`~mcp_ohmy_sql.adapter.rewrite_adapter.RewriteAdapterMixin.get_column_index`.
+        """
+        return dict()
+
+    @cached_property
+    def partition_key_indexes(self) -> dict[str, tuple[float, T_PARTITION_KEY_INDEX]]:
+        """
+        Per database cache of ``(created_at, partition_key_index)`` used to
+        split large exports, see :meth:`~mcp_ohmy_sql.adapter.rewrite_adapter.RewriteAdapterMixin.get_partition_key_index`.
+        """
+        return dict()
+
+    @cached_property
+    def table_indexes(self) -> dict[str, tuple[float, T_TABLE_INDEX]]:
+        """
+        Per database cache of ``(created_at, table_index)`` used to tag
+        cached results, see :meth:`~mcp_ohmy_sql.adapter.rewrite_adapter.RewriteAdapterMixin.get_table_index`.
+        """
+        return dict()
+
+    @cached_property
+    def spill_store(self) -> SpillStore:
+        """
+        Local store of the large results, see :class:`~mcp_ohmy_sql.config.define.SpillSettings`.
+        """
+        spill = self.config.settings.spill
+        return SpillStore(
+            directory=spill.spill_dir,
+            max_age=spill.max_age,
+            max_total_bytes=spill.max_total_bytes,
+        )
+
+    @cached_property
+    def result_cache(self) -> ResultCache:
+        """
+        Cached query results, see :class:`~mcp_ohmy_sql.config.define.ResultCacheSettings`.
+        """
+        return ResultCache(max_size=self.config.settings.result_cache.max_entries)
+
+    @cached_property
+    def table_version_probes(self) -> dict[str, TableVersionProbe]:
+        """
+        Per database probe of the table changes that invalidate cached results.
+        """
+        return dict()
+
+    @cached_property
+    def materialized_store(self) -> MaterializedStore:
+        """
+        Local SQLite file of the materialized tables, see :class:`~mcp_ohmy_sql.config.define.MaterializationSettings`.
+        """
+        return MaterializedStore(
+            path=self.config.settings.materialization.database_path,
+        )
+
+    @cached_property
+    def materialization_scheduler(self) -> MaterializationScheduler:
+        """
+        Background thread refreshing the due materializations.
+        """
+        return MaterializationScheduler(
+            run=self.refresh_due_materializations,
+            check_interval=self.config.settings.materialization.check_interval,
+        )
+
+    @cached_property
+    def profile_store(self) -> ProfileStore:
+        """
+        Cached column profiles of the tables, see :class:`~mcp_ohmy_sql.config.define.ProfilingSettings`.
+        """
+        return ProfileStore(
+            max_workers=self.config.settings.profiling.max_workers,
+        )
+
+    @cached_property
+    def cursor_registry(self) -> CursorRegistry:
+        """
+        Open cursors of the paginated queries, see :class:`~mcp_ohmy_sql.config.define.CursorSettings`.
+        """
+        cursor = self.config.settings.cursor
+        return CursorRegistry(
+            max_open_cursors=cursor.max_open_cursors,
+            idle_timeout=cursor.idle_timeout,
+        )
+
+    @cached_property
+    def job_manager(self) -> JobManager:
+        """
+        Background query jobs, see :class:`~mcp_ohmy_sql.config.define.JobSettings`.
+        """
+        jobs = self.config.settings.jobs
+        return JobManager(
+            max_workers=jobs.max_workers,
+            max_jobs=jobs.max_jobs,
+            job_ttl=jobs.job_ttl,
+        )
+
+    @cached_property
+    def local_engine(self) -> LocalEngine:
+        """
+        Embedded DuckDB engine of the large results, see :class:`~mcp_ohmy_sql.config.define.LocalEngineSettings`.
+        """
+        local_engine = self.config.settings.local_engine
+        return LocalEngine(
+            memory_limit=local_engine.memory_limit,
+            max_tables=local_engine.max_tables,
+            max_total_bytes=local_engine.max_total_bytes,
+            table_ttl=local_engine.table_ttl,
+        )
+
+    @contextmanager
+    def admit(
+        self: "Adapter",
+        database: "Database",
+        priority: int = PriorityEnum.QUERY,
+    ):
+        """
+        Hold an admission slot of the given database for the duration of the block.
+
+        :param database: The database that is about to be queried.
+        :param priority: :class:`~mcp_ohmy_sql.admission.PriorityEnum`,
+            metadata operations should use ``PriorityEnum.METADATA``.
+
+        :raises AdmissionRejectedError: if the database is too busy.
+        """
+        controller = self.admission_controllers[database.identifier]
+        with controller.admit(priority=priority):
+            yield
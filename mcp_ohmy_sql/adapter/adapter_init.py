@@ -8,3 +8,4 @@ from ..config.init import config
 from .adapter import Adapter
 
 adapter = Adapter(config=config)
+adapter.start_materializations()
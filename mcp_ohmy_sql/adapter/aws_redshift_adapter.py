@@ -7,6 +7,7 @@ AWS Redshift adapter mixin for Redshift-specific database operations.
 import typing as T
 
 from ..config.api import Database
+from ..admission import PriorityEnum
 from ..db.aws_redshift import api as aws_redshift
 
 if T.TYPE_CHECKING:  # pragma: no cover
@@ -28,16 +29,17 @@ class AwsRedshiftAdapterMixin:
 
         :returns: A DatabaseInfo object containing the all schema details.
         """
-        database_info = aws_redshift.new_database_info(
-            conn_or_engine=database.connection.sa_engine,
-            db_name=database.identifier,
-            schema_table_filter_list=[
-                aws_redshift.SchemaTableFilter(
-                    schema_name=schema.name,
-                    include=schema.table_filter.include,
-                    exclude=schema.table_filter.exclude,
-                )
-                for schema in database.schemas
-            ],
-        )
+        with self.admit(database, priority=PriorityEnum.METADATA):
+            database_info = aws_redshift.new_database_info(
+                conn_or_engine=database.connection.sa_engine,
+                db_name=database.identifier,
+                schema_table_filter_list=[
+                    aws_redshift.SchemaTableFilter(
+                        schema_name=schema.name,
+                        include=schema.table_filter.include,
+                        exclude=schema.table_filter.exclude,
+                    )
+                    for schema in database.schemas
+                ],
+            )
         return database_info
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+"""
+Batch adapter mixin, runs several SELECT statements concurrently in one call.
+"""
+
+import typing as T
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from ..constants import DbTypeEnum, ResultFormatEnum
+from ..config.api import Database
+from ..admission import PriorityEnum
+from ..sa import api as sa_api
+from ..aws.aws_redshift import api as aws_redshift_api
+from ..rewrite import api as rewrite_api
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .adapter import Adapter
+
+#: a statement of a batch, (database, sql, params)
+T_BATCH_STATEMENT = tuple["Database", str, T.Optional[dict[str, T.Any]]]
+
+
+class BatchAdapterMixin:
+    """
+    Adapter mixin for batches of SELECT statements.
+    """
+
+    @contextmanager
+    def snapshot(
+        self: "Adapter",
+        database: "Database",
+    ) -> T.Generator[aws_redshift_api.T_CONN_OR_ENGINE, None, None]:
+        """
+        Open a read-only transaction on one connection of the database, every
+        statement run on the yielded connection sees the same snapshot. The
+        Redshift connection is a new one, see
+        :meth:`~mcp_ohmy_sql.adapter.preflight_adapter.PreflightAdapterMixin.dedicated_connection`,
+        so the rollbacks never touch the statements of other threads.
+        """
+        if database.db_type == DbTypeEnum.AWS_REDSHIFT.value:
+            with self.dedicated_connection(database) as rs_conn:
+                with aws_redshift_api.snapshot_connection(rs_conn) as conn:
+                    yield conn
+        else:
+            with sa_api.snapshot_connection(database.connection.sa_engine) as conn:
+                yield conn
+
+    def _execute_batch_statement(
+        self: "Adapter",
+        statement: T_BATCH_STATEMENT,
+        max_chars: T.Optional[int],
+        column_index: T.Optional[rewrite_api.T_COLUMN_INDEX],
+        result_format: str,
+        conn_or_engine: T.Optional[aws_redshift_api.T_CONN_OR_ENGINE] = None,
+    ) -> str:
+        database, sql, params = statement
+        try:
+            return self._execute_select_statement(
+                database=database,
+                sql=sql,
+                params=params,
+                start_time=time.time(),
+                max_result_chars=max_chars,
+                column_index=column_index,
+                result_format=result_format,
+                conn_or_engine=conn_or_engine,
+            )
+        except Exception as e:  # pragma: no cover
+            return f"Error: {e}"
+
+    def execute_batch(
+        self: "Adapter",
+        statements: list[T_BATCH_STATEMENT],
+        max_chars: T.Optional[int] = None,
+        result_format: str = ResultFormatEnum.MARKDOWN.value,
+        snapshot: bool = False,
+    ) -> list[str]:
+        """
+        Run SELECT statements concurrently, each one under the admission
+        control of its database. Each Redshift statement, or snapshot group,
+        runs on a new connection and its result is returned inline.
+
+        :param statements: list of (database, sql, params).
+        :param max_chars: the character budget of each result.
+        :param result_format: the output format of every result.
+        :param snapshot: if True, the statements of the same database run one
+            after another on one connection, in one read-only transaction,
+            so they see the same snapshot of the data. Different databases
+            still run concurrently.
+
+        :returns: the formatted result of each statement, in order.
+        """
+        settings = self.config.settings
+        # metadata lookups take their own admission slot, do them first
+        column_indexes = dict()
+        for database, _, _ in statements:
+            if database.identifier not in column_indexes:
+                column_indexes[database.identifier] = (
+                    self.get_column_index(database)
+                    if settings.push_down_truncation
+                    else None
+                )
+
+        results: list[T.Optional[str]] = [None] * len(statements)
+
+        def run_one(ith: int):
+            database = statements[ith][0]
+            try:
+                with self.admit(database, priority=PriorityEnum.QUERY):
+                    with self.dedicated_connection(database) as conn:
+                        results[ith] = self._execute_batch_statement(
+                            statement=statements[ith],
+                            max_chars=max_chars,
+                            column_index=column_indexes[database.identifier],
+                            result_format=result_format,
+                            conn_or_engine=conn,
+                        )
+            except Exception as e:
+                results[ith] = f"Error: {e}"
+
+        def run_group(indexes: list[int]):
+            database = statements[indexes[0]][0]
+            try:
+                with self.admit(database, priority=PriorityEnum.QUERY):
+                    with self.snapshot(database) as conn_or_engine:
+                        for ith in indexes:
+                            results[ith] = self._execute_batch_statement(
+                                statement=statements[ith],
+                                max_chars=max_chars,
+                                column_index=column_indexes[database.identifier],
+                                result_format=result_format,
+                                conn_or_engine=conn_or_engine,
+                            )
+            except Exception as e:
+                for ith in indexes:
+                    if results[ith] is None:
+                        results[ith] = f"Error: {e}"
+
+        if snapshot:
+            groups: dict[str, list[int]] = dict()
+            for ith, (database, _, _) in enumerate(statements):
+                groups.setdefault(database.identifier, []).append(ith)
+            tasks = [(run_group, indexes) for indexes in groups.values()]
+        else:
+            tasks = [(run_one, ith) for ith in range(len(statements))]
+
+        if len(tasks) == 1:
+            func, arg = tasks[0]
+            func(arg)
+        else:
+            max_workers = min(len(tasks), settings.max_batch_size)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for future in [executor.submit(func, arg) for func, arg in tasks]:
+                    future.result()
+        return results
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cursor adapter mixin, keeps query cursors open so the model can read
+the next rows with a continuation token.
+"""
+
+import typing as T
+
+from ..constants import DbTypeEnum, ResultFormatEnum
+from ..config.api import Database
+from ..cursor import OpenCursor
+from ..sa import api as sa_api
+from ..aws.aws_redshift import api as aws_redshift_api
+from ..result import api as result_api
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    import redshift_connector
+    from .adapter import Adapter
+
+
+def get_cursor_footer(
+    cursor: OpenCursor,
+    n_rows: int,
+    has_more: bool,
+    page_rows: int,
+) -> str:
+    """
+    Describe which rows were returned and how to get the next ones.
+    """
+    start = cursor.n_fetched - n_rows + 1
+    rows = f"rows {start}-{cursor.n_fetched}"
+    if has_more:
+        return (
+            f"... ({rows}, more rows available, call continue_query with "
+            f"token={cursor.token!r} for the next {page_rows} rows)"
+        )
+    if cursor.truncated:
+        return (
+            f"... ({rows}, end of result, truncated to the first "
+            f"{cursor.max_rows} rows)"
+        )
+    return f"... ({rows}, end of result)"
+
+
+class CursorAdapterMixin:
+    """
+    Adapter mixin for continuation token pagination.
+    """
+
+    def open_select_cursor(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        max_rows: T.Optional[int] = None,
+        conn: T.Optional["redshift_connector.Connection"] = None,
+    ) -> OpenCursor:
+        """
+        Run a SELECT statement and return its open cursor, not registered yet.
+
+        :param conn: a Redshift connection to use instead of the one of the
+            current thread, e.g. from :meth:`~mcp_ohmy_sql.adapter.preflight_adapter.PreflightAdapterMixin.dedicated_connection`.
+        """
+        if database.db_type == DbTypeEnum.AWS_REDSHIFT.value:
+            return aws_redshift_api.open_select_cursor(
+                conn=conn or self.get_rs_conn(database),
+                query=sql,
+                params=params,
+                max_rows=max_rows,
+            )
+        else:
+            return sa_api.open_select_cursor(
+                engine=database.connection.sa_engine,
+                query=sql,
+                params=params,
+                max_rows=max_rows,
+            )
+
+    def _fetch_cursor_page(
+        self: "Adapter",
+        cursor: OpenCursor,
+        max_chars: T.Optional[int] = None,
+        result_format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> tuple[str, bool]:
+        """
+        Fetch and encode the next ``page_rows`` rows of a cursor. The rows
+        cut by the character budget are given back to the cursor, so the
+        next page starts right after the last row shown.
+
+        :returns: a tuple of (text, has_more).
+        """
+        settings = self.config.settings
+        page_rows = settings.cursor.page_rows
+        rows, has_more = cursor.fetch(page_rows)
+        if len(rows) == 0:
+            return "No result", has_more
+        report = result_api.BudgetReport()
+        text = result_api.encode_result(
+            columns=cursor.columns,
+            rows=rows,
+            result_format=result_format,
+            max_chars=max_chars,
+            max_cell_chars=settings.max_cell_chars,
+            report=report,
+        )
+        n_shown_rows = report.n_shown_rows
+        if n_shown_rows < len(rows):
+            cursor.push_back(rows[n_shown_rows:])
+            has_more = True
+        # the whole result fits in the first page, nothing to paginate
+        if cursor.n_fetched == len(rows) and not (has_more or cursor.truncated):
+            return text, has_more
+        footer = get_cursor_footer(cursor, n_shown_rows, has_more, page_rows)
+        return f"{text}\n{footer}", has_more
+
+    def execute_with_cursor(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        max_chars: T.Optional[int] = None,
+        result_format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Run a SELECT statement and return its first ``settings.cursor.page_rows``
+        rows. If there are more rows, the cursor is kept in
+        :attr:`~mcp_ohmy_sql.adapter.adapter.Adapter.cursor_registry` and the
+        footer gives the continuation token.
+        """
+        settings = self.config.settings
+        try:
+            cursor = self.open_select_cursor(
+                database=database,
+                sql=sql,
+                params=params,
+                max_rows=settings.cursor.max_rows,
+            )
+        except Exception as e:
+            return f"Error executing query: {e}"
+        # register first, so the footer has the token
+        self.cursor_registry.add(cursor, database_identifier=database.identifier)
+        has_more = False
+        try:
+            text, has_more = self._fetch_cursor_page(cursor, max_chars, result_format)
+        except Exception as e:  # pragma: no cover
+            text = f"Error fetching result: {e}"
+        finally:
+            if has_more is False:
+                self.cursor_registry.close(cursor.token)
+        return text
+
+    def continue_query(
+        self: "Adapter",
+        token: str,
+        max_chars: T.Optional[int] = None,
+        result_format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Fetch and encode the next rows of an open cursor. The cursor is closed
+        once the result is exhausted.
+
+        :raises CursorNotFoundError: if the token is unknown or expired.
+        :raises AdmissionRejectedError: if the database is too busy.
+        """
+        cursor = self.cursor_registry.get(token)
+        database = self.config.databases_mapping[cursor.database_identifier]
+        with self.admit(database):
+            try:
+                text, has_more = self._fetch_cursor_page(
+                    cursor, max_chars, result_format
+                )
+            except Exception as e:
+                self.cursor_registry.close(token)
+                raise e
+        if has_more is False:
+            self.cursor_registry.close(token)
+        return text
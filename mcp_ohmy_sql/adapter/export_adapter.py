@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+
+"""
+Export adapter mixin, streams query results into local files.
+"""
+
+import typing as T
+import time
+import shutil
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from ..constants import DbTypeEnum, ExportFormatEnum
+from ..config.api import Database
+from ..admission import PriorityEnum
+from ..aws.aws_redshift import api as aws_redshift_api
+from ..rewrite import api as rewrite_api
+from ..result import api as result_api
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from pathlib import Path
+    from .adapter import Adapter
+
+
+class ExportAdapterMixin:
+    """
+    Adapter mixin for the result export to Parquet, CSV and JSON Lines files.
+    """
+
+    def _export_to_file(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]],
+        path: "Path",
+        export_format: str,
+        dedicated_connection: bool = False,
+    ) -> result_api.ExportManifest:
+        """
+        Stream the rows of one query into one file, holding an admission slot
+        of the database until the file is written.
+
+        :param dedicated_connection: open a new Redshift connection instead of
+            sharing the cached one, so that several files can be written
+            concurrently. SQLAlchemy cursors always get their own pooled
+            connection.
+        """
+        export = self.config.settings.export
+        with self.admit(database, priority=PriorityEnum.QUERY):
+            conn = None
+            try:
+                if (
+                    dedicated_connection
+                    and database.db_type == DbTypeEnum.AWS_REDSHIFT.value
+                ):
+                    conn = database.connection.get_rs_conn()
+                    cursor = aws_redshift_api.open_select_cursor(
+                        conn=conn,
+                        query=sql,
+                        params=params,
+                        max_rows=export.max_rows,
+                    )
+                else:
+                    cursor = self.open_select_cursor(
+                        database=database,
+                        sql=sql,
+                        params=params,
+                        max_rows=export.max_rows,
+                    )
+                try:
+                    return result_api.export_cursor(
+                        cursor,
+                        path=path,
+                        export_format=export_format,
+                        batch_size=export.batch_size,
+                        database_identifier=database.identifier,
+                        sql=sql,
+                    )
+                finally:
+                    cursor.close()
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def export_query_result(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        export_format: str = ExportFormatEnum.PARQUET.value,
+        file_name: T.Optional[str] = None,
+    ) -> result_api.ExportManifest:
+        """
+        Run a SELECT statement on an open cursor and stream all its rows,
+        up to ``settings.export.max_rows``, into a file of the export
+        directory. The admission slot of the database is held until the
+        file is written.
+
+        :raises ValueError: if the format or the file name is invalid, or
+            the rows can't be written in this format.
+        """
+        export = self.config.settings.export
+        path = result_api.get_export_path(
+            directory=export.export_dir,
+            file_name=file_name or result_api.new_export_file_name(),
+            export_format=export_format,
+        )
+        limited_sql = sql
+        if export.max_rows is not None:
+            named_params = database.db_type != DbTypeEnum.AWS_REDSHIFT.value
+            # fetch one more row than we write, so we know if it is truncated
+            limited_sql = rewrite_api.add_row_limit(
+                sql=sql,
+                db_type=database.db_type,
+                limit=export.max_rows + 1,
+                named_params=named_params,
+            )
+        return self._export_to_file(
+            database=database,
+            sql=limited_sql,
+            params=params,
+            path=path,
+            export_format=export_format,
+        )
+
+    def plan_export_partitions(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        partitions: int = 4,
+    ) -> tuple[rewrite_api.PartitionKey, list[str]]:
+        """
+        Split a single table SELECT into ``partitions`` key range queries,
+        see :mod:`mcp_ohmy_sql.rewrite.partition`. The key is found in the
+        cached schema, its ``MIN`` and ``MAX`` (and the row count, if
+        ``settings.export.max_rows`` is set) are queried first.
+
+        :raises ValueError: if the query can't be partitioned, the message
+            says why.
+        """
+        export = self.config.settings.export
+        key_index = self.get_partition_key_index(database)
+        if key_index is None:
+            raise ValueError("the schema of the database is not available")
+        key = rewrite_api.find_partition_key(sql, database.db_type, key_index)
+        named_params = database.db_type != DbTypeEnum.AWS_REDSHIFT.value
+        range_sql = rewrite_api.get_key_range_sql(
+            sql=sql,
+            db_type=database.db_type,
+            key=key,
+            with_count=export.max_rows is not None,
+            named_params=named_params,
+        )
+        with self.admit(database, priority=PriorityEnum.QUERY):
+            rows = self.fetch_select_result(
+                database=database,
+                sql=range_sql,
+                params=params,
+                max_rows=1,
+            )
+        row = rows[0]
+        low, high = row[0], row[1]
+        if low is None:
+            raise ValueError("the query returns no rows")
+        if export.max_rows is not None and row[2] > export.max_rows:
+            raise ValueError(
+                f"the query returns more than {export.max_rows} rows "
+                f"(settings.export.max_rows)"
+            )
+        ranges = rewrite_api.split_key_range(low, high, partitions, key.kind)
+        if len(ranges) == 1:
+            raise ValueError(f"the key {key.column} has a single value")
+        partition_sqls = rewrite_api.get_partition_sqls(
+            sql=sql,
+            db_type=database.db_type,
+            key=key,
+            ranges=ranges,
+            named_params=named_params,
+        )
+        return key, partition_sqls
+
+    def export_query_result_partitioned(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        key: rewrite_api.PartitionKey,
+        partition_sqls: list[str],
+        params: T.Optional[dict[str, T.Any]] = None,
+        export_format: str = ExportFormatEnum.PARQUET.value,
+        file_name: T.Optional[str] = None,
+    ) -> result_api.PartitionedExport:
+        """
+        Export the partitions of :meth:`plan_export_partitions` concurrently,
+        up to ``settings.export.max_workers`` at a time, each one on its own
+        connection and within the admission limits of the database, into
+        ``part-00001``, ``part-00002``, ... files of a new directory.
+
+        :raises ValueError: if the format or the file name is invalid. If any
+            partition fails, the directory is removed and the error is raised.
+        """
+        start_time = time.time()
+        export = self.config.settings.export
+        directory = result_api.get_partitioned_export_dir(
+            directory=export.export_dir,
+            file_name=file_name or result_api.new_export_file_name(),
+        )
+        paths = [
+            result_api.get_export_path(directory, f"part-{ith:05d}", export_format)
+            for ith in range(1, len(partition_sqls) + 1)
+        ]
+
+        def run_one(ith: int) -> result_api.ExportManifest:
+            return self._export_to_file(
+                database=database,
+                sql=partition_sqls[ith],
+                params=params,
+                path=paths[ith],
+                export_format=export_format,
+                dedicated_connection=True,
+            )
+
+        max_workers = min(len(partition_sqls), export.max_workers)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                parts = list(executor.map(run_one, range(len(partition_sqls))))
+        except Exception as e:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise e
+        result = result_api.PartitionedExport(
+            directory=str(directory),
+            export_format=export_format,
+            partition_key=key.column,
+            parts=parts,
+            database_identifier=database.identifier,
+            sql=sql,
+            duration=time.time() - start_time,
+            created_at=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        )
+        result.write()
+        return result
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fan-out adapter mixin, runs one SELECT statement on many identical databases
+and merges the results.
+"""
+
+import typing as T
+import time
+import fnmatch
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+from ..constants import DbTypeEnum, ResultFormatEnum
+from ..config.api import Database
+from ..admission import PriorityEnum
+from ..fanout import MergePlan, new_merge_plan, merge_rows
+from ..fanout import ShardResult, render_shard_report
+from ..sa.query import get_truncated_footer
+from ..rewrite import api as rewrite_api
+from ..result import api as result_api
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .adapter import Adapter
+
+
+class FanOutAdapterMixin:
+    """
+    Adapter mixin for fan-out queries across shards.
+    """
+
+    def resolve_databases(
+        self: "Adapter",
+        patterns: list[str],
+    ) -> list["Database"]:
+        """
+        Resolve database identifiers and glob patterns (e.g. ``tenant_*``)
+        to databases, in configuration order, without duplicates.
+
+        :raises ValueError: if an identifier or pattern matches no database.
+        """
+        identifiers = list(self.config.databases_mapping)
+        matched = set()
+        for pattern in patterns:
+            names = fnmatch.filter(identifiers, pattern)
+            if len(names) == 0:
+                raise ValueError(
+                    f"Database '{pattern}' not found in configuration. "
+                    f"It has the following databases: {', '.join(identifiers)}."
+                )
+            matched.update(names)
+        return [
+            self.config.databases_mapping[identifier]
+            for identifier in identifiers
+            if identifier in matched
+        ]
+
+    def _fetch_shard(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]],
+        max_rows: int,
+        count_sql: T.Optional[str] = None,
+    ) -> ShardResult:
+        """
+        Run the shard SQL on one database. A shard failing the pre-flight
+        cost guard is a failed database whatever ``settings.preflight.action``
+        is, a preview of its rows would silently skew the merged result.
+        """
+        start_time = time.time()
+        shard = ShardResult(database_identifier=database.identifier)
+        try:
+            with self.admit(database, priority=PriorityEnum.QUERY):
+                preflight_result = self.run_preflight(
+                    database=database,
+                    sql=sql,
+                    params=params,
+                    count_sql=count_sql,
+                )
+                if preflight_result is not None and preflight_result.passed is False:
+                    raise ValueError(
+                        f"Query rejected by the pre-flight cost guard: "
+                        f"{preflight_result.message}"
+                    )
+                rows = self.fetch_select_result(
+                    database=database,
+                    sql=sql,
+                    params=params,
+                    max_rows=max_rows,
+                )
+            shard.columns = rows.columns
+            shard.rows = rows
+        except Exception as e:
+            shard.error = str(e)
+        shard.duration = time.time() - start_time
+        return shard
+
+    def execute_fan_out(
+        self: "Adapter",
+        databases: list["Database"],
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        max_chars: T.Optional[int] = None,
+        result_format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Run a SELECT statement on every database concurrently, each one under
+        its own admission control, and merge the partial results, see
+        :mod:`mcp_ohmy_sql.fanout`. Failed databases, including the ones
+        rejected by the pre-flight cost guard, are left out of the merged
+        result and reported with their error.
+
+        :raises ValueError: if the partial results can't be merged.
+        """
+        start_time = time.time()
+        settings = self.config.settings
+        max_rows = settings.max_rows
+
+        # each dialect gets its own shard SQL, they share the merge logic
+        plans: dict[str, MergePlan] = dict()
+        for database in databases:
+            if database.db_type not in plans:
+                plans[database.db_type] = new_merge_plan(
+                    sql=sql,
+                    db_type=database.db_type,
+                    named_params=database.db_type != DbTypeEnum.AWS_REDSHIFT.value,
+                )
+        plan = plans[databases[0].db_type]
+
+        # fetch one more row than we show, so we know if it is truncated
+        shard_max_rows = plan.offset + max_rows
+        count_sqls = list()
+        shard_sqls = list()
+        for database in databases:
+            named_params = database.db_type != DbTypeEnum.AWS_REDSHIFT.value
+            shard_sql = plans[database.db_type].shard_sql
+            # truncated group keys would merge different groups
+            if settings.push_down_truncation and plan.is_aggregate is False:
+                shard_sql = self.truncate_large_values(
+                    database=database,
+                    sql=shard_sql,
+                    column_index=self.get_column_index(database),
+                    named_params=named_params,
+                )
+            count_sqls.append(shard_sql)
+            shard_sqls.append(
+                rewrite_api.add_row_limit(
+                    sql=shard_sql,
+                    db_type=database.db_type,
+                    limit=shard_max_rows + 1,
+                    named_params=named_params,
+                )
+            )
+
+        def run_one(ith: int) -> ShardResult:
+            return self._fetch_shard(
+                database=databases[ith],
+                sql=shard_sqls[ith],
+                params=params,
+                max_rows=shard_max_rows,
+                count_sql=count_sqls[ith],
+            )
+
+        if len(databases) == 1:
+            shards = [run_one(0)]
+        else:
+            max_workers = min(len(databases), settings.max_fan_out_workers)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                shards = list(executor.map(run_one, range(len(databases))))
+
+        # every shard must return the same columns
+        succeeded = [shard for shard in shards if shard.error is None]
+        if succeeded:
+            columns = succeeded[0].columns
+            expected = [name.lower() for name in columns]
+            for shard in succeeded[1:]:
+                if [name.lower() for name in shard.columns] != expected:
+                    shard.error = (
+                        f"columns {shard.columns} differ from the columns "
+                        f"{columns} of {succeeded[0].database_identifier!r}"
+                    )
+            succeeded = [shard for shard in succeeded if shard.error is None]
+
+        warning = None
+        if len(succeeded) == 0:
+            query_result_text = "No database succeeded"
+        else:
+            if plan.is_aggregate and any(
+                shard.n_rows > shard_max_rows for shard in succeeded
+            ):
+                warning = (
+                    f"A database returned more than {shard_max_rows} groups, "
+                    f"the aggregates may be incomplete, refine the WHERE clause "
+                    f"or group by fewer columns"
+                )
+            try:
+                merged = merge_rows(
+                    plan=plan,
+                    columns=columns,
+                    shards=[shard.rows for shard in succeeded],
+                )
+                rows = list(itertools.islice(merged, max_rows + 1))
+            except TypeError as e:
+                raise ValueError(f"Can't merge the results: {e}")
+            if len(rows) == 0:
+                query_result_text = "No result"
+            else:
+                query_result_text = result_api.encode_result(
+                    columns=columns,
+                    rows=rows[:max_rows],
+                    result_format=result_format,
+                    max_chars=max_chars,
+                    max_cell_chars=settings.max_cell_chars,
+                )
+                if len(rows) > max_rows:
+                    footer = get_truncated_footer(max_rows)
+                    query_result_text = f"{query_result_text}\n{footer}"
+
+        duration = time.time() - start_time
+        n_failed = len(shards) - len(succeeded)
+        summary = (
+            f"{len(shards)} databases in {duration:.3f} seconds, "
+            f"{len(succeeded)} succeeded"
+        )
+        if n_failed:
+            summary = f"{summary}, {n_failed} failed"
+        lines = ["# Fan-out", summary, ""]
+        if warning:
+            lines.extend(["# Warning", warning, ""])
+        lines.extend(
+            [
+                "# Query Result",
+                query_result_text,
+                "",
+                "# Databases",
+                render_shard_report(shards),
+            ]
+        )
+        return "\n".join(lines)
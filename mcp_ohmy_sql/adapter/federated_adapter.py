@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""
+Federated adapter mixin, joins tables of different databases in the local
+DuckDB engine.
+"""
+
+import typing as T
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ..constants import DbTypeEnum, ResultFormatEnum
+from ..fanout import ShardResult
+from ..federated import new_federated_plan, render_source_report
+from ..local_engine import LocalEngine
+from ..sa.query import get_truncated_footer
+from ..rewrite import api as rewrite_api
+from ..result import api as result_api
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .adapter import Adapter
+
+
+class FederatedAdapterMixin:
+    """
+    Adapter mixin for federated queries across databases.
+    """
+
+    def execute_federated(
+        self: "Adapter",
+        sql: str,
+        max_chars: T.Optional[int] = None,
+        result_format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Fetch every source table of a federated query concurrently, each one
+        under the admission control of its database, then run the query on
+        the fetched tables in a temporary DuckDB database, see
+        :mod:`mcp_ohmy_sql.federated`.
+
+        :raises ValueError: if the query is not a valid federated query.
+        """
+        start_time = time.time()
+        settings = self.config.settings
+        local_engine = settings.local_engine
+        max_source_rows = local_engine.max_source_rows
+
+        plan = new_federated_plan(sql, self.config.databases_mapping)
+        if len(plan.sources) == 0:
+            raise ValueError(
+                "The query doesn't use any table, reference them as "
+                "\"database_identifier\".schema.table"
+            )
+        databases = [
+            self.config.databases_mapping[source.database_identifier]
+            for source in plan.sources
+        ]
+        source_sqls = list()
+        for source, database in zip(plan.sources, databases):
+            named_params = database.db_type != DbTypeEnum.AWS_REDSHIFT.value
+            # fetch one more row than we accept, so we know if it is truncated
+            source_sqls.append(
+                rewrite_api.add_row_limit(
+                    sql=source.to_sql(database.db_type, named_params=named_params),
+                    db_type=database.db_type,
+                    limit=max_source_rows + 1,
+                    named_params=named_params,
+                )
+            )
+
+        def run_one(ith: int) -> ShardResult:
+            return self._fetch_shard(
+                database=databases[ith],
+                sql=source_sqls[ith],
+                params=None,
+                max_rows=max_source_rows,
+            )
+
+        if len(plan.sources) == 1:
+            results = [run_one(0)]
+        else:
+            max_workers = min(len(plan.sources), settings.max_fan_out_workers)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(run_one, range(len(plan.sources))))
+        # a partial table would silently give a wrong join
+        for source, result in zip(plan.sources, results):
+            if result.error is None and result.n_rows > max_source_rows:
+                result.error = (
+                    f"more than {max_source_rows} rows, add a WHERE filter "
+                    f"on {source.alias}"
+                )
+
+        errors = [result.error for result in results if result.error]
+        if errors:
+            query_result_text = f"Error: {len(errors)} sources failed"
+        else:
+            engine = LocalEngine(
+                memory_limit=local_engine.memory_limit,
+                max_tables=len(plan.sources),
+                max_total_bytes=local_engine.max_total_bytes,
+            )
+            try:
+                for source, source_sql, result in zip(
+                    plan.sources, source_sqls, results
+                ):
+                    engine.add(
+                        result.rows,
+                        database_identifier=source.database_identifier,
+                        sql=source_sql,
+                        name=source.name,
+                    )
+                if len(engine) != len(plan.sources):
+                    raise ValueError(
+                        f"The sources take more than "
+                        f"{local_engine.max_total_bytes} bytes, add WHERE filters"
+                    )
+                rows = engine.query(plan.local_sql, max_rows=settings.max_rows)
+            except Exception as e:
+                rows = None
+                query_result_text = f"Error: {e}"
+            finally:
+                engine.close()
+            if rows is None:
+                pass
+            elif len(rows) == 0:
+                query_result_text = "No result"
+            else:
+                query_result_text = result_api.encode_result(
+                    columns=rows.columns,
+                    rows=rows[: settings.max_rows],
+                    result_format=result_format,
+                    max_chars=max_chars,
+                    max_cell_chars=settings.max_cell_chars,
+                )
+                if len(rows) > settings.max_rows:
+                    footer = get_truncated_footer(settings.max_rows)
+                    query_result_text = f"{query_result_text}\n{footer}"
+
+        duration = time.time() - start_time
+        lines = [
+            "# Federated Query",
+            f"{len(plan.sources)} sources in {duration:.3f} seconds",
+            "",
+            "# Query Result",
+            query_result_text,
+            "",
+            "# Sources",
+            render_source_report(plan.sources, source_sqls, results),
+        ]
+        return "\n".join(lines)
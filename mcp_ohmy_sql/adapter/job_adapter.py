@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+"""
+Job adapter mixin, runs SELECT statements as background jobs.
+"""
+
+import typing as T
+
+from ..constants import DbTypeEnum, ResultFormatEnum
+from ..config.api import Database
+from ..admission import PriorityEnum
+from ..explain.api import PlanCache
+from ..jobs import QueryJob
+from ..rewrite import api as rewrite_api
+from ..result import api as result_api
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .adapter import Adapter
+
+#: the result of a job, the rows are either in the spill store or in the buffer
+T_JOB_RESULT = tuple[result_api.SpilledResult, T.Optional[result_api.ResultBuffer]]
+
+
+def format_job_page(
+    job: QueryJob,
+    page: result_api.ResultPage,
+    text: str,
+) -> str:
+    """
+    Append the position of the page and how to get the next one.
+    """
+    start, stop = page.result.get_page_range(page.page)
+    n_rows = f"{page.result.n_rows}"
+    if page.result.truncated:
+        n_rows = f"{n_rows}+ (truncated)"
+    footer = f"... (page {page.page} of {page.result.n_pages} (rows {start + 1}-{stop} of {n_rows})"
+    if page.page < page.result.n_pages:
+        footer = (
+            f"{footer}, call get_query_result with job_id={job.job_id!r} "
+            f"and page={page.page + 1} for the next page"
+        )
+    return f"{text}\n{footer})"
+
+
+class JobAdapterMixin:
+    """
+    Adapter mixin for background query jobs.
+    """
+
+    def submit_query_job(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        column_index: T.Optional[rewrite_api.T_COLUMN_INDEX] = None,
+    ) -> tuple[QueryJob, bool]:
+        """
+        Submit a SELECT statement to the
+        :attr:`~mcp_ohmy_sql.adapter.adapter.Adapter.job_manager`, or return
+        the identical job that is already queued, running or succeeded, as
+        long as its spilled result is still in the spill store.
+
+        :returns: a tuple of (job, is_new).
+        """
+        jobs = self.config.settings.jobs
+        named_params = database.db_type != DbTypeEnum.AWS_REDSHIFT.value
+        truncated_sql = self.truncate_large_values(
+            database=database,
+            sql=sql,
+            column_index=column_index,
+            named_params=named_params,
+        )
+        limited_sql = rewrite_api.add_row_limit(
+            sql=truncated_sql,
+            db_type=database.db_type,
+            limit=jobs.max_rows + 1,
+            named_params=named_params,
+        )
+        normalized_sql = rewrite_api.normalize_sql(
+            sql,
+            rewrite_api.get_sqlglot_dialect(database.db_type),
+        )
+        key = PlanCache.make_key(database.identifier, normalized_sql, params)
+
+        def run(job: QueryJob) -> T_JOB_RESULT:
+            return self._run_query_job(job, database, limited_sql, params)
+
+        def is_result_valid(job: QueryJob) -> bool:
+            result, rows = job.result
+            return rows is not None or self.spill_store.exists(result.handle)
+
+        return self.job_manager.submit(
+            key=key,
+            database_identifier=database.identifier,
+            sql=sql,
+            run=run,
+            is_result_valid=is_result_valid,
+        )
+
+    def _run_query_job(
+        self: "Adapter",
+        job: QueryJob,
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+    ) -> T_JOB_RESULT:
+        """
+        Run the query of a job and keep its rows. Cancellation is checked
+        before every fetched batch, a query still running in the database
+        finishes before the job stops. The job runs on a worker thread, a
+        Redshift job opens its own connection, see
+        :meth:`~mcp_ohmy_sql.adapter.preflight_adapter.PreflightAdapterMixin.dedicated_connection`.
+        """
+        jobs = self.config.settings.jobs
+        with self.admit(database, priority=PriorityEnum.BACKGROUND):
+            with self.dedicated_connection(database) as conn:
+                job.check_cancelled()
+                cursor = self.open_select_cursor(
+                    database=database,
+                    sql=sql,
+                    params=params,
+                    conn=conn,
+                )
+                try:
+
+                    def fetchmany(n: int):
+                        job.check_cancelled()
+                        rows = cursor.fetchmany(n)
+                        job.rows_fetched += len(rows)
+                        return rows
+
+                    rows = result_api.fill_result_buffer(
+                        columns=cursor.columns,
+                        fetchmany=fetchmany,
+                        max_rows=jobs.max_rows,
+                    )
+                finally:
+                    cursor.close()
+
+        truncated = len(rows) > jobs.max_rows
+        if truncated:
+            rows = rows[: jobs.max_rows]
+        job.rows_fetched = len(rows)
+        job.check_cancelled()
+        if result_api.is_arrow_available():
+            try:
+                spilled = self.spill_store.put(
+                    rows,
+                    page_rows=jobs.page_rows,
+                    truncated=truncated,
+                    database_identifier=database.identifier,
+                    sql=job.sql,
+                )
+                return spilled, None
+            except Exception:
+                pass
+        result = result_api.SpilledResult(
+            handle=job.job_id,
+            n_rows=len(rows),
+            page_rows=jobs.page_rows,
+            truncated=truncated,
+            database_identifier=database.identifier,
+            sql=job.sql,
+        )
+        return result, rows
+
+    def get_job_result_page(
+        self: "Adapter",
+        job: QueryJob,
+        page: int,
+        max_chars: T.Optional[int] = None,
+        result_format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Read and encode one page of the result of a succeeded job.
+
+        :raises ResultHandleNotFoundError: if the spilled result was evicted.
+        :raises IndexError: if the page is out of range.
+        """
+        result, rows = job.result
+        if rows is None:
+            result_page = self.spill_store.get_page(result.handle, page)
+        else:
+            if not (1 <= page <= result.n_pages):
+                raise IndexError(
+                    f"Page {page} is out of range, the result has "
+                    f"{result.n_pages} pages"
+                )
+            start, stop = result.get_page_range(page)
+            result_page = result_api.ResultPage(
+                result=result,
+                page=page,
+                columns=rows.columns,
+                rows=list(rows[start:stop]),
+            )
+        if len(result_page.rows) == 0:
+            return "No result"
+        text = result_api.encode_result(
+            columns=result_page.columns,
+            rows=result_page.rows,
+            result_format=result_format,
+            max_chars=max_chars,
+            max_cell_chars=self.config.settings.max_cell_chars,
+        )
+        return format_job_page(job, result_page, text)
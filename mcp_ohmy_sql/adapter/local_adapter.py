@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""
+Local engine adapter mixin, loads large query results into the embedded
+DuckDB engine so the model can keep analyzing them locally.
+"""
+
+import typing as T
+
+from ..constants import ResultFormatEnum
+from ..config.api import Database
+from ..local_engine import LocalTable, is_duckdb_available
+from ..sa.query import get_truncated_footer
+from ..result import api as result_api
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .adapter import Adapter
+
+
+def get_local_table_footer(table: LocalTable) -> str:
+    """
+    Tell the model where the full result is and how to query it.
+    """
+    return (
+        f"... (showing the first rows, the full result is loaded into the "
+        f"local table {table.to_description()}, call query_local_result "
+        f"with SQL like 'SELECT ... FROM {table.name} GROUP BY ...' to "
+        f"aggregate, filter or join it locally)"
+    )
+
+
+class LocalAdapterMixin:
+    """
+    Adapter mixin for the local post-processing of large results.
+    """
+
+    def is_local_engine_enabled(self: "Adapter") -> bool:
+        """
+        The local engine needs ``settings.local_engine.enabled``, ``duckdb``
+        and ``pyarrow``.
+        """
+        return self.config.settings.local_engine.enabled and is_duckdb_available()
+
+    def execute_and_load_local(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        max_chars: T.Optional[int] = None,
+        result_format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Run a SELECT statement, fetch up to ``settings.local_engine.max_rows``
+        rows, and return them inline if there are at most ``min_rows`` rows.
+        Otherwise the rows are registered in
+        :attr:`~mcp_ohmy_sql.adapter.adapter.Adapter.local_engine` and the
+        first ``preview_rows`` rows are returned with the table name.
+
+        If the rows can't be loaded (e.g. a column mixes types), the first
+        ``settings.max_rows`` rows are returned like a normal query.
+        """
+        settings = self.config.settings
+        local_engine = settings.local_engine
+        try:
+            rows = self.fetch_select_result(
+                database=database,
+                sql=sql,
+                params=params,
+                max_rows=local_engine.max_rows,
+            )
+        except Exception as e:
+            return f"Error executing query: {e}"
+        if len(rows) == 0:
+            return "No result"
+
+        truncated = len(rows) > local_engine.max_rows
+        if truncated:
+            rows = rows[: local_engine.max_rows]
+        table = None
+        if len(rows) > local_engine.min_rows:
+            try:
+                table = self.local_engine.add(
+                    rows,
+                    database_identifier=database.identifier,
+                    sql=sql,
+                    truncated=truncated,
+                )
+            except Exception:
+                pass
+
+        try:
+            if table is None:
+                text = result_api.encode_result(
+                    columns=rows.columns,
+                    rows=rows[: settings.max_rows],
+                    result_format=result_format,
+                    max_chars=max_chars,
+                    max_cell_chars=settings.max_cell_chars,
+                )
+                if len(rows) > settings.max_rows:
+                    text = f"{text}\n{get_truncated_footer(settings.max_rows)}"
+                return text
+            text = result_api.encode_result(
+                columns=rows.columns,
+                rows=rows[: local_engine.preview_rows],
+                result_format=result_format,
+                max_chars=max_chars,
+                max_cell_chars=settings.max_cell_chars,
+            )
+            return f"{text}\n{get_local_table_footer(table)}"
+        except Exception as e:  # pragma: no cover
+            return f"Error formatting result: {e}"
+
+    def query_local(
+        self: "Adapter",
+        sql: str,
+        max_chars: T.Optional[int] = None,
+        result_format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Run a SELECT statement on the local tables and encode at most
+        ``settings.max_rows`` rows.
+
+        :raises ValueError: if the SQL is not a single SELECT statement.
+        :raises duckdb.Error: if the query fails.
+        """
+        settings = self.config.settings
+        rows = self.local_engine.query(sql, max_rows=settings.max_rows)
+        if len(rows) == 0:
+            return "No result"
+        text = result_api.encode_result(
+            columns=rows.columns,
+            rows=rows[: settings.max_rows],
+            result_format=result_format,
+            max_chars=max_chars,
+            max_cell_chars=settings.max_cell_chars,
+        )
+        if len(rows) > settings.max_rows:
+            text = f"{text}\n{get_truncated_footer(settings.max_rows)}"
+        return text
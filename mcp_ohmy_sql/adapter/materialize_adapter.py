@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+"""
+Materialization adapter mixin, refreshes the scheduled local copies of hot
+queries in the background.
+"""
+
+import typing as T
+import time
+
+from sqlglot import exp
+
+from ..config.api import Database, Materialization
+from ..admission import PriorityEnum
+from ..materialize import MaterializationStatus, get_next_refresh_time
+from ..rewrite.dialect import get_sqlglot_dialect
+from ..rewrite.parser import parse_sql
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .adapter import Adapter
+
+
+class MaterializeAdapterMixin:
+    """
+    Adapter mixin for the scheduled local materialization of hot queries.
+    """
+
+    def is_materialization_enabled(self: "Adapter") -> bool:
+        return (
+            self.config.settings.materialization.enabled
+            and len(self.config.materializations) > 0
+        )
+
+    def get_materialized_database(self: "Adapter") -> T.Optional["Database"]:
+        """
+        Get the read-only database of the materialized tables, None if the
+        materializations are disabled.
+        """
+        if self.is_materialization_enabled() is False:
+            return None
+        return self.config.databases_mapping[
+            self.config.settings.materialization.identifier
+        ]
+
+    def _reset_materialized_schema(self: "Adapter"):
+        """
+        Forget the cached schema of the materialized database, a refresh may
+        have created a table or changed its columns.
+        """
+        database = self.get_materialized_database()
+        database.__dict__.pop("sa_metadata", None)
+        for cache in [
+            self.column_indexes,
+            self.partition_key_indexes,
+            self.table_indexes,
+        ]:
+            cache.pop(database.identifier, None)
+
+    def get_materialization_next_refresh_time(
+        self: "Adapter",
+        materialization: "Materialization",
+        status: T.Optional[MaterializationStatus],
+    ) -> float:
+        """
+        Get when a materialization is due, right away if its source query
+        changed since its last refresh, see
+        :func:`~mcp_ohmy_sql.materialize.get_next_refresh_time`.
+        """
+        if status is not None and (
+            status.sql != materialization.sql
+            or status.database_identifier != materialization.database_identifier
+        ):
+            return 0.0
+        return get_next_refresh_time(
+            status,
+            refresh_interval=materialization.refresh_interval,
+            refresh_hours=materialization.refresh_hours,
+            retry_interval=self.config.settings.materialization.retry_interval,
+        )
+
+    def refresh_materialization(
+        self: "Adapter",
+        materialization: "Materialization",
+    ) -> MaterializationStatus:
+        """
+        Run the source query of a materialization with a background
+        admission slot, so user queries are served first, and replace its
+        local table with the result. If it fails, the old table is kept and
+        the error is recorded in its status.
+        """
+        settings = self.config.settings.materialization
+        database = self.config.databases_mapping[materialization.database_identifier]
+        previous = self.materialized_store.get_statuses().get(materialization.name)
+        status = MaterializationStatus(
+            name=materialization.name,
+            database_identifier=materialization.database_identifier,
+            sql=materialization.sql,
+            attempted_at=time.time(),
+        )
+        try:
+            with self.admit(database, priority=PriorityEnum.BACKGROUND):
+                cursor = self.open_select_cursor(
+                    database=database,
+                    sql=materialization.sql,
+                    max_rows=settings.max_rows,
+                )
+                try:
+                    status.n_rows = self.materialized_store.write_cursor(
+                        name=materialization.name,
+                        cursor=cursor,
+                        batch_size=settings.batch_size,
+                    )
+                    status.truncated = cursor.truncated
+                finally:
+                    cursor.close()
+            status.refreshed_at = time.time()
+            status.duration = status.refreshed_at - status.attempted_at
+            self._reset_materialized_schema()
+        except Exception as e:
+            # the first line, without the SQL and the links of SQLAlchemy
+            status.error = (str(e) or repr(e)).splitlines()[0]
+            # the old table is still there, keep its freshness
+            if previous is not None and previous.sql == materialization.sql:
+                status.refreshed_at = previous.refreshed_at
+                status.n_rows = previous.n_rows
+                status.truncated = previous.truncated
+                status.duration = previous.duration
+        status.next_refresh_at = self.get_materialization_next_refresh_time(
+            materialization, status
+        )
+        self.materialized_store.set_status(status)
+        return status
+
+    def refresh_due_materializations(
+        self: "Adapter",
+        now: T.Optional[float] = None,
+    ) -> list[MaterializationStatus]:
+        """
+        Refresh the materializations that are due, one after another.
+
+        :returns: the status of each refreshed materialization.
+        """
+        if now is None:
+            now = time.time()
+        statuses = self.materialized_store.get_statuses()
+        refreshed = list()
+        for materialization in self.config.materializations:
+            next_refresh_time = self.get_materialization_next_refresh_time(
+                materialization, statuses.get(materialization.name)
+            )
+            if next_refresh_time <= now:
+                refreshed.append(self.refresh_materialization(materialization))
+        return refreshed
+
+    def start_materializations(self: "Adapter") -> bool:
+        """
+        Create the local database of the materialized tables, and start the
+        background scheduler refreshing them.
+
+        :returns: False if the materializations are disabled.
+        """
+        if self.is_materialization_enabled() is False:
+            return False
+        self.materialized_store.initialize(
+            names=[item.name for item in self.config.materializations]
+        )
+        self._reset_materialized_schema()
+        self.materialization_scheduler.start()
+        return True
+
+    def get_materialization_note(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+    ) -> T.Optional[str]:
+        """
+        Get the freshness of the materialized tables a query reads, e.g.
+        ``monthly_sales materialized from 'warehouse' at ... (3600 seconds ago, 12 rows)``.
+
+        :returns: the note, or None if the query doesn't read a materialized
+            table.
+        """
+        materialized_database = self.get_materialized_database()
+        if (
+            materialized_database is None
+            or database.identifier != materialized_database.identifier
+        ):
+            return None
+        try:
+            ast = parse_sql(sql, get_sqlglot_dialect(database.db_type))
+        except Exception:
+            return None
+        table_names = {table.name.lower() for table in ast.find_all(exp.Table)}
+        statuses = self.materialized_store.get_statuses()
+        now = time.time()
+        lines = [
+            status.to_freshness(now)
+            for name, status in statuses.items()
+            if name.lower() in table_names
+        ]
+        if len(lines) == 0:
+            return None
+        return "; ".join(lines)
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+"""
+Pre-flight cost guard adapter mixin, checks the query plan before running a query.
+"""
+
+import typing as T
+from contextlib import contextmanager
+
+from ..constants import DbTypeEnum
+from ..config.api import Database
+from ..sa import api as sa_api
+from ..aws.aws_redshift import api as aws_redshift_api
+from ..rewrite import api as rewrite_api
+from ..explain import api as explain_api
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    import redshift_connector
+    from .adapter import Adapter
+
+
+class PreflightAdapterMixin:
+    """
+    Adapter mixin for the EXPLAIN based pre-flight cost guard.
+    """
+
+    def get_rs_conn(
+        self: "Adapter",
+        database: "Database",
+    ) -> "redshift_connector.Connection":
+        """
+        Get the Redshift connection of the current thread. A
+        ``redshift_connector`` connection must not be shared between threads
+        (its ``threadsafety`` is 1), and tool calls run in worker threads at
+        the same time, so each thread opens its own connection on first use
+        and reuses it for its next calls.
+        """
+        conns = self.thread_rs_conns.__dict__.setdefault("conns", dict())
+        conn = conns.get(database.identifier)
+        if conn is None:
+            conn = database.connection.get_rs_conn()
+            conns[database.identifier] = conn
+        return conn
+
+    def get_conn_or_engine(
+        self: "Adapter",
+        database: "Database",
+    ):
+        """
+        Get the object used to run SQL against the database, the Redshift
+        connection of the current thread for Redshift, see :meth:`get_rs_conn`,
+        the SQLAlchemy engine for everything else.
+        """
+        if database.db_type == DbTypeEnum.AWS_REDSHIFT.value:
+            return self.get_rs_conn(database)
+        else:
+            return database.connection.sa_engine
+
+    @contextmanager
+    def dedicated_connection(
+        self: "Adapter",
+        database: "Database",
+    ) -> T.Generator[T.Optional["redshift_connector.Connection"], None, None]:
+        """
+        Open a new Redshift connection for a worker thread, and close it at
+        the end. A ``redshift_connector`` connection must not be shared
+        between threads (its ``threadsafety`` is 1), unlike the SQLAlchemy
+        engine, which gives each thread its own pooled connection, so None is
+        yielded for the other databases.
+        """
+        if database.db_type == DbTypeEnum.AWS_REDSHIFT.value:
+            conn = database.connection.get_rs_conn()
+            try:
+                yield conn
+            finally:
+                conn.close()
+        else:
+            yield None
+
+    def get_query_plan(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        conn_or_engine: T.Optional[aws_redshift_api.T_CONN_OR_ENGINE] = None,
+    ) -> explain_api.QueryPlan:
+        """
+        Get the query plan of a SELECT statement, cached per normalized query.
+
+        :param conn_or_engine: run EXPLAIN on this connection instead of
+            :meth:`get_conn_or_engine`.
+
+        :raises NotImplementedError: if the database doesn't support EXPLAIN.
+        """
+        normalized_sql = rewrite_api.normalize_sql(
+            sql,
+            rewrite_api.get_sqlglot_dialect(database.db_type),
+        )
+        key = self.plan_cache.make_key(database.identifier, normalized_sql, params)
+        query_plan = self.plan_cache.get(key)
+        if query_plan is None:
+            query_plan = explain_api.explain_query(
+                conn_or_engine=conn_or_engine or self.get_conn_or_engine(database),
+                sql=sql,
+                db_type=database.db_type,
+                params=params,
+            )
+            self.plan_cache.set(key, query_plan)
+        return query_plan
+
+    def get_exact_count(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        conn_or_engine: T.Optional[aws_redshift_api.T_CONN_OR_ENGINE] = None,
+    ) -> int:
+        """
+        Get the exact number of rows returned by a SELECT statement.
+
+        :param conn_or_engine: run the count on this connection instead of
+            :meth:`get_conn_or_engine`.
+        """
+        if conn_or_engine is None:
+            conn_or_engine = self.get_conn_or_engine(database)
+        if database.db_type == DbTypeEnum.AWS_REDSHIFT.value:
+            return aws_redshift_api.execute_count_query(
+                conn=conn_or_engine,
+                query=sql,
+                params=params,
+            )
+        else:
+            return sa_api.execute_count_query(
+                engine=conn_or_engine,
+                query=sql,
+                params=params,
+            )
+
+    def run_preflight(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        count_sql: T.Optional[str] = None,
+        conn_or_engine: T.Optional[aws_redshift_api.T_CONN_OR_ENGINE] = None,
+    ) -> T.Optional[explain_api.PreflightResult]:
+        """
+        Check the query against the ``settings.preflight`` thresholds.
+
+        The guard fails open: if the check itself fails (e.g. the SQL is
+        invalid), None is returned and the query runs as usual, so the model
+        gets the real database error.
+
+        :param database: the target database.
+        :param sql: the SELECT statement that is about to run.
+        :param params: optional bind parameters.
+        :param count_sql: the SQL used for the exact count, typically the
+            statement before the row cap was pushed down. Defaults to ``sql``.
+        :param conn_or_engine: run the checks on this connection instead of
+            :meth:`get_conn_or_engine`.
+
+        :returns: the :class:`~mcp_ohmy_sql.explain.preflight.PreflightResult`,
+            or None if the guard is disabled or the check failed.
+        """
+        preflight_settings = self.config.settings.preflight
+        if preflight_settings.enabled is False:
+            return None
+        try:
+            try:
+                query_plan = self.get_query_plan(
+                    database, sql, params, conn_or_engine=conn_or_engine
+                )
+            except NotImplementedError:
+                query_plan = None
+            result = explain_api.check_query_plan(query_plan, preflight_settings)
+            # only pay for the exact count if the cheap check passed
+            if result.passed and preflight_settings.exact_count:
+                exact_count = self.get_exact_count(
+                    database,
+                    count_sql or sql,
+                    params,
+                    conn_or_engine=conn_or_engine,
+                )
+                result = explain_api.check_query_plan(
+                    query_plan,
+                    preflight_settings,
+                    exact_count=exact_count,
+                )
+            return result
+        except Exception:
+            return None
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+"""
+Profile adapter mixin, samples the tables in the background and keeps the
+profile of their columns for the schema details.
+"""
+
+import typing as T
+import time
+
+from ..constants import ObjectTypeEnum
+from ..config.api import Database, Schema
+from ..admission import PriorityEnum
+from ..profiling import TableProfile, new_table_profile, encode_table_profiles
+from ..rewrite import api as rewrite_api
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .adapter import Adapter
+
+
+class ProfileAdapterMixin:
+    """
+    Adapter mixin for the cached column profiles of the tables.
+    """
+
+    def get_profiled_tables(
+        self: "Adapter",
+        database: "Database",
+        schema: "Schema",
+    ) -> list[tuple[str, list[str]]]:
+        """
+        Get the ``(table_name, column_names)`` of the tables of a schema that
+        are profiled, views are not sampled.
+
+        This takes a metadata admission slot.
+        """
+        schema_name = schema.name or None
+        database_info = self.get_database_info(database)
+        tables = list()
+        for schema_info in database_info.schemas:
+            if (schema_info.name or None) != schema_name:
+                continue
+            for table_info in schema_info.tables:
+                if table_info.object_type != ObjectTypeEnum.TABLE:
+                    continue
+                tables.append(
+                    (
+                        table_info.name,
+                        [column.name for column in table_info.columns],
+                    )
+                )
+        return tables
+
+    def profile_table(
+        self: "Adapter",
+        database: "Database",
+        schema_name: T.Optional[str],
+        table_name: str,
+        column_names: list[str],
+        deadline: T.Optional[float] = None,
+    ) -> T.Optional[TableProfile]:
+        """
+        Sample a table with a background admission slot and compute the
+        profile of its columns.
+
+        The table is first sampled at ``settings.profiling.sample_percent`` %.
+        If the sample has fewer than ``sample_rows`` rows, the rows of the
+        table are counted: a table with at most ``sample_rows`` rows is read
+        whole, a larger one is sampled again at the rate that gives about
+        ``sample_rows`` rows.
+
+        :param deadline: Unix time after which the table is not sampled.
+
+        :returns: the profile, or None if the deadline has passed.
+        """
+        if deadline is not None and time.time() > deadline:
+            return None
+        settings = self.config.settings.profiling
+        limit = settings.sample_rows
+        with self.admit(database, priority=PriorityEnum.BACKGROUND):
+            rows = self.fetch_select_result(
+                database=database,
+                sql=rewrite_api.get_table_sample_sql(
+                    schema_name=schema_name,
+                    table_name=table_name,
+                    column_names=column_names,
+                    db_type=database.db_type,
+                    percent=settings.sample_percent,
+                    limit=limit,
+                ),
+                max_rows=limit,
+            )
+            complete = False
+            if settings.sample_percent >= 100:
+                complete = len(rows) < limit
+            elif len(rows) < limit:
+                n_rows = self.get_exact_count(
+                    database=database,
+                    sql=rewrite_api.get_table_sample_sql(
+                        schema_name=schema_name,
+                        table_name=table_name,
+                        column_names=column_names,
+                        db_type=database.db_type,
+                        limit=None,
+                    ),
+                )
+                complete = n_rows <= limit
+                if complete:
+                    percent = None
+                else:
+                    # sample a bit more, the sample size varies around its mean
+                    percent = min(100.0, 120.0 * limit / n_rows)
+                rows = self.fetch_select_result(
+                    database=database,
+                    sql=rewrite_api.get_table_sample_sql(
+                        schema_name=schema_name,
+                        table_name=table_name,
+                        column_names=column_names,
+                        db_type=database.db_type,
+                        percent=percent,
+                        limit=limit,
+                    ),
+                    max_rows=limit,
+                )
+        return new_table_profile(
+            schema_name=schema_name,
+            table_name=table_name,
+            column_names=column_names,
+            column_values=[rows.column_values(ith) for ith in range(len(column_names))],
+            complete=complete,
+            max_values=settings.max_values,
+            max_value_chars=settings.max_value_chars,
+        )
+
+    def start_profiling(
+        self: "Adapter",
+        database: "Database",
+        schema: "Schema",
+        tables: T.Optional[list[tuple[str, list[str]]]] = None,
+    ) -> int:
+        """
+        Profile the tables of a schema that have no profile, or an expired
+        one, in the background within ``settings.profiling.time_budget``
+        seconds.
+
+        :param tables: see :meth:`get_profiled_tables`.
+
+        :returns: the number of tables being profiled.
+        """
+        settings = self.config.settings.profiling
+        if tables is None:
+            tables = self.get_profiled_tables(database, schema)
+        schema_name = schema.name or None
+        now = time.time()
+        deadline = now + settings.time_budget
+        n_pending = 0
+        for table_name, column_names in tables:
+            key = (database.identifier, schema_name, table_name)
+            profile = self.profile_store.get(key)
+            if profile is not None and now - profile.profiled_at < settings.profile_ttl:
+                continue
+            self.profile_store.submit(
+                key,
+                run=lambda table_name=table_name, column_names=column_names: (
+                    self.profile_table(
+                        database=database,
+                        schema_name=schema_name,
+                        table_name=table_name,
+                        column_names=column_names,
+                        deadline=deadline,
+                    )
+                ),
+            )
+            n_pending += 1
+        return n_pending
+
+    def get_schema_profiles(
+        self: "Adapter",
+        database: "Database",
+        schema: "Schema",
+    ) -> str:
+        """
+        Get the cached column profiles of the tables of a schema, see
+        :func:`~mcp_ohmy_sql.profiling.encode_table_profiles`, and start
+        profiling the tables that have none or an expired one.
+
+        This takes a metadata admission slot.
+        """
+        if self.config.settings.profiling.enabled is False:
+            return (
+                "Column profiles are disabled, "
+                "set settings.profiling.enabled to compute them."
+            )
+        tables = self.get_profiled_tables(database, schema)
+        n_pending = self.start_profiling(database, schema, tables=tables)
+        table_names = {table_name for table_name, _ in tables}
+        profiles = [
+            profile
+            for profile in self.profile_store.get_schema(
+                database.identifier, schema.name or None
+            )
+            if profile.table_name in table_names
+        ]
+        lines = list()
+        if profiles:
+            lines.append(encode_table_profiles(profiles))
+        if n_pending:
+            lines.append(
+                f"{n_pending} tables are being profiled in the background, "
+                f"call again later for their profiles."
+            )
+        if len(lines) == 0:  # pragma: no cover
+            lines.append("No table to profile.")
+        return "\n".join(lines)
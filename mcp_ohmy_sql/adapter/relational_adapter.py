@@ -8,6 +8,7 @@ import typing as T
 
 from ..constants import DbTypeEnum
 from ..config.api import Database, Schema
+from ..admission import PriorityEnum
 from ..db.relational import api as relational
 
 if T.TYPE_CHECKING:  # pragma: no cover
@@ -31,13 +32,14 @@ class RelationalAdapterMixin:
 
         :returns: A SchemaInfo object containing the schema details.
         """
-        schema_info = relational.new_schema_info(
-            engine=database.connection.sa_engine,
-            metadata=database.sa_metadata,
-            schema_name=schema.name,
-            include=schema.table_filter.include,
-            exclude=schema.table_filter.exclude,
-        )
+        with self.admit(database, priority=PriorityEnum.METADATA):
+            schema_info = relational.new_schema_info(
+                engine=database.connection.sa_engine,
+                metadata=database.sa_metadata,
+                schema_name=schema.name,
+                include=schema.table_filter.include,
+                exclude=schema.table_filter.exclude,
+            )
         return schema_info
 
     def get_relational_database_info(
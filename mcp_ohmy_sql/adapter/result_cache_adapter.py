@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+
+"""
+Result cache adapter mixin, serves repeated queries from memory while their
+tables are unchanged, and refreshes the results of append-only tables
+incrementally.
+"""
+
+import typing as T
+import time
+import dataclasses
+
+from ..constants import DbTypeEnum, ResultFormatEnum
+from ..config.api import Database
+from ..sa.query import get_truncated_footer
+from ..table_version import TableVersionProbe, is_append_only_change
+from ..rewrite import api as rewrite_api
+from ..result import api as result_api
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .adapter import Adapter
+
+
+def _find_column(columns: list[str], name: str) -> int:
+    """
+    Find the position of a result column, case-insensitive.
+
+    :raises ValueError: if the column is not in the result, or is ambiguous.
+    """
+    positions = [
+        ith for ith, column in enumerate(columns) if column.lower() == name.lower()
+    ]
+    if len(positions) != 1:
+        raise ValueError(f"the key {name} is not a column of the result")
+    return positions[0]
+
+
+class ResultCacheAdapterMixin:
+    """
+    Adapter mixin for the query result cache.
+    """
+
+    def is_result_cache_enabled(self: "Adapter") -> bool:
+        return self.config.settings.result_cache.enabled
+
+    def get_append_only_key_index(
+        self: "Adapter",
+        database: "Database",
+    ) -> rewrite_api.T_PARTITION_KEY_INDEX:
+        """
+        Get the partition keys of the ``append_only_tables`` of the schemas
+        of a database, by ``table`` and ``schema.table`` name.
+
+        This may take a metadata admission slot to load the schema, call it
+        before admitting the query.
+        """
+        names = set()
+        for schema in database.schemas:
+            for table_name in schema.append_only_tables:
+                names.add(table_name.lower())
+                if schema.name:
+                    names.add(f"{schema.name.lower()}.{table_name.lower()}")
+        if not names:
+            return {}
+        key_index = self.get_partition_key_index(database) or {}
+        return {name: key for name, key in key_index.items() if name in names}
+
+    def get_incremental_key(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+    ) -> T.Optional[str]:
+        """
+        Get the increasing key column of the table the query reads, see
+        :func:`~mcp_ohmy_sql.rewrite.incremental.find_incremental_key`. The
+        primary key of a table is only used if the table is declared
+        append-only, see :meth:`get_append_only_key_index`.
+
+        This may take a metadata admission slot to load the schema, call it
+        before admitting the query.
+
+        :returns: the key column, or None if the result can't be refreshed
+            incrementally.
+        """
+        result_cache = self.config.settings.result_cache
+        if result_cache.enabled is False or result_cache.incremental is False:
+            return None
+        key_index = None
+        if rewrite_api.get_incremental_key_hint(sql) is None:
+            key_index = self.get_append_only_key_index(database)
+        try:
+            return rewrite_api.find_incremental_key(
+                sql=sql,
+                db_type=database.db_type,
+                key_index=key_index,
+            )
+        except ValueError:
+            return None
+
+    def get_source_tables(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+    ) -> T.Optional[list[rewrite_api.T_TABLE]]:
+        """
+        Get the base tables the query reads, to track their changes, see
+        :func:`~mcp_ohmy_sql.rewrite.tables.get_source_tables`.
+
+        This may take a metadata admission slot to load the schema, call it
+        before admitting the query.
+
+        :returns: the tables, or None if their changes can't be tracked.
+        """
+        result_cache = self.config.settings.result_cache
+        if result_cache.enabled is False or result_cache.track_table_changes is False:
+            return None
+        if self.get_table_version_probe(database).is_supported() is False:
+            return None
+        table_index = self.get_table_index(database)
+        if table_index is None:
+            return None
+        try:
+            return rewrite_api.get_source_tables(
+                sql=sql,
+                db_type=database.db_type,
+                table_index=table_index,
+            )
+        except ValueError:
+            return None
+
+    def get_table_version_probe(
+        self: "Adapter",
+        database: "Database",
+    ) -> TableVersionProbe:
+        probe = self.table_version_probes.get(database.identifier)
+        if probe is None:
+            # the probe is shared by all threads, it gets its own Redshift
+            # connection and serializes its queries on it
+            if database.db_type == DbTypeEnum.AWS_REDSHIFT.value:
+                conn_or_engine = database.connection.get_rs_conn()
+            else:
+                conn_or_engine = database.connection.sa_engine
+            probe = self.table_version_probes.setdefault(
+                database.identifier,
+                TableVersionProbe(
+                    db_type=database.db_type,
+                    conn_or_engine=conn_or_engine,
+                ),
+            )
+        return probe
+
+    def _get_table_version(
+        self: "Adapter",
+        database: "Database",
+        tables: T.Optional[list[rewrite_api.T_TABLE]],
+    ) -> T.Optional[tuple]:
+        """
+        :returns: the version of the tables, or None if they are unknown or
+            the probe fails, then the cached result simply expires.
+        """
+        if tables is None:
+            return None
+        try:
+            return self.get_table_version_probe(database).get_version(tables)
+        except Exception:
+            return None
+
+    def _compute_cached_result(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        limited_sql: str,
+        params: T.Optional[dict[str, T.Any]],
+        incremental_key: T.Optional[str],
+        tables: T.Optional[list[rewrite_api.T_TABLE]] = None,
+        table_version: T.Optional[tuple] = None,
+    ) -> result_api.CachedResult:
+        """
+        Run the query in full.
+
+        :param table_version: the version of the tables, fetched before the
+            query runs, so a change during the query is never missed.
+        """
+        max_rows = self.config.settings.max_rows
+        rows = self.fetch_select_result(
+            database=database,
+            sql=limited_sql,
+            params=params,
+            max_rows=max_rows,
+        )
+        truncated = len(rows) > max_rows
+        high_water_mark = None
+        if incremental_key is not None and truncated is False:
+            try:
+                position = _find_column(rows.columns, incremental_key)
+                high_water_mark = rewrite_api.get_high_water_mark(
+                    rows.column_values(position)
+                )
+            except ValueError:
+                incremental_key = None
+        now = time.time()
+        return result_api.CachedResult(
+            database_identifier=database.identifier,
+            sql=sql,
+            rows=rows,
+            truncated=truncated,
+            created_at=now,
+            refreshed_at=now,
+            checked_at=now,
+            incremental_key=incremental_key,
+            high_water_mark=high_water_mark,
+            tables=tables,
+            table_version=table_version,
+        )
+
+    def _can_refresh_incrementally(
+        self: "Adapter",
+        cached: result_api.CachedResult,
+        now: float,
+    ) -> bool:
+        result_cache = self.config.settings.result_cache
+        return (
+            result_cache.incremental
+            and cached.incremental_key is not None
+            and cached.high_water_mark is not None
+            and cached.truncated is False
+            and now - cached.created_at < result_cache.full_refresh_interval
+        )
+
+    def _refresh_cached_result(
+        self: "Adapter",
+        database: "Database",
+        cached: result_api.CachedResult,
+        params: T.Optional[dict[str, T.Any]],
+        table_version: T.Optional[tuple] = None,
+    ) -> result_api.CachedResult:
+        """
+        Fetch the rows from the high-water mark of a cached result on, and
+        append them to a copy of its rows without the high-water mark rows,
+        so the key doesn't have to be unique.
+
+        :raises Exception: if the new rows can't be fetched or merged.
+        """
+        max_rows = self.config.settings.max_rows
+        named_params = database.db_type != DbTypeEnum.AWS_REDSHIFT.value
+        position = _find_column(cached.rows.columns, cached.incremental_key)
+        rows = result_api.ResultBuffer(cached.rows.columns)
+        rows.append_rows(
+            [row for row in cached.rows if row[position] != cached.high_water_mark]
+        )
+        incremental_sql = rewrite_api.get_incremental_sql(
+            sql=cached.sql,
+            db_type=database.db_type,
+            column=cached.incremental_key,
+            high_water_mark=cached.high_water_mark,
+            named_params=named_params,
+        )
+        # the merged result may have at most max_rows + 1 rows
+        remaining = max_rows - len(rows)
+        limited_sql = rewrite_api.add_row_limit(
+            sql=incremental_sql,
+            db_type=database.db_type,
+            limit=remaining + 1,
+            named_params=named_params,
+        )
+        new_rows = self.fetch_select_result(
+            database=database,
+            sql=limited_sql,
+            params=params,
+            max_rows=remaining,
+        )
+        if new_rows.columns != cached.rows.columns:
+            raise ValueError("the columns of the result have changed")
+        high_water_mark = rewrite_api.get_high_water_mark(
+            [cached.high_water_mark] + new_rows.column_values(position)
+        )
+        rows.append_rows(list(new_rows))
+        now = time.time()
+        return dataclasses.replace(
+            cached,
+            rows=rows,
+            truncated=len(rows) > max_rows,
+            refreshed_at=now,
+            checked_at=now,
+            high_water_mark=high_water_mark,
+            n_refreshes=cached.n_refreshes + 1,
+            table_version=table_version,
+        )
+
+    def execute_with_result_cache(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        limited_sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        max_chars: T.Optional[int] = None,
+        result_format: str = ResultFormatEnum.MARKDOWN.value,
+        incremental_key: T.Optional[str] = None,
+        source_tables: T.Optional[list[rewrite_api.T_TABLE]] = None,
+    ) -> str:
+        """
+        Serve a query from :attr:`~mcp_ohmy_sql.adapter.adapter.Adapter.result_cache`
+        if its result was checked less than ``settings.result_cache.ttl``
+        seconds ago, or if the tables it reads are unchanged since. Otherwise,
+        if the result has an incremental key, only fetch the rows from its
+        high-water mark on, and fall back to running the query in full if
+        that is not possible or fails.
+
+        :param sql: the query without the row limit.
+        :param limited_sql: the query with the ``settings.max_rows`` row limit.
+        :param incremental_key: see :meth:`get_incremental_key`.
+        :param source_tables: see :meth:`get_source_tables`.
+        """
+        settings = self.config.settings
+        result_cache = settings.result_cache
+        key = self.result_cache.make_key(database.identifier, limited_sql, params)
+        now = time.time()
+        cached = self.result_cache.get(key)
+        note = None
+        if cached is not None and now - cached.checked_at < result_cache.ttl:
+            note = f"cached result from {now - cached.refreshed_at:.0f} seconds ago"
+        else:
+            tables = source_tables if cached is None else cached.tables
+            table_version = self._get_table_version(database, tables)
+            if (
+                cached is not None
+                and table_version is not None
+                and table_version == cached.table_version
+            ):
+                cached = dataclasses.replace(cached, checked_at=now)
+                note = (
+                    f"cached result from {now - cached.refreshed_at:.0f} "
+                    f"seconds ago, its tables are unchanged"
+                )
+            else:
+                refreshed = None
+                if (
+                    cached is not None
+                    and self._can_refresh_incrementally(cached, now)
+                    and (
+                        table_version is None
+                        or cached.table_version is None
+                        or is_append_only_change(
+                            database.db_type, cached.table_version, table_version
+                        )
+                    )
+                ):
+                    try:
+                        refreshed = self._refresh_cached_result(
+                            database, cached, params, table_version
+                        )
+                        n_new_rows = len(refreshed.rows) - len(cached.rows)
+                        note = (
+                            f"cached result refreshed incrementally, {n_new_rows} "
+                            f"new rows with {cached.incremental_key} >= "
+                            f"{cached.high_water_mark!r}"
+                        )
+                    except Exception:
+                        refreshed = None
+                if refreshed is None:
+                    try:
+                        refreshed = self._compute_cached_result(
+                            database=database,
+                            sql=sql,
+                            limited_sql=limited_sql,
+                            params=params,
+                            incremental_key=incremental_key,
+                            tables=tables,
+                            table_version=table_version,
+                        )
+                    except Exception as e:
+                        return f"Error executing query: {e}"
+                cached = refreshed
+            self.result_cache.set(key, cached)
+
+        rows = cached.rows
+        if len(rows) == 0:
+            text = "No result"
+        else:
+            try:
+                text = result_api.encode_result(
+                    columns=rows.columns,
+                    rows=rows[: settings.max_rows],
+                    result_format=result_format,
+                    max_chars=max_chars,
+                    max_cell_chars=settings.max_cell_chars,
+                )
+            except Exception as e:  # pragma: no cover
+                return f"Error formatting result: {e}"
+            if cached.truncated:
+                text = f"{text}\n{get_truncated_footer(settings.max_rows)}"
+        if note is not None:
+            text = f"{text}\n... ({note})"
+        return text
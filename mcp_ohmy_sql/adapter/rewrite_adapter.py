@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+"""
+SQL rewrite adapter mixin, rewrites queries using the cached schema.
+"""
+
+import typing as T
+import time
+
+from ..constants import DbTypeEnum
+from ..config.api import Database
+from ..rewrite import api as rewrite_api
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .adapter import Adapter
+
+
+class RewriteAdapterMixin:
+    """
+    Adapter mixin for schema aware SQL rewriting.
+    """
+
+    def get_database_info(
+        self: "Adapter",
+        database: "Database",
+    ):
+        """
+        Get the relational or Redshift ``DatabaseInfo`` of the configured
+        schemas, it takes a metadata admission slot.
+        """
+        if database.db_type == DbTypeEnum.AWS_REDSHIFT.value:
+            return self.get_aws_redshift_database_info(database)
+        else:
+            return self.get_relational_database_info(database)
+
+    def get_column_index(
+        self: "Adapter",
+        database: "Database",
+    ) -> T.Optional[rewrite_api.T_COLUMN_INDEX]:
+        """
+        Get the column index used to truncate large values, see
+        :func:`~mcp_ohmy_sql.rewrite.truncate.new_column_index`. It is cached
+        for ``settings.cache_for_schema_expires`` seconds.
+
+        This takes a metadata admission slot, call it before admitting the query.
+
+        :returns: the column index, or None if the schema can't be loaded
+            (e.g. the database is too busy), the query is then sent as it is.
+        """
+        settings = self.config.settings
+        now = time.time()
+        cached = self.column_indexes.get(database.identifier)
+        if cached is not None and now - cached[0] < settings.cache_for_schema_expires:
+            return cached[1]
+        try:
+            column_index = rewrite_api.new_column_index(
+                self.get_database_info(database),
+                max_chars=settings.max_cell_chars,
+            )
+        except Exception:
+            return None
+        self.column_indexes[database.identifier] = (now, column_index)
+        return column_index
+
+    def get_partition_key_index(
+        self: "Adapter",
+        database: "Database",
+    ) -> T.Optional[rewrite_api.T_PARTITION_KEY_INDEX]:
+        """
+        Get the partition key index used to split large exports, see
+        :func:`~mcp_ohmy_sql.rewrite.partition.new_partition_key_index`. It
+        is cached for ``settings.cache_for_schema_expires`` seconds.
+
+        This takes a metadata admission slot, call it before admitting the query.
+
+        :returns: the partition key index, or None if the schema can't be loaded.
+        """
+        settings = self.config.settings
+        now = time.time()
+        cached = self.partition_key_indexes.get(database.identifier)
+        if cached is not None and now - cached[0] < settings.cache_for_schema_expires:
+            return cached[1]
+        try:
+            key_index = rewrite_api.new_partition_key_index(
+                self.get_database_info(database),
+            )
+        except Exception:
+            return None
+        self.partition_key_indexes[database.identifier] = (now, key_index)
+        return key_index
+
+    def get_table_index(
+        self: "Adapter",
+        database: "Database",
+    ) -> T.Optional[rewrite_api.T_TABLE_INDEX]:
+        """
+        Get the table index used to tag cached results with the tables they
+        read, see :func:`~mcp_ohmy_sql.rewrite.tables.new_table_index`. It is
+        cached for ``settings.cache_for_schema_expires`` seconds.
+
+        This takes a metadata admission slot, call it before admitting the query.
+
+        :returns: the table index, or None if the schema can't be loaded.
+        """
+        settings = self.config.settings
+        now = time.time()
+        cached = self.table_indexes.get(database.identifier)
+        if cached is not None and now - cached[0] < settings.cache_for_schema_expires:
+            return cached[1]
+        try:
+            table_index = rewrite_api.new_table_index(
+                self.get_database_info(database),
+            )
+        except Exception:
+            return None
+        self.table_indexes[database.identifier] = (now, table_index)
+        return table_index
+
+    def truncate_large_values(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        column_index: T.Optional[rewrite_api.T_COLUMN_INDEX],
+        named_params: bool = True,
+    ) -> str:
+        """
+        Push the ``settings.max_cell_chars`` truncation of large values down
+        into the SQL, see :func:`~mcp_ohmy_sql.rewrite.truncate.truncate_large_values`.
+
+        :returns: the rewritten SQL, or the original SQL if the feature is
+            disabled, the column index is not available or the rewrite failed.
+        """
+        settings = self.config.settings
+        if (
+            settings.push_down_truncation is False
+            or settings.max_cell_chars is None
+            or column_index is None
+        ):
+            return sql
+        try:
+            return rewrite_api.truncate_large_values(
+                sql=sql,
+                db_type=database.db_type,
+                column_index=column_index,
+                max_chars=settings.max_cell_chars,
+                named_params=named_params,
+            )
+        except Exception:  # pragma: no cover
+            return sql
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+"""
+Spill adapter mixin, keeps large query results in local files so the model
+can page through them without re-running the query.
+"""
+
+import typing as T
+
+from ..constants import DbTypeEnum, ResultFormatEnum
+from ..config.api import Database
+from ..sa import api as sa_api
+from ..sa.query import get_truncated_footer
+from ..aws.aws_redshift import api as aws_redshift_api
+from ..result import api as result_api
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .adapter import Adapter
+
+
+def format_result_page(
+    page: result_api.ResultPage,
+    text: str,
+    n_shown_rows: T.Optional[int] = None,
+) -> str:
+    """
+    Append the position of the page and how to get the next one.
+
+    :param n_shown_rows: number of rows of the page shown in ``text``,
+        defaults to all of them. If the character budget cut some, the same
+        page must be fetched again with a larger budget, the next page
+        doesn't start where the text stops.
+    """
+    footer = f"... ({page.to_header()}"
+    if n_shown_rows is not None and n_shown_rows < len(page.rows):
+        footer = (
+            f"{footer}, only {n_shown_rows} of the {len(page.rows)} rows of "
+            f"this page fit in max_result_chars, call fetch_result_page with "
+            f"handle={page.result.handle!r} and page={page.page} and a larger "
+            f"max_result_chars for the rest"
+        )
+    elif page.page < page.result.n_pages:
+        footer = (
+            f"{footer}, call fetch_result_page with "
+            f"handle={page.result.handle!r} and page={page.page + 1} "
+            f"for the next page"
+        )
+    return f"{text}\n{footer})"
+
+
+class SpillAdapterMixin:
+    """
+    Adapter mixin for large result spilling and paging.
+    """
+
+    def is_spill_enabled(self: "Adapter") -> bool:
+        """
+        Spilling needs both ``settings.spill.enabled`` and ``pyarrow``.
+        """
+        return (
+            self.config.settings.spill.enabled and result_api.is_arrow_available()
+        )
+
+    def fetch_select_result(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        max_rows: T.Optional[int] = None,
+    ) -> result_api.ResultBuffer:
+        """
+        Run a SELECT statement and fetch its rows without formatting.
+        """
+        if database.db_type == DbTypeEnum.AWS_REDSHIFT.value:
+            return aws_redshift_api.fetch_select_result(
+                conn=self.get_rs_conn(database),
+                query=sql,
+                params=params,
+                max_rows=max_rows,
+            )
+        else:
+            return sa_api.fetch_select_result(
+                engine=database.connection.sa_engine,
+                query=sql,
+                params=params,
+                max_rows=max_rows,
+            )
+
+    def execute_and_spill(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        max_chars: T.Optional[int] = None,
+        result_format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Run a SELECT statement and return its rows inline if they fit in one
+        page. Otherwise up to ``settings.spill.max_rows`` rows are streamed
+        page by page into :attr:`~mcp_ohmy_sql.adapter.adapter.Adapter.spill_store`
+        and the first page is returned with the result handle.
+
+        If the rows can't be spilled (e.g. a column mixes types), the first
+        ``settings.max_rows`` rows are returned like a normal query.
+        """
+        settings = self.config.settings
+        spill = settings.spill
+        try:
+            cursor = self.open_select_cursor(
+                database=database,
+                sql=sql,
+                params=params,
+                max_rows=spill.max_rows,
+            )
+        except Exception as e:
+            return f"Error executing query: {e}"
+        writer = None
+        try:
+            first_page, has_more = cursor.fetch(spill.page_rows)
+            if len(first_page) == 0:
+                return "No result"
+            if has_more:
+                writer = self.spill_store.new_writer(
+                    columns=cursor.columns,
+                    page_rows=spill.page_rows,
+                    database_identifier=database.identifier,
+                    sql=sql,
+                )
+            # the first rows, returned inline if the rows can't be spilled
+            head = list()
+            rows = first_page
+            while True:
+                head.extend(rows[: settings.max_rows + 1 - len(head)])
+                if writer is not None:
+                    try:
+                        writer.write_page(rows)
+                    except Exception:
+                        writer.abort()
+                        writer = None
+                if has_more is False or (
+                    writer is None and len(head) > settings.max_rows
+                ):
+                    break
+                rows, has_more = cursor.fetch(spill.page_rows)
+            spilled = None
+            if writer is not None:
+                try:
+                    spilled = writer.close(truncated=cursor.truncated)
+                except Exception:
+                    pass
+        except Exception as e:
+            if writer is not None:
+                writer.abort()
+            return f"Error executing query: {e}"
+        finally:
+            cursor.close()
+
+        try:
+            if spilled is None:
+                text = result_api.encode_result(
+                    columns=cursor.columns,
+                    rows=head[: settings.max_rows],
+                    result_format=result_format,
+                    max_chars=max_chars,
+                    max_cell_chars=settings.max_cell_chars,
+                )
+                if len(head) > settings.max_rows:
+                    text = f"{text}\n{get_truncated_footer(settings.max_rows)}"
+                return text
+            page = result_api.ResultPage(
+                result=spilled,
+                page=1,
+                columns=cursor.columns,
+                rows=list(first_page),
+            )
+            return self._encode_result_page(page, max_chars, result_format)
+        except Exception as e:  # pragma: no cover
+            return f"Error formatting result: {e}"
+
+    def _encode_result_page(
+        self: "Adapter",
+        page: result_api.ResultPage,
+        max_chars: T.Optional[int] = None,
+        result_format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        report = result_api.BudgetReport()
+        text = result_api.encode_result(
+            columns=page.columns,
+            rows=page.rows,
+            result_format=result_format,
+            max_chars=max_chars,
+            max_cell_chars=self.config.settings.max_cell_chars,
+            report=report,
+        )
+        return format_result_page(page, text, report.n_shown_rows)
+
+    def get_result_page(
+        self: "Adapter",
+        handle: str,
+        page: int,
+        max_chars: T.Optional[int] = None,
+        result_format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Read and encode one page of a spilled result.
+
+        :raises ResultHandleNotFoundError: if the result doesn't exist.
+        :raises IndexError: if the page is out of range.
+        """
+        result_page = self.spill_store.get_page(handle, page)
+        return self._encode_result_page(result_page, max_chars, result_format)
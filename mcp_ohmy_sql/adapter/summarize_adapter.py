@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""
+Summarize adapter mixin, profiles query results inside the database.
+"""
+
+import typing as T
+import dataclasses
+
+from ..constants import DbTypeEnum
+from ..config.api import Database
+from ..admission import PriorityEnum
+from ..rewrite import api as rewrite_api
+from ..result import api as result_api
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .adapter import Adapter
+
+#: number of rows fetched to find the kind of each column
+_KIND_SAMPLE_ROWS = 100
+
+
+@dataclasses.dataclass
+class QuerySummary:
+    """
+    The profile of a query result.
+
+    :param n_rows: number of rows of the result.
+    :param profiles: the profile of each column.
+    :param approximate: whether the distinct counts and quantiles are
+        approximate.
+    :param notes: what could not be computed, and why.
+    """
+
+    n_rows: int
+    profiles: list[result_api.ColumnProfile]
+    approximate: bool = False
+    notes: list[str] = dataclasses.field(default_factory=list)
+
+
+class SummarizeAdapterMixin:
+    """
+    Adapter mixin for the query result profile.
+    """
+
+    def _fetch_summary_row(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]],
+    ) -> dict[str, T.Any]:
+        rows = self.fetch_select_result(
+            database=database,
+            sql=sql,
+            params=params,
+            max_rows=1,
+        )
+        return {
+            column.lower(): value for column, value in zip(rows.columns, rows[0])
+        }
+
+    def summarize_query(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        top_k: int = 5,
+    ) -> QuerySummary:
+        """
+        Profile the result of a query without fetching its rows:
+
+        1. The first rows are fetched to find the columns and their kind.
+        2. One aggregate query computes the statistics of all columns, see
+           :func:`~mcp_ohmy_sql.rewrite.summarize.get_summary_sql`. If it
+           fails with the quantiles, it runs again without them.
+        3. One query counts the ``top_k`` most frequent values of the text
+           and boolean columns that have repeated values, see
+           :func:`~mcp_ohmy_sql.rewrite.summarize.get_top_values_sql`.
+
+        The queries hold one admission slot of the database.
+
+        :raises ValueError: if the query can't be summarized.
+        :raises Exception: if the query fails.
+        """
+        db_type = database.db_type
+        named_params = db_type != DbTypeEnum.AWS_REDSHIFT.value
+        notes = list()
+        with self.admit(database, priority=PriorityEnum.QUERY):
+            sample = self.fetch_select_result(
+                database=database,
+                sql=rewrite_api.add_row_limit(
+                    sql=sql,
+                    db_type=db_type,
+                    limit=_KIND_SAMPLE_ROWS,
+                    named_params=named_params,
+                ),
+                params=params,
+                max_rows=_KIND_SAMPLE_ROWS,
+            )
+            columns = [
+                (column, rewrite_api.get_column_kind(sample.column_values(ith)))
+                for ith, column in enumerate(sample.columns)
+            ]
+            if len(columns) == 0:  # pragma: no cover
+                raise ValueError("the query doesn't return any column")
+
+            quantiles = rewrite_api.has_quantiles(db_type) and any(
+                kind == "number" for _, kind in columns
+            )
+            try:
+                summary = self._fetch_summary_row(
+                    database=database,
+                    sql=rewrite_api.get_summary_sql(
+                        sql=sql,
+                        db_type=db_type,
+                        columns=columns,
+                        quantiles=quantiles,
+                        named_params=named_params,
+                    ),
+                    params=params,
+                )
+            except Exception as e:
+                if quantiles is False:
+                    raise e
+                notes.append(f"Quantiles not computed: {str(e).splitlines()[0]}")
+                quantiles = False
+                summary = self._fetch_summary_row(
+                    database=database,
+                    sql=rewrite_api.get_summary_sql(
+                        sql=sql,
+                        db_type=db_type,
+                        columns=columns,
+                        quantiles=False,
+                        named_params=named_params,
+                    ),
+                    params=params,
+                )
+            n_rows = summary["n_rows"]
+            profiles = result_api.new_column_profiles(
+                columns=columns,
+                db_type=db_type,
+                summary=summary,
+                quantiles=quantiles,
+            )
+
+            # unique values, e.g. names or ids, have no top values
+            top_columns = [
+                (ith, profile.name)
+                for ith, profile in enumerate(profiles)
+                if profile.kind in ("text", "bool")
+                and (profile.stats.get("non_null") or 0) > 0
+                and (profile.stats.get("distinct") or 0)
+                < profile.stats.get("non_null")
+            ]
+            if top_k > 0 and top_columns:
+                try:
+                    top_rows = self.fetch_select_result(
+                        database=database,
+                        sql=rewrite_api.get_top_values_sql(
+                            sql=sql,
+                            db_type=db_type,
+                            columns=top_columns,
+                            top_k=top_k,
+                            named_params=named_params,
+                        ),
+                        params=params,
+                        max_rows=top_k * len(top_columns),
+                    )
+                    for position, value, count in top_rows:
+                        profile = profiles[int(position)]
+                        if profile.top_values is None:
+                            profile.top_values = list()
+                        profile.top_values.append((value, count))
+                except Exception as e:
+                    notes.append(f"Top values not computed: {str(e).splitlines()[0]}")
+
+        return QuerySummary(
+            n_rows=n_rows,
+            profiles=profiles,
+            approximate=rewrite_api.is_distinct_approximate(db_type),
+            notes=notes,
+        )
@@ -4,31 +4,51 @@ import typing as T
 import time
 import textwrap
 
-from ..constants import DbTypeEnum
+from ..constants import DbTypeEnum, PreflightActionEnum, ResultFormatEnum
+from ..constants import JobStatusEnum, ExportFormatEnum
+from ..admission import PriorityEnum, AdmissionRejectedError
+from ..cursor import CursorNotFoundError
+from ..jobs import JobNotFoundError
+from ..local_engine import is_duckdb_available
 
 from ..db.relational import api as relational_db
 from ..db.aws_redshift import api as aws_redshift_db
 from ..sa import api as sa_api
 from ..aws.aws_redshift import api as aws_redshift_api
+from ..rewrite import api as rewrite_api
+from ..explain import api as explain_api
+from ..result import api as result_api
 
 if T.TYPE_CHECKING:  # pragma: no cover
+    from ..config.api import Database, Schema
     from .adapter import Adapter
 
 
 def format_query_result(
     duration: float,
     query_result_text: str,
+    warning: T.Optional[str] = None,
 ):
     """
     Format query execution results with timing information for MCP tool output.
+
+    :param duration: execution time in seconds.
+    :param query_result_text: the formatted query result.
+    :param warning: optional warning shown before the result, e.g. the query
+        was downgraded to a preview by the pre-flight cost guard.
     """
-    lines = [
-        "# Execution Time",
-        f"{duration:.3f} seconds",
-        "",
-        "# Query Result",
-        query_result_text,
-    ]
+    lines = list()
+    if warning:
+        lines.extend(["# Warning", warning, ""])
+    lines.extend(
+        [
+            "# Execution Time",
+            f"{duration:.3f} seconds",
+            "",
+            "# Query Result",
+            query_result_text,
+        ]
+    )
     return "\n".join(lines)
 
 
@@ -124,6 +144,16 @@ class ToolAdapterMixin:
         if flag is False:
             return msg
 
+        try:
+            return self._list_tables(database, schema)
+        except AdmissionRejectedError as e:
+            return f"Error: {e}"
+
+    def _list_tables(
+        self: "Adapter",
+        database: "Database",
+        schema: "Schema",
+    ) -> str:
         if database.db_type in [
             DbTypeEnum.SQLITE.value,
             DbTypeEnum.POSTGRESQL.value,
@@ -237,6 +267,7 @@ class ToolAdapterMixin:
         self: "Adapter",
         database_identifier: str,
         schema_name: T.Optional[str] = None,
+        include_profiles: bool = False,
     ) -> str:
         """
         **CRITICAL FOR SQL WRITING**: Get detailed schema for a specific database.
@@ -284,8 +315,28 @@ class ToolAdapterMixin:
               )
             )
 
+        **Column Profiles:** with ``include_profiles=True`` (when profiling is
+        enabled), a ``Profiles(...)`` section follows with the profile of each
+        table's columns, computed from a sample of its rows in the background:
+        the NULL ratio, the distinct count (``~`` when sampled), the range of
+        numbers and dates, and the exact values of low-cardinality text
+        columns. **Use these values as they are in WHERE clauses**
+        (``status = 'ACTIVE'``, not ``'Active'``). The first call starts
+        profiling, call again later for the tables not profiled yet.
+
+        .. code-block:: typescript
+
+            Profiles(
+              Table Invoice(412 rows)(
+                BillingState:null=49%,distinct=25,
+                BillingCountry:distinct=24,
+                Total:distinct=11,min=0.99,max=25.86,
+              )
+            )
+
         :param database_identifier: Database identifier from list_databases.
         :param schema_name: Optional schema name (uses default if None).
+        :param include_profiles: Whether to add the cached column profiles.
         :returns: Schema structure with tables, columns, types, and relationships.
         """
         (flag, msg, database, schema) = self.get_database_and_schema_object(
@@ -294,6 +345,19 @@ class ToolAdapterMixin:
         if flag is False:
             return msg
 
+        try:
+            s = self._get_schema_details(database, schema)
+            if include_profiles and not s.startswith("Error"):
+                s = f"{s}\n{self.get_schema_profiles(database, schema)}"
+            return s
+        except AdmissionRejectedError as e:
+            return f"Error: {e}"
+
+    def _get_schema_details(
+        self: "Adapter",
+        database: "Database",
+        schema: "Schema",
+    ) -> str:
         if database.db_type in [
             DbTypeEnum.SQLITE.value,
             DbTypeEnum.POSTGRESQL.value,
@@ -314,7 +378,7 @@ class ToolAdapterMixin:
                 all_schema = ", ".join(
                     [name for name in database_info.schemas_mapping if name]
                 )
-                return f"Error: Schema '{schema.name}' not found in database '{database_identifier}', it has the following schemas: {all_schema}"
+                return f"Error: Schema '{schema.name}' not found in database '{database.identifier}', it has the following schemas: {all_schema}"
         else:
             raise NotImplementedError(
                 f"Database type {database.db_type} is not supported."
@@ -325,6 +389,9 @@ class ToolAdapterMixin:
         database_identifier: str,
         sql: str,
         params: T.Optional[dict[str, T.Any]] = None,
+        max_result_chars: T.Optional[int] = None,
+        format: str = ResultFormatEnum.MARKDOWN.value,
+        approximate: bool = False,
     ) -> str:
         """
         Execute SELECT queries with performance timing and formatted results.
@@ -360,17 +427,147 @@ class ToolAdapterMixin:
                 {"artist_id": 1}
             )
 
+        At most ``settings.max_rows`` rows are returned, the row cap is pushed
+        down into the SQL as a dialect-correct ``LIMIT`` / ``TOP`` / ``FETCH FIRST``.
+        If the database is too busy, the request is rejected immediately with
+        a suggested number of seconds to wait before retrying. If the pre-flight
+        cost guard is enabled, queries whose estimated cost or rows exceed the
+        thresholds are rejected or downgraded to a short preview, with the reason.
+
+        Long cells are truncated, oversized columns are elided and trailing
+        rows are cut to fit the result into a character budget, the footer
+        states exactly what was dropped. Long text and JSON values are already
+        cut by the database, binary values are shown as their length and
+        a hash prefix, e.g. ``<5242880 bytes, md5 1b2cf535f27d>``. Select
+        fewer or narrower columns (e.g. ``SUBSTR``) if you need to see
+        the full values.
+
+        If result spilling is enabled, a large result is saved on the server
+        and only its first page is returned, the footer gives a result handle,
+        e.g. ``... (page 1 of 50 (rows 1-100 of 4975), handle: 9f86d081884c7d65, ...)``.
+        Use ``fetch_result_page`` with the handle to read the other pages,
+        don't re-run the query with ``OFFSET``. If cursor pagination is enabled
+        instead, the footer gives a continuation token, e.g.
+        ``... (rows 1-100, more rows available, call continue_query with token='9f86d081884c7d65' ...)``,
+        use ``continue_query`` with the token to read the next rows.
+        If the local engine is enabled, a large result is loaded into a local
+        table instead, the footer gives its name and columns, e.g.
+        ``... (showing the first rows, the full result is loaded into the local table result_1 ...)``,
+        use ``query_local_result`` to aggregate, filter or join it.
+        If the result cache is enabled, a repeated query may be served from
+        the cache, the footer then says how old the result is. For a plain
+        query on one table whose rows are only inserted, never updated or
+        deleted, add a ``/* incremental_key: column */`` comment to name its
+        increasing key column, e.g. an id or a creation time, then only the
+        new rows are fetched when the result is refreshed.
+        A database listed as "read-only local copies of query results" holds
+        tables materialized from other databases on a schedule, querying them
+        is instant, the footer says when they were refreshed.
+
+        For exploratory questions on large tables, ``approximate=True`` runs
+        the query on a sample of the first table of its ``FROM`` clause (put
+        the large fact table first, joined tables are read whole), ``COUNT``
+        and ``SUM`` are scaled up to estimate the full table, ``AVG`` is an
+        estimate as it is, ``COUNT(DISTINCT)``, ``MIN`` and ``MAX`` are those of
+        the sample. The footer gives the sampling rate and the standard error
+        of the scaled counts. Don't use it when an exact answer is needed.
+
         :param database_identifier: Database identifier from list_databases.
         :param sql: SELECT statement only (DDL/DML not permitted).
         :param params: Optional parameters for safe value substitution.
-        :returns: Execution time and query results in Markdown table format.
+        :param max_result_chars: Optional character budget of the result
+            (about 4 characters per token), overrides the server default.
+        :param format: Optional output format. ``markdown`` (default),
+            ``csv`` / ``tsv`` (typed header like ``AlbumId:int``, fewest tokens
+            for wide numeric results), ``jsonl`` (one JSON object per row,
+            for programmatic parsing) or ``columnar`` (one line per column,
+            for few rows with many columns).
+        :param approximate: Optional, answer from a sample of the main table,
+            ``settings.approximate.sample_percent`` % of its rows.
+        :returns: Execution time and query results in Markdown table format,
+            or the requested format.
         """
         start_time = time.time()
         if database_identifier not in self.config.databases_mapping:
             return (
                 f"Error: Database '{database_identifier}' not found in configuration."
             )
+        try:
+            result_api.get_encoder(format)
+        except ValueError as e:
+            return f"Error: {e}"
         database = self.config.databases_mapping[database_identifier]
+        approximate_query = None
+        if approximate:
+            try:
+                approximate_query = rewrite_api.get_approximate_sql(
+                    sql=sql,
+                    db_type=database.db_type,
+                    percent=self.config.settings.approximate.sample_percent,
+                    table_index=self.get_table_index(database),
+                    named_params=database.db_type != DbTypeEnum.AWS_REDSHIFT.value,
+                )
+            except ValueError as e:
+                return f"Error: The query can't be approximated, {e}."
+            sql = approximate_query.sql
+        column_index = None
+        if self.config.settings.push_down_truncation:
+            column_index = self.get_column_index(database)
+        incremental_key = None
+        if approximate_query is None:
+            incremental_key = self.get_incremental_key(database, sql)
+        source_tables = self.get_source_tables(database, sql)
+        try:
+            with self.admit(database, priority=PriorityEnum.QUERY):
+                text = self._execute_select_statement(
+                    database=database,
+                    sql=sql,
+                    params=params,
+                    start_time=start_time,
+                    max_result_chars=max_result_chars,
+                    column_index=column_index,
+                    result_format=format,
+                    incremental_key=incremental_key,
+                    source_tables=source_tables,
+                )
+        except AdmissionRejectedError as e:
+            return f"Error: {e}"
+        note = self.get_materialization_note(database, sql)
+        if note is not None:
+            text = f"{text}\n... ({note})"
+        if approximate_query is not None and not text.startswith("Error"):
+            text = f"{text}\n... ({approximate_query.get_note()})"
+        return text
+
+    def _execute_select_statement(
+        self: "Adapter",
+        database: "Database",
+        sql: str,
+        params: T.Optional[dict[str, T.Any]],
+        start_time: float,
+        max_result_chars: T.Optional[int] = None,
+        column_index: T.Optional[rewrite_api.T_COLUMN_INDEX] = None,
+        result_format: str = ResultFormatEnum.MARKDOWN.value,
+        conn_or_engine: T.Optional[aws_redshift_api.T_CONN_OR_ENGINE] = None,
+        incremental_key: T.Optional[str] = None,
+        source_tables: T.Optional[list[rewrite_api.T_TABLE]] = None,
+    ) -> str:
+        """
+        :param conn_or_engine: run the query on this connection instead of
+            the database's own, e.g. a snapshot transaction, see
+            :meth:`~mcp_ohmy_sql.adapter.batch_adapter.BatchAdapterMixin.snapshot`.
+            The result is then always returned inline and never cached.
+        :param incremental_key: the increasing key column used to refresh
+            the cached result, see
+            :meth:`~mcp_ohmy_sql.adapter.result_cache_adapter.ResultCacheAdapterMixin.get_incremental_key`.
+        :param source_tables: the base tables whose changes invalidate the
+            cached result, see
+            :meth:`~mcp_ohmy_sql.adapter.result_cache_adapter.ResultCacheAdapterMixin.get_source_tables`.
+        """
+        settings = self.config.settings
+        max_rows = settings.max_rows
+        if max_result_chars is None:
+            max_result_chars = settings.max_result_chars
         if database.db_type in [
             DbTypeEnum.SQLITE.value,
             DbTypeEnum.POSTGRESQL.value,
@@ -378,31 +575,1037 @@ class ToolAdapterMixin:
             DbTypeEnum.MSSQL.value,
             DbTypeEnum.ORACLE.value,
         ]:
-            engine = database.connection.sa_engine
-            query_result_text = sa_api.execute_select_query(
-                engine=engine,
-                query=sql,
+            named_params = True
+        elif database.db_type == DbTypeEnum.AWS_REDSHIFT.value:
+            named_params = False
+        else:
+            raise NotImplementedError(
+                f"Database type {database.db_type} is not supported."
+            )
+
+        # large values never leave the database
+        truncated_sql = self.truncate_large_values(
+            database=database,
+            sql=sql,
+            column_index=column_index,
+            named_params=named_params,
+        )
+        # large results are loaded into the local engine for follow-up
+        # queries, so we fetch up to its limit instead of the inline limit
+        local_enabled = conn_or_engine is None and self.is_local_engine_enabled()
+        # otherwise, they are spilled to a local file and paged
+        spill_enabled = (
+            conn_or_engine is None
+            and local_enabled is False
+            and self.is_spill_enabled()
+        )
+        # otherwise, they can be paginated with an open cursor
+        cursor_enabled = (
+            conn_or_engine is None
+            and local_enabled is False
+            and spill_enabled is False
+            and settings.cursor.enabled
+        )
+        # otherwise, inline results can be cached
+        cache_enabled = (
+            conn_or_engine is None
+            and local_enabled is False
+            and spill_enabled is False
+            and cursor_enabled is False
+            and self.is_result_cache_enabled()
+        )
+        if conn_or_engine is None:
+            conn_or_engine = self.get_conn_or_engine(database)
+        if local_enabled:
+            row_limit = settings.local_engine.max_rows
+        elif spill_enabled:
+            row_limit = settings.spill.max_rows
+        elif cursor_enabled:
+            row_limit = settings.cursor.max_rows
+        else:
+            row_limit = max_rows
+        # fetch one more row than we show, so we know if it is truncated
+        limited_sql = rewrite_api.add_row_limit(
+            sql=truncated_sql,
+            db_type=database.db_type,
+            limit=row_limit + 1,
+            named_params=named_params,
+        )
+
+        warning = None
+        preflight_result = self.run_preflight(
+            database=database,
+            sql=limited_sql,
+            params=params,
+            count_sql=sql,
+            conn_or_engine=conn_or_engine,
+        )
+        if preflight_result is not None and preflight_result.passed is False:
+            preflight_settings = settings.preflight
+            if preflight_settings.action == PreflightActionEnum.REJECT.value:
+                return (
+                    f"Error: Query rejected by the pre-flight cost guard: "
+                    f"{preflight_result.message}"
+                )
+            max_rows = preflight_settings.preview_rows
+            local_enabled = False
+            spill_enabled = False
+            cursor_enabled = False
+            cache_enabled = False
+            limited_sql = rewrite_api.add_row_limit(
+                sql=limited_sql,
+                db_type=database.db_type,
+                limit=max_rows + 1,
+                named_params=named_params,
+            )
+            warning = (
+                f"Only a preview of {max_rows} rows is returned, the query "
+                f"failed the pre-flight cost guard: {preflight_result.message}"
+            )
+
+        if local_enabled:
+            query_result_text = self.execute_and_load_local(
+                database=database,
+                sql=limited_sql,
                 params=params,
+                max_chars=max_result_chars,
+                result_format=result_format,
             )
-            duration = time.time() - start_time
-            s = format_query_result(
-                duration=duration,
-                query_result_text=query_result_text,
+        elif spill_enabled:
+            query_result_text = self.execute_and_spill(
+                database=database,
+                sql=limited_sql,
+                params=params,
+                max_chars=max_result_chars,
+                result_format=result_format,
+            )
+        elif cursor_enabled:
+            query_result_text = self.execute_with_cursor(
+                database=database,
+                sql=limited_sql,
+                params=params,
+                max_chars=max_result_chars,
+                result_format=result_format,
+            )
+        elif cache_enabled:
+            query_result_text = self.execute_with_result_cache(
+                database=database,
+                sql=truncated_sql,
+                limited_sql=limited_sql,
+                params=params,
+                max_chars=max_result_chars,
+                result_format=result_format,
+                incremental_key=incremental_key,
+                source_tables=source_tables,
             )
-            return s
         elif database.db_type == DbTypeEnum.AWS_REDSHIFT.value:
-            rs_conn = database.connection.rs_conn
             query_result_text = aws_redshift_api.execute_select_query(
-                conn=rs_conn,
-                query=sql,
+                conn=conn_or_engine,
+                query=limited_sql,
                 params=params,
+                max_rows=max_rows,
+                max_chars=max_result_chars,
+                max_cell_chars=settings.max_cell_chars,
+                result_format=result_format,
             )
-            duration = time.time() - start_time
-            s = format_query_result(
-                duration=duration, query_result_text=query_result_text
-            )
-            return s
         else:
-            raise NotImplementedError(
-                f"Database type {database.db_type} is not supported."
+            query_result_text = sa_api.execute_select_query(
+                engine=conn_or_engine,
+                query=limited_sql,
+                params=params,
+                max_rows=max_rows,
+                max_chars=max_result_chars,
+                max_cell_chars=settings.max_cell_chars,
+                result_format=result_format,
+            )
+        duration = time.time() - start_time
+        s = format_query_result(
+            duration=duration,
+            query_result_text=query_result_text,
+            warning=warning,
+        )
+        return s
+
+    def tool_execute_select_statements(
+        self: "Adapter",
+        statements: list[dict[str, T.Any]],
+        max_result_chars: T.Optional[int] = None,
+        format: str = ResultFormatEnum.MARKDOWN.value,
+        snapshot: bool = False,
+    ) -> str:
+        """
+        Execute several independent SELECT queries concurrently in one call.
+
+        **Use this tool instead of several execute_select_statement calls**
+        when you need multiple independent queries (counts, distributions,
+        samples), possibly on different databases. Each result has its own
+        execution time, and the character budget is shared by all results.
+
+        **Sample Output:**
+
+        .. code-block:: markdown
+
+            # Batch
+            2 statements in 0.051 seconds
+
+            # Statement 1 (chinook_sqlite)
+            # Execution Time
+            0.012 seconds
+
+            # Query Result
+            | n   |
+            |-----|
+            | 347 |
+
+            # Statement 2 (chinook_sqlite)
+            ...
+
+        **Usage Examples:**
+
+        .. code-block:: python
+
+            execute_select_statements(
+                [
+                    {"database_identifier": "chinook_sqlite", "sql": "SELECT COUNT(*) AS n FROM Album"},
+                    {
+                        "database_identifier": "chinook_sqlite",
+                        "sql": "SELECT * FROM Track WHERE AlbumId = :album_id",
+                        "params": {"album_id": 1},
+                    },
+                ],
+                snapshot=True,
+            )
+
+        :param statements: List of statements, each one is an object with
+            ``database_identifier``, ``sql`` and optional ``params``, same as
+            ``execute_select_statement``.
+        :param max_result_chars: Optional character budget of all the results
+            together, overrides the server default.
+        :param format: Optional output format of every result, same as
+            ``execute_select_statement``.
+        :param snapshot: If True, the statements of the same database run on
+            one connection in one read-only transaction, so they see
+            consistent data (e.g. a count and the rows it counts). They run
+            one after another, different databases still run concurrently.
+        :returns: The execution time and the result of each statement, in order.
+        """
+        start_time = time.time()
+        settings = self.config.settings
+        try:
+            result_api.get_encoder(format)
+        except ValueError as e:
+            return f"Error: {e}"
+        if len(statements) == 0:
+            return "Error: No statement to execute."
+        if len(statements) > settings.max_batch_size:
+            return (
+                f"Error: Too many statements, at most {settings.max_batch_size} "
+                f"statements can be executed in one call."
+            )
+        batch = list()
+        for ith, statement in enumerate(statements, start=1):
+            database_identifier = statement.get("database_identifier")
+            sql = statement.get("sql")
+            if not database_identifier or not sql:
+                return (
+                    f"Error: Statement {ith} must have "
+                    f"'database_identifier' and 'sql'."
+                )
+            if database_identifier not in self.config.databases_mapping:
+                return (
+                    f"Error: Statement {ith}: Database '{database_identifier}' "
+                    f"not found in configuration."
+                )
+            database = self.config.databases_mapping[database_identifier]
+            batch.append((database, sql, statement.get("params")))
+
+        if max_result_chars is None:
+            max_result_chars = settings.max_result_chars
+        if max_result_chars is not None:
+            max_result_chars = max(max_result_chars // len(batch), 100)
+        results = self.execute_batch(
+            statements=batch,
+            max_chars=max_result_chars,
+            result_format=format,
+            snapshot=snapshot,
+        )
+        duration = time.time() - start_time
+        lines = ["# Batch", f"{len(batch)} statements in {duration:.3f} seconds"]
+        for ith, ((database, _, _), text) in enumerate(zip(batch, results), start=1):
+            lines.extend(["", f"# Statement {ith} ({database.identifier})", text])
+        return "\n".join(lines)
+
+    def tool_execute_fan_out_query(
+        self: "Adapter",
+        database_identifiers: list[str],
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        max_result_chars: T.Optional[int] = None,
+        format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Execute one SELECT query on several databases with the same schema
+        (shards, tenants, regions) in parallel and merge the results.
+
+        **Use this tool instead of one execute_select_statement call per
+        database** when the same query must run on every shard. The merged
+        result is what a single database holding all the rows would return:
+
+        - ``ORDER BY``: the sorted rows of each database are merged in order.
+        - ``GROUP BY`` with ``COUNT``, ``SUM``, ``MIN``, ``MAX``: the partial
+          aggregates are combined per group. ``AVG`` can't be combined,
+          select ``SUM(x)`` and ``COUNT(x)`` instead.
+        - ``LIMIT`` / ``OFFSET`` apply to the merged result.
+
+        ``ORDER BY`` and ``GROUP BY`` expressions must be in the select list.
+        A database that fails is left out of the result, its error is shown
+        in the per-database report.
+
+        **Sample Output:**
+
+        .. code-block:: markdown
+
+            # Fan-out
+            3 databases in 0.051 seconds, 2 succeeded, 1 failed
+
+            # Query Result
+            | Country | n  |
+            |---------|----|
+            | USA     | 13 |
+            | Canada  | 8  |
+
+            # Databases
+            | database | rows | seconds | error          |
+            |----------|------|---------|----------------|
+            | tenant_a | 2    | 0.012   |                |
+            | tenant_b | 2    | 0.015   |                |
+            | tenant_c |      | 0.002   | no such table  |
+
+        **Usage Examples:**
+
+        .. code-block:: python
+
+            execute_fan_out_query(
+                ["tenant_*"],
+                "SELECT Country, COUNT(*) AS n FROM Customer GROUP BY Country ORDER BY n DESC LIMIT 10",
+            )
+
+        :param database_identifiers: Database identifiers from list_databases,
+            or glob patterns like ``tenant_*``.
+        :param sql: SELECT statement only (DDL/DML not permitted).
+        :param params: Optional parameters for safe value substitution.
+        :param max_result_chars: Optional character budget of the merged result,
+            overrides the server default.
+        :param format: Optional output format, same as ``execute_select_statement``.
+        :returns: The merged result and the rows, execution time and error
+            of each database.
+        """
+        try:
+            result_api.get_encoder(format)
+        except ValueError as e:
+            return f"Error: {e}"
+        if len(database_identifiers) == 0:
+            return "Error: No database to query."
+        try:
+            databases = self.resolve_databases(database_identifiers)
+        except ValueError as e:
+            return f"Error: {e}"
+        if max_result_chars is None:
+            max_result_chars = self.config.settings.max_result_chars
+        try:
+            return self.execute_fan_out(
+                databases=databases,
+                sql=sql,
+                params=params,
+                max_chars=max_result_chars,
+                result_format=format,
+            )
+        except ValueError as e:
+            return f"Error: {e}"
+
+    def tool_execute_federated_query(
+        self: "Adapter",
+        sql: str,
+        max_result_chars: T.Optional[int] = None,
+        format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Join or combine tables from different databases in one SELECT query.
+
+        Write the query in DuckDB SQL and qualify every table with its
+        database identifier: ``"<database_identifier>".schema.table`` (or
+        ``"<database_identifier>".table`` for the default schema). Each table
+        is fetched from its own database, only with the columns the query
+        uses and the WHERE filters on that table alone, then the query runs
+        locally on the fetched rows. A table with too many rows fails the
+        query, add WHERE filters on it. Parameters are not supported.
+
+        **Sample Output:**
+
+        .. code-block:: markdown
+
+            # Federated Query
+            2 sources in 0.052 seconds
+
+            # Query Result
+            | Name  | n  |
+            |-------|----|
+            | Queen | 3  |
+
+            # Sources
+            | source   | database | query                                                       | rows | seconds | error |
+            |----------|----------|-------------------------------------------------------------|------|---------|-------|
+            | source_1 | sales    | SELECT ArtistId FROM main.Album                             | 347  | 0.021   |       |
+            | source_2 | catalog  | SELECT Name, ArtistId FROM public.Artist WHERE Name = 'Queen' | 1    | 0.018   |       |
+
+        **Usage Examples:**
+
+        .. code-block:: python
+
+            execute_federated_query(
+                "SELECT r.Name, COUNT(*) AS n "
+                "FROM \"sales\".main.Album AS a "
+                "JOIN \"catalog\".public.Artist AS r ON a.ArtistId = r.ArtistId "
+                "WHERE r.Name = 'Queen' GROUP BY r.Name"
+            )
+
+        :param sql: SELECT statement in DuckDB SQL, every table qualified with
+            its database identifier.
+        :param max_result_chars: Optional character budget of the result,
+            overrides the server default.
+        :param format: Optional output format, same as ``execute_select_statement``.
+        :returns: The result and the query, rows, execution time and error
+            of each source table.
+        """
+        if is_duckdb_available() is False:
+            return (
+                "Error: Federated queries need DuckDB, install "
+                "'mcp_ohmy_sql[duckdb]'."
+            )
+        try:
+            result_api.get_encoder(format)
+        except ValueError as e:
+            return f"Error: {e}"
+        if max_result_chars is None:
+            max_result_chars = self.config.settings.max_result_chars
+        try:
+            return self.execute_federated(
+                sql=sql,
+                max_chars=max_result_chars,
+                result_format=format,
+            )
+        except ValueError as e:
+            return f"Error: {e}"
+
+    def tool_fetch_result_page(
+        self: "Adapter",
+        handle: str,
+        page: int,
+        max_result_chars: T.Optional[int] = None,
+        format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Read one page of a large query result saved by ``execute_select_statement``.
+
+        Use the result handle from the footer of ``execute_select_statement``,
+        pages are read from a local file, the query is NOT run again. Handles
+        expire after a while, run the query again if the handle is not found.
+
+        **Sample Output:**
+
+        .. code-block:: markdown
+
+            # Query Result
+            | id  | name    |
+            |-----|---------|
+            | 101 | Alice   |
+            | 102 | Bob     |
+            ... (page 2 of 50 (rows 101-200 of 4975), handle: 9f86d081884c7d65, call fetch_result_page with handle='9f86d081884c7d65' and page=3 for the next page)
+
+        :param handle: The result handle from ``execute_select_statement``.
+        :param page: The 1-based page number.
+        :param max_result_chars: Optional character budget of the page,
+            overrides the server default.
+        :param format: Optional output format, same as ``execute_select_statement``.
+        :returns: The rows of the page and the position in the result.
+        """
+        try:
+            result_api.get_encoder(format)
+        except ValueError as e:
+            return f"Error: {e}"
+        if max_result_chars is None:
+            max_result_chars = self.config.settings.max_result_chars
+        try:
+            text = self.get_result_page(
+                handle=handle,
+                page=page,
+                max_chars=max_result_chars,
+                result_format=format,
+            )
+        except (result_api.ResultHandleNotFoundError, IndexError) as e:
+            return f"Error: {e}"
+        return "\n".join(["# Query Result", text])
+
+    def tool_query_local_result(
+        self: "Adapter",
+        sql: str,
+        max_result_chars: T.Optional[int] = None,
+        format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Run a follow-up SELECT query on large results kept locally.
+
+        When ``execute_select_statement`` returns a large result, the full
+        result is loaded into a local table (``result_1``, ``result_2``, ...)
+        and the footer gives its name and columns. Use this tool to aggregate,
+        filter, sort or join these tables with DuckDB SQL, the source database
+        is NOT queried again. Prefer returning small summaries over raw rows.
+
+        **Sample Output:**
+
+        .. code-block:: markdown
+
+            # Execution Time
+            0.004 seconds
+
+            # Query Result
+            | ArtistId | n  |
+            |----------|----|
+            | 90       | 21 |
+            | 22       | 14 |
+
+        **Usage Examples:**
+
+        .. code-block:: python
+
+            query_local_result(
+                "SELECT ArtistId, COUNT(*) AS n FROM result_1 "
+                "GROUP BY ArtistId ORDER BY n DESC LIMIT 10"
+            )
+
+        :param sql: SELECT statement in DuckDB SQL, on the local tables only.
+        :param max_result_chars: Optional character budget of the result,
+            overrides the server default.
+        :param format: Optional output format, same as ``execute_select_statement``.
+        :returns: Execution time and query results, or the error and the
+            available local tables.
+        """
+        start_time = time.time()
+        if self.is_local_engine_enabled() is False:
+            return (
+                "Error: The local engine is disabled, enable "
+                "settings.local_engine and install 'mcp_ohmy_sql[duckdb]'."
+            )
+        try:
+            result_api.get_encoder(format)
+        except ValueError as e:
+            return f"Error: {e}"
+        if max_result_chars is None:
+            max_result_chars = self.config.settings.max_result_chars
+        try:
+            text = self.query_local(
+                sql=sql,
+                max_chars=max_result_chars,
+                result_format=format,
+            )
+        except Exception as e:
+            lines = [f"Error: {e}", "", "Local tables:"]
+            tables = self.local_engine.list_tables()
+            for table in tables:
+                lines.append(f"- {table.to_description()}")
+            if len(tables) == 0:
+                lines.append("- no table, run a query with a large result first")
+            return "\n".join(lines)
+        return format_query_result(
+            duration=time.time() - start_time,
+            query_result_text=text,
+        )
+
+    def tool_export_query_result(
+        self: "Adapter",
+        database_identifier: str,
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        format: str = ExportFormatEnum.PARQUET.value,
+        file_name: T.Optional[str] = None,
+        partitions: int = 1,
+    ) -> str:
+        """
+        Export the full result of a SELECT query to a local file.
+
+        Use this tool when the user needs the data itself (an extract to share
+        or to load into another tool), not an answer: the rows are streamed
+        into the file in batches and are NOT returned. Only the file path,
+        the number of rows and bytes and a SHA-256 checksum are returned, the
+        same information is saved next to the file as
+        ``<file>.manifest.json``. Existing files are never overwritten.
+
+        For a large table, set ``partitions`` to split a plain
+        ``SELECT ... FROM table [WHERE ...]`` by ranges of the numeric or
+        date primary key (sort key on Redshift), the ranges are extracted
+        concurrently into ``<file_name>/part-00001.parquet``, ... with a
+        ``_manifest.json`` for all files. Other queries are exported to one
+        file and the reply says why.
+
+        **Sample Output:**
+
+        .. code-block:: markdown
+
+            # Export
+            path: /tmp/mcp_ohmy_sql_export/tracks.parquet
+            format: parquet
+            rows: 3503
+            bytes: 81234
+            sha256: 7d9f0c1e...
+            manifest: /tmp/mcp_ohmy_sql_export/tracks.parquet.manifest.json
+            seconds: 0.412
+
+        :param database_identifier: Database identifier from list_databases.
+        :param sql: SELECT statement only (DDL/DML not permitted).
+        :param params: Optional parameters for safe value substitution.
+        :param format: Optional file format, ``parquet`` (default, zstd
+            compressed), ``csv`` (gzip compressed, with a header line) or
+            ``jsonl`` (gzip compressed, one JSON object per row).
+        :param file_name: Optional file name without directory, the extension
+            is added. By default a unique name is generated.
+        :param partitions: Optional number of key ranges extracted
+            concurrently, defaults to 1 (one file).
+        :returns: The exported file(s) and the manifest.
+        """
+        if self.config.settings.export.enabled is False:
+            return "Error: Exporting results is disabled, enable settings.export."
+        if database_identifier not in self.config.databases_mapping:
+            return (
+                f"Error: Database '{database_identifier}' not found in configuration."
+            )
+        try:
+            sa_api.ensure_valid_select_query(sql)
+        except ValueError as e:
+            return f"Error: {e}"
+        if partitions < 1:
+            return "Error: partitions must be at least 1."
+        try:
+            result_api.get_export_writer_class(format)
+        except ValueError as e:
+            return f"Error: {e}"
+        database = self.config.databases_mapping[database_identifier]
+        lines = ["# Export"]
+        try:
+            partition_sqls = None
+            if partitions > 1:
+                try:
+                    key, partition_sqls = self.plan_export_partitions(
+                        database=database,
+                        sql=sql,
+                        params=params,
+                        partitions=partitions,
+                    )
+                except ValueError as e:
+                    lines.append(f"Not partitioned: {e}, exported into one file.")
+            if partition_sqls is None:
+                result = self.export_query_result(
+                    database=database,
+                    sql=sql,
+                    params=params,
+                    export_format=format,
+                    file_name=file_name,
+                )
+            else:
+                result = self.export_query_result_partitioned(
+                    database=database,
+                    sql=sql,
+                    key=key,
+                    partition_sqls=partition_sqls,
+                    params=params,
+                    export_format=format,
+                    file_name=file_name,
+                )
+        except (ValueError, AdmissionRejectedError) as e:
+            return f"Error: {e}"
+        except Exception as e:
+            return f"Error exporting query result: {e}"
+        lines.append(result.to_summary())
+        return "\n".join(lines)
+
+    def tool_summarize_query(
+        self: "Adapter",
+        database_identifier: str,
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        top_k: int = 5,
+        max_result_chars: T.Optional[int] = None,
+        format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Profile the result of a SELECT query without returning its rows.
+
+        **Use this tool instead of execute_select_statement** when you only
+        need the shape of a result: row count, null ratios, distinct counts,
+        min / max, mean and quantiles of numeric columns, and the most
+        frequent values of text columns. The database computes the profile
+        in one pass, only one row per column is returned. Distinct counts
+        and quantiles are approximate on Redshift, quantiles are not
+        available on SQLite, MySQL and SQL Server.
+
+        **Sample Output:**
+
+        .. code-block:: markdown
+
+            # Execution Time
+            0.045 seconds
+
+            # Summary
+            3503 rows, 3 columns
+
+            # Column Profile
+            | column       | type   | null_ratio | distinct | min | max     | mean   | top_values                         |
+            |--------------|--------|------------|----------|-----|---------|--------|------------------------------------|
+            | Name         | text   | 0.0        | 3257     | ... | ...     |        | Intro (5), Wrathchild (3), ...     |
+            | Composer     | text   | 0.2783     | 852      | ... | ...     |        | Steve Harris (80), U2 (44), ...    |
+            | Milliseconds | number | 0.0        | 3080     | 1071| 5286953 | 393599 |                                    |
+
+        :param database_identifier: Database identifier from list_databases.
+        :param sql: SELECT statement only (DDL/DML not permitted).
+        :param params: Optional parameters for safe value substitution.
+        :param top_k: Optional number of most frequent values shown per
+            text column, defaults to 5, 0 to skip them.
+        :param max_result_chars: Optional character budget of the profile,
+            overrides the server default.
+        :param format: Optional output format of the profile table, same as
+            ``execute_select_statement``.
+        :returns: The execution time, the number of rows and the profile of
+            each column.
+        """
+        start_time = time.time()
+        if database_identifier not in self.config.databases_mapping:
+            return (
+                f"Error: Database '{database_identifier}' not found in configuration."
+            )
+        try:
+            sa_api.ensure_valid_select_query(sql)
+            result_api.get_encoder(format)
+        except ValueError as e:
+            return f"Error: {e}"
+        if not (0 <= top_k <= 100):
+            return "Error: top_k must be between 0 and 100."
+        database = self.config.databases_mapping[database_identifier]
+        settings = self.config.settings
+        if max_result_chars is None:
+            max_result_chars = settings.max_result_chars
+        try:
+            summary = self.summarize_query(
+                database=database,
+                sql=sql,
+                params=params,
+                top_k=top_k,
+            )
+        except (ValueError, AdmissionRejectedError) as e:
+            return f"Error: {e}"
+        except Exception as e:
+            return f"Error summarizing query: {e}"
+        duration = time.time() - start_time
+        line = f"{summary.n_rows} rows, {len(summary.profiles)} columns"
+        if summary.approximate:
+            line = f"{line}, distinct counts and quantiles are approximate"
+        lines = [
+            "# Execution Time",
+            f"{duration:.3f} seconds",
+            "",
+            "# Summary",
+            line,
+            *summary.notes,
+            "",
+            "# Column Profile",
+            result_api.encode_summary(
+                n_rows=summary.n_rows,
+                profiles=summary.profiles,
+                result_format=format,
+                max_chars=max_result_chars,
+                max_cell_chars=settings.max_cell_chars,
+            ),
+        ]
+        return "\n".join(lines)
+
+    def tool_continue_query(
+        self: "Adapter",
+        token: str,
+        max_result_chars: T.Optional[int] = None,
+        format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Read the next rows of a query started by ``execute_select_statement``.
+
+        Use the continuation token from the footer of ``execute_select_statement``
+        or of the previous ``continue_query`` call. Rows are read from the
+        query cursor kept open on the server, the query is NOT run again.
+        Tokens expire when they are not used for a while, run the query again
+        if the token is not found.
+
+        **Sample Output:**
+
+        .. code-block:: markdown
+
+            # Query Result
+            | id  | name    |
+            |-----|---------|
+            | 101 | Alice   |
+            | 102 | Bob     |
+            ... (rows 101-200, more rows available, call continue_query with token='9f86d081884c7d65' for the next 100 rows)
+
+        :param token: The continuation token.
+        :param max_result_chars: Optional character budget of the rows,
+            overrides the server default.
+        :param format: Optional output format, same as ``execute_select_statement``.
+        :returns: The next rows, and a footer telling if there are more.
+        """
+        try:
+            result_api.get_encoder(format)
+        except ValueError as e:
+            return f"Error: {e}"
+        if max_result_chars is None:
+            max_result_chars = self.config.settings.max_result_chars
+        try:
+            text = self.continue_query(
+                token=token,
+                max_chars=max_result_chars,
+                result_format=format,
+            )
+        except (CursorNotFoundError, AdmissionRejectedError) as e:
+            return f"Error: {e}"
+        except Exception as e:  # pragma: no cover
+            return f"Error fetching result: {e}"
+        return "\n".join(["# Query Result", text])
+
+    def tool_submit_query(
+        self: "Adapter",
+        database_identifier: str,
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+    ) -> str:
+        """
+        Run a long SELECT query in the background and return a job id at once.
+
+        **Use this tool instead of execute_select_statement for heavy
+        warehouse queries** (big scans, joins or aggregations that may take
+        minutes), they keep running even if this conversation times out.
+        Then poll ``get_query_status`` and read the rows with
+        ``get_query_result``. Submitting the same query again returns the
+        existing job instead of running it twice. The pre-flight cost guard
+        is not applied to jobs.
+
+        **Sample Output:**
+
+        .. code-block:: markdown
+
+            # Query Job
+            job_id: 9f86d081884c7d65
+            database: chinook_redshift
+            status: queued
+            waiting: 0.000 seconds
+            rows fetched: 0
+
+        :param database_identifier: Database identifier from list_databases.
+        :param sql: SELECT statement only (DDL/DML not permitted).
+        :param params: Optional parameters for safe value substitution.
+        :returns: The job id and status.
+        """
+        if database_identifier not in self.config.databases_mapping:
+            return (
+                f"Error: Database '{database_identifier}' not found in configuration."
+            )
+        try:
+            sa_api.ensure_valid_select_query(sql)
+        except ValueError as e:
+            return f"Error: {e}"
+        database = self.config.databases_mapping[database_identifier]
+        column_index = None
+        if self.config.settings.push_down_truncation:
+            column_index = self.get_column_index(database)
+        job, is_new = self.submit_query_job(
+            database=database,
+            sql=sql,
+            params=params,
+            column_index=column_index,
+        )
+        lines = ["# Query Job"]
+        if is_new is False:
+            lines.append("An identical query was already submitted, reusing its job.")
+        lines.append(job.to_status())
+        return "\n".join(lines)
+
+    def tool_get_query_status(
+        self: "Adapter",
+        job_id: str,
+    ) -> str:
+        """
+        Get the status of a query job submitted by ``submit_query``.
+
+        Status is one of ``queued``, ``running``, ``succeeded``, ``failed`` or
+        ``cancelled``, with the elapsed time and the number of rows fetched so
+        far. Wait a few seconds between two polls of a running job.
+
+        :param job_id: The job id returned by submit_query.
+        :returns: The job status.
+        """
+        try:
+            job = self.job_manager.get(job_id)
+        except JobNotFoundError as e:
+            return f"Error: {e}"
+        return "\n".join(["# Query Job", job.to_status()])
+
+    def tool_get_query_result(
+        self: "Adapter",
+        job_id: str,
+        page: int = 1,
+        max_result_chars: T.Optional[int] = None,
+        format: str = ResultFormatEnum.MARKDOWN.value,
+    ) -> str:
+        """
+        Read one page of the result of a succeeded query job.
+
+        The footer tells the position of the page and how to get the next one,
+        e.g. ``... (page 1 of 50 (rows 1-100 of 4975), call get_query_result
+        with job_id='9f86d081884c7d65' and page=2 for the next page)``.
+
+        :param job_id: The job id returned by submit_query.
+        :param page: The 1-based page number, defaults to 1.
+        :param max_result_chars: Optional character budget of the page,
+            overrides the server default.
+        :param format: Optional output format, same as ``execute_select_statement``.
+        :returns: The rows of the page, or the job status if it is not
+            succeeded.
+        """
+        try:
+            result_api.get_encoder(format)
+        except ValueError as e:
+            return f"Error: {e}"
+        try:
+            job = self.job_manager.get(job_id)
+        except JobNotFoundError as e:
+            return f"Error: {e}"
+        if job.status != JobStatusEnum.SUCCEEDED.value:
+            return "\n".join(
+                [
+                    f"Error: the job is {job.status}, the result is not available.",
+                    "",
+                    "# Query Job",
+                    job.to_status(),
+                ]
+            )
+        if max_result_chars is None:
+            max_result_chars = self.config.settings.max_result_chars
+        try:
+            text = self.get_job_result_page(
+                job=job,
+                page=page,
+                max_chars=max_result_chars,
+                result_format=format,
+            )
+        except (result_api.ResultHandleNotFoundError, IndexError) as e:
+            return f"Error: {e}"
+        return "\n".join(
+            [
+                "# Execution Time",
+                f"{job.elapsed:.3f} seconds",
+                "",
+                "# Query Result",
+                text,
+            ]
+        )
+
+    def tool_cancel_query(
+        self: "Adapter",
+        job_id: str,
+    ) -> str:
+        """
+        Cancel a query job submitted by ``submit_query``.
+
+        A queued job is cancelled at once. A running job stops before fetching
+        its next batch of rows, a query still running in the database finishes
+        first. Finished jobs are not changed.
+
+        :param job_id: The job id returned by submit_query.
+        :returns: The job status after cancellation.
+        """
+        try:
+            job = self.job_manager.cancel(job_id)
+        except JobNotFoundError as e:
+            return f"Error: {e}"
+        return "\n".join(["# Query Job", job.to_status()])
+
+    def tool_explain_query(
+        self: "Adapter",
+        database_identifier: str,
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+        analyze: bool = False,
+    ) -> str:
+        """
+        Show the execution plan of a SELECT query and its performance hotspots,
+        without running it.
+
+        **Use this tool before running a query that may be slow** (big tables,
+        joins, sorts) to find out how the database will execute it, then tune
+        the SQL: add selective filters, use indexed / sort key columns, avoid
+        joins that redistribute data.
+
+        **Sample Output:**
+
+        .. code-block:: markdown
+
+            # Query Plan
+            Hash Join (cost=1.2M rows=5.1M) [Hash Cond: (t.album_id = a.album_id)]
+              Seq Scan on track t (cost=980.5K rows=5.1M) [Filter: (milliseconds > 1000)]
+              Hash (cost=6.47 rows=347)
+                Seq Scan on album a (cost=6.47 rows=347)
+
+            # Hotspots
+            - Expensive: Seq Scan on track t, cost 980.5K (82% of total)
+            - Missing index?: full scan on track (~5.1M rows) with Filter: (milliseconds > 1000), an index on the filtered columns may help
+
+        Cost is in the database's own planner units, compare plans of the same
+        database only.
+
+        :param database_identifier: Database identifier from list_databases.
+        :param sql: SELECT statement only (DDL/DML not permitted).
+        :param params: Optional parameters for safe value substitution.
+        :param analyze: Actually run the query to get real row counts and
+            timings (PostgreSQL only, subject to a timeout). Defaults to False.
+        :returns: Condensed plan tree and a list of hotspots.
+        """
+        if database_identifier not in self.config.databases_mapping:
+            return (
+                f"Error: Database '{database_identifier}' not found in configuration."
+            )
+        database = self.config.databases_mapping[database_identifier]
+        try:
+            sa_api.ensure_valid_select_query(sql)
+        except ValueError as e:
+            return f"Error: {e}"
+
+        priority = PriorityEnum.QUERY if analyze else PriorityEnum.METADATA
+        try:
+            with self.admit(database, priority=priority):
+                if analyze:
+                    query_plan = explain_api.explain_query(
+                        conn_or_engine=self.get_conn_or_engine(database),
+                        sql=sql,
+                        db_type=database.db_type,
+                        params=params,
+                        analyze=True,
+                        timeout=self.config.settings.explain_timeout,
+                    )
+                else:
+                    query_plan = self.get_query_plan(database, sql, params)
+        except AdmissionRejectedError as e:
+            return f"Error: {e}"
+        except Exception as e:
+            return f"Error explaining query: {e}"
+
+        s = explain_api.encode_query_plan(query_plan)
+        if analyze and query_plan.analyzed is False:
+            s = (
+                f"Note: analyze is not supported for {database.db_type}, "
+                f"showing the estimated plan.\n\n{s}"
             )
+        return s
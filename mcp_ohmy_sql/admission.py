@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+"""
+Per-database admission control.
+
+Each configured database gets its own :class:`AdmissionController`. It limits
+how many queries run against that database at the same time and keeps the
+overflow in a bounded priority queue, so that a burst of agent activity cannot
+saturate a small database (or a Redshift WLM queue), and cheap metadata tools
+don't wait behind heavy user queries.
+
+Usage:
+
+>>> controller = AdmissionController(name="chinook", max_concurrency=2)
+>>> with controller.admit(priority=PriorityEnum.QUERY):
+...     ...  # run the query
+"""
+
+import typing as T
+import time
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+
+from enum_mate.api import BetterIntEnum
+
+
+class PriorityEnum(BetterIntEnum):
+    """
+    Admission priority, lower value is served first.
+    """
+
+    METADATA = 0  # schema introspection, list tables, etc ...
+    QUERY = 10  # user SELECT statements
+    BACKGROUND = 20  # background jobs that nobody is waiting for
+
+
+class AdmissionRejectedError(Exception):
+    """
+    Raised when a request cannot be admitted, either because the wait queue
+    is full or because it waited longer than the queue timeout.
+
+    :param name: the database identifier.
+    :param reason: human-readable reason of the rejection.
+    :param retry_after: suggested number of seconds to wait before retrying.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        reason: str,
+        retry_after: float,
+    ):
+        self.name = name
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(
+            f"Database {name!r} is busy: {reason}. "
+            f"Please retry after {retry_after:.1f} seconds."
+        )
+
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded priority wait queue.
+
+    Requests are admitted in priority order (then FIFO). A thread that already
+    holds a slot is admitted again without waiting, so nested gated calls
+    (e.g. a query that needs schema metadata) never deadlock.
+
+    :param name: the database identifier, used in error messages.
+    :param max_concurrency: maximum number of requests running at the same time.
+    :param max_queue_size: maximum number of requests waiting for a slot.
+    :param queue_timeout: maximum seconds a request waits in the queue.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 4,
+        max_queue_size: int = 16,
+        queue_timeout: float = 30.0,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+
+        self._cond = threading.Condition()
+        self._running = 0
+        self._waiting: list[tuple[int, int]] = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._local = threading.local()
+        # exponential moving average of the request duration, for retry hint
+        self._avg_duration = 1.0
+
+    @property
+    def running(self) -> int:
+        """
+        Number of requests currently running.
+        """
+        return self._running
+
+    @property
+    def waiting(self) -> int:
+        """
+        Number of requests currently waiting in the queue.
+        """
+        return len(self._waiting)
+
+    def _get_depth(self) -> int:
+        return getattr(self._local, "depth", 0)
+
+    def _set_depth(self, depth: int):
+        self._local.depth = depth
+
+    def get_retry_after(self) -> float:
+        """
+        Estimate how many seconds it takes until a new request could be served.
+        """
+        rounds = (len(self._waiting) + 1) / self.max_concurrency
+        return max(1.0, self._avg_duration * rounds)
+
+    def acquire(
+        self,
+        priority: int = PriorityEnum.QUERY,
+    ):
+        """
+        Block until a slot is available.
+
+        :raises AdmissionRejectedError: if the queue is full or the wait
+            exceeds ``queue_timeout``.
+        """
+        depth = self._get_depth()
+        if depth:  # re-entrant, this thread already holds a slot
+            self._set_depth(depth + 1)
+            return
+
+        with self._cond:
+            if self._running < self.max_concurrency and not self._waiting:
+                self._running += 1
+                self._set_depth(1)
+                return
+
+            if len(self._waiting) >= self.max_queue_size:
+                raise AdmissionRejectedError(
+                    name=self.name,
+                    reason=f"{len(self._waiting)} requests are already queued",
+                    retry_after=self.get_retry_after(),
+                )
+
+            ticket = (int(priority), next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+            deadline = time.monotonic() + self.queue_timeout
+            while True:
+                if (
+                    self._running < self.max_concurrency
+                    and self._waiting[0] == ticket
+                ):
+                    heapq.heappop(self._waiting)
+                    self._running += 1
+                    self._set_depth(1)
+                    # the next one in line may also fit
+                    self._cond.notify_all()
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                    raise AdmissionRejectedError(
+                        name=self.name,
+                        reason=f"waited more than {self.queue_timeout} seconds in queue",
+                        retry_after=self.get_retry_after(),
+                    )
+                self._cond.wait(remaining)
+
+    def release(
+        self,
+        duration: T.Optional[float] = None,
+    ):
+        """
+        Release the slot held by the current thread.
+
+        :param duration: how long the request took, used to refine the retry hint.
+        """
+        depth = self._get_depth()
+        if depth > 1:
+            self._set_depth(depth - 1)
+            return
+        self._set_depth(0)
+        with self._cond:
+            self._running -= 1
+            if duration is not None:
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+            self._cond.notify_all()
+
+    @contextmanager
+    def admit(
+        self,
+        priority: int = PriorityEnum.QUERY,
+    ):
+        """
+        Context manager that holds a slot for the duration of the block.
+        """
+        self.acquire(priority=priority)
+        start_time = time.monotonic()
+        try:
+            yield self
+        finally:
+            self.release(duration=time.monotonic() - start_time)
@@ -3,4 +3,8 @@
 from .utils import Session
 from .utils import T_CONN_OR_ENGINE
 from .utils import execute_many_sql
+from .query import snapshot_connection
+from .query import execute_count_query
+from .query import fetch_select_result
+from .query import open_select_cursor
 from .query import execute_select_query
@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
 
 import typing as T
+from contextlib import contextmanager
 
-from tabulate import tabulate
-
+from ...constants import ResultFormatEnum
 from ...lazy_import import redshift_connector
+from ...result.api import encode_result, fill_result_buffer, ResultBuffer
+from ...cursor import OpenCursor
+from ...sa.query import get_truncated_footer, get_count_query
 
 from .utils import Session
 
@@ -15,22 +18,63 @@ except ImportError:  # pragma: no cover
     pass
 
 
+@contextmanager
+def snapshot_connection(
+    conn: "redshift_connector.Connection",
+) -> T.Generator["redshift_connector.Connection", None, None]:
+    """
+    Run the statements of the block in one new transaction, Redshift gives
+    every transaction a consistent snapshot. The transaction is rolled back
+    at the end.
+
+    .. note::
+
+        The connection is not in autocommit mode, statements run between the
+        two rollbacks share one transaction.
+    """
+    conn.rollback()
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+
+
 def format_result(
     columns: list[str],
-    records: list[tuple],
+    records: T.Sequence[T.Sequence[T.Any]],
+    max_rows: T.Optional[int] = None,
+    max_chars: T.Optional[int] = None,
+    max_cell_chars: T.Optional[int] = None,
+    pad: bool = False,
+    result_format: str = ResultFormatEnum.MARKDOWN.value,
 ) -> str:
     """
-    Format SQL query result into a Markdown table.
+    Format SQL query result into a Markdown table, or another ``result_format``.
+
+    :param columns: column names.
+    :param records: rows, a list of tuples or a
+        :class:`~mcp_ohmy_sql.result.buffer.ResultBuffer`.
+    :param max_rows: if provided and there are more records than this,
+        only show the first ``max_rows`` records and append a note.
+    :param max_chars: optional character budget of the table.
+    :param max_cell_chars: optional maximum number of characters per cell.
+    :param pad: if True, align the columns with padding.
+    :param result_format: the output format, see
+        :func:`~mcp_ohmy_sql.result.formats.encode_result`.
     """
-    rows = list()
-    rows.append(columns)
-    rows.extend(records)
-    text = tabulate(
-        rows,
-        headers="firstrow",
-        tablefmt="pipe",
-        floatfmt=".4f",
+    truncated = max_rows is not None and len(records) > max_rows
+    if truncated:
+        records = records[:max_rows]
+    text = encode_result(
+        columns=columns,
+        rows=records,
+        result_format=result_format,
+        max_chars=max_chars,
+        max_cell_chars=max_cell_chars,
+        pad=pad,
     )
+    if truncated:
+        text = f"{text}\n{get_truncated_footer(max_rows)}"
     return text
 
 
@@ -42,29 +86,140 @@ def ensure_valid_select_query(query: str):
         raise ValueError("Invalid query: must start with 'SELECT '")
 
 
+def execute_count_query(
+    conn: "redshift_connector.Connection",
+    query: str,
+    params: T.Optional[dict[str, T.Any]] = None,
+) -> int:
+    """
+    Executes a SQL SELECT query and returns the count of rows.
+
+    :param conn: Redshift connection.
+    :param query: the SELECT statement.
+    :param params: optional bind parameters.
+    """
+    ensure_valid_select_query(query)
+    with Session(conn) as cursor:
+        cursor.execute(get_count_query(query), params)
+        return cursor.fetchone()[0]
+
+
+def fetch_select_result(
+    conn: "redshift_connector.Connection",
+    query: str,
+    params: T.Optional[dict[str, T.Any]] = None,
+    max_rows: T.Optional[int] = None,
+) -> ResultBuffer:
+    """
+    Executes a SQL SELECT query and fetches the rows into a
+    :class:`~mcp_ohmy_sql.result.buffer.ResultBuffer`, without formatting.
+
+    :param conn: Redshift connection.
+    :param query: the SELECT statement.
+    :param params: optional bind parameters.
+    :param max_rows: if provided, fetch at most ``max_rows + 1`` rows.
+
+    :raises ValueError: if the query is not a SELECT statement.
+    """
+    ensure_valid_select_query(query)
+    with Session(conn) as cursor:
+        cursor.execute(query, params)
+        return fill_result_buffer(
+            columns=[desc[0] for desc in cursor.description],
+            fetchmany=cursor.fetchmany,
+            max_rows=max_rows,
+        )
+
+
+def open_select_cursor(
+    conn: "redshift_connector.Connection",
+    query: str,
+    params: T.Optional[dict[str, T.Any]] = None,
+    max_rows: T.Optional[int] = None,
+) -> OpenCursor:
+    """
+    Executes a SQL SELECT query and returns the open cursor, the caller must
+    close it.
+
+    .. note::
+
+        ``redshift_connector`` reads the whole result at ``execute()``, so
+        the rows are held in the cursor, not on the cluster. Keep
+        ``max_rows`` small enough for the memory of the server.
+
+    :param conn: Redshift connection.
+    :param query: the SELECT statement.
+    :param params: optional bind parameters.
+    :param max_rows: see :class:`~mcp_ohmy_sql.cursor.OpenCursor`.
+
+    :raises ValueError: if the query is not a SELECT statement.
+    """
+    ensure_valid_select_query(query)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+    except Exception as e:
+        conn.rollback()
+        cursor.close()
+        raise e
+    return OpenCursor(
+        columns=[desc[0] for desc in cursor.description],
+        fetchmany=cursor.fetchmany,
+        close=cursor.close,
+        max_rows=max_rows,
+    )
+
+
 def execute_select_query(
     conn: "redshift_connector.Connection",
     query: str,
     params: T.Optional[dict[str, T.Any]] = None,
+    max_rows: T.Optional[int] = None,
+    max_chars: T.Optional[int] = None,
+    max_cell_chars: T.Optional[int] = None,
+    result_format: str = ResultFormatEnum.MARKDOWN.value,
 ) -> str:
     """
     Executes a SQL SELECT query and returns the result formatted as a Markdown table.
+
+    .. note::
+
+        ``redshift_connector`` decodes every row of the result in Python while
+        ``cursor.execute()`` reads the wire protocol, its ``fetch_numpy_array``
+        and ``fetch_dataframe`` are thin wrappers of ``fetchmany`` that copy
+        the decoded rows once more. So we don't use them: the decoded rows
+        are moved in batches into the columnar
+        :class:`~mcp_ohmy_sql.result.buffer.ResultBuffer`, and the decoding
+        cost is bounded by the ``LIMIT`` pushed down into the query.
+
+    :param conn: Redshift connection.
+    :param query: the SELECT statement.
+    :param params: optional bind parameters.
+    :param max_rows: optional maximum number of rows to fetch.
+    :param max_chars: optional character budget of the table.
+    :param max_cell_chars: optional maximum number of characters per cell.
+    :param result_format: the output format, e.g. ``csv``, see
+        :class:`~mcp_ohmy_sql.constants.ResultFormatEnum`.
     """
     try:
         ensure_valid_select_query(query)
     except ValueError as e:  # pragma: no cover
         return f"Error: {e}"
 
-    with Session(conn) as cursor:
-        try:
-            cursor.execute(query, params)
-            columns = [desc[0] for desc in cursor.description]
-            rows = cursor.fetchall()
-        except Exception as e:  # pragma: no cover
-            return f"Error executing query: {e}"
+    try:
+        rows = fetch_select_result(conn, query, params, max_rows=max_rows)
+    except Exception as e:  # pragma: no cover
+        return f"Error executing query: {e}"
 
     try:
-        text = format_result(columns, rows)
+        text = format_result(
+            rows.columns,
+            rows,
+            max_rows=max_rows,
+            max_chars=max_chars,
+            max_cell_chars=max_cell_chars,
+            result_format=result_format,
+        )
     except Exception as e:  # pragma: no cover
         return f"Error formatting result: {e}"
 
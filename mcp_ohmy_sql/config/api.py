@@ -1,5 +1,16 @@
 # -*- coding: utf-8 -*-
 
+from .define import AdmissionSettings
+from .define import PreflightSettings
+from .define import SpillSettings
+from .define import CursorSettings
+from .define import JobSettings
+from .define import LocalEngineSettings
+from .define import ExportSettings
+from .define import ResultCacheSettings
+from .define import MaterializationSettings
+from .define import ProfilingSettings
+from .define import ApproximateSettings
 from .define import Settings
 from .define import TableFilter
 from .define import Schema
@@ -10,4 +21,5 @@ from .aws_redshift import AwsRedshiftConnectionMethodEnum
 from .aws_redshift import AWSRedshiftConnection
 from .define import T_CONNECTION
 from .define import Database
+from .define import Materialization
 from .define import Config
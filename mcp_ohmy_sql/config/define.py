@@ -12,36 +12,881 @@ ensuring robust configuration handling for production deployments.
 
 import typing as T
 import json
+import tempfile
 from pathlib import Path
 from functools import cached_property
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
-from ..constants import DbTypeEnum
+from ..constants import DbTypeEnum, PreflightActionEnum
 from ..lazy_import import sa
 
 
+class AdmissionSettings(BaseModel):
+    """
+    Admission control configuration for a single database.
+
+    Every query and schema extraction against a database has to be admitted
+    before it runs. At most ``max_concurrency`` of them run at the same time,
+    the rest wait in a bounded priority queue (metadata tools are served before
+    user queries). When the queue is full, or the wait exceeds ``queue_timeout``,
+    the request is rejected immediately with a retry hint instead of piling up.
+
+    :param max_concurrency: Maximum number of queries running concurrently
+        against one database.
+    :param max_queue_size: Maximum number of requests waiting for a slot.
+        Requests beyond this are rejected immediately.
+    :param queue_timeout: Maximum number of seconds a request waits in the
+        queue before it is rejected.
+
+    **Examples**:
+        Allow two concurrent queries on a small Postgres::
+
+            {
+                "max_concurrency": 2,
+                "max_queue_size": 8,
+                "queue_timeout": 10
+            }
+    """
+
+    max_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum number of concurrently running queries per database",
+    )
+    max_queue_size: int = Field(
+        default=16,
+        ge=0,
+        description="Maximum number of requests waiting for a free slot",
+    )
+    queue_timeout: float = Field(
+        default=30.0,
+        gt=0,
+        description="Maximum seconds a request waits in the queue",
+    )
+
+
+class PreflightSettings(BaseModel):
+    """
+    Pre-flight cost guard configuration.
+
+    Before a SELECT statement runs, the database's EXPLAIN is used to get the
+    planner's estimated cost and rows. Queries over the thresholds are either
+    rejected or downgraded to a small preview, and the reply tells the model
+    why, so an agent cannot launch a multi-minute scan by accident. Plans are
+    cached per normalized query.
+
+    :param enabled: Whether to run the pre-flight check at all.
+    :param max_estimated_cost: Maximum planner cost of the query, in the
+        database's own cost units. None means no limit.
+    :param max_estimated_rows: Maximum number of rows the biggest step of the
+        plan is estimated to process, a scan below a ``LIMIT`` (without a
+        sort or an aggregate in between) counts up to the limit. None means
+        no limit.
+    :param exact_count: Also run ``SELECT COUNT(*)`` on the query and compare
+        the exact count with ``max_estimated_rows``. Useful for databases that
+        don't expose row estimates (SQLite), but the count itself costs a scan.
+    :param action: :class:`~mcp_ohmy_sql.constants.PreflightActionEnum`,
+        ``reject`` or ``preview``.
+    :param preview_rows: Number of rows returned when a query is downgraded
+        to a preview.
+    :param cache_size: Maximum number of cached query plans.
+
+    **Examples**:
+        Only show a preview of queries that scan more than 10M rows::
+
+            {
+                "enabled": true,
+                "max_estimated_rows": 10000000,
+                "action": "preview",
+                "preview_rows": 20
+            }
+    """
+
+    enabled: bool = Field(
+        default=False,
+        description="Whether to check the query plan before running a query",
+    )
+    max_estimated_cost: T.Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Maximum planner estimated cost of a query",
+    )
+    max_estimated_rows: T.Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Maximum estimated number of rows processed by a query",
+    )
+    exact_count: bool = Field(
+        default=False,
+        description="Whether to run an exact COUNT(*) in addition to EXPLAIN",
+    )
+    action: str = Field(
+        default=PreflightActionEnum.REJECT.value,
+        description="What to do with a query over the thresholds (reject or preview)",
+    )
+    preview_rows: int = Field(
+        default=20,
+        ge=1,
+        description="Number of rows returned when a query is downgraded to a preview",
+    )
+    cache_size: int = Field(
+        default=256,
+        ge=0,
+        description="Maximum number of cached query plans",
+    )
+
+    @field_validator("action", mode="after")
+    @classmethod
+    def check_action(cls, value: str) -> str:
+        """
+        Validate the action field.
+        """
+        if PreflightActionEnum.is_valid_value(value) is False:
+            raise ValueError(f"{value} is not a valid value of {PreflightActionEnum}")
+        return value
+
+
+class SpillSettings(BaseModel):
+    """
+    Spill large query results to local files.
+
+    When enabled, a result with more than ``page_rows`` rows is written once,
+    page by page as the rows are fetched, into an Arrow IPC file under
+    ``directory``, the reply shows the first page
+    and a result handle, and the ``fetch_result_page`` tool reads the other
+    pages from the file without re-running the query. Requires ``pyarrow``
+    (``pip install 'mcp_ohmy_sql[arrow]'``).
+
+    :param enabled: Whether to spill large results at all.
+    :param directory: Where the files are written. None means a
+        ``mcp_ohmy_sql_spill`` folder in the system temp directory.
+    :param page_rows: Number of rows per page.
+    :param max_rows: Maximum number of rows spilled per query, it replaces
+        ``settings.max_rows`` as the ``LIMIT`` pushed down into the SQL.
+    :param max_age: Number of seconds a spilled result is kept.
+    :param max_total_bytes: Maximum total size of the spill directory, the
+        oldest results are evicted first.
+
+    **Examples**:
+        Keep up to one million rows per query for 10 minutes::
+
+            {
+                "enabled": true,
+                "max_rows": 1000000,
+                "max_age": 600
+            }
+    """
+
+    enabled: bool = Field(
+        default=False,
+        description="Whether to spill large results to local files",
+    )
+    directory: T.Optional[str] = Field(
+        default=None,
+        description="Directory of the spilled results",
+    )
+    page_rows: int = Field(
+        default=100,
+        ge=1,
+        description="Number of rows per page of a spilled result",
+    )
+    max_rows: int = Field(
+        default=1_000_000,
+        ge=1,
+        description="Maximum number of rows spilled per query",
+    )
+    max_age: int = Field(
+        default=3600,
+        ge=0,
+        description="Seconds a spilled result is kept",
+    )
+    max_total_bytes: int = Field(
+        default=1_000_000_000,
+        ge=0,
+        description="Maximum total size of the spilled results in bytes",
+    )
+
+    @property
+    def spill_dir(self) -> Path:
+        """
+        The resolved spill directory.
+        """
+        if self.directory is None:
+            return Path(tempfile.gettempdir()).joinpath("mcp_ohmy_sql_spill")
+        return Path(self.directory).expanduser()
+
+
+class CursorSettings(BaseModel):
+    """
+    Continuation token pagination over open query cursors.
+
+    When enabled, ``execute_select_statement`` keeps the query cursor open
+    and returns the first ``page_rows`` rows with a continuation token, the
+    ``continue_query`` tool fetches the next rows from the same cursor,
+    without re-running the query. If :class:`SpillSettings` is also enabled,
+    large results are spilled instead.
+
+    :param enabled: Whether to keep cursors open at all.
+    :param page_rows: Number of rows returned per call.
+    :param max_rows: Maximum number of rows read from a cursor, it replaces
+        ``settings.max_rows`` as the ``LIMIT`` pushed down into the SQL.
+    :param idle_timeout: Number of seconds an unused cursor stays open.
+    :param max_open_cursors: Maximum number of open cursors per database,
+        each one holds a connection. The least recently used cursor is closed
+        when a new one doesn't fit.
+
+    **Examples**:
+        Keep at most 2 cursors per database open for 1 minute::
+
+            {
+                "enabled": true,
+                "idle_timeout": 60,
+                "max_open_cursors": 2
+            }
+    """
+
+    enabled: bool = Field(
+        default=False,
+        description="Whether to paginate results with open cursors",
+    )
+    page_rows: int = Field(
+        default=100,
+        ge=1,
+        description="Number of rows returned per call",
+    )
+    max_rows: int = Field(
+        default=100_000,
+        ge=1,
+        description="Maximum number of rows read from a cursor",
+    )
+    idle_timeout: float = Field(
+        default=300,
+        gt=0,
+        description="Seconds an unused cursor stays open",
+    )
+    max_open_cursors: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum number of open cursors per database",
+    )
+
+
+class JobSettings(BaseModel):
+    """
+    Background query jobs, used by the ``submit_query`` tool.
+
+    A job runs the query on a worker pool with the ``background`` admission
+    priority, independent of the MCP request, so a long warehouse query
+    survives client timeouts. The result is kept in the spill directory
+    (see :class:`SpillSettings`) if ``pyarrow`` is installed, in memory
+    otherwise.
+
+    :param max_workers: Maximum number of jobs running at the same time.
+    :param max_rows: Maximum number of rows kept per job, pushed down into
+        the SQL as a ``LIMIT``.
+    :param page_rows: Number of rows per page of ``get_query_result``.
+    :param job_ttl: Number of seconds a finished job and its result are kept.
+    :param max_jobs: Maximum number of jobs kept, the oldest finished jobs
+        are dropped first.
+
+    **Examples**:
+        Run at most one job at a time::
+
+            {
+                "max_workers": 1
+            }
+    """
+
+    max_workers: int = Field(
+        default=2,
+        ge=1,
+        description="Maximum number of jobs running at the same time",
+    )
+    max_rows: int = Field(
+        default=1_000_000,
+        ge=1,
+        description="Maximum number of rows kept per job",
+    )
+    page_rows: int = Field(
+        default=100,
+        ge=1,
+        description="Number of rows per page of a job result",
+    )
+    job_ttl: int = Field(
+        default=3600,
+        ge=0,
+        description="Seconds a finished job is kept",
+    )
+    max_jobs: int = Field(
+        default=100,
+        ge=1,
+        description="Maximum number of jobs kept",
+    )
+
+
+class LocalEngineSettings(BaseModel):
+    """
+    Embedded DuckDB engine to post-process large results locally.
+
+    When enabled, a result with more than ``min_rows`` rows is registered as
+    a table (``result_1``, ``result_2``, ...) in an in-memory DuckDB database,
+    the reply shows its first ``preview_rows`` rows and the table name, and
+    the ``query_local_result`` tool runs follow-up aggregations, filters and
+    joins on it without going back to the database. Requires ``duckdb`` and
+    ``pyarrow`` (``pip install 'mcp_ohmy_sql[duckdb]'``).
+
+    :param enabled: Whether to load large results into the local engine.
+    :param min_rows: Results with more rows than this are loaded, smaller
+        results are returned inline.
+    :param preview_rows: Number of rows shown when a result is loaded.
+    :param max_rows: Maximum number of rows loaded per query, it replaces
+        ``settings.max_rows`` as the ``LIMIT`` pushed down into the SQL.
+    :param max_tables: Maximum number of tables kept, the oldest are dropped
+        first.
+    :param max_total_bytes: Maximum total size of the tables.
+    :param table_ttl: Number of seconds a table is kept.
+    :param memory_limit: DuckDB ``memory_limit`` of the local queries.
+    :param max_source_rows: Maximum number of rows fetched per source table
+        of a ``execute_federated_query`` call, a source with more rows fails
+        the query instead of silently joining a partial table.
+
+    **Examples**:
+        Load results of more than 1000 rows::
+
+            {
+                "enabled": true,
+                "min_rows": 1000
+            }
+    """
+
+    enabled: bool = Field(
+        default=False,
+        description="Whether to load large results into the local DuckDB engine",
+    )
+    min_rows: int = Field(
+        default=100,
+        ge=1,
+        description="Results with more rows are loaded into the local engine",
+    )
+    preview_rows: int = Field(
+        default=10,
+        ge=0,
+        description="Number of rows shown when a result is loaded",
+    )
+    max_rows: int = Field(
+        default=1_000_000,
+        ge=1,
+        description="Maximum number of rows loaded per query",
+    )
+    max_tables: int = Field(
+        default=10,
+        ge=1,
+        description="Maximum number of local tables kept",
+    )
+    max_total_bytes: int = Field(
+        default=1_000_000_000,
+        ge=0,
+        description="Maximum total size of the local tables in bytes",
+    )
+    table_ttl: int = Field(
+        default=3600,
+        ge=0,
+        description="Seconds a local table is kept",
+    )
+    memory_limit: str = Field(
+        default="1GB",
+        description="DuckDB memory limit of the local queries",
+    )
+    max_source_rows: int = Field(
+        default=100_000,
+        ge=1,
+        description="Maximum number of rows fetched per source of a federated query",
+    )
+
+
+class ExportSettings(BaseModel):
+    """
+    Export query results to local files.
+
+    When enabled, the ``export_query_result`` tool streams a SELECT from its
+    database into a zstd Parquet, gzip CSV or gzip JSON Lines file under
+    ``directory``, ``batch_size`` rows at a time, and writes a manifest with
+    the number of rows and bytes and the SHA-256 of the file. Parquet requires
+    ``pyarrow`` (``pip install 'mcp_ohmy_sql[arrow]'``).
+
+    :param enabled: Whether the export tool is allowed to write files.
+    :param directory: Where the files are written. None means a
+        ``mcp_ohmy_sql_export`` folder in the system temp directory.
+    :param batch_size: Number of rows fetched and written at a time.
+    :param max_rows: Maximum number of rows per export, None means no limit.
+    :param max_workers: Maximum number of partitions of one export extracted
+        at the same time, each one on its own connection, see the
+        ``partitions`` argument of ``export_query_result``.
+
+    **Examples**:
+        Export into a shared folder, at most 50 million rows::
+
+            {
+                "enabled": true,
+                "directory": "~/exports",
+                "max_rows": 50000000
+            }
+    """
+
+    enabled: bool = Field(
+        default=False,
+        description="Whether to allow exporting query results to local files",
+    )
+    directory: T.Optional[str] = Field(
+        default=None,
+        description="Directory of the exported files",
+    )
+    batch_size: int = Field(
+        default=10_000,
+        ge=1,
+        description="Number of rows fetched and written at a time",
+    )
+    max_rows: T.Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Maximum number of rows per export",
+    )
+    max_workers: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum number of partitions of one export extracted at once",
+    )
+
+    @property
+    def export_dir(self) -> Path:
+        """
+        The resolved export directory.
+        """
+        if self.directory is None:
+            return Path(tempfile.gettempdir()).joinpath("mcp_ohmy_sql_export")
+        return Path(self.directory).expanduser()
+
+
+class ResultCacheSettings(BaseModel):
+    """
+    Cache the results of ``execute_select_statement``.
+
+    Agents poll the same queries again and again, e.g. "the latest orders".
+    When enabled, a result is served from the cache for ``ttl`` seconds.
+    After that, if ``track_table_changes`` is on and the database has a
+    cheap change probe (SQLite, PostgreSQL and Redshift), the result is
+    served as long as the tables it reads are unchanged. Otherwise, if the
+    tables changed by inserts only, or their changes are not tracked, and
+    the query reads a single append-only table with an increasing key, the
+    rows from the largest key of the cached result on are fetched again and
+    replace its last rows, else the query runs again. Only the PostgreSQL
+    probe tells inserts from updates, on SQLite and Redshift any change runs
+    the query again.
+    A query is only refreshed this way if it names its key with a
+    ``/* incremental_key: OrderId */`` comment, or if its table is listed in
+    the ``append_only_tables`` of its :class:`Schema`, then the key is the
+    first primary key column of the table (or the leading sort key column on
+    Redshift). The rows with the largest key are fetched again, so the key
+    doesn't have to be unique, e.g. a timestamp. An update or a delete of the
+    older rows is only seen by the next full refresh.
+
+    Only results returned inline are cached, i.e. when ``spill``, ``cursor``
+    and ``local_engine`` are disabled.
+
+    :param enabled: Whether to cache query results.
+    :param ttl: Number of seconds a cached result is served as it is.
+    :param max_entries: Maximum number of cached results, the least recently
+        used are dropped first.
+    :param track_table_changes: Whether to tag cached results with the base
+        tables they read, and keep serving them after ``ttl`` while these
+        tables are unchanged, see :mod:`mcp_ohmy_sql.table_version`.
+    :param incremental: Whether to refresh a cached result incrementally
+        when possible, instead of running the query again.
+    :param full_refresh_interval: Number of seconds after which an
+        incrementally refreshed result is recomputed in full, to pick up
+        rows that were not appended in key order.
+
+    **Examples**:
+        Serve results up to 5 minutes old::
+
+            {
+                "enabled": true,
+                "ttl": 300
+            }
+    """
+
+    enabled: bool = Field(
+        default=False,
+        description="Whether to cache query results",
+    )
+    ttl: int = Field(
+        default=60,
+        ge=0,
+        description="Seconds a cached result is served as it is",
+    )
+    max_entries: int = Field(
+        default=128,
+        ge=1,
+        description="Maximum number of cached results",
+    )
+    track_table_changes: bool = Field(
+        default=True,
+        description="Whether to keep cached results while their tables are unchanged",
+    )
+    incremental: bool = Field(
+        default=True,
+        description="Whether to refresh cached results incrementally",
+    )
+    full_refresh_interval: int = Field(
+        default=3600,
+        ge=0,
+        description="Seconds after which a cached result is recomputed in full",
+    )
+
+
+class MaterializationSettings(BaseModel):
+    """
+    Local materialization of hot queries, see :class:`Materialization`.
+
+    When enabled, a background scheduler runs each configured materialization
+    when it is due, streams its rows into a table of a local SQLite file under
+    ``directory``, and swaps the new table in once it is complete. The file
+    is exposed as a read-only database named ``identifier``, agents query it
+    with the normal tools, its ``_materializations`` table tells where each
+    table comes from and when it was refreshed.
+
+    :param enabled: Whether to run the materializations at all.
+    :param identifier: Identifier of the local database of the materialized
+        tables, it must not be used by another database.
+    :param directory: Where the SQLite file is written. None means a
+        ``mcp_ohmy_sql_materialized`` folder in the system temp directory.
+    :param max_rows: Maximum number of rows per materialized table, the
+        table keeps the first rows and is flagged as truncated.
+    :param batch_size: Number of rows fetched and written at a time.
+    :param check_interval: Number of seconds between two checks of which
+        materializations are due.
+    :param retry_interval: Number of seconds before a failed refresh is
+        tried again.
+
+    **Examples**:
+        Refresh into a persistent folder::
+
+            {
+                "enabled": true,
+                "identifier": "materialized",
+                "directory": "~/.mcp_ohmy_sql/materialized"
+            }
+    """
+
+    enabled: bool = Field(
+        default=False,
+        description="Whether to run the materializations",
+    )
+    identifier: str = Field(
+        default="materialized",
+        description="Identifier of the local database of the materialized tables",
+    )
+    directory: T.Optional[str] = Field(
+        default=None,
+        description="Directory of the local database file",
+    )
+    max_rows: int = Field(
+        default=1_000_000,
+        ge=1,
+        description="Maximum number of rows per materialized table",
+    )
+    batch_size: int = Field(
+        default=10_000,
+        ge=1,
+        description="Number of rows fetched and written at a time",
+    )
+    check_interval: float = Field(
+        default=60,
+        gt=0,
+        description="Seconds between two checks of the due materializations",
+    )
+    retry_interval: float = Field(
+        default=600,
+        ge=0,
+        description="Seconds before a failed refresh is tried again",
+    )
+
+    @property
+    def database_path(self) -> Path:
+        """
+        The resolved path of the local SQLite file.
+        """
+        if self.directory is None:
+            directory = Path(tempfile.gettempdir()).joinpath(
+                "mcp_ohmy_sql_materialized"
+            )
+        else:
+            directory = Path(self.directory).expanduser()
+        return directory.joinpath("materialized.sqlite")
+
+
+class ProfilingSettings(BaseModel):
+    """
+    Cached column profiles of the tables, shown by ``get_schema_details``
+    with ``include_profiles=True``.
+
+    When enabled, the first request of the profiles of a schema starts a
+    background job that samples each table, at most ``max_workers`` tables at
+    a time with a background admission slot, so user queries are served
+    first. Each table is read with the sampling primitive of its database
+    (``TABLESAMPLE`` on PostgreSQL and SQL Server, ``SAMPLE`` on Oracle, a
+    random filter elsewhere) at ``sample_percent`` % of its rows, up to
+    ``sample_rows`` rows. If the sample has fewer rows, the table is counted,
+    small tables are read whole, larger ones are sampled again at the rate
+    giving about ``sample_rows`` rows. The profiles are
+    recomputed in the background once they are older than ``profile_ttl``
+    seconds, the old profiles are shown in the meantime.
+
+    :param enabled: Whether to profile the tables at all.
+    :param sample_percent: Sampling rate of the tables, in percent.
+    :param sample_rows: Maximum number of rows sampled per table.
+    :param max_values: Text columns with at most this many distinct values
+        in the sample get their values listed.
+    :param max_value_chars: Longer values are not listed.
+    :param max_workers: Maximum number of tables sampled at the same time.
+    :param time_budget: Number of seconds a profiling job of a schema may
+        spend, the tables not started in time are profiled by the next job.
+    :param profile_ttl: Number of seconds before a profile is recomputed.
+
+    **Examples**:
+        Sample 5% of each table, up to 50,000 rows::
+
+            {
+                "enabled": true,
+                "sample_percent": 5,
+                "sample_rows": 50000
+            }
+    """
+
+    enabled: bool = Field(
+        default=False,
+        description="Whether to profile the tables",
+    )
+    sample_percent: float = Field(
+        default=1.0,
+        gt=0,
+        le=100,
+        description="Sampling rate of the tables, in percent",
+    )
+    sample_rows: int = Field(
+        default=10_000,
+        ge=1,
+        description="Maximum number of rows sampled per table",
+    )
+    max_values: int = Field(
+        default=20,
+        ge=1,
+        description="Maximum number of distinct values listed per text column",
+    )
+    max_value_chars: int = Field(
+        default=50,
+        ge=1,
+        description="Maximum length of a listed value",
+    )
+    max_workers: int = Field(
+        default=2,
+        ge=1,
+        description="Maximum number of tables sampled at the same time",
+    )
+    time_budget: float = Field(
+        default=300,
+        gt=0,
+        description="Seconds a profiling job of a schema may spend",
+    )
+    profile_ttl: float = Field(
+        default=86400,
+        ge=0,
+        description="Seconds before a profile is recomputed",
+    )
+
+
+class ApproximateSettings(BaseModel):
+    """
+    Approximate answers of ``execute_select_statement`` with
+    ``approximate=True``, for exploratory questions on large tables.
+
+    The first table of the ``FROM`` clause is read at ``sample_percent`` % of
+    its rows with the sampling primitive of its database (``TABLESAMPLE
+    SYSTEM`` on PostgreSQL and SQL Server, ``SAMPLE`` on Oracle, a random
+    filter elsewhere), ``COUNT`` and ``SUM`` are scaled by
+    ``100 / sample_percent``, and the result says how it was sampled and
+    how large the error of the scaled counts is.
+
+    :param sample_percent: Sampling rate of the main table, in percent.
+
+    **Examples**:
+        Sample 0.1% of the main table::
+
+            {
+                "sample_percent": 0.1
+            }
+    """
+
+    sample_percent: float = Field(
+        default=1.0,
+        gt=0,
+        lt=100,
+        description="Sampling rate of the main table, in percent",
+    )
+
+
 class Settings(BaseModel):
     """
     Global settings for the MCP server.
 
-    This class is currently empty but reserved for future global configuration
-    options such as query timeout limits, result size limits, logging levels,
-    and other server-wide settings.
+    :param max_rows: Maximum number of rows returned by ``execute_select_statement``.
+        A matching ``LIMIT`` is pushed down into the SQL so the database
+        enforces the cap instead of our network and memory.
+    :param max_result_chars: Character budget of a query result table
+        (about 4 characters per token). Oversized columns are elided and
+        trailing rows are cut to fit. None means unlimited. Can be overridden
+        per call of ``execute_select_statement``.
+    :param max_cell_chars: Maximum number of characters per cell, longer
+        values are truncated. None means unlimited.
+    :param push_down_truncation: If True, long text, JSON / SUPER and binary
+        columns are shrunk inside the database (``SUBSTRING``, length and
+        hash prefix) so large payloads never leave it. Requires
+        ``max_cell_chars``. The columns are looked up in the schema of the
+        database, which is loaded on the first query, so it is off by default.
+    :param cache_for_schema_expires: Number of seconds the schema used to
+        rewrite queries is cached before it is loaded again.
+    :param admission: Default :class:`AdmissionSettings` applied to every
+        database, unless the database overrides it.
+    :param preflight: :class:`PreflightSettings` of the pre-flight cost guard.
+    :param explain_timeout: Maximum number of seconds ``explain_query`` may
+        spend running the query with ``analyze=True``.
+    :param max_batch_size: Maximum number of statements of one
+        ``execute_select_statements`` call, they run concurrently within the
+        per-database ``admission`` limits.
+    :param max_fan_out_workers: Maximum number of databases queried at the
+        same time by one ``execute_fan_out_query`` or
+        ``execute_federated_query`` call.
+    :param spill: :class:`SpillSettings` of large results paging.
+    :param cursor: :class:`CursorSettings` of continuation token paging.
+    :param jobs: :class:`JobSettings` of background query jobs.
+    :param local_engine: :class:`LocalEngineSettings` of the local
+        post-processing of large results.
+    :param export: :class:`ExportSettings` of the result export to files.
+    :param result_cache: :class:`ResultCacheSettings` of the query result cache.
+    :param materialization: :class:`MaterializationSettings` of the scheduled
+        local materialization of hot queries.
+    :param profiling: :class:`ProfilingSettings` of the cached column
+        profiles of the tables.
+    :param approximate: :class:`ApproximateSettings` of the approximate
+        queries on table samples.
 
     Example:
 
         In JSON configuration::
 
             {
-                "settings": {}
+                "settings": {
+                    "max_rows": 1000,
+                    "max_result_chars": 40000,
+                    "max_cell_chars": 200,
+                    "admission": {
+                        "max_concurrency": 4,
+                        "max_queue_size": 16,
+                        "queue_timeout": 30
+                    },
+                    "preflight": {
+                        "enabled": true,
+                        "max_estimated_cost": 1000000
+                    }
+                }
             }
     """
 
+    max_rows: int = Field(
+        default=1000,
+        ge=1,
+        description="Maximum number of rows returned by a SELECT statement",
+    )
+    max_result_chars: T.Optional[int] = Field(
+        default=40_000,
+        ge=100,
+        description="Character budget of a query result table",
+    )
+    max_cell_chars: T.Optional[int] = Field(
+        default=200,
+        ge=10,
+        description="Maximum number of characters per result cell",
+    )
+    push_down_truncation: bool = Field(
+        default=False,
+        description="Shrink large values inside the database",
+    )
+    cache_for_schema_expires: int = Field(
+        default=3600,
+        ge=0,
+        description="Seconds the schema used to rewrite queries is cached",
+    )
+    admission: AdmissionSettings = Field(
+        default_factory=AdmissionSettings,
+        description="Default per-database admission control settings",
+    )
+    preflight: PreflightSettings = Field(
+        default_factory=PreflightSettings,
+        description="Pre-flight cost guard settings",
+    )
+    explain_timeout: float = Field(
+        default=30.0,
+        gt=0,
+        description="Maximum seconds of EXPLAIN ANALYZE",
+    )
+    max_batch_size: int = Field(
+        default=10,
+        ge=1,
+        description="Maximum number of statements per execute_select_statements call",
+    )
+    max_fan_out_workers: int = Field(
+        default=8,
+        ge=1,
+        description="Maximum number of databases queried at once by a fan-out query",
+    )
+    spill: SpillSettings = Field(
+        default_factory=SpillSettings,
+        description="Large results spilling settings",
+    )
+    cursor: CursorSettings = Field(
+        default_factory=CursorSettings,
+        description="Open cursor pagination settings",
+    )
+    jobs: JobSettings = Field(
+        default_factory=JobSettings,
+        description="Background query job settings",
+    )
+    local_engine: LocalEngineSettings = Field(
+        default_factory=LocalEngineSettings,
+        description="Local DuckDB engine settings",
+    )
+    export: ExportSettings = Field(
+        default_factory=ExportSettings,
+        description="Query result export settings",
+    )
+    result_cache: ResultCacheSettings = Field(
+        default_factory=ResultCacheSettings,
+        description="Query result cache settings",
+    )
+    materialization: MaterializationSettings = Field(
+        default_factory=MaterializationSettings,
+        description="Scheduled local materialization settings",
+    )
+    profiling: ProfilingSettings = Field(
+        default_factory=ProfilingSettings,
+        description="Cached column profiles settings",
+    )
+    approximate: ApproximateSettings = Field(
+        default_factory=ApproximateSettings,
+        description="Approximate query settings",
+    )
     # enable_cache_for_schema: bool = Field(default=False)
-    # cache_for_schema_expires: int = Field(default=3600)
-    # enable_cache_for_query: bool = Field(default=False)
-    # cache_for_query_expires: int = Field(default=600)
 
 
 class TableFilter(BaseModel):
@@ -106,6 +951,11 @@ class Schema(BaseModel):
     :param name: Schema name. If None, uses the database's default schema.
         Some databases (like SQLite) don't have explicit schemas.
     :param table_filter: :class:`TableFilter` rules for this schema.
+    :param append_only_tables: Tables whose rows are only ever inserted, never
+        updated or deleted, with a key that only grows. The cached results of
+        plain queries on them are refreshed incrementally by their integer or
+        date primary key (or leading Redshift sort key), see
+        :class:`ResultCacheSettings`.
 
     **Examples**:
         Default schema with filtering::
@@ -146,6 +996,10 @@ class Schema(BaseModel):
     table_filter: TableFilter = Field(
         default_factory=TableFilter, description="Table filtering rules for this schema"
     )
+    append_only_tables: list[str] = Field(
+        default_factory=list,
+        description="Tables whose rows are only inserted, never updated or deleted",
+    )
 
 
 from .sqlalchemy import SqlalchemyConnection
@@ -179,6 +1033,8 @@ class Database(BaseModel):
         etc.).
     :param schemas: List of :class:`Schema` configurations for this database. Each schema can
         have its own table filtering rules.
+    :param admission: Optional :class:`AdmissionSettings` for this database.
+        If None, uses the global ``settings.admission``.
 
     **Examples**:
         SQLite database::
@@ -219,6 +1075,10 @@ class Database(BaseModel):
     schemas: list[Schema] = Field(
         description="List of schema configurations for this database"
     )
+    admission: T.Optional[AdmissionSettings] = Field(
+        default=None,
+        description="Admission control override. If None, uses global settings",
+    )
 
     @field_validator("db_type", mode="after")
     @classmethod
@@ -265,6 +1125,67 @@ class Database(BaseModel):
         return metadata
 
 
+class Materialization(BaseModel):
+    """
+    A query materialized into a local table on a schedule, see
+    :class:`MaterializationSettings`.
+
+    The query runs again ``refresh_interval`` seconds after its last
+    refresh. If ``refresh_hours`` is given, a due refresh waits for the next
+    of these hours, e.g. the off-peak hours of the source database. A table
+    that was never materialized is refreshed right away.
+
+    :param name: Name of the local table, letters, digits and underscores.
+    :param database_identifier: Identifier of the source database.
+    :param sql: The SELECT statement to materialize.
+    :param description: Human-readable description of the table.
+    :param refresh_interval: Number of seconds between two refreshes.
+    :param refresh_hours: Hours of the day (0 - 23, server local time) a
+        refresh may start at. Empty means any time.
+
+    **Examples**:
+        Refresh the monthly sales every night between 1 AM and 5 AM::
+
+            {
+                "name": "monthly_sales",
+                "database_identifier": "warehouse",
+                "sql": "SELECT DATE_TRUNC('month', order_date) AS month, SUM(amount) AS amount FROM orders GROUP BY 1",
+                "refresh_interval": 86400,
+                "refresh_hours": [1, 2, 3, 4]
+            }
+    """
+
+    name: str = Field(
+        pattern=r"^[A-Za-z][A-Za-z0-9_]*$",
+        description="Name of the local table",
+    )
+    database_identifier: str = Field(description="Identifier of the source database")
+    sql: str = Field(description="The SELECT statement to materialize")
+    description: str = Field(
+        default="", description="Human-readable description of the table"
+    )
+    refresh_interval: int = Field(
+        default=86400,
+        ge=1,
+        description="Seconds between two refreshes",
+    )
+    refresh_hours: list[int] = Field(
+        default_factory=list,
+        description="Hours of the day a refresh may start at, empty means any time",
+    )
+
+    @field_validator("refresh_hours", mode="after")
+    @classmethod
+    def check_refresh_hours(cls, value: list[int]) -> list[int]:
+        """
+        Validate the refresh_hours field.
+        """
+        for hour in value:
+            if not (0 <= hour <= 23):
+                raise ValueError(f"{hour} is not an hour of the day (0 - 23)")
+        return value
+
+
 class Config(BaseModel):
     """
     Root configuration object for the mcp_ohmy_sql MCP server.
@@ -279,6 +1200,9 @@ class Config(BaseModel):
         result limits, etc.
     :param databases: List of :class:`Database` configurations. Each database must have
         a unique identifier and can contain multiple schemas.
+    :param materializations: List of :class:`Materialization`. When
+        ``settings.materialization`` is enabled, their local database is
+        added to ``databases``.
 
     **Configuration File Structure**:
         The JSON configuration file should follow this structure::
@@ -354,6 +1278,60 @@ class Config(BaseModel):
         default_factory=Settings, description="Global server settings"
     )
     databases: list[Database] = Field(description="List of database configurations")
+    materializations: list[Materialization] = Field(
+        default_factory=list,
+        description="List of queries materialized into local tables",
+    )
+
+    @model_validator(mode="after")
+    def add_materialized_database(self) -> "Config":
+        """
+        Validate the materializations, and add the read-only database of the
+        materialized tables if they are enabled.
+        """
+        materialization = self.settings.materialization
+        identifiers = {db.identifier for db in self.databases}
+        names = set()
+        for item in self.materializations:
+            if item.name.lower() in names:
+                raise ValueError(f"Duplicate materialization name {item.name!r}")
+            names.add(item.name.lower())
+            if (
+                item.database_identifier not in identifiers
+                or item.database_identifier == materialization.identifier
+            ):
+                raise ValueError(
+                    f"Materialization {item.name!r}: database "
+                    f"{item.database_identifier!r} not found in configuration"
+                )
+        if materialization.enabled is False or len(self.materializations) == 0:
+            return self
+        all_names = ", ".join(item.name for item in self.materializations)
+        path = materialization.database_path
+        database = Database(
+            identifier=materialization.identifier,
+            description=(
+                f"Read-only local copies of query results, refreshed on a "
+                f"schedule: {all_names}. The _materializations table has the "
+                f"source database, refresh time and row count of each table."
+            ),
+            db_type=DbTypeEnum.SQLITE.value,
+            connection=SqlalchemyConnection(
+                url=f"sqlite:///file:{path.as_posix()}?mode=ro&uri=true"
+            ),
+            schemas=[Schema()],
+        )
+        for existing in self.databases:
+            if existing.identifier == database.identifier:
+                # loaded from a dump of a config that already has it
+                if existing.model_dump() == database.model_dump():
+                    return self
+                raise ValueError(
+                    f"The materialized database identifier "
+                    f"{database.identifier!r} is already used by another database"
+                )
+        self.databases.append(database)
+        return self
 
     @classmethod
     def load(cls, path: Path) -> "Config":
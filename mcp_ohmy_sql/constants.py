@@ -124,6 +124,61 @@ class ConnectionTypeEnum(BetterStrEnum):
 # [endconnectiontypeenum]
 
 
+class PreflightActionEnum(BetterStrEnum):
+    """
+    What to do with a SELECT statement that fails the pre-flight cost check.
+    Used in :class:`~mcp_ohmy_sql.config.define.PreflightSettings`.
+    """
+
+    REJECT = "reject"  # don't run the query, tell the model why
+    PREVIEW = "preview"  # run the query with a small row cap, tell the model why
+
+
+class ResultFormatEnum(BetterStrEnum):
+    """
+    Output format of a query result, see :mod:`mcp_ohmy_sql.result.formats`.
+    """
+
+    MARKDOWN = "markdown"  # Markdown pipe table, the default
+    CSV = "csv"  # comma separated values with a typed header
+    TSV = "tsv"  # tab separated values with a typed header
+    JSONL = "jsonl"  # one JSON object per row
+    COLUMNAR = "columnar"  # one line per column, compact for wide results
+
+
+class ExportFormatEnum(BetterStrEnum):
+    """
+    File format of an exported query result, see :mod:`mcp_ohmy_sql.result.export`.
+    """
+
+    PARQUET = "parquet"  # zstd compressed Parquet, the default
+    CSV = "csv"  # gzip compressed CSV with a header line
+    JSONL = "jsonl"  # gzip compressed JSON Lines, one object per row
+
+
+class LargeValueKindEnum(BetterStrEnum):
+    """
+    How a potentially large column is shrunk inside the database before
+    it is sent to us. Used in :mod:`mcp_ohmy_sql.rewrite.truncate`.
+    """
+
+    TEXT = "text"  # long string, cut to a prefix
+    JSON = "json"  # JSON / SUPER, serialized to string then cut to a prefix
+    BINARY = "binary"  # replaced by its length and a hash prefix
+
+
+class JobStatusEnum(BetterStrEnum):
+    """
+    Status of a background query job, see :mod:`mcp_ohmy_sql.jobs`.
+    """
+
+    QUEUED = "queued"  # waiting for a worker
+    RUNNING = "running"  # the query is running or its rows are being fetched
+    SUCCEEDED = "succeeded"  # the result is ready
+    FAILED = "failed"  # the query failed, see the error
+    CANCELLED = "cancelled"  # cancelled by the user
+
+
 class EnvVar(BaseModel):
     """
     Environment variable wrapper with default value support.
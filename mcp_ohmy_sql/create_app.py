@@ -9,5 +9,6 @@ def create_app():
     from .tools import get_all_database_details
     from .tools import get_schema_details
     from .tools import execute_select_statement
+    from .tools import explain_query
 
     return mcp
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+
+"""
+Registry of open query cursors for continuation based pagination.
+
+A query opened with a cursor returns its first rows and a continuation token,
+the cursor (SQLAlchemy ``stream_results`` result, or a ``redshift_connector``
+cursor) stays open in the :class:`CursorRegistry` so the next rows are
+fetched from it, without re-running the query or rescanning with ``OFFSET``.
+
+Every open cursor holds a database connection, so the registry bounds the
+number of open cursors per database, closing the least recently used one
+when a new cursor doesn't fit, and closes cursors idle for too long.
+
+Usage:
+
+>>> registry = CursorRegistry(max_open_cursors=4, idle_timeout=300)
+>>> cursor = registry.add(
+...     OpenCursor(columns=columns, fetchmany=result.fetchmany, close=result.close),
+...     database_identifier="chinook",
+... )
+>>> rows, has_more = registry.get(cursor.token).fetch(100)
+"""
+
+import typing as T
+import time
+import secrets
+import threading
+from collections import OrderedDict
+
+
+class CursorNotFoundError(KeyError):
+    """
+    Raised when a continuation token is invalid, or its cursor was closed.
+    """
+
+    def __str__(self) -> str:
+        return (
+            f"Continuation token {self.args[0]!r} not found or expired, "
+            f"run the query again"
+        )
+
+
+class OpenCursor:
+    """
+    A live query cursor.
+
+    :param columns: column names.
+    :param fetchmany: the ``fetchmany`` method of the cursor or result.
+    :param close: close the cursor and release its connection.
+    :param max_rows: if provided, at most this many rows are returned, the
+        query should fetch ``max_rows + 1`` rows so we know it is truncated.
+    """
+
+    def __init__(
+        self,
+        columns: T.Sequence[str],
+        fetchmany: T.Callable[[int], T.Sequence[T.Sequence[T.Any]]],
+        close: T.Callable[[], T.Any],
+        max_rows: T.Optional[int] = None,
+    ):
+        self.columns: list[str] = list(columns)
+        self.fetchmany = fetchmany
+        self._close = close
+        self.max_rows = max_rows
+        self.token: str = ""
+        self.database_identifier: str = ""
+        self.last_used: float = time.time()
+        self.n_fetched: int = 0
+        self.truncated: bool = False
+        self.closed: bool = False
+        # the row fetched ahead to know if there are more rows
+        self._lookahead: list[tuple] = []
+        self._lock = threading.Lock()
+
+    def fetch(self, n: int) -> tuple[list[tuple], bool]:
+        """
+        Fetch the next ``n`` rows.
+
+        :returns: a tuple of (rows, has_more). ``has_more`` is False once
+            the result is exhausted, or ``max_rows`` rows have been returned.
+        """
+        with self._lock:
+            self.last_used = time.time()
+            if self.closed:
+                return [], False
+            if self.max_rows is not None:
+                n = min(n, self.max_rows - self.n_fetched)
+            rows = self._lookahead + [tuple(row) for row in self.fetchmany(n + 1)]
+            self._lookahead = rows[n:]
+            rows = rows[:n]
+            self.n_fetched += len(rows)
+            has_more = len(self._lookahead) > 0
+            if has_more and self.max_rows is not None:
+                if self.n_fetched >= self.max_rows:
+                    self.truncated = True
+                    has_more = False
+            return rows, has_more
+
+    def push_back(self, rows: list[tuple]):
+        """
+        Give back the last fetched rows that were not shown, e.g. cut by the
+        character budget, the next :meth:`fetch` starts with them.
+        """
+        with self._lock:
+            if len(rows) == 0 or self.closed:
+                return
+            self._lookahead = list(rows) + self._lookahead
+            self.n_fetched -= len(rows)
+            # fewer than max_rows rows are returned now
+            self.truncated = False
+
+    def close(self):
+        """
+        Close the cursor, it is safe to call it more than once.
+        """
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self._lookahead = []
+            try:
+                self._close()
+            except Exception:  # pragma: no cover
+                pass
+
+
+class CursorRegistry:
+    """
+    Thread-safe registry of open cursors, keyed by continuation token.
+
+    :param max_open_cursors: maximum number of open cursors per database.
+    :param idle_timeout: number of seconds a cursor stays open without being
+        used.
+    """
+
+    def __init__(
+        self,
+        max_open_cursors: int = 4,
+        idle_timeout: float = 300,
+    ):
+        self.max_open_cursors = max_open_cursors
+        self.idle_timeout = idle_timeout
+        # ordered from the least to the most recently used
+        self._cursors: "OrderedDict[str, OpenCursor]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    def _pop_idle(self) -> list[OpenCursor]:
+        now = time.time()
+        tokens = [
+            token
+            for token, cursor in self._cursors.items()
+            if now - cursor.last_used > self.idle_timeout
+        ]
+        return [self._cursors.pop(token) for token in tokens]
+
+    def close_idle(self) -> list[str]:
+        """
+        Close the cursors idle for more than ``idle_timeout`` seconds.
+
+        :returns: the tokens of the closed cursors.
+        """
+        with self._lock:
+            cursors = self._pop_idle()
+        for cursor in cursors:
+            cursor.close()
+        return [cursor.token for cursor in cursors]
+
+    def add(
+        self,
+        cursor: OpenCursor,
+        database_identifier: str,
+    ) -> OpenCursor:
+        """
+        Register a cursor and assign its continuation token. If the database
+        already has ``max_open_cursors`` open cursors, the least recently used
+        one is closed.
+        """
+        cursor.token = secrets.token_hex(8)
+        cursor.database_identifier = database_identifier
+        with self._lock:
+            to_close = self._pop_idle()
+            tokens = [
+                token
+                for token, c in self._cursors.items()
+                if c.database_identifier == database_identifier
+            ]
+            n_over = len(tokens) + 1 - self.max_open_cursors
+            for token in tokens[: max(n_over, 0)]:
+                to_close.append(self._cursors.pop(token))
+            self._cursors[cursor.token] = cursor
+        for c in to_close:
+            c.close()
+        return cursor
+
+    def get(self, token: str) -> OpenCursor:
+        """
+        Get an open cursor and mark it as the most recently used.
+
+        :raises CursorNotFoundError: if the token is unknown or expired.
+        """
+        self.close_idle()
+        with self._lock:
+            try:
+                cursor = self._cursors[token]
+            except KeyError:
+                raise CursorNotFoundError(token)
+            self._cursors.move_to_end(token)
+            cursor.last_used = time.time()
+            return cursor
+
+    def close(self, token: str):
+        """
+        Close a cursor and forget its token, unknown tokens are ignored.
+        """
+        with self._lock:
+            cursor = self._cursors.pop(token, None)
+        if cursor is not None:
+            cursor.close()
+
+    def close_all(self):
+        """
+        Close all cursors.
+        """
+        with self._lock:
+            cursors = list(self._cursors.values())
+            self._cursors.clear()
+        for cursor in cursors:
+            cursor.close()
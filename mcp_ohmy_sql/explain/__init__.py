@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+"""
+Query plan (EXPLAIN) tools.
+"""
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+
+from .plan_1_model import PlanNode
+from .plan_1_model import QueryPlan
+from .plan_2_encoder import find_hotspots
+from .plan_2_encoder import encode_query_plan
+from .plan_3_extractor import get_explain_sql
+from .plan_3_extractor import parse_explain_rows
+from .plan_3_extractor import explain_query
+from .preflight import PlanCache
+from .preflight import PreflightResult
+from .preflight import check_query_plan
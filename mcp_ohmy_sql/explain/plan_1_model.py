@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+"""
+Normalized query plan data model.
+
+Every database has its own EXPLAIN output format (JSON for Postgres and MySQL,
+indented text for Redshift, a flat table for SQLite). They are all parsed
+into the same :class:`PlanNode` tree so the rest of the code doesn't need to
+care about the dialect.
+"""
+
+import typing as T
+import re
+
+from pydantic import BaseModel, Field
+
+from ..constants import DbTypeEnum
+
+#: a ``LIMIT`` step, e.g. ``Limit`` or ``XN Limit``
+_LIMIT_NODE_TYPE_PATTERN = re.compile(r"\blimit$", re.IGNORECASE)
+
+#: the steps that read all of their input before they return a row, e.g.
+#: ``Sort``, ``HashAggregate``, the ``Hash`` of a hash join or ``WindowAgg``
+_BLOCKING_NODE_TYPE_PATTERN = re.compile(
+    r"sort|aggregate|\bhash$|materialize|window|setop",
+    re.IGNORECASE,
+)
+
+
+class PlanNode(BaseModel):
+    """
+    A node in the query plan tree.
+
+    :param node_type: operation name, e.g. ``Seq Scan``, ``XN Hash Join DS_BCAST_INNER``.
+    :param relation: the table (or alias) this node reads, if any.
+    :param index: the index this node uses, if any.
+    :param estimated_rows: planner's estimate of rows produced by this node.
+    :param estimated_cost: planner's estimate of the total cost of this node,
+        including its children, in planner cost units.
+    :param actual_rows: actual rows produced, only available with ANALYZE.
+    :param actual_time: actual total time in milliseconds, only available with ANALYZE.
+    :param details: additional information, e.g. filter or join conditions.
+    :param children: child nodes.
+    """
+
+    node_type: str = Field()
+    relation: T.Optional[str] = Field(default=None)
+    index: T.Optional[str] = Field(default=None)
+    estimated_rows: T.Optional[float] = Field(default=None)
+    estimated_cost: T.Optional[float] = Field(default=None)
+    actual_rows: T.Optional[float] = Field(default=None)
+    actual_time: T.Optional[float] = Field(default=None)
+    details: list[str] = Field(default_factory=list)
+    children: list["PlanNode"] = Field(default_factory=list)
+
+    def walk(self) -> T.Iterable["PlanNode"]:
+        """
+        Iterate over this node and all of its descendants, depth first.
+        """
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+class QueryPlan(BaseModel):
+    """
+    The parsed query plan of a SELECT statement.
+
+    :param db_type: the database type that produced the plan.
+    :param root: the root node. SQLite plans may have multiple top level steps,
+        they are grouped under a synthetic ``Query`` root node.
+    :param analyzed: whether the plan has actual run time statistics.
+    """
+
+    db_type: DbTypeEnum = Field()
+    root: PlanNode = Field()
+    analyzed: bool = Field(default=False)
+
+    def walk(self) -> T.Iterable[PlanNode]:
+        """
+        Iterate over all nodes in the plan, depth first.
+        """
+        return self.root.walk()
+
+    @property
+    def estimated_rows(self) -> T.Optional[float]:
+        """
+        Planner's estimate of the number of rows returned by the query.
+        """
+        return self.root.estimated_rows
+
+    @property
+    def estimated_cost(self) -> T.Optional[float]:
+        """
+        Planner's estimate of the total cost of the query.
+        """
+        return self.root.estimated_cost
+
+    @property
+    def max_estimated_rows(self) -> T.Optional[float]:
+        """
+        The largest row estimate of any node, i.e. the most rows the database
+        has to process in a single step (typically the biggest table scan).
+        """
+        values = [
+            node.estimated_rows
+            for node in self.walk()
+            if node.estimated_rows is not None
+        ]
+        if values:
+            return max(values)
+        return None
+
+    @property
+    def max_processed_rows(self) -> T.Optional[float]:
+        """
+        Like :attr:`max_estimated_rows`, but a step below a ``LIMIT`` stops
+        once the limit is reached, unless a step in between (e.g. a sort or
+        an aggregate) reads all of its input first. ``SELECT * FROM big
+        LIMIT 10`` processes about 10 rows, ``SELECT * FROM big ORDER BY x
+        LIMIT 10`` all of them.
+        """
+        values = list(_iter_processed_rows(self.root, limit=None))
+        if values:
+            return max(values)
+        return None
+
+
+def _iter_processed_rows(
+    node: PlanNode,
+    limit: T.Optional[float],
+) -> T.Iterable[float]:
+    rows = node.estimated_rows
+    if rows is not None and limit is not None:
+        rows = min(rows, limit)
+    if rows is not None:
+        yield rows
+    if _BLOCKING_NODE_TYPE_PATTERN.search(node.node_type):
+        limit = None
+    elif _LIMIT_NODE_TYPE_PATTERN.search(node.node_type) and rows is not None:
+        limit = rows
+    for child in node.children:
+        yield from _iter_processed_rows(child, limit)
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+
+"""
+Encode a :class:`~mcp_ohmy_sql.explain.plan_1_model.QueryPlan` into a compact,
+token-efficient text summary for LLMs: a condensed plan tree, followed by
+the hotspots worth fixing before running the query.
+"""
+
+import typing as T
+import re
+
+from ..constants import TAB
+
+from .plan_1_model import PlanNode, QueryPlan
+from .preflight import format_number
+
+#: normalized node types that read a whole table, across all dialects
+FULL_SCAN_NODE_TYPES = {
+    "Seq Scan",  # PostgreSQL
+    "Parallel Seq Scan",  # PostgreSQL
+    "XN Seq Scan",  # AWS Redshift
+    "Table Scan",  # MySQL, SQLite
+}
+
+#: Redshift join steps that move data between compute nodes,
+#: DS_DIST_NONE and DS_DIST_ALL_NONE are the good ones.
+_REDISTRIBUTION_PATTERN = re.compile(
+    r"\b(DS_BCAST_INNER|DS_DIST_ALL_INNER|DS_DIST_INNER|DS_DIST_OUTER|DS_DIST_BOTH)\b"
+)
+
+_SORT_DETAILS = ("using filesort", "using temporary table")
+
+
+def get_node_label(node: PlanNode) -> str:
+    """
+    Get the one line label of a node, e.g. ``Seq Scan on album``.
+    """
+    label = node.node_type
+    if node.relation:
+        label = f"{label} on {node.relation}"
+    if node.index:
+        label = f"{label} using {node.index}"
+    return label
+
+
+def encode_plan_node(node: PlanNode) -> str:
+    """
+    Encode a single node in one line, e.g.
+    ``Seq Scan on album (cost=6.47 rows=347) [Filter: (id > 10)]``.
+    """
+    metrics = list()
+    if node.estimated_cost is not None:
+        metrics.append(f"cost={format_number(node.estimated_cost)}")
+    if node.estimated_rows is not None:
+        metrics.append(f"rows={format_number(node.estimated_rows)}")
+    if node.actual_rows is not None:
+        metrics.append(f"actual_rows={format_number(node.actual_rows)}")
+    if node.actual_time is not None:
+        metrics.append(f"time={node.actual_time:.1f}ms")
+    line = get_node_label(node)
+    if metrics:
+        line = f"{line} ({' '.join(metrics)})"
+    if node.details:
+        line = f"{line} [{'; '.join(node.details)}]"
+    return line
+
+
+def _get_inclusive(
+    node: PlanNode,
+    attr: str,
+) -> float:
+    """
+    Get the cost (or time) of the node including its children. Nodes without
+    the metric (e.g. MySQL nested loop) count as the sum of their children.
+    """
+    value = getattr(node, attr)
+    if value is not None:
+        return value
+    return sum(_get_inclusive(child, attr) for child in node.children)
+
+
+def _get_exclusive(
+    node: PlanNode,
+    attr: str,
+) -> float:
+    """
+    Get the cost (or time) spent in the node itself, excluding its children.
+    """
+    children = sum(_get_inclusive(child, attr) for child in node.children)
+    return max(_get_inclusive(node, attr) - children, 0)
+
+
+def find_expensive_nodes(
+    query_plan: QueryPlan,
+    top_n: int = 3,
+) -> list[str]:
+    """
+    Find the nodes with the highest exclusive cost, or the highest
+    exclusive actual time if the plan is analyzed. Nodes below 5% of the
+    total are not worth mentioning.
+    """
+    attr = "actual_time" if query_plan.analyzed else "estimated_cost"
+    total = getattr(query_plan.root, attr)
+    if not total:
+        return []
+    nodes = [
+        (_get_exclusive(node, attr), node)
+        for node in query_plan.walk()
+        if getattr(node, attr) is not None
+    ]
+    nodes.sort(key=lambda x: x[0], reverse=True)
+    lines = list()
+    for value, node in nodes[:top_n]:
+        if value / total < 0.05:
+            break
+        if query_plan.analyzed:
+            metric = f"{value:.1f}ms"
+        else:
+            metric = f"cost {format_number(value)}"
+        lines.append(
+            f"- Expensive: {get_node_label(node)}, {metric} "
+            f"({value / total:.0%} of total)"
+        )
+    return lines
+
+
+def find_full_scans(
+    query_plan: QueryPlan,
+    big_table_rows: int = 100_000,
+) -> list[str]:
+    """
+    Find full table scans on big tables, and suggest an index when the scan
+    has a filter. SQLite doesn't estimate rows, every full scan is reported.
+    """
+    lines = list()
+    for node in query_plan.walk():
+        if node.node_type not in FULL_SCAN_NODE_TYPES:
+            continue
+        rows = node.estimated_rows
+        if rows is not None and rows < big_table_rows:
+            continue
+        size = f" (~{format_number(rows)} rows)" if rows is not None else ""
+        filters = [
+            detail for detail in node.details if detail.startswith("Filter:")
+        ]
+        if filters:
+            lines.append(
+                f"- Missing index?: full scan on {node.relation}{size} "
+                f"with {filters[0]}, an index on the filtered columns may help"
+            )
+        else:
+            lines.append(f"- Full scan on {node.relation}{size}")
+    return lines
+
+
+def find_sorts(query_plan: QueryPlan) -> list[str]:
+    """
+    Find sorts and groupings that can't use an index (MySQL filesort,
+    SQLite temp B-tree).
+    """
+    lines = list()
+    for node in query_plan.walk():
+        if node.node_type.startswith("USE TEMP B-TREE") or any(
+            detail in _SORT_DETAILS for detail in node.details
+        ):
+            lines.append(
+                f"- Sort without index: {node.node_type}, an index matching "
+                f"the ORDER BY / GROUP BY columns may help"
+            )
+    return lines
+
+
+def find_redistributions(query_plan: QueryPlan) -> list[str]:
+    """
+    Find Redshift join steps that broadcast or redistribute data.
+    """
+    lines = list()
+    for node in query_plan.walk():
+        match = _REDISTRIBUTION_PATTERN.search(node.node_type)
+        if match is None:
+            continue
+        if match.group(1) == "DS_BCAST_INNER":
+            hint = (
+                "the inner table is broadcast to all compute nodes, "
+                "use DISTSTYLE ALL for small tables or a matching DISTKEY"
+            )
+        else:
+            hint = (
+                "rows are redistributed between compute nodes, "
+                "distribute both tables on the join column"
+            )
+        lines.append(f"- Redistribution: {node.node_type}, {hint}")
+    return lines
+
+
+def find_misestimates(
+    query_plan: QueryPlan,
+    ratio: float = 10.0,
+) -> list[str]:
+    """
+    Find nodes whose actual rows differ a lot from the estimate, a sign of
+    stale statistics. Only available for analyzed plans.
+    """
+    lines = list()
+    if query_plan.analyzed is False:
+        return lines
+    for node in query_plan.walk():
+        if node.estimated_rows is None or node.actual_rows is None:
+            continue
+        estimated = max(node.estimated_rows, 1)
+        actual = max(node.actual_rows, 1)
+        if max(estimated / actual, actual / estimated) >= ratio:
+            lines.append(
+                f"- Misestimate: {get_node_label(node)} estimated "
+                f"{format_number(node.estimated_rows)} rows, got "
+                f"{format_number(node.actual_rows)}, statistics may be stale"
+            )
+    return lines
+
+
+def find_missing_statistics(query_plan: QueryPlan) -> list[str]:
+    """
+    Find planner warnings about tables without statistics (Redshift).
+    """
+    lines = list()
+    for node in query_plan.walk():
+        for detail in node.details:
+            if "missing statistics" in detail:
+                lines.append(
+                    f"- Missing statistics: {detail.strip('- ')}, run ANALYZE"
+                )
+    return lines
+
+
+def find_hotspots(
+    query_plan: QueryPlan,
+    top_n: int = 3,
+    big_table_rows: int = 100_000,
+) -> list[str]:
+    """
+    Find everything worth fixing in the plan, one line per finding.
+
+    :param query_plan: the query plan.
+    :param top_n: number of most expensive nodes to report.
+    :param big_table_rows: full scans on tables with fewer estimated rows
+        are not reported.
+    """
+    lines = list()
+    lines.extend(find_expensive_nodes(query_plan, top_n=top_n))
+    lines.extend(find_full_scans(query_plan, big_table_rows=big_table_rows))
+    lines.extend(find_sorts(query_plan))
+    lines.extend(find_redistributions(query_plan))
+    lines.extend(find_misestimates(query_plan))
+    lines.extend(find_missing_statistics(query_plan))
+    return lines
+
+
+def encode_query_plan(
+    query_plan: QueryPlan,
+    top_n: int = 3,
+    big_table_rows: int = 100_000,
+    max_nodes: int = 50,
+) -> str:
+    """
+    Encode the query plan into a compact text summary.
+
+    **Sample Output:**
+
+    .. code-block:: markdown
+
+        # Query Plan
+        XN Hash Join DS_BCAST_INNER (cost=1.1M rows=347)
+          XN Seq Scan on album (cost=3.47 rows=347)
+          XN Hash (cost=2.75 rows=275)
+            XN Seq Scan on artist (cost=2.75 rows=275)
+
+        # Hotspots
+        - Expensive: XN Hash Join DS_BCAST_INNER, cost 1.1M (100% of total)
+        - Redistribution: XN Hash Join DS_BCAST_INNER, the inner table is broadcast ...
+
+    :param query_plan: the query plan.
+    :param top_n: number of most expensive nodes to report.
+    :param big_table_rows: full scans on tables with fewer estimated rows
+        are not reported.
+    :param max_nodes: maximum number of nodes in the plan tree, the rest
+        are omitted.
+    """
+    lines = ["# Query Plan"]
+    n_nodes = 0
+
+    def encode(node: PlanNode, depth: int):
+        nonlocal n_nodes
+        n_nodes += 1
+        if n_nodes <= max_nodes:
+            lines.append(f"{TAB * depth}{encode_plan_node(node)}")
+        for child in node.children:
+            encode(child, depth + 1)
+
+    encode(query_plan.root, 0)
+    if n_nodes > max_nodes:
+        lines.append(f"... ({n_nodes - max_nodes} more nodes)")
+
+    lines.append("")
+    lines.append("# Hotspots")
+    hotspots = find_hotspots(query_plan, top_n=top_n, big_table_rows=big_table_rows)
+    if hotspots:
+        lines.extend(hotspots)
+    else:
+        lines.append("No obvious hotspot found.")
+    return "\n".join(lines)
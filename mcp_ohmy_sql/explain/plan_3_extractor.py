@@ -0,0 +1,470 @@
+# -*- coding: utf-8 -*-
+
+"""
+Run EXPLAIN and parse the dialect specific output into a
+:class:`~mcp_ohmy_sql.explain.plan_1_model.QueryPlan`.
+
+Reference:
+
+- https://www.postgresql.org/docs/current/sql-explain.html
+- https://docs.aws.amazon.com/redshift/latest/dg/r_EXPLAIN.html
+- https://dev.mysql.com/doc/refman/8.0/en/explain-output.html
+- https://www.sqlite.org/eqp.html
+"""
+
+import typing as T
+import re
+import json
+
+from ..lazy_import import sa, redshift_connector
+from ..constants import DbTypeEnum
+from ..aws.aws_redshift.api import Session, T_CONN_OR_ENGINE
+
+from .plan_1_model import PlanNode, QueryPlan
+
+try:
+    from rich import print as rprint
+except ImportError:  # pragma: no cover
+    pass
+
+
+def strip_sql(sql: str) -> str:
+    """
+    Strip whitespaces and the trailing semicolon, so the SQL can be embedded
+    in another statement.
+    """
+    sql = sql.strip()
+    while sql.endswith(";"):
+        sql = sql[:-1].strip()
+    return sql
+
+
+def get_explain_sql(
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+    analyze: bool = False,
+) -> str:
+    """
+    Get the dialect specific EXPLAIN statement of a SELECT statement.
+
+    :param sql: the SELECT statement.
+    :param db_type: :class:`~mcp_ohmy_sql.constants.DbTypeEnum` of the target database.
+    :param analyze: actually run the query and collect run time statistics.
+        Only supported by PostgreSQL, ignored for other databases.
+
+    :raises NotImplementedError: if the database doesn't support EXPLAIN.
+    """
+    sql = strip_sql(sql)
+    db_type = DbTypeEnum.ensure_str(db_type)
+    if db_type == DbTypeEnum.POSTGRESQL.value:
+        if analyze:
+            return f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"
+        else:
+            return f"EXPLAIN (FORMAT JSON) {sql}"
+    elif db_type == DbTypeEnum.AWS_REDSHIFT.value:
+        return f"EXPLAIN {sql}"
+    elif db_type == DbTypeEnum.MYSQL.value:
+        return f"EXPLAIN FORMAT=JSON {sql}"
+    elif db_type == DbTypeEnum.SQLITE.value:
+        return f"EXPLAIN QUERY PLAN {sql}"
+    else:
+        raise NotImplementedError(f"EXPLAIN is not supported for {db_type}")
+
+
+# ------------------------------------------------------------------------------
+# PostgreSQL
+# ------------------------------------------------------------------------------
+_POSTGRES_DETAIL_KEYS = [
+    "Filter",
+    "Index Cond",
+    "Recheck Cond",
+    "Hash Cond",
+    "Merge Cond",
+    "Join Filter",
+    "Sort Key",
+    "Group Key",
+    "Rows Removed by Filter",
+]
+
+
+def _parse_postgres_node(plan: dict[str, T.Any]) -> PlanNode:
+    details = list()
+    for key in _POSTGRES_DETAIL_KEYS:
+        if key in plan:
+            value = plan[key]
+            if isinstance(value, list):
+                value = ", ".join(str(v) for v in value)
+            details.append(f"{key}: {value}")
+    if "Shared Hit Blocks" in plan:
+        details.append(
+            f"Buffers: shared hit={plan['Shared Hit Blocks']} "
+            f"read={plan.get('Shared Read Blocks', 0)}"
+        )
+
+    # Plan Rows and Actual Rows are per loop, scale both to the total
+    loops = plan.get("Actual Loops", 1) or 1
+    estimated_rows = plan.get("Plan Rows")
+    if estimated_rows is not None:
+        estimated_rows = estimated_rows * loops
+    actual_rows = plan.get("Actual Rows")
+    if actual_rows is not None:
+        actual_rows = actual_rows * loops
+    actual_time = plan.get("Actual Total Time")
+    if actual_time is not None:
+        actual_time = actual_time * loops
+
+    node = PlanNode(
+        node_type=plan["Node Type"],
+        relation=plan.get("Relation Name") or plan.get("CTE Name"),
+        index=plan.get("Index Name"),
+        estimated_rows=estimated_rows,
+        estimated_cost=plan.get("Total Cost"),
+        actual_rows=actual_rows,
+        actual_time=actual_time,
+        details=details,
+        children=[_parse_postgres_node(child) for child in plan.get("Plans", [])],
+    )
+    return node
+
+
+def parse_postgres_plan(data: T.Union[str, list, dict]) -> PlanNode:
+    """
+    Parse the output of PostgreSQL ``EXPLAIN (FORMAT JSON)``.
+    """
+    if isinstance(data, str):
+        data = json.loads(data)
+    if isinstance(data, list):
+        data = data[0]
+    return _parse_postgres_node(data["Plan"])
+
+
+# ------------------------------------------------------------------------------
+# AWS Redshift (and PostgreSQL text format)
+# ------------------------------------------------------------------------------
+_TEXT_NODE_PATTERN = re.compile(
+    r"^(?P<indent>\s*(?:->\s+)?)(?P<label>\S.*?)\s+"
+    r"\(cost=(?P<startup_cost>[\d.]+)\.\.(?P<total_cost>[\d.]+)\s+"
+    r"rows=(?P<rows>\d+)\s+width=\d+\)"
+    r"(?:\s+\(actual time=[\d.]+\.\.(?P<actual_time>[\d.]+)\s+"
+    r"rows=(?P<actual_rows>\d+)\s+loops=(?P<loops>\d+)\))?"
+)
+
+_TEXT_LABEL_PATTERN = re.compile(
+    r"^(?P<node_type>.+?)(?: using (?P<index>\S+))? on (?P<relation>\S+)"
+)
+
+
+def _new_text_node(match: re.Match) -> PlanNode:
+    label = match.group("label")
+    label_match = _TEXT_LABEL_PATTERN.match(label)
+    if label_match:
+        node_type = label_match.group("node_type")
+        relation = label_match.group("relation")
+        index = label_match.group("index")
+    else:
+        node_type = label
+        relation = None
+        index = None
+    actual_rows = None
+    actual_time = None
+    if match.group("actual_rows") is not None:
+        loops = int(match.group("loops"))
+        actual_rows = float(match.group("actual_rows")) * loops
+        actual_time = float(match.group("actual_time")) * loops
+    return PlanNode(
+        node_type=node_type,
+        relation=relation,
+        index=index,
+        estimated_rows=float(match.group("rows")),
+        estimated_cost=float(match.group("total_cost")),
+        actual_rows=actual_rows,
+        actual_time=actual_time,
+    )
+
+
+def parse_text_plan(lines: list[str]) -> PlanNode:
+    """
+    Parse the indented text EXPLAIN output of AWS Redshift (and PostgreSQL
+    ``FORMAT TEXT``). Lines without cost information, e.g. join conditions,
+    filters, are attached to the closest node above as details. Plan wide
+    notes are attached to the root node.
+    """
+    root: T.Optional[PlanNode] = None
+    stack: list[tuple[int, PlanNode]] = list()
+    pending_details: list[str] = list()
+    for line in lines:
+        if not line.strip():
+            continue
+        match = _TEXT_NODE_PATTERN.match(line)
+        if match is None:
+            # plan wide notes, e.g. "----- Tables missing statistics: t -----"
+            if line.strip().startswith("-----"):
+                pending_details.append(line.strip())
+            elif stack:
+                stack[-1][1].details.append(line.strip())
+            else:
+                pending_details.append(line.strip())
+            continue
+        indent = len(match.group("indent"))
+        node = _new_text_node(match)
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        if stack:
+            stack[-1][1].children.append(node)
+        elif root is None:
+            root = node
+        else:  # pragma: no cover
+            root.children.append(node)
+        stack.append((indent, node))
+    if root is None:
+        root = PlanNode(node_type="Query")
+    root.details.extend(pending_details)
+    return root
+
+
+# ------------------------------------------------------------------------------
+# MySQL
+# ------------------------------------------------------------------------------
+MYSQL_ACCESS_TYPE_TO_NODE_TYPE_MAPPING = {
+    "ALL": "Table Scan",
+    "index": "Full Index Scan",
+    "range": "Index Range Scan",
+    "ref": "Index Lookup",
+    "ref_or_null": "Index Lookup",
+    "eq_ref": "Unique Index Lookup",
+    "const": "Const Lookup",
+    "system": "Const Lookup",
+}
+
+
+def _to_float(value: T.Any) -> T.Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):  # pragma: no cover
+        return None
+
+
+def _get_mysql_table_cost(cost_info: dict[str, T.Any]) -> T.Optional[float]:
+    # prefix_cost is cumulative over the join order, read_cost + eval_cost
+    # is the cost of accessing this table alone
+    read_cost = _to_float(cost_info.get("read_cost"))
+    eval_cost = _to_float(cost_info.get("eval_cost"))
+    if read_cost is None and eval_cost is None:
+        return None
+    return (read_cost or 0) + (eval_cost or 0)
+
+
+def _parse_mysql_table(table: dict[str, T.Any]) -> PlanNode:
+    access_type = table.get("access_type", "")
+    details = list()
+    if table.get("possible_keys"):
+        details.append(f"possible keys: {', '.join(table['possible_keys'])}")
+    if table.get("attached_condition"):
+        details.append(f"Filter: {table['attached_condition']}")
+    node = PlanNode(
+        node_type=MYSQL_ACCESS_TYPE_TO_NODE_TYPE_MAPPING.get(
+            access_type, access_type or "Table Access"
+        ),
+        relation=table.get("table_name"),
+        index=table.get("key"),
+        estimated_rows=_to_float(table.get("rows_examined_per_scan")),
+        estimated_cost=_get_mysql_table_cost(table.get("cost_info", {})),
+        details=details,
+    )
+    subquery = table.get("materialized_from_subquery")
+    if subquery:
+        _parse_mysql_block(subquery.get("query_block", {}), node)
+    return node
+
+
+def _parse_mysql_block(block: dict[str, T.Any], parent: PlanNode):
+    for key, value in block.items():
+        if key == "table":
+            parent.children.append(_parse_mysql_table(value))
+        elif key == "nested_loop":
+            node = PlanNode(node_type="Nested Loop")
+            for item in value:
+                _parse_mysql_block(item, node)
+            parent.children.append(node)
+        elif key == "query_block":
+            _parse_mysql_block(value, parent)
+        elif key == "union_result":
+            node = PlanNode(node_type="Union")
+            for spec in value.get("query_specifications", []):
+                _parse_mysql_block(spec, node)
+            parent.children.append(node)
+        elif isinstance(value, dict) and key.endswith("_operation"):
+            node = PlanNode(node_type=key.replace("_", " ").title())
+            if value.get("using_filesort"):
+                node.details.append("using filesort")
+            if value.get("using_temporary_table"):
+                node.details.append("using temporary table")
+            _parse_mysql_block(value, node)
+            parent.children.append(node)
+        elif isinstance(value, list) and key.endswith("subqueries"):
+            for item in value:
+                _parse_mysql_block(item, parent)
+
+
+def parse_mysql_plan(data: T.Union[str, dict]) -> PlanNode:
+    """
+    Parse the output of MySQL ``EXPLAIN FORMAT=JSON``.
+    """
+    if isinstance(data, str):
+        data = json.loads(data)
+    query_block = data["query_block"]
+    root = PlanNode(
+        node_type="Query",
+        estimated_cost=_to_float(query_block.get("cost_info", {}).get("query_cost")),
+    )
+    _parse_mysql_block(query_block, root)
+    # rows produced by the query is roughly the product of the rows produced
+    # per join of all joined tables
+    estimated_rows = None
+    for node in root.walk():
+        if node.relation is not None and node.estimated_rows is not None:
+            estimated_rows = (estimated_rows or 1) * node.estimated_rows
+    root.estimated_rows = estimated_rows
+    return root
+
+
+# ------------------------------------------------------------------------------
+# SQLite
+# ------------------------------------------------------------------------------
+_SQLITE_DETAIL_PATTERN = re.compile(
+    r"^(?P<op>SCAN|SEARCH)(?: TABLE)? (?P<relation>\S+)"
+    r"(?: AS \S+)?"
+    r"(?: USING (?:COVERING |INTEGER PRIMARY KEY)?(?:INDEX (?P<index>\S+))?)?"
+)
+
+
+def _new_sqlite_node(detail: str) -> PlanNode:
+    match = _SQLITE_DETAIL_PATTERN.match(detail)
+    if match is None or match.group("relation") == "CONSTANT":
+        return PlanNode(node_type=detail)
+    op = match.group("op")
+    uses_index = " USING " in detail
+    if op == "SEARCH":
+        node_type = "Index Search"
+    elif uses_index:
+        node_type = "Index Scan"
+    else:
+        node_type = "Table Scan"
+    return PlanNode(
+        node_type=node_type,
+        relation=match.group("relation"),
+        index=match.group("index"),
+        details=[detail],
+    )
+
+
+def parse_sqlite_plan(rows: list[tuple]) -> PlanNode:
+    """
+    Parse the output of SQLite ``EXPLAIN QUERY PLAN``, a list of
+    ``(id, parent, notused, detail)`` rows. SQLite doesn't expose row or cost
+    estimates, only the access path of each step.
+    """
+    root = PlanNode(node_type="Query")
+    nodes: dict[int, PlanNode] = {0: root}
+    for row in rows:
+        id_, parent, detail = row[0], row[1], row[3]
+        node = _new_sqlite_node(detail)
+        nodes.get(parent, root).children.append(node)
+        nodes[id_] = node
+    return root
+
+
+# ------------------------------------------------------------------------------
+# Run EXPLAIN
+# ------------------------------------------------------------------------------
+def _fetch_explain_rows(
+    conn_or_engine: T_CONN_OR_ENGINE,
+    explain_sql: str,
+    params: T.Optional[dict[str, T.Any]] = None,
+    timeout: T.Optional[float] = None,
+) -> list[tuple]:
+    if isinstance(conn_or_engine, redshift_connector.Connection):
+        with Session(conn_or_engine) as cursor:
+            cursor.execute(explain_sql, params)
+            return [tuple(row) for row in cursor.fetchall()]
+    elif isinstance(conn_or_engine, sa.Engine):
+        # the transaction is rolled back when the connection is closed,
+        # so SET LOCAL doesn't leak to other queries
+        with conn_or_engine.connect() as conn:
+            if timeout is not None and conn.dialect.name == "postgresql":
+                conn.execute(
+                    sa.text(f"SET LOCAL statement_timeout = {int(timeout * 1000)}")
+                )
+            rows = conn.execute(sa.text(explain_sql), params).fetchall()
+            return [tuple(row) for row in rows]
+    elif isinstance(conn_or_engine, sa.Connection):
+        # an open connection, e.g. the snapshot of a batch, its transaction
+        # is not ours, so the timeout is not set on it
+        rows = conn_or_engine.execute(sa.text(explain_sql), params).fetchall()
+        return [tuple(row) for row in rows]
+    else:  # pragma: no cover
+        raise TypeError(
+            "conn_or_engine must be a redshift_connector.Connection, "
+            "a sqlalchemy.Engine or a sqlalchemy.Connection"
+        )
+
+
+def parse_explain_rows(
+    rows: list[tuple],
+    db_type: T.Union[str, DbTypeEnum],
+    analyzed: bool = False,
+) -> QueryPlan:
+    """
+    Parse the raw rows returned by the EXPLAIN statement.
+    """
+    db_type = DbTypeEnum.get_by_value(DbTypeEnum.ensure_str(db_type))
+    if db_type is DbTypeEnum.POSTGRESQL:
+        root = parse_postgres_plan(rows[0][0])
+    elif db_type is DbTypeEnum.AWS_REDSHIFT:
+        root = parse_text_plan([row[0] for row in rows])
+    elif db_type is DbTypeEnum.MYSQL:
+        root = parse_mysql_plan(rows[0][0])
+    elif db_type is DbTypeEnum.SQLITE:
+        root = parse_sqlite_plan(rows)
+    else:  # pragma: no cover
+        raise NotImplementedError(f"EXPLAIN is not supported for {db_type}")
+    return QueryPlan(db_type=db_type, root=root, analyzed=analyzed)
+
+
+def explain_query(
+    conn_or_engine: T_CONN_OR_ENGINE,
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+    params: T.Optional[dict[str, T.Any]] = None,
+    analyze: bool = False,
+    timeout: T.Optional[float] = None,
+) -> QueryPlan:
+    """
+    Run EXPLAIN on a SELECT statement and parse the plan.
+
+    :param conn_or_engine: Redshift connection or SQLAlchemy engine.
+    :param sql: the SELECT statement.
+    :param db_type: :class:`~mcp_ohmy_sql.constants.DbTypeEnum` of the target database.
+    :param params: optional bind parameters of the SELECT statement.
+    :param analyze: actually run the query to collect run time statistics,
+        only supported by PostgreSQL, ignored for other databases.
+    :param timeout: maximum seconds of ``EXPLAIN ANALYZE`` (PostgreSQL
+        ``statement_timeout``).
+
+    :raises NotImplementedError: if the database doesn't support EXPLAIN.
+    """
+    analyze = analyze and (
+        DbTypeEnum.ensure_str(db_type) == DbTypeEnum.POSTGRESQL.value
+    )
+    explain_sql = get_explain_sql(sql, db_type, analyze=analyze)
+    rows = _fetch_explain_rows(
+        conn_or_engine,
+        explain_sql,
+        params,
+        timeout=timeout if analyze else None,
+    )
+    query_plan = parse_explain_rows(rows, db_type, analyzed=analyze)
+    # rprint(query_plan.model_dump())  # for debug only
+    return query_plan
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+"""
+Pre-flight cost guard.
+
+Before a SELECT statement runs, compare the planner's estimates (and
+optionally an exact row count) with the configured thresholds, so an agent
+cannot launch a multi-minute scan by accident.
+"""
+
+import typing as T
+import json
+import threading
+from collections import OrderedDict
+
+from pydantic import BaseModel, Field
+
+from .plan_1_model import QueryPlan
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from ..config.api import PreflightSettings
+
+
+class PlanCache:
+    """
+    Thread-safe LRU cache of :class:`~mcp_ohmy_sql.explain.plan_1_model.QueryPlan`.
+
+    Agents tend to send the same query again and again, and EXPLAIN is a
+    round trip to the database, so plans are cached per normalized query.
+
+    :param max_size: maximum number of cached plans, 0 disables the cache.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._data: OrderedDict[tuple, QueryPlan] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @staticmethod
+    def make_key(
+        database_identifier: str,
+        normalized_sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+    ) -> tuple[str, str, str]:
+        """
+        Create the cache key of a query.
+        """
+        params_key = json.dumps(params or {}, sort_keys=True, default=str)
+        return (database_identifier, normalized_sql, params_key)
+
+    def get(self, key: tuple) -> T.Optional[QueryPlan]:
+        with self._lock:
+            plan = self._data.get(key)
+            if plan is not None:
+                self._data.move_to_end(key)
+            return plan
+
+    def set(self, key: tuple, plan: QueryPlan):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = plan
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def format_number(value: float) -> str:
+    """
+    Format a big number in a compact, human-readable way.
+    """
+    for threshold, suffix in [(1e9, "B"), (1e6, "M"), (1e3, "K")]:
+        if abs(value) >= threshold:
+            return f"{value / threshold:.1f}{suffix}"
+    return f"{value:g}"
+
+
+class PreflightResult(BaseModel):
+    """
+    The outcome of the pre-flight check of a query.
+
+    :param passed: whether the query is within all thresholds.
+    :param estimated_cost: planner's estimated cost of the query.
+    :param estimated_rows: planner's estimated rows of the biggest plan step,
+        see :attr:`~mcp_ohmy_sql.explain.plan_1_model.QueryPlan.max_processed_rows`.
+    :param exact_count: exact number of rows returned by the query, only
+        available if ``exact_count`` is enabled.
+    :param reasons: why the query failed the check.
+    """
+
+    passed: bool = Field(default=True)
+    estimated_cost: T.Optional[float] = Field(default=None)
+    estimated_rows: T.Optional[float] = Field(default=None)
+    exact_count: T.Optional[int] = Field(default=None)
+    reasons: list[str] = Field(default_factory=list)
+
+    @property
+    def message(self) -> str:
+        """
+        Explain to the model why the query failed the check, and what to do.
+        """
+        return (
+            "; ".join(self.reasons)
+            + ". Add a more selective WHERE clause, aggregate the data, "
+            "or query a smaller range."
+        )
+
+
+def check_query_plan(
+    query_plan: T.Optional[QueryPlan],
+    preflight_settings: "PreflightSettings",
+    exact_count: T.Optional[int] = None,
+) -> PreflightResult:
+    """
+    Compare the query plan and the exact count with the thresholds.
+
+    :param query_plan: the query plan, None if the database doesn't support EXPLAIN.
+    :param preflight_settings: the thresholds.
+    :param exact_count: exact number of rows returned by the query, if known.
+    """
+    result = PreflightResult(exact_count=exact_count)
+    if query_plan is not None:
+        result.estimated_cost = query_plan.estimated_cost
+        result.estimated_rows = query_plan.max_processed_rows
+
+    max_cost = preflight_settings.max_estimated_cost
+    if (
+        max_cost is not None
+        and result.estimated_cost is not None
+        and result.estimated_cost > max_cost
+    ):
+        result.reasons.append(
+            f"estimated cost {format_number(result.estimated_cost)} "
+            f"exceeds the limit of {format_number(max_cost)}"
+        )
+
+    max_rows = preflight_settings.max_estimated_rows
+    if max_rows is not None:
+        if result.estimated_rows is not None and result.estimated_rows > max_rows:
+            result.reasons.append(
+                f"estimated {format_number(result.estimated_rows)} rows to scan "
+                f"exceeds the limit of {format_number(max_rows)}"
+            )
+        if exact_count is not None and exact_count > max_rows:
+            result.reasons.append(
+                f"the query matches {format_number(exact_count)} rows, "
+                f"more than the limit of {format_number(max_rows)}"
+            )
+
+    result.passed = len(result.reasons) == 0
+    return result
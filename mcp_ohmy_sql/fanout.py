@@ -0,0 +1,457 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fan-out queries over identical databases (shards, tenants, regions).
+
+The same SELECT runs on every shard, the partial results are merged the way
+a single database would have computed them:
+
+- ``ORDER BY``: each shard returns its rows sorted, a streaming k-way merge
+  (:func:`heapq.merge`) produces the global order.
+- ``GROUP BY`` with ``COUNT`` / ``SUM`` / ``MIN`` / ``MAX``: each shard
+  returns partial aggregates, they are re-aggregated by group key.
+- ``LIMIT`` / ``OFFSET``: applied to the merged stream. Each shard only needs
+  its first ``offset + limit`` sorted rows, so the limit is pushed down,
+  except for aggregates, where a group can be spread across shards.
+
+Queries we can't merge correctly (``AVG``, ``COUNT(DISTINCT ...)``,
+``HAVING``, window functions, ...) are rejected with the reason, instead of
+returning a silently wrong result.
+
+Usage:
+
+>>> plan = new_merge_plan("SELECT g, COUNT(*) AS n FROM t GROUP BY g", "sqlite")
+>>> rows = list(merge_rows(plan, columns, [rows_of_shard_1, rows_of_shard_2]))
+"""
+
+import typing as T
+import heapq
+import itertools
+import dataclasses
+
+from sqlglot import exp
+
+from .constants import DbTypeEnum
+from .rewrite.dialect import get_sqlglot_dialect
+from .rewrite.parser import parse_sql, generate_sql
+from .rewrite.limit import get_row_limit
+from .result.markdown import render_markdown_table
+
+#: the function that combines the partial aggregates of two shards
+MERGE_FUNCTIONS: dict[str, T.Callable[[T.Any, T.Any], T.Any]] = {
+    "sum": lambda a, b: b if a is None else (a if b is None else a + b),
+    "min": lambda a, b: b if a is None else (a if b is None else min(a, b)),
+    "max": lambda a, b: b if a is None else (a if b is None else max(a, b)),
+}
+
+
+@dataclasses.dataclass
+class OrderKey:
+    """
+    A sort key of the merged result.
+
+    :param column: the position of the column in the select list, or its
+        output name when the select list has a ``*``.
+    :param desc: descending order.
+    :param nulls_first: NULLs sort before the other values, sqlglot fills
+        in the dialect's default when the query doesn't say.
+    """
+
+    column: T.Union[int, str]
+    desc: bool = False
+    nulls_first: bool = False
+
+
+@dataclasses.dataclass
+class MergePlan:
+    """
+    How to run a query on every shard and merge the partial results.
+
+    :param shard_sql: the query run on each shard.
+    :param order_by: the sort keys of the merged result.
+    :param group_by: positions of the group key columns, None if the query
+        is not re-aggregated, an empty list for a global aggregate
+        (e.g. ``SELECT COUNT(*) FROM t``).
+    :param aggregates: position of each aggregate column to its merge
+        function, see :data:`MERGE_FUNCTIONS`.
+    :param distinct: remove the duplicate rows of the merged result.
+    :param limit: the limit of the merged result, None means no limit.
+    :param offset: the number of merged rows to skip.
+    """
+
+    shard_sql: str
+    order_by: list[OrderKey] = dataclasses.field(default_factory=list)
+    group_by: T.Optional[list[int]] = None
+    aggregates: dict[int, str] = dataclasses.field(default_factory=dict)
+    distinct: bool = False
+    limit: T.Optional[int] = None
+    offset: int = 0
+
+    @property
+    def is_aggregate(self) -> bool:
+        return self.group_by is not None
+
+
+def _get_literal_int(node: T.Optional[exp.Expression]) -> T.Optional[int]:
+    if isinstance(node, exp.Literal) and node.is_int:
+        return int(node.name)
+    return None
+
+
+def _find_projection(
+    node: exp.Expression,
+    projections: list[exp.Expression],
+) -> T.Optional[int]:
+    """
+    Find the select list item an ORDER BY / GROUP BY expression refers to,
+    by position (``ORDER BY 1``), by alias, or by the same expression.
+    """
+    position = _get_literal_int(node)
+    if position is not None:
+        if 1 <= position <= len(projections):
+            return position - 1
+        return None
+    if isinstance(node, exp.Column) and not node.table:
+        for ith, projection in enumerate(projections):
+            if isinstance(projection, exp.Alias) and (
+                projection.alias.lower() == node.name.lower()
+            ):
+                return ith
+    sql = node.sql()
+    for ith, projection in enumerate(projections):
+        if projection.unalias().sql() == sql:
+            return ith
+    return None
+
+
+def _get_merge_function(node: exp.Expression) -> T.Optional[str]:
+    """
+    :returns: the merge function of a mergeable aggregate, None if the
+        expression is not an aggregate.
+
+    :raises ValueError: if the expression aggregates but can't be merged.
+    """
+    if isinstance(node, (exp.Count, exp.Sum, exp.Min, exp.Max)):
+        if isinstance(node.this, exp.Distinct):
+            raise ValueError(
+                f"{node.sql()} can't be merged across databases, "
+                f"select the distinct values and count them instead"
+            )
+        if isinstance(node, (exp.Count, exp.Sum)):
+            return "sum"
+        return "min" if isinstance(node, exp.Min) else "max"
+    if isinstance(node, exp.Avg):
+        arg = node.this.sql()
+        raise ValueError(
+            f"{node.sql()} can't be merged across databases, "
+            f"select SUM({arg}) and COUNT({arg}) instead"
+        )
+    if node.find(exp.AggFunc) is not None:
+        raise ValueError(
+            f"{node.sql()} can't be merged across databases, only plain "
+            f"COUNT, SUM, MIN and MAX can be merged"
+        )
+    return None
+
+
+def new_merge_plan(
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+    named_params: bool = True,
+) -> MergePlan:
+    """
+    Analyze a SELECT statement and plan how to merge its results across
+    shards.
+
+    :param sql: the SELECT statement.
+    :param db_type: :class:`~mcp_ohmy_sql.constants.DbTypeEnum` of the shards.
+    :param named_params: see :func:`~mcp_ohmy_sql.rewrite.parser.generate_sql`.
+
+    :raises ValueError: if the query can't be parsed, or its partial results
+        can't be merged correctly.
+    """
+    dialect = get_sqlglot_dialect(db_type)
+    ast = parse_sql(sql, dialect)
+    if not isinstance(ast, exp.Query):
+        raise ValueError("The query can't be parsed as a single SELECT statement")
+    if not isinstance(ast, exp.Select):
+        # the rows of a UNION can only be concatenated
+        if not isinstance(ast, exp.Union) or any(
+            ast.args.get(key) for key in ["order", "limit", "offset"]
+        ):
+            raise ValueError(
+                "Only a plain UNION / UNION ALL set operation, without "
+                "ORDER BY / LIMIT, can be merged across databases"
+            )
+        return MergePlan(shard_sql=sql, distinct=bool(ast.args.get("distinct")))
+
+    projections = list(ast.expressions)
+    for projection in projections:
+        if projection.find(exp.Window) is not None:
+            raise ValueError(
+                f"Window function {projection.sql()} can't be merged across databases"
+            )
+    if ast.args.get("having") is not None:
+        raise ValueError(
+            "HAVING filters the partial aggregates of each database, "
+            "it can't be merged across databases"
+        )
+    distinct = ast.args.get("distinct")
+    if distinct is not None and distinct.args.get("on") is not None:
+        raise ValueError("DISTINCT ON can't be merged across databases")
+    has_star = any(projection.is_star for projection in projections)
+
+    # order by
+    order_by = list()
+    order = ast.args.get("order")
+    for ordered in order.expressions if order else []:
+        node = ordered.this
+        column = None if has_star else _find_projection(node, projections)
+        if column is None:
+            if has_star and isinstance(node, exp.Column):
+                column = node.name
+            else:
+                raise ValueError(
+                    f"ORDER BY {node.sql()} must be in the select list to merge "
+                    f"the results across databases"
+                )
+        order_by.append(
+            OrderKey(
+                column=column,
+                desc=bool(ordered.args.get("desc")),
+                nulls_first=bool(ordered.args.get("nulls_first")),
+            )
+        )
+
+    # limit and offset
+    limit = get_row_limit(ast)
+    offset = _get_literal_int(
+        ast.args["offset"].expression if ast.args.get("offset") else None
+    )
+    if limit == -1 or (ast.args.get("offset") and offset is None):
+        raise ValueError("LIMIT and OFFSET must be integer literals")
+    offset = offset or 0
+
+    # group by and aggregates
+    group = ast.args.get("group")
+    aggregates = dict()
+    group_by = None
+    if group is not None or any(
+        projection.find(exp.AggFunc) is not None for projection in projections
+    ):
+        if has_star:
+            raise ValueError("SELECT * can't be used with GROUP BY across databases")
+        group_by = list()
+        group_positions = set()
+        for node in group.expressions if group else []:
+            position = _find_projection(node, projections)
+            if position is None:
+                raise ValueError(
+                    f"GROUP BY {node.sql()} must be in the select list to merge "
+                    f"the results across databases"
+                )
+            group_positions.add(position)
+        for ith, projection in enumerate(projections):
+            node = projection.unalias()
+            func = _get_merge_function(node)
+            if func is not None:
+                aggregates[ith] = func
+            elif ith in group_positions or node.find(exp.Column) is None:
+                group_by.append(ith)
+            else:
+                raise ValueError(
+                    f"{node.sql()} must be in GROUP BY or be an aggregate "
+                    f"(COUNT, SUM, MIN, MAX)"
+                )
+
+    # a group can be spread across shards, each shard must return all its
+    # groups, the order and the limit are applied after the re-aggregation
+    for key in ["order", "offset"]:
+        ast.set(key, None)
+    if group_by is not None or limit is None:
+        ast.set("limit", None)
+    elif offset:
+        ast.limit(limit + offset, copy=False)
+    if order_by and group_by is None:
+        ast.set("order", order)
+
+    return MergePlan(
+        shard_sql=generate_sql(ast, dialect, named_params=named_params),
+        order_by=order_by,
+        group_by=group_by,
+        aggregates=aggregates,
+        distinct=distinct is not None,
+        limit=limit,
+        offset=offset,
+    )
+
+
+def resolve_column(
+    column: T.Union[int, str],
+    columns: T.Sequence[str],
+) -> int:
+    """
+    Resolve an :class:`OrderKey` column to its position in the result.
+
+    :raises ValueError: if the column is not in the result.
+    """
+    if isinstance(column, int):
+        return column
+    names = [name.lower() for name in columns]
+    try:
+        return names.index(column.lower())
+    except ValueError:
+        raise ValueError(f"ORDER BY column {column!r} is not in the result")
+
+
+class SortKey:
+    """
+    Sort key of a row, honoring the direction and the NULL ordering of
+    each :class:`OrderKey`.
+    """
+
+    __slots__ = ("values", "directions")
+
+    def __init__(
+        self,
+        values: tuple,
+        directions: tuple[tuple[bool, bool], ...],
+    ):
+        self.values = values
+        self.directions = directions
+
+    def __lt__(self, other: "SortKey") -> bool:
+        for a, b, (desc, nulls_first) in zip(
+            self.values, other.values, self.directions
+        ):
+            if a is None and b is None:
+                continue
+            if a is None:
+                return nulls_first
+            if b is None:
+                return not nulls_first
+            if a == b:
+                continue
+            return a > b if desc else a < b
+        return False
+
+
+def new_sort_key(
+    order_by: list[OrderKey],
+    columns: T.Sequence[str],
+) -> T.Callable[[tuple], SortKey]:
+    """
+    Create the sort key function of the merged rows.
+    """
+    positions = [resolve_column(key.column, columns) for key in order_by]
+    directions = tuple((key.desc, key.nulls_first) for key in order_by)
+
+    def get_key(row: tuple) -> SortKey:
+        return SortKey(tuple(row[i] for i in positions), directions)
+
+    return get_key
+
+
+def reaggregate(
+    rows: T.Iterable[tuple],
+    group_by: list[int],
+    aggregates: dict[int, str],
+) -> list[tuple]:
+    """
+    Combine the partial aggregates of the rows that have the same group key,
+    in the order the groups are first seen.
+    """
+    groups: dict[tuple, list] = dict()
+    for row in rows:
+        key = tuple(row[i] for i in group_by)
+        merged = groups.get(key)
+        if merged is None:
+            groups[key] = list(row)
+            continue
+        for ith, func in aggregates.items():
+            merged[ith] = MERGE_FUNCTIONS[func](merged[ith], row[ith])
+    return [tuple(row) for row in groups.values()]
+
+
+def _unique(rows: T.Iterable[tuple]) -> T.Iterator[tuple]:
+    seen = set()
+    for row in rows:
+        if row not in seen:
+            seen.add(row)
+            yield row
+
+
+def merge_rows(
+    plan: MergePlan,
+    columns: T.Sequence[str],
+    shards: list[T.Iterable[tuple]],
+) -> T.Iterator[tuple]:
+    """
+    Merge the rows of every shard into the result of the query.
+
+    Sorted shards are merged lazily, take the first rows from the returned
+    iterator to avoid materializing the full result. Values are compared
+    in Python, the order may differ from a database that uses a case
+    insensitive collation.
+
+    :param plan: see :func:`new_merge_plan`.
+    :param columns: the column names of the result.
+    :param shards: the rows of each shard, sorted by the shard as the plan
+        asks for.
+    """
+    if plan.is_aggregate:
+        rows = reaggregate(
+            itertools.chain.from_iterable(shards),
+            group_by=plan.group_by,
+            aggregates=plan.aggregates,
+        )
+        if plan.order_by:
+            rows.sort(key=new_sort_key(plan.order_by, columns))
+        stream = iter(rows)
+    elif plan.order_by:
+        stream = heapq.merge(*shards, key=new_sort_key(plan.order_by, columns))
+    else:
+        stream = itertools.chain.from_iterable(shards)
+    if plan.distinct:
+        stream = _unique(stream)
+    stop = None if plan.limit is None else plan.offset + plan.limit
+    return itertools.islice(stream, plan.offset, stop)
+
+
+@dataclasses.dataclass
+class ShardResult:
+    """
+    The partial result of one shard.
+
+    :param database_identifier: the shard.
+    :param duration: number of seconds spent waiting for and running the query.
+    :param columns: the column names.
+    :param rows: the rows, None if the query failed.
+    :param error: the error message if the query failed.
+    """
+
+    database_identifier: str
+    duration: float = 0.0
+    columns: list[str] = dataclasses.field(default_factory=list)
+    rows: T.Optional[T.Sequence[tuple]] = None
+    error: T.Optional[str] = None
+
+    @property
+    def n_rows(self) -> int:
+        return 0 if self.rows is None else len(self.rows)
+
+
+def render_shard_report(shards: list[ShardResult]) -> str:
+    """
+    Render the rows, timing and error of each shard as a Markdown table.
+    """
+    rows = [
+        (
+            shard.database_identifier,
+            "" if shard.error else shard.n_rows,
+            f"{shard.duration:.3f}",
+            shard.error or "",
+        )
+        for shard in shards
+    ]
+    return render_markdown_table(["database", "rows", "seconds", "error"], rows)
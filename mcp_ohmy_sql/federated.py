@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+
+"""
+Federated queries, joins across databases through the local DuckDB engine.
+
+The query is written in DuckDB SQL and references the source tables as
+``"<database_identifier>".schema.table`` (or ``"<database_identifier>".table``
+for the default schema). Each source table becomes one SELECT run on its own
+database, with:
+
+- projection push-down: only the columns the query uses are fetched.
+- filter push-down: the ``WHERE`` conjuncts that only use the columns of one
+  table (e.g. ``a.AlbumId > 5``) are sent to its database, transpiled to
+  its dialect.
+
+The partial results are registered as local tables and the query, with the
+source tables replaced by the local ones, runs in DuckDB.
+
+Usage:
+
+>>> plan = new_federated_plan(sql, database_identifiers={"pg", "redshift"})
+>>> for source in plan.sources:
+...     source_sql = source.to_sql(db_type)
+>>> plan.local_sql
+'SELECT ... FROM source_1 AS a JOIN source_2 AS b ON ...'
+"""
+
+import typing as T
+import dataclasses
+
+from sqlglot import exp
+
+from .constants import DbTypeEnum
+from .rewrite.dialect import get_sqlglot_dialect
+from .rewrite.parser import parse_sql, generate_sql
+from .result.markdown import render_markdown_table
+from .fanout import ShardResult
+
+
+@dataclasses.dataclass
+class FederatedSource:
+    """
+    A source table of a federated query.
+
+    :param name: the name of the local table.
+    :param database_identifier: the database of the table.
+    :param table: the table in the source database, ``schema.table`` or
+        ``table`` for the default schema.
+    :param alias: the name the query uses for the table.
+    :param columns: the columns the query uses, None means all columns.
+    :param filters: the predicates pushed down to the database.
+    """
+
+    name: str
+    database_identifier: str
+    table: exp.Table
+    alias: str
+    columns: T.Optional[list[exp.Column]] = None
+    filters: list[exp.Expression] = dataclasses.field(default_factory=list)
+
+    def to_sql(
+        self,
+        db_type: T.Union[str, DbTypeEnum],
+        named_params: bool = True,
+    ) -> str:
+        """
+        Generate the SELECT statement run on the source database.
+        """
+        if self.columns is None:
+            projections = [exp.Star()]
+        else:
+            projections = [exp.column(column.this.copy()) for column in self.columns]
+        query = exp.select(*projections).from_(self.table.copy())
+        for predicate in self.filters:
+            query = query.where(_unqualify(predicate.copy()), copy=False)
+        return generate_sql(
+            query,
+            dialect=get_sqlglot_dialect(db_type),
+            named_params=named_params,
+        )
+
+
+@dataclasses.dataclass
+class FederatedPlan:
+    """
+    How to run a federated query.
+
+    :param sources: the source tables.
+    :param local_sql: the query run in DuckDB on the local tables.
+    """
+
+    sources: list[FederatedSource]
+    local_sql: str
+
+
+def _unqualify(node: exp.Expression) -> exp.Expression:
+    for column in node.find_all(exp.Column):
+        column.set("table", None)
+    return node
+
+
+def _is_pushable(
+    predicate: exp.Expression,
+    alias: T.Optional[str],
+) -> bool:
+    """
+    A predicate can be evaluated by the source database if it only uses the
+    columns of that source, and no subquery, aggregate or window function.
+
+    :param alias: the alias of the source, None if it is the only source,
+        then unqualified columns belong to it.
+    """
+    if predicate.find(exp.Subquery, exp.Select, exp.AggFunc, exp.Window):
+        return False
+    columns = list(predicate.find_all(exp.Column))
+    if len(columns) == 0:
+        return False
+    if alias is None:
+        return True
+    return all(column.table.lower() == alias for column in columns)
+
+
+def _get_nullable_aliases(select: exp.Select) -> set[str]:
+    """
+    The tables on the nullable side of an outer join, a WHERE predicate on
+    them is not equivalent once pushed below the join.
+    """
+    nullable = set()
+    from_ = select.args.get("from_") or select.args.get("from")
+    previous = [from_.this.alias_or_name.lower()] if from_ else []
+    for join in select.args.get("joins") or []:
+        alias = join.this.alias_or_name.lower()
+        side = (join.side or "").upper()
+        if side in ("LEFT", "FULL"):
+            nullable.add(alias)
+        if side in ("RIGHT", "FULL"):
+            nullable.update(previous)
+        previous.append(alias)
+    return nullable
+
+
+def _push_down(
+    select: exp.Select,
+    sources: list[FederatedSource],
+):
+    """
+    Set the columns and the filters of each source.
+    """
+    is_single = len(sources) == 1
+    # ORDER BY / GROUP BY can refer to the select list aliases
+    select_aliases = {
+        projection.alias.lower()
+        for projection in select.expressions
+        if isinstance(projection, exp.Alias)
+    }
+    in_select_list = {
+        id(column)
+        for projection in select.expressions
+        for column in projection.find_all(exp.Column)
+    }
+    columns = [
+        column
+        for column in select.find_all(exp.Column)
+        if column.table
+        or id(column) in in_select_list
+        or column.name.lower() not in select_aliases
+    ]
+    is_unqualified = any(not column.table for column in columns)
+    is_select_all = any(
+        isinstance(projection, exp.Star) for projection in select.expressions
+    )
+    for source in sources:
+        alias = source.alias.lower()
+        if is_single:
+            used = columns
+        elif is_unqualified:
+            used = []
+        else:
+            used = [column for column in columns if column.table.lower() == alias]
+        if (
+            len(used) == 0
+            or is_select_all
+            or any(isinstance(column.this, exp.Star) for column in used)
+        ):
+            continue
+        unique = dict()
+        for column in used:
+            unique.setdefault(column.name.lower(), column)
+        source.columns = list(unique.values())
+
+    where = select.args.get("where")
+    if where is None:
+        return
+    nullable = _get_nullable_aliases(select)
+    if isinstance(where.this, exp.And):
+        predicates = list(where.this.flatten())
+    else:
+        predicates = [where.this]
+    for predicate in predicates:
+        for source in sources:
+            alias = source.alias.lower()
+            if alias in nullable:
+                continue
+            if _is_pushable(predicate, None if is_single else alias):
+                source.filters.append(predicate.copy())
+
+
+def new_federated_plan(
+    sql: str,
+    database_identifiers: T.Iterable[str],
+) -> FederatedPlan:
+    """
+    Find the source tables of a federated query and what can be pushed down
+    to each of them.
+
+    :param sql: the SELECT statement in DuckDB SQL.
+    :param database_identifiers: the configured database identifiers.
+
+    :raises ValueError: if the query can't be parsed, or references a table
+        without a database identifier.
+    """
+    identifiers = {identifier.lower(): identifier for identifier in database_identifiers}
+    ast = parse_sql(sql, "duckdb")
+    if not isinstance(ast, exp.Query):
+        raise ValueError("The query can't be parsed as a single SELECT statement")
+
+    cte_names = {cte.alias_or_name.lower() for cte in ast.find_all(exp.CTE)}
+    sources: list[FederatedSource] = list()
+    for table in list(ast.find_all(exp.Table)):
+        if table.catalog:
+            database_key = table.catalog.lower()
+            source_table = exp.Table(
+                this=table.this.copy(), db=table.args["db"].copy()
+            )
+        elif table.db:
+            database_key = table.db.lower()
+            source_table = exp.Table(this=table.this.copy())
+        elif table.name.lower() in cte_names:
+            continue
+        else:
+            raise ValueError(
+                f"Table {table.sql(dialect='duckdb')} must be qualified with a "
+                f"database identifier, e.g. \"my_database\".schema.table"
+            )
+        if database_key not in identifiers:
+            raise ValueError(
+                f"Database {database_key!r} of table {table.sql(dialect='duckdb')} "
+                f"not found in configuration. It has the following databases: "
+                f"{', '.join(identifiers.values())}."
+            )
+        source = FederatedSource(
+            name=f"source_{len(sources) + 1}",
+            database_identifier=identifiers[database_key],
+            table=source_table,
+            alias=table.alias_or_name,
+        )
+        sources.append(source)
+        table.replace(
+            exp.alias_(exp.to_table(source.name), source.alias, table=True)
+        )
+
+    # push-down only for a plain SELECT, where every alias is unambiguous
+    aliases = [source.alias.lower() for source in sources]
+    if (
+        isinstance(ast, exp.Select)
+        and ast.find(exp.Subquery, exp.CTE) is None
+        and len(set(aliases)) == len(aliases)
+    ):
+        _push_down(ast, sources)
+
+    return FederatedPlan(
+        sources=sources,
+        local_sql=ast.sql(dialect="duckdb"),
+    )
+
+
+def render_source_report(
+    sources: list[FederatedSource],
+    source_sqls: list[str],
+    results: list[ShardResult],
+) -> str:
+    """
+    Render the query, rows, timing and error of each source as a Markdown table.
+    """
+    rows = [
+        (
+            source.name,
+            source.database_identifier,
+            source_sql,
+            "" if result.error else result.n_rows,
+            f"{result.duration:.3f}",
+            result.error or "",
+        )
+        for source, source_sql, result in zip(sources, source_sqls, results)
+    ]
+    return render_markdown_table(
+        ["source", "database", "query", "rows", "seconds", "error"], rows
+    )
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+
+"""
+Background query jobs.
+
+MCP clients time out long before a heavy warehouse query finishes. A query
+submitted as a job runs on a bounded worker pool, independent of the request
+that submitted it. The client polls its status (rows fetched, elapsed time)
+and reads the result once it is ready. Submitting the same query again while
+it is still queued, running, or its result is still kept, returns the
+existing job instead of running the query twice.
+
+Usage:
+
+>>> manager = JobManager(max_workers=2)
+>>> job, is_new = manager.submit(key, "chinook", sql, run=run_query)
+>>> manager.get(job.job_id).status
+'running'
+"""
+
+import typing as T
+import time
+import secrets
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .constants import JobStatusEnum
+
+
+class JobNotFoundError(KeyError):
+    """
+    Raised when a job id is unknown, or the job has expired.
+    """
+
+    def __str__(self) -> str:
+        return f"Job {self.args[0]!r} not found or expired"
+
+
+class JobCancelledError(Exception):
+    """
+    Raised inside a running job when it is cancelled, see
+    :meth:`QueryJob.check_cancelled`.
+    """
+
+
+class QueryJob:
+    """
+    State of a background query job.
+
+    :param job_id: the id of the job.
+    :param key: the deduplication key, see
+        :meth:`~mcp_ohmy_sql.explain.preflight.PlanCache.make_key`.
+    :param database_identifier: the database the query runs on.
+    :param sql: the query.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        key: T.Hashable,
+        database_identifier: str,
+        sql: str,
+    ):
+        self.job_id = job_id
+        self.key = key
+        self.database_identifier = database_identifier
+        self.sql = sql
+        self.status: str = JobStatusEnum.QUEUED.value
+        self.submitted_at: float = time.time()
+        self.started_at: T.Optional[float] = None
+        self.finished_at: T.Optional[float] = None
+        #: updated by the job while it fetches rows
+        self.rows_fetched: int = 0
+        self.error: T.Optional[str] = None
+        #: whatever the job function returns
+        self.result: T.Any = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (
+            JobStatusEnum.SUCCEEDED.value,
+            JobStatusEnum.FAILED.value,
+            JobStatusEnum.CANCELLED.value,
+        )
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Number of seconds the job has been running, or ran.
+        """
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def is_cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """
+        Called by the job between two steps, e.g. two fetched batches.
+
+        :raises JobCancelledError: if the job has been cancelled.
+        """
+        if self._cancel_event.is_set():
+            raise JobCancelledError(self.job_id)
+
+    def to_status(self) -> str:
+        """
+        Describe the job in a few lines, e.g.::
+
+            job_id: 9f86d081884c7d65
+            status: running
+            elapsed: 12.345 seconds
+            rows fetched: 25000
+        """
+        lines = [
+            f"job_id: {self.job_id}",
+            f"database: {self.database_identifier}",
+            f"status: {self.status}",
+        ]
+        if self.status == JobStatusEnum.QUEUED.value:
+            waiting = time.time() - self.submitted_at
+            lines.append(f"waiting: {waiting:.3f} seconds")
+        else:
+            lines.append(f"elapsed: {self.elapsed:.3f} seconds")
+        lines.append(f"rows fetched: {self.rows_fetched}")
+        if self.error:
+            lines.append(f"error: {self.error}")
+        return "\n".join(lines)
+
+
+class JobManager:
+    """
+    Run query jobs on a bounded thread pool and keep their state in memory.
+
+    Finished jobs are kept for ``job_ttl`` seconds, at most ``max_jobs``
+    jobs are kept, the oldest finished jobs are dropped first.
+
+    :param max_workers: maximum number of jobs running at the same time.
+    :param max_jobs: maximum number of jobs kept.
+    :param job_ttl: number of seconds a finished job is kept.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_jobs: int = 100,
+        job_ttl: float = 3600,
+    ):
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self.job_ttl = job_ttl
+        self._jobs: "OrderedDict[str, QueryJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: T.Optional[ThreadPoolExecutor] = None
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """
+        The worker pool, created on the first job.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="mcp_ohmy_sql_job",
+            )
+        return self._executor
+
+    def _evict(self):
+        """
+        Drop the expired finished jobs, then the oldest finished jobs while
+        there are too many. Queued and running jobs are never dropped.
+        """
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.is_finished]
+        n_over = len(self._jobs) - self.max_jobs
+        for job in finished:
+            if now - job.finished_at > self.job_ttl or n_over > 0:
+                self._jobs.pop(job.job_id)
+                n_over -= 1
+
+    def _find(
+        self,
+        key: T.Hashable,
+        is_result_valid: T.Optional[T.Callable[[QueryJob], bool]] = None,
+    ) -> T.Optional[QueryJob]:
+        for job in self._jobs.values():
+            if job.key != key:
+                continue
+            if job.status in (
+                JobStatusEnum.QUEUED.value,
+                JobStatusEnum.RUNNING.value,
+            ):
+                return job
+            if job.status == JobStatusEnum.SUCCEEDED.value and (
+                is_result_valid is None or is_result_valid(job)
+            ):
+                return job
+        return None
+
+    def submit(
+        self,
+        key: T.Hashable,
+        database_identifier: str,
+        sql: str,
+        run: T.Callable[[QueryJob], T.Any],
+        is_result_valid: T.Optional[T.Callable[[QueryJob], bool]] = None,
+    ) -> tuple[QueryJob, bool]:
+        """
+        Submit a job, unless an identical one is queued, running or succeeded.
+
+        :param key: the deduplication key.
+        :param database_identifier: the database the query runs on.
+        :param sql: the query.
+        :param run: the job function, it takes the job, should update
+            ``job.rows_fetched`` and call ``job.check_cancelled()`` regularly,
+            its return value is stored in ``job.result``.
+        :param is_result_valid: whether the result of a succeeded job can
+            still be read, e.g. its spilled file was not evicted. A succeeded
+            job without a valid result is not reused, the query runs again.
+
+        :returns: a tuple of (job, is_new), ``is_new`` is False if an existing
+            job was returned.
+        """
+        with self._lock:
+            self._evict()
+            job = self._find(key, is_result_valid)
+            if job is not None:
+                return job, False
+            job = QueryJob(
+                job_id=secrets.token_hex(8),
+                key=key,
+                database_identifier=database_identifier,
+                sql=sql,
+            )
+            self._jobs[job.job_id] = job
+            self._evict()
+        self.executor.submit(self._run, job, run)
+        return job, True
+
+    def _run(
+        self,
+        job: QueryJob,
+        run: T.Callable[[QueryJob], T.Any],
+    ):
+        if job.is_cancel_requested:
+            return
+        job.started_at = time.time()
+        job.status = JobStatusEnum.RUNNING.value
+        try:
+            job.result = run(job)
+            job.check_cancelled()
+            job.status = JobStatusEnum.SUCCEEDED.value
+        except JobCancelledError:
+            job.result = None
+            job.status = JobStatusEnum.CANCELLED.value
+        except Exception as e:
+            job.error = str(e)
+            job.status = JobStatusEnum.FAILED.value
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> QueryJob:
+        """
+        Get a job.
+
+        :raises JobNotFoundError: if the job is unknown or expired.
+        """
+        with self._lock:
+            self._evict()
+            try:
+                return self._jobs[job_id]
+            except KeyError:
+                raise JobNotFoundError(job_id)
+
+    def cancel(self, job_id: str) -> QueryJob:
+        """
+        Cancel a job. A queued job is cancelled at once, a running job stops
+        at its next :meth:`QueryJob.check_cancelled` call. Finished jobs are
+        left as they are.
+
+        :raises JobNotFoundError: if the job is unknown or expired.
+        """
+        job = self.get(job_id)
+        with self._lock:
+            if job.is_finished:
+                return job
+            job._cancel_event.set()
+            if job.status == JobStatusEnum.QUEUED.value:
+                job.status = JobStatusEnum.CANCELLED.value
+                job.finished_at = time.time()
+        return job
+
+    def shutdown(self, wait: bool = True):
+        """
+        Cancel all unfinished jobs and stop the worker pool.
+        """
+        for job in list(self._jobs.values()):
+            self.cancel(job.job_id)
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
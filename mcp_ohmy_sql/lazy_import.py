@@ -59,3 +59,18 @@ try:
     import simple_aws_redshift.api as aws_rs
 except ImportError:  # pragma: no cover
     aws_rs = Library("simple_aws_redshift")
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = Library("pyarrow", message="run pip install 'mcp_ohmy_sql[arrow]'")
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pq = Library("pyarrow", message="run pip install 'mcp_ohmy_sql[arrow]'")
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover
+    duckdb = Library("duckdb", message="run pip install 'mcp_ohmy_sql[duckdb]'")
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+"""
+Embedded DuckDB engine to post-process large query results locally.
+
+A result too large for the model is registered in an in-memory DuckDB
+database as a named table (``result_1``, ``result_2``, ...). The Arrow
+columns of the :class:`~mcp_ohmy_sql.result.buffer.ResultBuffer` are
+registered as they are, without a copy. Follow-up aggregations, filters and
+joins run locally on these tables, so iterative analysis doesn't go back to
+the warehouse, and only small results go back to the model.
+
+The engine is sandboxed: file system and network access are disabled and
+the configuration is locked, so the SQL can only read the registered tables.
+
+Requires ``duckdb`` and ``pyarrow`` (``pip install 'mcp_ohmy_sql[duckdb]'``).
+
+Usage:
+
+>>> engine = LocalEngine(memory_limit="1GB")
+>>> table = engine.add(buffer, database_identifier="chinook", sql=sql)
+>>> rows = engine.query(f"SELECT COUNT(*) FROM {table.name}", max_rows=100)
+"""
+
+import typing as T
+import time
+import itertools
+import threading
+import dataclasses
+from collections import OrderedDict
+
+from sqlglot import exp
+
+from .lazy_import import Library, duckdb
+from .rewrite.parser import parse_sql
+from .result.buffer import ResultBuffer, is_arrow_available, fill_result_buffer
+
+
+def is_duckdb_available() -> bool:
+    """
+    Check whether both ``duckdb`` and ``pyarrow`` are installed.
+    """
+    return not isinstance(duckdb, Library) and is_arrow_available()
+
+
+@dataclasses.dataclass
+class LocalTable:
+    """
+    A result registered in the :class:`LocalEngine`.
+
+    :param name: the table name to use in the SQL.
+    :param columns: column names.
+    :param n_rows: number of rows.
+    :param n_bytes: size of the Arrow columns.
+    :param truncated: True if the query returned more rows than the engine
+        accepts, only the first ``n_rows`` rows are kept.
+    :param database_identifier: the database the result comes from.
+    :param sql: the query that produced the result.
+    """
+
+    name: str
+    columns: list[str]
+    n_rows: int
+    n_bytes: int
+    truncated: bool
+    database_identifier: str
+    sql: str
+    created_at: float = dataclasses.field(default_factory=time.time)
+
+    def to_description(self) -> str:
+        """
+        Describe the table in one line, e.g.
+        ``result_1 (347 rows from 'chinook', columns: AlbumId, Title, ArtistId)``.
+        """
+        n_rows = f"{self.n_rows}"
+        if self.truncated:
+            n_rows = f"{n_rows}+ (truncated)"
+        return (
+            f"{self.name} ({n_rows} rows from {self.database_identifier!r}, "
+            f"columns: {', '.join(self.columns)})"
+        )
+
+
+class LocalEngine:
+    """
+    Thread-safe in-memory DuckDB database of registered results.
+
+    The oldest tables are dropped once there are more than ``max_tables``
+    tables, or their total size exceeds ``max_total_bytes``. Tables older
+    than ``table_ttl`` seconds are dropped too.
+
+    :param memory_limit: DuckDB ``memory_limit``, e.g. ``"1GB"``.
+    :param max_tables: maximum number of tables kept.
+    :param max_total_bytes: maximum total size of the tables.
+    :param table_ttl: number of seconds a table is kept.
+    """
+
+    def __init__(
+        self,
+        memory_limit: str = "1GB",
+        max_tables: int = 10,
+        max_total_bytes: int = 1_000_000_000,
+        table_ttl: float = 3600,
+    ):
+        self.memory_limit = memory_limit
+        self.max_tables = max_tables
+        self.max_total_bytes = max_total_bytes
+        self.table_ttl = table_ttl
+        self._tables: "OrderedDict[str, LocalTable]" = OrderedDict()
+        self._counter = itertools.count(1)
+        self._lock = threading.RLock()
+        self._connection: T.Optional["duckdb.DuckDBPyConnection"] = None
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    @property
+    def connection(self) -> "duckdb.DuckDBPyConnection":
+        """
+        The DuckDB connection, created on first use.
+        """
+        if self._connection is None:
+            self._connection = duckdb.connect(
+                ":memory:",
+                config={
+                    "memory_limit": self.memory_limit,
+                    "enable_external_access": False,
+                    "lock_configuration": True,
+                },
+            )
+        return self._connection
+
+    def _evict(self, reserve_bytes: int = 0, reserve_tables: int = 0):
+        now = time.time()
+        for table in list(self._tables.values()):
+            if now - table.created_at > self.table_ttl:
+                self.drop(table.name)
+        total_bytes = sum(table.n_bytes for table in self._tables.values())
+        while self._tables and (
+            len(self._tables) + reserve_tables > self.max_tables
+            or total_bytes + reserve_bytes > self.max_total_bytes
+        ):
+            table = next(iter(self._tables.values()))
+            total_bytes -= table.n_bytes
+            self.drop(table.name)
+
+    def add(
+        self,
+        buffer: ResultBuffer,
+        database_identifier: str,
+        sql: str,
+        truncated: bool = False,
+        name: T.Optional[str] = None,
+    ) -> LocalTable:
+        """
+        Register a result as a new table.
+
+        :param name: the table name, by default ``result_<n>``. A table with
+            the same name is replaced.
+
+        :raises ValueError: if the result alone is larger than ``max_total_bytes``.
+        :raises ImportError: if ``duckdb`` or ``pyarrow`` is not installed.
+        """
+        arrow_table = buffer.to_arrow()
+        if arrow_table.nbytes > self.max_total_bytes:
+            raise ValueError(
+                f"The result takes {arrow_table.nbytes} bytes, more than "
+                f"the local engine limit of {self.max_total_bytes} bytes"
+            )
+        with self._lock:
+            if name is not None:
+                self.drop(name)
+            self._evict(reserve_bytes=arrow_table.nbytes, reserve_tables=1)
+            table = LocalTable(
+                name=name or f"result_{next(self._counter)}",
+                columns=list(buffer.columns),
+                n_rows=len(buffer),
+                n_bytes=arrow_table.nbytes,
+                truncated=truncated,
+                database_identifier=database_identifier,
+                sql=sql,
+            )
+            self.connection.register(table.name, arrow_table)
+            self._tables[table.name] = table
+        return table
+
+    def drop(self, name: str):
+        """
+        Drop a table, unknown names are ignored.
+        """
+        with self._lock:
+            if self._tables.pop(name, None) is not None:
+                self.connection.unregister(name)
+
+    def list_tables(self) -> list[LocalTable]:
+        """
+        List the tables, from the oldest to the newest.
+        """
+        with self._lock:
+            self._evict()
+            return list(self._tables.values())
+
+    def query(
+        self,
+        sql: str,
+        max_rows: T.Optional[int] = None,
+    ) -> ResultBuffer:
+        """
+        Run a SELECT statement on the registered tables.
+
+        :param sql: the SELECT statement, in DuckDB SQL.
+        :param max_rows: if provided, fetch at most ``max_rows + 1`` rows, so
+            the caller can tell whether the result was truncated.
+
+        :raises ValueError: if the SQL is not a single SELECT statement.
+        :raises duckdb.Error: if the query fails.
+        """
+        if not isinstance(parse_sql(sql, "duckdb"), exp.Query):
+            raise ValueError("Only a single SELECT statement can be run locally")
+        with self._lock:
+            cursor = self.connection.execute(sql)
+            columns = [column[0] for column in cursor.description]
+            return fill_result_buffer(
+                columns=columns,
+                fetchmany=cursor.fetchmany,
+                max_rows=max_rows,
+            )
+
+    def close(self):
+        """
+        Drop all tables and close the DuckDB connection.
+        """
+        with self._lock:
+            self._tables.clear()
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,473 @@
+# -*- coding: utf-8 -*-
+
+"""
+Local materialization of hot queries.
+
+An expensive query that agents run again and again (e.g. the monthly sales
+of a warehouse) is materialized on a schedule into a table of a local SQLite
+file, see :class:`~mcp_ohmy_sql.config.define.Materialization`. Agents query
+the local table instantly with the normal tools, through the read-only
+database the file is exposed as.
+
+A refresh streams the rows of the source query into a new table, and swaps
+it with the old table only once it is complete, so readers always see a
+whole result. The ``_materializations`` table records where each table
+comes from, when it was refreshed, its number of rows and the error of the
+last failed refresh.
+
+Usage:
+
+>>> store = MaterializedStore(path)
+>>> store.initialize(names=["monthly_sales"])
+>>> n_rows = store.write_cursor("monthly_sales", cursor, batch_size=10000)
+>>> store.set_status(status)
+>>> store.get_statuses()["monthly_sales"].refreshed_at
+1760860800.0
+"""
+
+import typing as T
+import json
+import time
+import decimal
+import sqlite3
+import datetime
+import threading
+import dataclasses
+from pathlib import Path
+
+from .cursor import OpenCursor
+
+MATERIALIZATIONS_TABLE = "_materializations"
+"""
+The table of the :class:`MaterializationStatus` of each materialized table.
+"""
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def get_sqlite_type(value: T.Any) -> str:
+    """
+    Get the SQLite column type of a Python value.
+    """
+    if isinstance(value, (bool, int)):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "REAL"
+    if isinstance(value, decimal.Decimal):
+        return "NUMERIC"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "BLOB"
+    return "TEXT"
+
+
+def to_sqlite_value(value: T.Any) -> T.Any:
+    """
+    Convert a Python value into a value SQLite can store. Dates and times
+    are stored as ISO 8601 text, JSON values as JSON text.
+    """
+    if value is None or isinstance(value, (str, int, float, bytes)):
+        return value
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+def get_column_names(columns: list[str]) -> list[str]:
+    """
+    Make the column names of a result unique, SQLite compares them
+    case-insensitively, e.g. ``["id", "ID"]`` becomes ``["id", "ID_2"]``.
+    """
+    names = list()
+    seen = set()
+    for column in columns:
+        name = column or "column"
+        candidate = name
+        ith = 1
+        while candidate.lower() in seen:
+            ith += 1
+            candidate = f"{name}_{ith}"
+        seen.add(candidate.lower())
+        names.append(candidate)
+    return names
+
+
+def _to_iso(timestamp: T.Optional[float]) -> T.Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.datetime.fromtimestamp(
+        timestamp, tz=datetime.timezone.utc
+    ).isoformat(timespec="seconds")
+
+
+def _from_iso(value: T.Optional[str]) -> T.Optional[float]:
+    if value is None:
+        return None
+    return datetime.datetime.fromisoformat(value).timestamp()
+
+
+@dataclasses.dataclass
+class MaterializationStatus:
+    """
+    The freshness of a materialized table.
+
+    :param name: the local table name.
+    :param database_identifier: the source database.
+    :param sql: the source query of the table.
+    :param refreshed_at: when the table was last refreshed, None if never.
+    :param attempted_at: when the last refresh started.
+    :param next_refresh_at: when the next refresh is due.
+    :param n_rows: number of rows of the table.
+    :param truncated: True if the query returned more rows than
+        ``settings.materialization.max_rows``.
+    :param duration: number of seconds the last successful refresh took.
+    :param error: the error of the last refresh, None if it succeeded.
+    """
+
+    name: str
+    database_identifier: str
+    sql: str
+    refreshed_at: T.Optional[float] = None
+    attempted_at: T.Optional[float] = None
+    next_refresh_at: T.Optional[float] = None
+    n_rows: int = 0
+    truncated: bool = False
+    duration: float = 0.0
+    error: T.Optional[str] = None
+
+    def to_freshness(self, now: T.Optional[float] = None) -> str:
+        """
+        Describe the freshness of the table in one line, e.g.
+        ``monthly_sales materialized from 'warehouse' at 2026-10-19T01:00:12+00:00 (3600 seconds ago, 12 rows)``.
+        """
+        if now is None:
+            now = time.time()
+        if self.refreshed_at is None:
+            return f"{self.name} was never materialized from {self.database_identifier!r}"
+        n_rows = f"{self.n_rows}"
+        if self.truncated:
+            n_rows = f"{n_rows}+ (truncated)"
+        text = (
+            f"{self.name} materialized from {self.database_identifier!r} at "
+            f"{_to_iso(self.refreshed_at)} ({now - self.refreshed_at:.0f} "
+            f"seconds ago, {n_rows} rows)"
+        )
+        if self.error is not None:
+            text = f"{text}, the last refresh failed: {self.error}"
+        return text
+
+
+def get_next_refresh_time(
+    status: T.Optional[MaterializationStatus],
+    refresh_interval: float,
+    refresh_hours: T.Optional[list[int]] = None,
+    retry_interval: float = 600,
+) -> float:
+    """
+    Get when a materialized table is due for a refresh.
+
+    A table that was never materialized is due right away. Otherwise it is
+    due ``refresh_interval`` seconds after its last refresh, at the start of
+    the next of the ``refresh_hours`` (server local time) if it is not one
+    of them. A failed refresh is retried ``retry_interval`` seconds later.
+    """
+    if status is None:
+        return 0.0
+    if status.refreshed_at is None:
+        due = 0.0
+    else:
+        due = status.refreshed_at + refresh_interval
+        if refresh_hours:
+            moment = datetime.datetime.fromtimestamp(due)
+            for _ in range(24):
+                if moment.hour in refresh_hours:
+                    break
+                moment = (moment + datetime.timedelta(hours=1)).replace(
+                    minute=0, second=0, microsecond=0
+                )
+            due = moment.timestamp()
+    if status.error is not None and status.attempted_at is not None:
+        due = max(due, status.attempted_at + retry_interval)
+    return due
+
+
+class MaterializedStore:
+    """
+    The local SQLite file of the materialized tables.
+
+    The tables are written by this store only, with its own connections,
+    readers open the file read-only.
+
+    :param path: path of the SQLite file.
+    :param timeout: number of seconds a write waits for the readers to
+        release the file.
+    """
+
+    def __init__(
+        self,
+        path: T.Union[str, Path],
+        timeout: float = 60,
+    ):
+        self.path = Path(path)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(
+            str(self.path),
+            timeout=self.timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+
+    def initialize(self, names: T.Optional[list[str]] = None):
+        """
+        Create the file and the ``_materializations`` table if they don't
+        exist.
+
+        :param names: the configured materializations, the tables of the
+            other materializations are dropped.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            conn = self.connect()
+            try:
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {MATERIALIZATIONS_TABLE} ("
+                    "name TEXT PRIMARY KEY, "
+                    "database_identifier TEXT, "
+                    "sql TEXT, "
+                    "refreshed_at TEXT, "
+                    "attempted_at TEXT, "
+                    "next_refresh_at TEXT, "
+                    "n_rows INTEGER, "
+                    "truncated INTEGER, "
+                    "duration REAL, "
+                    "error TEXT)"
+                )
+                if names is not None:
+                    keep = {name.lower() for name in names}
+                    rows = conn.execute(
+                        "SELECT name FROM sqlite_master WHERE type = 'table'"
+                    ).fetchall()
+                    # also the new tables left behind by an interrupted refresh
+                    for (table_name,) in rows:
+                        if (
+                            table_name != MATERIALIZATIONS_TABLE
+                            and table_name.lower() not in keep
+                        ):
+                            conn.execute(
+                                f"DROP TABLE IF EXISTS {quote_identifier(table_name)}"
+                            )
+                    for status_name in list(self._get_statuses(conn)):
+                        if status_name.lower() not in keep:
+                            conn.execute(
+                                f"DELETE FROM {MATERIALIZATIONS_TABLE} WHERE name = ?",
+                                (status_name,),
+                            )
+            finally:
+                conn.close()
+
+    def write_cursor(
+        self,
+        name: str,
+        cursor: OpenCursor,
+        batch_size: int = 10_000,
+    ) -> int:
+        """
+        Stream all rows of an open cursor into a new table, up to the
+        ``max_rows`` of the cursor, then replace the table ``name`` with it.
+        The column types are taken from the first batch of rows. The caller
+        closes the cursor.
+
+        :returns: the number of rows written.
+
+        :raises Exception: if the rows can't be written, the old table is
+            left as it is.
+        """
+        new_name = f"{name}__new"
+        columns = get_column_names(cursor.columns)
+        n_rows = 0
+        with self._lock:
+            conn = self.connect()
+            try:
+                conn.execute(f"DROP TABLE IF EXISTS {quote_identifier(new_name)}")
+                rows, has_more = cursor.fetch(batch_size)
+                types = list()
+                for ith, column in enumerate(columns):
+                    value = next(
+                        (row[ith] for row in rows if row[ith] is not None), None
+                    )
+                    column_type = "" if value is None else f" {get_sqlite_type(value)}"
+                    types.append(f"{quote_identifier(column)}{column_type}")
+                conn.execute(
+                    f"CREATE TABLE {quote_identifier(new_name)} ({', '.join(types)})"
+                )
+                insert_sql = (
+                    f"INSERT INTO {quote_identifier(new_name)} "
+                    f"VALUES ({', '.join(['?'] * len(columns))})"
+                )
+                while True:
+                    # one short write transaction per batch, readers are
+                    # only blocked while it commits
+                    conn.execute("BEGIN")
+                    conn.executemany(
+                        insert_sql,
+                        [[to_sqlite_value(value) for value in row] for row in rows],
+                    )
+                    conn.execute("COMMIT")
+                    n_rows += len(rows)
+                    if has_more is False:
+                        break
+                    rows, has_more = cursor.fetch(batch_size)
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(f"DROP TABLE IF EXISTS {quote_identifier(name)}")
+                conn.execute(
+                    f"ALTER TABLE {quote_identifier(new_name)} "
+                    f"RENAME TO {quote_identifier(name)}"
+                )
+                conn.execute("COMMIT")
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                try:
+                    conn.execute(f"DROP TABLE IF EXISTS {quote_identifier(new_name)}")
+                except Exception:  # pragma: no cover
+                    pass
+                raise e
+            finally:
+                conn.close()
+        return n_rows
+
+    def set_status(self, status: MaterializationStatus):
+        with self._lock:
+            conn = self.connect()
+            try:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {MATERIALIZATIONS_TABLE} "
+                    f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        status.name,
+                        status.database_identifier,
+                        status.sql,
+                        _to_iso(status.refreshed_at),
+                        _to_iso(status.attempted_at),
+                        _to_iso(status.next_refresh_at),
+                        status.n_rows,
+                        int(status.truncated),
+                        round(status.duration, 3),
+                        status.error,
+                    ),
+                )
+            finally:
+                conn.close()
+
+    @staticmethod
+    def _get_statuses(conn: sqlite3.Connection) -> dict[str, MaterializationStatus]:
+        rows = conn.execute(
+            "SELECT name, database_identifier, sql, refreshed_at, attempted_at, "
+            "next_refresh_at, n_rows, truncated, duration, error "
+            f"FROM {MATERIALIZATIONS_TABLE}"
+        ).fetchall()
+        statuses = dict()
+        for row in rows:
+            statuses[row[0]] = MaterializationStatus(
+                name=row[0],
+                database_identifier=row[1],
+                sql=row[2],
+                refreshed_at=_from_iso(row[3]),
+                attempted_at=_from_iso(row[4]),
+                next_refresh_at=_from_iso(row[5]),
+                n_rows=row[6] or 0,
+                truncated=bool(row[7]),
+                duration=row[8] or 0.0,
+                error=row[9],
+            )
+        return statuses
+
+    def get_statuses(self) -> dict[str, MaterializationStatus]:
+        """
+        Get the status of each materialized table, by name. Empty if the
+        store is not initialized.
+        """
+        if self.path.exists() is False:
+            return dict()
+        conn = self.connect()
+        try:
+            return self._get_statuses(conn)
+        except sqlite3.OperationalError:
+            return dict()
+        finally:
+            conn.close()
+
+
+class MaterializationScheduler:
+    """
+    Daemon thread calling ``run`` right away, then every ``check_interval``
+    seconds until it is stopped. An exception raised by ``run`` doesn't
+    stop the thread.
+
+    :param run: refresh the due materializations.
+    :param check_interval: number of seconds between two calls.
+    """
+
+    def __init__(
+        self,
+        run: T.Callable[[], T.Any],
+        check_interval: float = 60,
+    ):
+        self.run = run
+        self.check_interval = check_interval
+        self._thread: T.Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _loop(self):
+        while self._stop_event.is_set() is False:
+            try:
+                self.run()
+            except Exception:  # pragma: no cover
+                pass
+            self._stop_event.wait(self.check_interval)
+
+    def start(self) -> bool:
+        """
+        Start the thread.
+
+        :returns: False if it was already running.
+        """
+        with self._lock:
+            if self.is_running:
+                return False
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._loop,
+                name="mcp_ohmy_sql_materialization",
+                daemon=True,
+            )
+            self._thread.start()
+            return True
+
+    def stop(self, timeout: T.Optional[float] = None):
+        """
+        Stop the thread, a running refresh is finished first.
+        """
+        with self._lock:
+            self._stop_event.set()
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            thread.join(timeout)
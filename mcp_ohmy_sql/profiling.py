@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cached column profiles of the database tables.
+
+Agents guess the values of a column from its name, e.g. ``status = 'Active'``
+when the column holds ``'ACTIVE'``, and only learn it from an empty result.
+A background job samples each table (see :mod:`mcp_ohmy_sql.rewrite.sample`)
+and keeps the profile of its columns: the NULL ratio, the number of distinct
+values, the range of numbers and dates, and the values of the
+low-cardinality text columns. ``get_schema_details`` shows them on request:
+
+.. code-block:: typescript
+
+    Profiles(
+      Table Invoice(412 rows)(
+        BillingState:null=49%,distinct=25,
+        BillingCountry:distinct=24,
+        Total:distinct=11,min=0.99,max=25.86,
+      )
+      Table Track(10000 sampled rows)(
+        MediaTypeId:distinct~5,min=1,max=5,
+        Status:distinct~3,values=['ACTIVE', 'CLOSED', 'PENDING'],
+      )
+    )
+
+The distinct counts of a sample are marked with ``~``, they are those of the
+sample and the values dictionary may miss rare values.
+
+Usage:
+
+>>> store = ProfileStore(max_workers=2)
+>>> store.submit(("chinook", None, "Track"), run=profile_track)
+True
+>>> store.get_schema("chinook", None)
+[TableProfile(schema_name=None, table_name='Track', ...)]
+"""
+
+import typing as T
+import time
+import datetime
+import threading
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+
+from .constants import TAB
+from .rewrite.summarize import get_column_kind
+
+T_PROFILE_KEY = tuple[str, T.Optional[str], str]
+"""
+The ``(database_identifier, schema_name, table_name)`` of a table profile.
+"""
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _format_value(value: T.Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+@dataclasses.dataclass
+class ColumnStats:
+    """
+    The profile of one column, computed from the sampled rows.
+
+    :param name: the column name.
+    :param null_ratio: the ratio of NULL values.
+    :param distinct: the number of distinct non-NULL values.
+    :param min: the smallest number or date, None for other kinds.
+    :param max: the largest number or date, None for other kinds.
+    :param values: the distinct values of a low-cardinality text column,
+        most frequent first, None for the other columns.
+    """
+
+    name: str
+    null_ratio: float
+    distinct: int
+    min: T.Any = None
+    max: T.Any = None
+    values: T.Optional[list[str]] = None
+
+    def encode(self, complete: bool = True) -> str:
+        """
+        Encode the profile as ``name:stat=value,...``.
+
+        :param complete: whether the profile is computed from all the rows,
+            otherwise the distinct count is marked as approximate.
+        """
+        stats = list()
+        if self.null_ratio > 0:
+            stats.append(f"null={round(self.null_ratio * 100)}%")
+        stats.append(f"distinct{'=' if complete else '~'}{self.distinct}")
+        if self.min is not None:
+            stats.append(f"min={_format_value(self.min)}")
+        if self.max is not None:
+            stats.append(f"max={_format_value(self.max)}")
+        if self.values is not None:
+            values = ", ".join(_quote_literal(value) for value in self.values)
+            stats.append(f"values=[{values}]")
+        return f"{self.name}:{','.join(stats)}"
+
+
+def new_column_stats(
+    name: str,
+    values: list[T.Any],
+    max_values: int = 20,
+    max_value_chars: int = 50,
+) -> ColumnStats:
+    """
+    Compute the profile of a column from its sampled values.
+
+    The values of a text column are listed if it has at most ``max_values``
+    distinct values, and some values are repeated, unique values like names
+    are not worth listing. Values longer than ``max_value_chars`` are not
+    listed either, a long text is not a category.
+    """
+    non_null = [value for value in values if value is not None]
+    null_ratio = (len(values) - len(non_null)) / len(values) if values else 0.0
+    counts = dict()
+    for value in non_null:
+        try:
+            counts[value] = counts.get(value, 0) + 1
+        except TypeError:  # unhashable, e.g. JSON
+            counts[repr(value)] = counts.get(repr(value), 0) + 1
+    stats = ColumnStats(name=name, null_ratio=null_ratio, distinct=len(counts))
+    kind = get_column_kind(non_null[:1])
+    if kind in ("number", "datetime"):
+        try:
+            stats.min = min(non_null)
+            stats.max = max(non_null)
+        except TypeError:  # pragma: no cover
+            pass
+    elif (
+        kind == "text"
+        and 0 < len(counts) <= max_values
+        and len(counts) < len(non_null)
+        and all(len(value) <= max_value_chars for value in counts)
+    ):
+        stats.values = [
+            value
+            for value, _ in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        ]
+    return stats
+
+
+@dataclasses.dataclass
+class TableProfile:
+    """
+    The profile of the columns of a table.
+
+    :param schema_name: the schema name, None for the default schema.
+    :param table_name: the table name.
+    :param n_rows: the number of rows the profile is computed from.
+    :param complete: whether these are all the rows of the table.
+    :param profiled_at: when the table was sampled, Unix time.
+    :param columns: the profile of each column.
+    :param error: why the table couldn't be sampled, if it failed.
+    """
+
+    schema_name: T.Optional[str]
+    table_name: str
+    n_rows: int = 0
+    complete: bool = False
+    profiled_at: float = 0.0
+    columns: list[ColumnStats] = dataclasses.field(default_factory=list)
+    error: T.Optional[str] = None
+
+    def encode(self) -> str:
+        if self.error is not None:
+            return f"Table {self.table_name}(not profiled: {self.error})"
+        if self.complete:
+            header = f"Table {self.table_name}({self.n_rows} rows)"
+        else:
+            header = f"Table {self.table_name}({self.n_rows} sampled rows)"
+        lines = [
+            f"{TAB}{column.encode(complete=self.complete)},"
+            for column in self.columns
+        ]
+        columns_def = "\n".join(lines)
+        return f"{header}(\n{columns_def}\n)"
+
+
+def new_table_profile(
+    schema_name: T.Optional[str],
+    table_name: str,
+    column_names: list[str],
+    column_values: list[list[T.Any]],
+    complete: bool,
+    max_values: int = 20,
+    max_value_chars: int = 50,
+) -> TableProfile:
+    """
+    Compute the profile of a table from its sampled rows.
+
+    :param column_values: the sampled values of each column.
+    :param complete: whether these are all the rows of the table.
+    """
+    columns = [
+        new_column_stats(
+            name=name,
+            values=values,
+            max_values=max_values,
+            max_value_chars=max_value_chars,
+        )
+        for name, values in zip(column_names, column_values)
+    ]
+    return TableProfile(
+        schema_name=schema_name,
+        table_name=table_name,
+        n_rows=len(column_values[0]) if column_values else 0,
+        complete=complete,
+        profiled_at=time.time(),
+        columns=columns,
+    )
+
+
+def encode_table_profiles(profiles: list[TableProfile]) -> str:
+    """
+    Encode the table profiles in the compact format of the schema details.
+    """
+    tables = list()
+    for profile in profiles:
+        lines = profile.encode().splitlines()
+        tables.append("\n".join(f"{TAB}{line}" for line in lines))
+    tables_def = "\n".join(tables)
+    return f"Profiles(\n{tables_def}\n)"
+
+
+class ProfileStore:
+    """
+    Keep the table profiles in memory, and compute them on a bounded
+    thread pool. A table is profiled once at a time.
+
+    :param max_workers: maximum number of tables sampled at the same time.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._profiles: dict[T_PROFILE_KEY, TableProfile] = dict()
+        self._pending: set[T_PROFILE_KEY] = set()
+        self._lock = threading.Lock()
+        self._executor: T.Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """
+        The worker pool, created on the first profile.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="mcp_ohmy_sql_profile",
+            )
+        return self._executor
+
+    def get(self, key: T_PROFILE_KEY) -> T.Optional[TableProfile]:
+        with self._lock:
+            return self._profiles.get(key)
+
+    def get_schema(
+        self,
+        database_identifier: str,
+        schema_name: T.Optional[str],
+    ) -> list[TableProfile]:
+        """
+        Get the profiles of the tables of a schema, by table name.
+        """
+        with self._lock:
+            profiles = [
+                profile
+                for (identifier, schema, _), profile in self._profiles.items()
+                if identifier == database_identifier and schema == schema_name
+            ]
+        return sorted(profiles, key=lambda profile: profile.table_name)
+
+    def is_pending(self, key: T_PROFILE_KEY) -> bool:
+        with self._lock:
+            return key in self._pending
+
+    def submit(
+        self,
+        key: T_PROFILE_KEY,
+        run: T.Callable[[], T.Optional[TableProfile]],
+    ) -> bool:
+        """
+        Profile a table in the background, unless it is already queued or
+        running.
+
+        :param run: sample the table and return its profile, None leaves
+            the current profile as it is.
+
+        :returns: False if the table was already queued or running.
+        """
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+        self.executor.submit(self._run, key, run)
+        return True
+
+    def _run(
+        self,
+        key: T_PROFILE_KEY,
+        run: T.Callable[[], T.Optional[TableProfile]],
+    ):
+        try:
+            profile = run()
+        except Exception as e:
+            profile = TableProfile(
+                schema_name=key[1],
+                table_name=key[2],
+                profiled_at=time.time(),
+                error=(str(e) or repr(e)).splitlines()[0],
+            )
+        with self._lock:
+            if profile is not None:
+                self._profiles[key] = profile
+            self._pending.discard(key)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop the worker pool.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+from .markdown import format_value
+from .markdown import new_column_formatter
+from .markdown import render_markdown_table
+from .budget import BudgetReport
+from .budget import render_markdown_table_with_budget
+from .formats import RESULT_ENCODERS
+from .formats import register_encoder
+from .formats import get_encoder
+from .formats import encode_result
+from .buffer import is_arrow_available
+from .buffer import ResultBuffer
+from .buffer import fill_result_buffer
+from .spill import ResultHandleNotFoundError
+from .spill import SpilledResult
+from .spill import ResultPage
+from .spill import SpillStore
+from .export import ExportWriter
+from .export import EXPORT_WRITERS
+from .export import get_export_writer_class
+from .export import new_export_file_name
+from .export import get_export_path
+from .export import get_partitioned_export_dir
+from .export import get_file_sha256
+from .export import ExportManifest
+from .export import PartitionedExport
+from .export import export_cursor
+from .cache import CachedResult
+from .cache import ResultCache
+from .summary import ColumnProfile
+from .summary import new_column_profiles
+from .summary import encode_summary
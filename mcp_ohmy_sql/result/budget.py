@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fit a query result into a character budget.
+
+One JSON, SUPER or long TEXT column can blow a result up to megabytes,
+wasting the model's context. Before the table is assembled, the formatted
+cells go through these steps, until the table fits the budget:
+
+1. cap every cell at ``max_cell_chars``
+2. elide wide columns that take more than half of the table
+3. cut trailing rows
+
+The footer states exactly what was dropped. As a rule of thumb, one token
+is about four characters.
+"""
+
+import typing as T
+
+from pydantic import BaseModel, Field
+
+from .markdown import format_cells, join_table
+
+#: an elided column must take more than this share of the table
+ELIDE_COLUMN_SHARE = 0.5
+#: and its cells must be this long on average, short columns are never elided
+ELIDE_COLUMN_MIN_AVG_CHARS = 32
+
+ELLIPSIS = "…"
+
+
+class BudgetReport(BaseModel):
+    """
+    What had to be dropped to fit the budget.
+
+    :param max_chars: the character budget of the table.
+    :param max_cell_chars: the maximum number of characters per cell.
+    :param n_truncated_cells: number of cells truncated to ``max_cell_chars``.
+    :param elided_columns: name and average cell length of the elided columns.
+    :param n_rows: number of rows before cutting.
+    :param n_shown_rows: number of rows left after cutting.
+    """
+
+    max_chars: T.Optional[int] = Field(default=None)
+    max_cell_chars: T.Optional[int] = Field(default=None)
+    n_truncated_cells: int = Field(default=0)
+    elided_columns: list[tuple[str, float]] = Field(default_factory=list)
+    n_rows: int = Field(default=0)
+    n_shown_rows: int = Field(default=0)
+
+    @property
+    def is_lossless(self) -> bool:
+        return (
+            self.n_truncated_cells == 0
+            and len(self.elided_columns) == 0
+            and self.n_shown_rows == self.n_rows
+        )
+
+    def to_footer(self) -> str:
+        """
+        Explain what was dropped, e.g.
+        ``... (to fit the 40000 chars budget: 3 cells truncated to 200 chars;
+        showing 120 of 1000 rows)``.
+        """
+        parts = list()
+        if self.n_truncated_cells:
+            parts.append(
+                f"{self.n_truncated_cells} cells truncated to "
+                f"{self.max_cell_chars} chars"
+            )
+        for name, avg in self.elided_columns:
+            parts.append(f"column {name!r} elided, avg {avg:.0f} chars per cell")
+        if self.n_shown_rows < self.n_rows:
+            parts.append(f"showing {self.n_shown_rows} of {self.n_rows} rows")
+        if self.max_chars is None:
+            prefix = "... ("
+        else:
+            prefix = f"... (to fit the {self.max_chars} chars budget: "
+        return prefix + "; ".join(parts) + ")"
+
+
+def new_budget_report(
+    report: T.Optional[BudgetReport] = None,
+    **kwargs,
+) -> BudgetReport:
+    """
+    Create a new report, or reset the report given by the caller of an
+    encoder, so the caller can read it once the rows are encoded.
+    """
+    if report is None:
+        return BudgetReport(**kwargs)
+    for name, value in BudgetReport(**kwargs):
+        setattr(report, name, value)
+    return report
+
+
+def truncate_cells(
+    cells: list[list[str]],
+    max_cell_chars: int,
+) -> int:
+    """
+    Truncate cells longer than ``max_cell_chars`` in place.
+
+    :returns: number of truncated cells.
+    """
+    n_truncated = 0
+    for row in cells:
+        for ith, cell in enumerate(row):
+            if len(cell) > max_cell_chars:
+                row[ith] = cell[: max(max_cell_chars - 1, 0)] + ELLIPSIS
+                n_truncated += 1
+    return n_truncated
+
+
+def fit_cells(
+    headers: list[str],
+    cells: list[list[str]],
+    is_numeric: list[bool],
+    max_chars: T.Optional[int] = None,
+    max_cell_chars: T.Optional[int] = None,
+    report: T.Optional[BudgetReport] = None,
+) -> tuple[list[str], list[list[str]], list[bool], BudgetReport]:
+    """
+    Cap cells, elide oversized columns and cut rows until the (unpadded)
+    table fits in ``max_chars``. At least one row is always kept.
+
+    :param report: if provided, filled in place instead of a new report.
+
+    :returns: a tuple of (headers, cells, is_numeric, report).
+    """
+    report = new_budget_report(
+        report,
+        max_chars=max_chars,
+        max_cell_chars=max_cell_chars,
+        n_rows=len(cells),
+        n_shown_rows=len(cells),
+    )
+    if max_cell_chars is not None:
+        report.n_truncated_cells = truncate_cells(cells, max_cell_chars)
+    if max_chars is None or len(cells) == 0:
+        return headers, cells, is_numeric, report
+
+    # every cell costs its length plus the " | " separator
+    column_sizes = [len(header) + 3 for header in headers]
+    for row in cells:
+        for ith, cell in enumerate(row):
+            column_sizes[ith] += len(cell) + 3
+    # the separator line costs about 6 chars per column
+    table_size = sum(column_sizes) + 6 * len(headers)
+
+    kept = list(range(len(headers)))
+    while table_size > max_chars and len(kept) > 1:
+        widest = max(kept, key=lambda ith: column_sizes[ith])
+        avg = (column_sizes[widest] - len(headers[widest]) - 3) / len(cells) - 3
+        if (
+            column_sizes[widest] <= table_size * ELIDE_COLUMN_SHARE
+            or avg < ELIDE_COLUMN_MIN_AVG_CHARS
+        ):
+            break
+        report.elided_columns.append((headers[widest], avg))
+        table_size -= column_sizes[widest] + 6
+        kept.remove(widest)
+    if len(kept) < len(headers):
+        headers = [headers[ith] for ith in kept]
+        is_numeric = [is_numeric[ith] for ith in kept]
+        cells = [[row[ith] for ith in kept] for row in cells]
+
+    size = sum(len(header) + 3 for header in headers) + 6 * len(headers)
+    n_shown_rows = 0
+    for row in cells:
+        size += sum(len(cell) + 3 for cell in row) + 2
+        if size > max_chars and n_shown_rows >= 1:
+            break
+        n_shown_rows += 1
+    if n_shown_rows < len(cells):
+        cells = cells[:n_shown_rows]
+        report.n_shown_rows = n_shown_rows
+    return headers, cells, is_numeric, report
+
+
+def render_markdown_table_with_budget(
+    columns: T.Sequence[str],
+    rows: T.Sequence[T.Sequence[T.Any]],
+    max_chars: T.Optional[int] = None,
+    max_cell_chars: T.Optional[int] = None,
+    pad: bool = False,
+    report: T.Optional[BudgetReport] = None,
+) -> str:
+    """
+    Render rows as a Markdown pipe table that fits in ``max_chars``,
+    followed by a footer if anything was dropped.
+
+    :param columns: column names.
+    :param rows: rows, each row is a sequence of values in column order.
+    :param max_chars: the character budget of the table, None means unlimited.
+    :param max_cell_chars: the maximum number of characters per cell,
+        None means unlimited.
+    :param pad: if True, align the columns with padding.
+    :param report: if provided, filled with what was dropped, e.g. to know
+        how many rows were shown.
+    """
+    headers, cells, is_numeric = format_cells(columns, rows)
+    headers, cells, is_numeric, report = fit_cells(
+        headers,
+        cells,
+        is_numeric,
+        max_chars=max_chars,
+        max_cell_chars=max_cell_chars,
+        report=report,
+    )
+    text = join_table(headers, cells, is_numeric, pad=pad)
+    if report.is_lossless is False:
+        text = f"{text}\n{report.to_footer()}"
+    return text
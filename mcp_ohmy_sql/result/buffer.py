@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+"""
+Columnar query result buffer.
+
+Both execution paths (SQLAlchemy and Redshift) fetch rows in batches and
+append every batch to a :class:`ResultBuffer`, which converts it once into
+typed columns. With ``pyarrow`` installed (``pip install 'mcp_ohmy_sql[arrow]'``)
+the columns are Arrow arrays: no per-cell Python object is kept, cached
+results take a fraction of the memory and can be exported without a copy.
+Without ``pyarrow`` the buffer keeps plain Python lists. With it, a column
+stays a Python list when Arrow can't give its values back as they were
+fetched:
+
+- nested values, e.g. the dicts of a JSON column, Arrow infers a struct
+  from the keys of each batch and fills the missing keys with nulls;
+- ``Decimal`` values, Arrow gives them the largest scale of the batch,
+  ``Decimal('1.10')`` would come back as ``Decimal('1.100000000')``;
+- timezone-aware datetimes, Arrow converts them to the timezone of the
+  first value;
+- columns whose batches have different types, e.g. SQLite columns mixing
+  integers and text, no batch is cast to the type of another.
+
+The buffer is also a read-only sequence of row tuples, so every encoder in
+:mod:`mcp_ohmy_sql.result.formats` consumes it as it is.
+"""
+
+import typing as T
+import json
+
+from ..lazy_import import Library, pa
+
+#: number of rows fetched from the cursor at a time
+DEFAULT_BATCH_SIZE = 1000
+
+
+def is_arrow_available() -> bool:
+    """
+    Check whether ``pyarrow`` is installed.
+    """
+    return not isinstance(pa, Library)
+
+
+def is_exact_arrow_type(type_: "pa.DataType") -> bool:
+    """
+    Check whether the values of an Arrow type convert back to the Python
+    values they were built from, see the module docstring.
+    """
+    if pa.types.is_nested(type_) or pa.types.is_dictionary(type_):
+        return False
+    if pa.types.is_decimal(type_):
+        return False
+    if pa.types.is_timestamp(type_) and type_.tz is not None:
+        return False
+    return True
+
+
+def to_arrow_array(values: list[T.Any]) -> "pa.Array":
+    """
+    Convert the values of a Python column into an Arrow array. Nested values
+    are stored as JSON text, so a dict keeps its own keys.
+    """
+    if any(isinstance(value, (dict, list, tuple)) for value in values):
+        values = [
+            None if value is None else json.dumps(value, default=str)
+            for value in values
+        ]
+    return pa.array(values)
+
+
+class ResultBuffer:
+    """
+    Query result stored column by column, filled batch by batch.
+
+    :param columns: column names, duplicates are allowed.
+    :param use_arrow: store the columns as Arrow arrays if ``pyarrow``
+        is installed, except the columns Arrow can't store exactly.
+    """
+
+    def __init__(
+        self,
+        columns: T.Sequence[str],
+        use_arrow: bool = True,
+    ):
+        self.columns: list[str] = list(columns)
+        self.use_arrow: bool = use_arrow and is_arrow_available()
+        # the Arrow chunks of each column
+        self._chunks: list[list["pa.Array"]] = [[] for _ in self.columns]
+        # the values of each Python column, all columns without Arrow
+        self._values: list[list[T.Any]] = [[] for _ in self.columns]
+        self._is_python: list[bool] = [not self.use_arrow for _ in self.columns]
+        self._n_rows: int = 0
+        self._pylist_cache: T.Optional[list[list[T.Any]]] = None
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+    def __repr__(self) -> str:
+        mode = "arrow" if self.use_arrow else "python"
+        return (
+            f"ResultBuffer(columns={self.columns!r}, "
+            f"n_rows={self._n_rows}, mode={mode!r})"
+        )
+
+    def _get_column_type(self, ith: int) -> T.Optional["pa.DataType"]:
+        """
+        Get the type of the first non-null chunk of a column.
+        """
+        for chunk in self._chunks[ith]:
+            if not pa.types.is_null(chunk.type):
+                return chunk.type
+        return None
+
+    def is_arrow_column(self, ith: int) -> bool:
+        """
+        Check whether the ``ith`` column is stored as Arrow arrays.
+        """
+        return self._is_python[ith] is False
+
+    def _switch_to_python(self, ith: int):
+        """
+        Move an Arrow column to a plain Python list.
+        """
+        self._values[ith] = [
+            value for chunk in self._chunks[ith] for value in chunk.to_pylist()
+        ]
+        self._chunks[ith] = []
+        self._is_python[ith] = True
+
+    def _append_array(self, ith: int, values: T.Sequence[T.Any]) -> bool:
+        """
+        Append a batch of values to an Arrow column. Only all-null chunks are
+        cast, any other type change is refused.
+
+        :returns: False if the values can't be stored as Arrow.
+        """
+        try:
+            array = pa.array(values)
+        except Exception:
+            return False
+        if is_exact_arrow_type(array.type) is False:
+            return False
+        chunks = self._chunks[ith]
+        type_ = self._get_column_type(ith)
+        if type_ is None:
+            if not pa.types.is_null(array.type):
+                # earlier batches were all null, now we know the type
+                self._chunks[ith] = [chunk.cast(array.type) for chunk in chunks]
+        elif pa.types.is_null(array.type):
+            array = array.cast(type_)
+        elif array.type != type_:
+            return False
+        self._chunks[ith].append(array)
+        return True
+
+    def append_rows(self, rows: T.Sequence[T.Sequence[T.Any]]):
+        """
+        Append a batch of rows.
+        """
+        if len(rows) == 0:
+            return
+        for ith, values in enumerate(zip(*rows)):
+            if self._is_python[ith] is False:
+                if self._append_array(ith, values):
+                    continue
+                self._switch_to_python(ith)
+            self._values[ith].extend(values)
+        self._n_rows += len(rows)
+        self._pylist_cache = None
+
+    def _get_pylists(self) -> list[list[T.Any]]:
+        if self.use_arrow is False:
+            return self._values
+        if self._pylist_cache is None:
+            self._pylist_cache = [
+                values
+                if is_python
+                else [value for chunk in chunks for value in chunk.to_pylist()]
+                for chunks, values, is_python in zip(
+                    self._chunks, self._values, self._is_python
+                )
+            ]
+        return self._pylist_cache
+
+    def column_values(self, ith: int) -> list[T.Any]:
+        """
+        Get the Python values of the ``ith`` column.
+        """
+        return self._get_pylists()[ith]
+
+    def __iter__(self) -> T.Iterator[tuple]:
+        if len(self.columns) == 0:
+            return iter([])
+        return zip(*self._get_pylists())
+
+    def __getitem__(self, index: T.Union[int, slice]):
+        """
+        Get a row tuple by index, or a new buffer of the rows in a slice.
+        """
+        if isinstance(index, slice):
+            return self.slice(*index.indices(self._n_rows)[:2])
+        return tuple(values[index] for values in self._get_pylists())
+
+    def slice(self, start: int, stop: int) -> "ResultBuffer":
+        """
+        Get a new buffer of the rows from ``start`` to ``stop``, Arrow columns
+        are sliced without copying.
+        """
+        start = max(start, 0)
+        stop = min(max(stop, start), self._n_rows)
+        buffer = ResultBuffer(self.columns, use_arrow=self.use_arrow)
+        for ith, chunks in enumerate(self._chunks):
+            if self._is_python[ith]:
+                buffer._values[ith] = self._values[ith][start:stop]
+                buffer._is_python[ith] = True
+            else:
+                type_ = self._get_column_type(ith) or pa.null()
+                chunked = pa.chunked_array(chunks, type=type_)
+                buffer._chunks[ith] = chunked.slice(start, stop - start).chunks
+        buffer._n_rows = stop - start
+        return buffer
+
+    def to_arrow(self) -> "pa.Table":
+        """
+        Convert the buffer into a ``pyarrow.Table``, zero-copy for the Arrow
+        columns. The Python columns are converted with :func:`to_arrow_array`.
+
+        :raises ImportError: if ``pyarrow`` is not installed.
+        :raises pyarrow.ArrowException: if a Python column can't be
+            converted, e.g. SQLite columns mixing integers and text.
+        """
+        arrays = [
+            to_arrow_array(values)
+            if is_python
+            else pa.chunked_array(chunks, type=self._get_column_type(ith) or pa.null())
+            for ith, (chunks, values, is_python) in enumerate(
+                zip(self._chunks, self._values, self._is_python)
+            )
+        ]
+        return pa.Table.from_arrays(arrays, names=self.columns)
+
+
+def fill_result_buffer(
+    columns: T.Sequence[str],
+    fetchmany: T.Callable[[int], T.Sequence[T.Sequence[T.Any]]],
+    max_rows: T.Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    use_arrow: bool = True,
+) -> ResultBuffer:
+    """
+    Fetch rows from a cursor in batches into a new :class:`ResultBuffer`.
+
+    :param columns: column names.
+    :param fetchmany: the ``fetchmany`` method of the cursor or result.
+    :param max_rows: if provided, fetch at most ``max_rows + 1`` rows, so the
+        caller can tell whether the result was truncated.
+    :param batch_size: number of rows per fetch.
+    :param use_arrow: see :class:`ResultBuffer`.
+    """
+    buffer = ResultBuffer(columns, use_arrow=use_arrow)
+    limit = None if max_rows is None else max_rows + 1
+    while True:
+        size = batch_size if limit is None else min(batch_size, limit - len(buffer))
+        if size <= 0:
+            break
+        rows = fetchmany(size)
+        if not rows:
+            break
+        buffer.append_rows(rows)
+    return buffer
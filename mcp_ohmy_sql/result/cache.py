@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""
+In-memory cache of query results, see
+:class:`~mcp_ohmy_sql.config.define.ResultCacheSettings`.
+"""
+
+import typing as T
+import json
+import threading
+import dataclasses
+from collections import OrderedDict
+
+from .buffer import ResultBuffer
+
+
+@dataclasses.dataclass
+class CachedResult:
+    """
+    A cached query result.
+
+    :param database_identifier: the database the query ran on.
+    :param sql: the query, without the row limit, the incremental refresh
+        adds its predicate to it.
+    :param rows: the rows, up to ``settings.max_rows + 1``.
+    :param truncated: whether the query returned more than ``settings.max_rows``
+        rows.
+    :param created_at: when the query last ran in full.
+    :param refreshed_at: when the result was last computed or refreshed.
+    :param checked_at: when the result was last refreshed, or found still
+        valid by the table change probe.
+    :param incremental_key: the increasing key column of the table, None if
+        the result can't be refreshed incrementally.
+    :param high_water_mark: the largest value of the key in the rows.
+    :param n_refreshes: number of incremental refreshes since ``created_at``.
+    :param tables: the base tables the query reads, ``(schema, table)``,
+        None if they are unknown.
+    :param table_version: the version of the tables when the rows were
+        fetched, None if the database has no change probe.
+    """
+
+    database_identifier: str
+    sql: str
+    rows: ResultBuffer
+    truncated: bool
+    created_at: float
+    refreshed_at: float
+    checked_at: float
+    incremental_key: T.Optional[str] = None
+    high_water_mark: T.Any = None
+    n_refreshes: int = 0
+    tables: T.Optional[list[tuple[T.Optional[str], str]]] = None
+    table_version: T.Optional[tuple] = None
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of :class:`CachedResult`.
+
+    :param max_size: maximum number of cached results.
+    """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self._data: OrderedDict[tuple, CachedResult] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @staticmethod
+    def make_key(
+        database_identifier: str,
+        sql: str,
+        params: T.Optional[dict[str, T.Any]] = None,
+    ) -> tuple[str, str, str]:
+        """
+        Create the cache key of a query.
+        """
+        params_key = json.dumps(params or {}, sort_keys=True, default=str)
+        return (database_identifier, sql, params_key)
+
+    def get(self, key: tuple) -> T.Optional[CachedResult]:
+        with self._lock:
+            cached = self._data.get(key)
+            if cached is not None:
+                self._data.move_to_end(key)
+            return cached
+
+    def set(self, key: tuple, cached: CachedResult):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = cached
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
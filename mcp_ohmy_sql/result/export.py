@@ -0,0 +1,518 @@
+# -*- coding: utf-8 -*-
+
+"""
+Stream query results into local Parquet, CSV or JSON Lines files.
+
+Rows are read from an open cursor (see :class:`~mcp_ohmy_sql.cursor.OpenCursor`)
+``batch_size`` rows at a time and appended to the file, so the memory used
+doesn't grow with the number of rows. The file is written under a temporary
+name and renamed once complete, then a manifest
+``<file>.manifest.json`` records the columns, the number of rows and bytes,
+the SHA-256 of the file and the query.
+
+- Parquet: zstd compressed, one row group per ``row_group_rows`` rows,
+  requires ``pyarrow`` (``pip install 'mcp_ohmy_sql[arrow]'``).
+- CSV: gzip compressed, with a header line. NULL is an empty field.
+- JSON Lines: gzip compressed, one JSON object per row.
+
+The gzip header has no file name and no timestamp, the same rows always give
+the same file and the same checksum.
+
+Usage:
+
+>>> cursor = sa_api.open_select_cursor(engine, "SELECT * FROM Track")
+>>> try:
+...     manifest = export_cursor(cursor, path="/tmp/track.parquet", export_format="parquet")
+... finally:
+...     cursor.close()
+>>> manifest.n_rows, manifest.sha256
+(3503, '7d9f...')
+"""
+
+import typing as T
+import io
+import os
+import re
+import csv
+import gzip
+import json
+import time
+import base64
+import secrets
+import decimal
+import hashlib
+import datetime
+import dataclasses
+from pathlib import Path
+
+from ..constants import ExportFormatEnum
+from ..lazy_import import pa, pq
+from ..cursor import OpenCursor
+
+from .markdown import render_markdown_table
+
+#: number of rows fetched from the cursor at a time
+DEFAULT_EXPORT_BATCH_SIZE = 10_000
+
+#: number of rows per Parquet row group
+DEFAULT_ROW_GROUP_ROWS = 100_000
+
+_FILE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$")
+
+
+def _to_json_value(value: T.Any) -> T.Any:
+    """
+    Convert the values :mod:`json` can't serialize.
+    """
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    return str(value)
+
+
+def _to_csv_value(value: T.Any) -> T.Any:
+    if value is None:
+        return ""
+    if isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=_to_json_value)
+    return _to_json_value(value)
+
+
+def _open_gzip_text(path: Path) -> tuple[T.BinaryIO, io.TextIOWrapper]:
+    """
+    Open a gzip text file without file name and timestamp in its header.
+    """
+    raw = open(path, "wb")
+    gz = gzip.GzipFile(filename="", mode="wb", compresslevel=6, fileobj=raw, mtime=0)
+    return raw, io.TextIOWrapper(gz, encoding="utf-8", newline="")
+
+
+class ExportWriter:
+    """
+    Base class of the file writers, one per :class:`~mcp_ohmy_sql.constants.ExportFormatEnum`.
+
+    :param path: the file to write.
+    :param columns: column names.
+    """
+
+    ext: str = ""
+
+    def __init__(
+        self,
+        path: Path,
+        columns: list[str],
+    ):
+        self.path = path
+        self.columns = columns
+
+    def write_rows(self, rows: T.Sequence[tuple]):  # pragma: no cover
+        raise NotImplementedError
+
+    def close(self):  # pragma: no cover
+        raise NotImplementedError
+
+
+class CsvExportWriter(ExportWriter):
+    ext = ".csv.gz"
+
+    def __init__(
+        self,
+        path: Path,
+        columns: list[str],
+    ):
+        super().__init__(path, columns)
+        self._raw, self._file = _open_gzip_text(path)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write_rows(self, rows: T.Sequence[tuple]):
+        self._writer.writerows([[_to_csv_value(v) for v in row] for row in rows])
+
+    def close(self):
+        self._file.close()
+        self._raw.close()
+
+
+class JsonlExportWriter(ExportWriter):
+    ext = ".jsonl.gz"
+
+    def __init__(
+        self,
+        path: Path,
+        columns: list[str],
+    ):
+        super().__init__(path, columns)
+        self._raw, self._file = _open_gzip_text(path)
+
+    def write_rows(self, rows: T.Sequence[tuple]):
+        lines = [
+            json.dumps(
+                dict(zip(self.columns, row)),
+                ensure_ascii=False,
+                default=_to_json_value,
+            )
+            for row in rows
+        ]
+        if lines:
+            self._file.write("\n".join(lines) + "\n")
+
+    def close(self):
+        self._file.close()
+        self._raw.close()
+
+
+class ParquetExportWriter(ExportWriter):
+    """
+    The batches are kept in memory until there are ``row_group_rows`` rows,
+    then written as one row group. The column types are those of the first
+    row group, a column that is NULL in all its rows gets the type of the
+    first row group where it is not.
+
+    :param row_group_rows: number of rows per row group.
+    """
+
+    ext = ".parquet"
+
+    def __init__(
+        self,
+        path: Path,
+        columns: list[str],
+        row_group_rows: int = DEFAULT_ROW_GROUP_ROWS,
+    ):
+        super().__init__(path, columns)
+        self.row_group_rows = row_group_rows
+        self._pending: list["pa.Table"] = []
+        self._n_pending = 0
+        self._writer: T.Optional["pq.ParquetWriter"] = None
+
+    def write_rows(self, rows: T.Sequence[tuple]):
+        if len(rows) == 0:
+            return
+        try:
+            arrays = [pa.array(values) for values in zip(*rows)]
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(
+                f"A column mixes value types and can't be written to Parquet, "
+                f"export as csv or jsonl instead: {e}"
+            )
+        self._pending.append(pa.Table.from_arrays(arrays, names=self.columns))
+        self._n_pending += len(rows)
+        if self._n_pending >= self.row_group_rows:
+            self._flush()
+
+    def _flush(self):
+        if len(self._pending) == 0:
+            return
+        table = pa.concat_tables(self._pending, promote_options="default")
+        self._pending = []
+        self._n_pending = 0
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(
+                str(self.path), table.schema, compression="zstd"
+            )
+        else:
+            try:
+                table = table.cast(self._writer.schema)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+                raise ValueError(
+                    f"A column changes type between row groups and can't be "
+                    f"written to Parquet, export as csv or jsonl instead: {e}"
+                )
+        self._writer.write_table(table)
+
+    def close(self):
+        self._flush()
+        if self._writer is None:
+            # empty result, a valid file with the columns
+            schema = pa.schema([(column, pa.null()) for column in self.columns])
+            self._writer = pq.ParquetWriter(str(self.path), schema, compression="zstd")
+        self._writer.close()
+
+
+EXPORT_WRITERS: dict[str, T.Type[ExportWriter]] = {
+    ExportFormatEnum.PARQUET.value: ParquetExportWriter,
+    ExportFormatEnum.CSV.value: CsvExportWriter,
+    ExportFormatEnum.JSONL.value: JsonlExportWriter,
+}
+
+
+def get_export_writer_class(export_format: str) -> T.Type[ExportWriter]:
+    """
+    Get the writer class of an export format.
+
+    :raises ValueError: if the format is not supported.
+    """
+    try:
+        return EXPORT_WRITERS[export_format]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported export format {export_format!r}, "
+            f"choose one of: {', '.join(EXPORT_WRITERS)}"
+        )
+
+
+def new_export_file_name() -> str:
+    """
+    Generate a unique file name, e.g. ``export_20240101_120000_9f86d081``.
+    """
+    now = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"export_{now}_{secrets.token_hex(4)}"
+
+
+def _check_file_name(file_name: str):
+    if _FILE_NAME_PATTERN.match(file_name) is None or ".." in file_name:
+        raise ValueError(
+            f"Invalid file name {file_name!r}, use letters, digits, '_', '-' "
+            f"and '.' only"
+        )
+
+
+def get_export_path(
+    directory: T.Union[str, Path],
+    file_name: str,
+    export_format: str,
+) -> Path:
+    """
+    Get the path of an export file, the extension of the format is added
+    unless the file name already has it.
+
+    :raises ValueError: if the file name is not a plain file name, it must
+        never point outside the directory, or the file already exists.
+    """
+    ext = get_export_writer_class(export_format).ext
+    if file_name.endswith(ext):
+        file_name = file_name[: -len(ext)]
+    _check_file_name(file_name)
+    path = Path(directory).joinpath(f"{file_name}{ext}")
+    if path.exists():
+        raise ValueError(f"File {path} already exists, choose another file name")
+    return path
+
+
+def get_partitioned_export_dir(
+    directory: T.Union[str, Path],
+    file_name: str,
+) -> Path:
+    """
+    Get the directory of a partitioned export, it has one file per partition.
+
+    :raises ValueError: if the file name is not a plain file name, or the
+        directory already exists.
+    """
+    _check_file_name(file_name)
+    path = Path(directory).joinpath(file_name)
+    if path.exists():
+        raise ValueError(f"File {path} already exists, choose another file name")
+    return path
+
+
+def get_file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 of a file without loading it in memory.
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+@dataclasses.dataclass
+class ExportManifest:
+    """
+    Metadata of an exported file.
+
+    :param path: the exported file.
+    :param export_format: see :class:`~mcp_ohmy_sql.constants.ExportFormatEnum`.
+    :param columns: column names.
+    :param n_rows: number of rows in the file.
+    :param n_bytes: size of the file.
+    :param sha256: SHA-256 of the file.
+    :param truncated: True if the query returned more rows than the export
+        accepts, only the first ``n_rows`` rows are kept.
+    :param database_identifier: the database the query ran on.
+    :param sql: the query.
+    :param duration: number of seconds of the export.
+    :param created_at: when the export finished, ISO 8601.
+    """
+
+    path: str
+    export_format: str
+    columns: list[str]
+    n_rows: int
+    n_bytes: int
+    sha256: str
+    truncated: bool = False
+    database_identifier: str = ""
+    sql: str = ""
+    duration: float = 0.0
+    created_at: str = ""
+
+    @property
+    def manifest_path(self) -> Path:
+        return Path(f"{self.path}.manifest.json")
+
+    def write(self):
+        """
+        Write the manifest next to the exported file.
+        """
+        self.manifest_path.write_text(json.dumps(dataclasses.asdict(self), indent=4))
+
+    def to_summary(self) -> str:
+        """
+        Describe the export, one ``key: value`` per line.
+        """
+        n_rows = f"{self.n_rows}"
+        if self.truncated:
+            n_rows = f"{n_rows} (truncated, the query returned more rows)"
+        lines = [
+            f"path: {self.path}",
+            f"format: {self.export_format}",
+            f"rows: {n_rows}",
+            f"bytes: {self.n_bytes}",
+            f"sha256: {self.sha256}",
+            f"manifest: {self.manifest_path}",
+            f"seconds: {self.duration:.3f}",
+        ]
+        return "\n".join(lines)
+
+
+@dataclasses.dataclass
+class PartitionedExport:
+    """
+    Metadata of an export split by key range, one file per partition.
+
+    :param directory: the directory of the files.
+    :param export_format: see :class:`~mcp_ohmy_sql.constants.ExportFormatEnum`.
+    :param partition_key: the column the rows are split by.
+    :param parts: the manifest of each file, in key order.
+    :param database_identifier: the database the query ran on.
+    :param sql: the query.
+    :param duration: number of seconds of the export.
+    :param created_at: when the export finished, ISO 8601.
+    """
+
+    directory: str
+    export_format: str
+    partition_key: str
+    parts: list[ExportManifest]
+    database_identifier: str = ""
+    sql: str = ""
+    duration: float = 0.0
+    created_at: str = ""
+
+    @property
+    def n_rows(self) -> int:
+        return sum(part.n_rows for part in self.parts)
+
+    @property
+    def n_bytes(self) -> int:
+        return sum(part.n_bytes for part in self.parts)
+
+    @property
+    def manifest_path(self) -> Path:
+        return Path(self.directory).joinpath("_manifest.json")
+
+    def write(self):
+        """
+        Write the manifest of all the files into the directory.
+        """
+        data = dataclasses.asdict(self)
+        data["n_rows"] = self.n_rows
+        data["n_bytes"] = self.n_bytes
+        self.manifest_path.write_text(json.dumps(data, indent=4))
+
+    def to_summary(self) -> str:
+        """
+        Describe the export, one ``key: value`` per line, then the files.
+        """
+        lines = [
+            f"directory: {self.directory}",
+            f"format: {self.export_format}",
+            f"partition key: {self.partition_key}",
+            f"files: {len(self.parts)}",
+            f"rows: {self.n_rows}",
+            f"bytes: {self.n_bytes}",
+            f"manifest: {self.manifest_path}",
+            f"seconds: {self.duration:.3f}",
+            "",
+        ]
+        rows = [
+            (
+                Path(part.path).name,
+                part.n_rows,
+                part.n_bytes,
+                part.sha256,
+                f"{part.duration:.3f}",
+            )
+            for part in self.parts
+        ]
+        lines.append(
+            render_markdown_table(["file", "rows", "bytes", "sha256", "seconds"], rows)
+        )
+        return "\n".join(lines)
+
+
+def export_cursor(
+    cursor: OpenCursor,
+    path: T.Union[str, Path],
+    export_format: str = ExportFormatEnum.PARQUET.value,
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+    database_identifier: str = "",
+    sql: str = "",
+) -> ExportManifest:
+    """
+    Stream all rows of an open cursor into a file, up to the ``max_rows``
+    of the cursor, and write its manifest. The caller closes the cursor.
+
+    :param cursor: the open cursor.
+    :param path: the file to write, see :func:`get_export_path`.
+    :param export_format: see :class:`~mcp_ohmy_sql.constants.ExportFormatEnum`.
+    :param batch_size: number of rows fetched and written at a time.
+
+    :raises ValueError: if the format is not supported, or the rows can't be
+        written in this format. No file is left behind.
+    """
+    start_time = time.time()
+    writer_class = get_export_writer_class(export_format)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    writer = writer_class(tmp_path, cursor.columns)
+    n_rows = 0
+    try:
+        while True:
+            rows, has_more = cursor.fetch(batch_size)
+            writer.write_rows(rows)
+            n_rows += len(rows)
+            if has_more is False:
+                break
+        writer.close()
+    except Exception as e:
+        try:
+            writer.close()
+        except Exception:
+            pass
+        tmp_path.unlink(missing_ok=True)
+        raise e
+    os.replace(tmp_path, path)
+    manifest = ExportManifest(
+        path=str(path),
+        export_format=export_format,
+        columns=cursor.columns,
+        n_rows=n_rows,
+        n_bytes=path.stat().st_size,
+        sha256=get_file_sha256(path),
+        truncated=cursor.truncated,
+        database_identifier=database_identifier,
+        sql=sql,
+        duration=time.time() - start_time,
+        created_at=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    )
+    manifest.write()
+    return manifest
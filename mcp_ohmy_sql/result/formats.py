@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+
+"""
+Pluggable query result encoders.
+
+Markdown is the default, but it is not the cheapest format for every result:
+
+- ``csv`` / ``tsv``: one line per row with a typed header, e.g.
+  ``AlbumId:int,Title:str``. The cheapest for wide numeric results.
+- ``jsonl``: one JSON object per row, for programmatic clients that want
+  to parse the result without scraping Markdown. Every line is valid JSON,
+  what was dropped to fit the budget is in a last ``{"_meta": ...}`` line.
+- ``columnar``: one line per column, e.g. ``Title:str | Balls to the Wall | ...``.
+  Column names and types are written once, compact for results with
+  few rows and many columns.
+
+Every encoder has the signature of
+:func:`~mcp_ohmy_sql.result.budget.render_markdown_table_with_budget` and
+honors the same ``max_chars`` / ``max_cell_chars`` budget. Row oriented
+encoders write row by row and stop as soon as the budget is reached.
+Use :func:`register_encoder` to plug in a new format.
+"""
+
+import typing as T
+import io
+import inspect
+import csv
+import json
+import math
+import datetime
+import decimal
+
+from ..constants import LLMTypeEnum, ResultFormatEnum
+
+from .markdown import get_samples, format_cells
+from .budget import ELLIPSIS, BudgetReport, new_budget_report, fit_cells
+from .budget import render_markdown_table_with_budget
+
+T_ENCODER = T.Callable[..., str]
+
+PYTHON_TYPE_TO_LLM_TYPE_MAPPING: dict[type, LLMTypeEnum] = {
+    str: LLMTypeEnum.STR,
+    int: LLMTypeEnum.INT,
+    bool: LLMTypeEnum.BOOL,
+    float: LLMTypeEnum.FLOAT,
+    decimal.Decimal: LLMTypeEnum.DEC,
+    datetime.datetime: LLMTypeEnum.DT,
+    datetime.date: LLMTypeEnum.DATE,
+    datetime.time: LLMTypeEnum.TIME,
+    bytes: LLMTypeEnum.BIN,
+}
+
+
+def get_llm_type(sample: T.Any) -> str:
+    """
+    Get the :class:`~mcp_ohmy_sql.constants.LLMTypeEnum` value of a column
+    from a sample value, used in typed headers.
+    """
+    if sample is None:
+        return LLMTypeEnum.NULL.value
+    if isinstance(sample, datetime.datetime) and sample.tzinfo is not None:
+        return LLMTypeEnum.TS.value
+    llm_type = PYTHON_TYPE_TO_LLM_TYPE_MAPPING.get(type(sample))
+    if llm_type is None:
+        return LLMTypeEnum.STR.value
+    return llm_type.value
+
+
+def get_typed_headers(
+    columns: T.Sequence[str],
+    rows: T.Sequence[T.Sequence[T.Any]],
+) -> list[str]:
+    """
+    Get headers like ``AlbumId:int``.
+    """
+    samples = get_samples(len(columns), rows)
+    return [
+        f"{column}:{get_llm_type(sample)}" for column, sample in zip(columns, samples)
+    ]
+
+
+def to_text(value: T.Any) -> str:
+    """
+    Convert a value to its plain text form, without any escaping.
+    """
+    if value is None:
+        return ""
+    elif isinstance(value, str):
+        return value
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        return f"0x{bytes(value).hex()}"
+    else:
+        return str(value)
+
+
+def to_json_value(value: T.Any) -> T.Any:
+    """
+    Convert a value to a JSON serializable value. Decimals are kept exact as
+    strings, and so are NaN and infinite floats, which JSON can't represent.
+    """
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    elif isinstance(value, float):
+        return value if math.isfinite(value) else str(value)
+    elif isinstance(value, decimal.Decimal):
+        return str(value)
+    elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    else:
+        return to_text(value)
+
+
+def cap_text(
+    text: str,
+    max_cell_chars: T.Optional[int],
+) -> tuple[str, bool]:
+    """
+    Truncate the text to ``max_cell_chars``.
+
+    :returns: a tuple of (text, is_truncated).
+    """
+    if max_cell_chars is None or len(text) <= max_cell_chars:
+        return text, False
+    return text[: max(max_cell_chars - 1, 0)] + ELLIPSIS, True
+
+
+def join_lines_with_budget(
+    header_lines: list[str],
+    row_lines: T.Iterable[tuple[str, int]],
+    report: BudgetReport,
+    to_footer: T.Optional[T.Callable[[BudgetReport], str]] = None,
+) -> str:
+    """
+    Write the header lines then the row lines until the text reaches
+    ``report.max_chars``, at least one row is always written. The footer
+    is appended if anything was dropped.
+
+    :param header_lines: lines written before the rows.
+    :param row_lines: iterable of (line, number of truncated cells in the line),
+        consumed lazily.
+    :param report: the :class:`~mcp_ohmy_sql.result.budget.BudgetReport`
+        to fill, ``n_rows`` must be set.
+    :param to_footer: get the footer from the report, defaults to
+        :meth:`~mcp_ohmy_sql.result.budget.BudgetReport.to_footer`.
+    """
+    lines = list(header_lines)
+    size = sum(len(line) + 1 for line in lines)
+    n_shown_rows = 0
+    for line, n_truncated in row_lines:
+        size += len(line) + 1
+        if (
+            report.max_chars is not None
+            and size > report.max_chars
+            and n_shown_rows >= 1
+        ):
+            break
+        lines.append(line)
+        report.n_truncated_cells += n_truncated
+        n_shown_rows += 1
+    report.n_shown_rows = n_shown_rows
+    text = "\n".join(lines)
+    if report.is_lossless is False:
+        footer = report.to_footer() if to_footer is None else to_footer(report)
+        text = f"{text}\n{footer}"
+    return text
+
+
+def _encode_delimited(
+    columns: T.Sequence[str],
+    rows: T.Sequence[T.Sequence[T.Any]],
+    delimiter: str,
+    max_chars: T.Optional[int] = None,
+    max_cell_chars: T.Optional[int] = None,
+    report: T.Optional[BudgetReport] = None,
+) -> str:
+    """
+    Write rows one by one into a single buffer, the row that overflows
+    the budget is rolled back and the rest is never encoded.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator="\n")
+    writer.writerow(get_typed_headers(columns, rows))
+    report = new_budget_report(
+        report,
+        max_chars=max_chars,
+        max_cell_chars=max_cell_chars,
+        n_rows=len(rows),
+    )
+    n_shown_rows = 0
+    for row in rows:
+        values = [to_text(value) for value in row]
+        n_truncated = 0
+        if max_cell_chars is not None:
+            for ith, text in enumerate(values):
+                if len(text) > max_cell_chars:
+                    values[ith], _ = cap_text(text, max_cell_chars)
+                    n_truncated += 1
+        position = buffer.tell()
+        writer.writerow(values)
+        if max_chars is not None and buffer.tell() > max_chars and n_shown_rows >= 1:
+            buffer.seek(position)
+            buffer.truncate()
+            break
+        report.n_truncated_cells += n_truncated
+        n_shown_rows += 1
+    report.n_shown_rows = n_shown_rows
+    text = buffer.getvalue()[:-1]
+    if report.is_lossless is False:
+        text = f"{text}\n{report.to_footer()}"
+    return text
+
+
+def encode_csv(
+    columns: T.Sequence[str],
+    rows: T.Sequence[T.Sequence[T.Any]],
+    max_chars: T.Optional[int] = None,
+    max_cell_chars: T.Optional[int] = None,
+    pad: bool = False,
+    report: T.Optional[BudgetReport] = None,
+) -> str:
+    """
+    Encode rows as CSV with a typed header, e.g.::
+
+        AlbumId:int,Title:str
+        1,For Those About To Rock We Salute You
+    """
+    return _encode_delimited(
+        columns, rows, ",", max_chars, max_cell_chars, report=report
+    )
+
+
+def encode_tsv(
+    columns: T.Sequence[str],
+    rows: T.Sequence[T.Sequence[T.Any]],
+    max_chars: T.Optional[int] = None,
+    max_cell_chars: T.Optional[int] = None,
+    pad: bool = False,
+    report: T.Optional[BudgetReport] = None,
+) -> str:
+    """
+    Encode rows as TSV with a typed header, see :func:`encode_csv`.
+    """
+    return _encode_delimited(
+        columns, rows, "\t", max_chars, max_cell_chars, report=report
+    )
+
+
+def encode_jsonl(
+    columns: T.Sequence[str],
+    rows: T.Sequence[T.Sequence[T.Any]],
+    max_chars: T.Optional[int] = None,
+    max_cell_chars: T.Optional[int] = None,
+    pad: bool = False,
+    report: T.Optional[BudgetReport] = None,
+) -> str:
+    """
+    Encode rows as JSON Lines, one object per row, e.g.::
+
+        {"AlbumId": 1, "Title": "For Those About To Rock We Salute You"}
+
+    If rows or cells were dropped to fit the budget, the last line says so::
+
+        {"_meta": {"n_rows": 1000, "n_shown_rows": 120, "n_truncated_cells": 0, "note": "... (to fit the 40000 chars budget: showing 120 of 1000 rows)"}}
+    """
+    columns = list(columns)
+
+    def row_lines() -> T.Iterable[tuple[str, int]]:
+        for row in rows:
+            n_truncated = 0
+            values = list()
+            for value in row:
+                value = to_json_value(value)
+                if isinstance(value, str):
+                    value, is_truncated = cap_text(value, max_cell_chars)
+                    n_truncated += is_truncated
+                values.append(value)
+            line = json.dumps(
+                dict(zip(columns, values)),
+                ensure_ascii=False,
+                allow_nan=False,
+            )
+            yield line, n_truncated
+
+    def to_footer(report: BudgetReport) -> str:
+        meta = {
+            "n_rows": report.n_rows,
+            "n_shown_rows": report.n_shown_rows,
+            "n_truncated_cells": report.n_truncated_cells,
+            "note": report.to_footer(),
+        }
+        return json.dumps({"_meta": meta}, ensure_ascii=False)
+
+    report = new_budget_report(
+        report,
+        max_chars=max_chars,
+        max_cell_chars=max_cell_chars,
+        n_rows=len(rows),
+    )
+    return join_lines_with_budget([], row_lines(), report, to_footer=to_footer)
+
+
+def encode_columnar(
+    columns: T.Sequence[str],
+    rows: T.Sequence[T.Sequence[T.Any]],
+    max_chars: T.Optional[int] = None,
+    max_cell_chars: T.Optional[int] = None,
+    pad: bool = False,
+    report: T.Optional[BudgetReport] = None,
+) -> str:
+    """
+    Encode rows column by column, one line per column, e.g.::
+
+        AlbumId:int | 1 | 2
+        Title:str | For Those About To Rock We Salute You | Balls to the Wall
+
+    Oversized columns are elided and trailing rows are cut like the
+    Markdown table, see :func:`~mcp_ohmy_sql.result.budget.fit_cells`.
+    """
+    typed_headers = get_typed_headers(columns, rows)
+    _, cells, is_numeric = format_cells(columns, rows)
+    headers, cells, _, report = fit_cells(
+        typed_headers,
+        cells,
+        is_numeric,
+        max_chars=max_chars,
+        max_cell_chars=max_cell_chars,
+        report=report,
+    )
+    lines = [
+        " | ".join([header, *[row[ith] for row in cells]])
+        for ith, header in enumerate(headers)
+    ]
+    text = "\n".join(lines)
+    if report.is_lossless is False:
+        text = f"{text}\n{report.to_footer()}"
+    return text
+
+
+RESULT_ENCODERS: dict[str, T_ENCODER] = {
+    ResultFormatEnum.MARKDOWN.value: render_markdown_table_with_budget,
+    ResultFormatEnum.CSV.value: encode_csv,
+    ResultFormatEnum.TSV.value: encode_tsv,
+    ResultFormatEnum.JSONL.value: encode_jsonl,
+    ResultFormatEnum.COLUMNAR.value: encode_columnar,
+}
+"""
+Mapping from result format name to its encoder.
+"""
+
+
+def register_encoder(
+    result_format: str,
+    encoder: T_ENCODER,
+):
+    """
+    Register a new result format, or replace an existing one.
+
+    :param result_format: the format name, used in ``execute_select_statement``.
+    :param encoder: a function with the signature of :func:`encode_csv`.
+        If it has no ``report`` parameter, the paginated results assume that
+        it shows every row it is given.
+    """
+    RESULT_ENCODERS[result_format] = encoder
+
+
+def get_encoder(result_format: str) -> T_ENCODER:
+    """
+    Get the encoder of a result format.
+
+    :raises ValueError: if the format is unknown.
+    """
+    if isinstance(result_format, ResultFormatEnum):
+        result_format = result_format.value
+    try:
+        return RESULT_ENCODERS[result_format]
+    except KeyError:
+        raise ValueError(
+            f"Unknown result format {result_format!r}, "
+            f"supported formats: {', '.join(RESULT_ENCODERS)}"
+        )
+
+
+def encode_result(
+    columns: T.Sequence[str],
+    rows: T.Sequence[T.Sequence[T.Any]],
+    result_format: str = ResultFormatEnum.MARKDOWN.value,
+    max_chars: T.Optional[int] = None,
+    max_cell_chars: T.Optional[int] = None,
+    pad: bool = False,
+    report: T.Optional[BudgetReport] = None,
+) -> str:
+    """
+    Encode rows in the given format.
+
+    :param columns: column names.
+    :param rows: rows, each row is a sequence of values in column order.
+    :param result_format: :class:`~mcp_ohmy_sql.constants.ResultFormatEnum`
+        value, or a format added by :func:`register_encoder`.
+    :param max_chars: the character budget, None means unlimited.
+    :param max_cell_chars: the maximum number of characters per cell,
+        None means unlimited.
+    :param pad: if True, align the Markdown table with padding, ignored
+        by the other formats.
+    :param report: if provided, filled with what was dropped to fit the
+        budget, e.g. ``report.n_shown_rows`` is the number of rows shown.
+
+    :raises ValueError: if the format is unknown.
+    """
+    encoder = get_encoder(result_format)
+    kwargs = dict()
+    if report is not None:
+        new_budget_report(
+            report,
+            max_chars=max_chars,
+            max_cell_chars=max_cell_chars,
+            n_rows=len(rows),
+            n_shown_rows=len(rows),
+        )
+        if "report" in inspect.signature(encoder).parameters:
+            kwargs["report"] = report
+    return encoder(
+        columns,
+        rows,
+        max_chars=max_chars,
+        max_cell_chars=max_cell_chars,
+        pad=pad,
+        **kwargs,
+    )
@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+
+"""
+Spill large query results to local Arrow IPC files and page through them.
+
+A result that doesn't fit in one reply is written once into
+``<directory>/<handle>.arrow``, one record batch per page, as the rows are
+fetched, so only one page is held in memory. Pages are read back from the
+memory-mapped file without re-running the query, so paging through a
+million-row result costs one scan of the database, not one ``OFFSET`` scan
+per page.
+
+Arrow IPC (Feather v2) is used rather than Parquet because it can be memory
+mapped and sliced without decoding. Columns, page size and the query are
+stored in the schema metadata, the number of rows, only known at the end,
+in the metadata of the last record batch, so each file is self-describing
+and the store has no index to keep in sync. Old files are evicted by age
+and by total size every time a result is spilled.
+
+Requires ``pyarrow`` (``pip install 'mcp_ohmy_sql[arrow]'``).
+"""
+
+import typing as T
+import os
+import json
+import time
+import secrets
+import dataclasses
+from pathlib import Path
+
+from ..lazy_import import pa
+
+from .buffer import ResultBuffer
+
+#: file extension of spilled results
+SPILL_FILE_EXT = ".arrow"
+
+_METADATA_KEY = b"mcp_ohmy_sql"
+
+
+class ResultHandleNotFoundError(KeyError):
+    """
+    Raised when a result handle is invalid, or the file has been evicted.
+    """
+
+    def __str__(self) -> str:
+        return (
+            f"Result handle {self.args[0]!r} not found or expired, "
+            f"run the query again"
+        )
+
+
+@dataclasses.dataclass
+class SpilledResult:
+    """
+    Metadata of a spilled result.
+
+    :param handle: the id of the result, used by ``fetch_result_page``.
+    :param n_rows: number of rows in the file.
+    :param page_rows: number of rows per page.
+    :param truncated: True if the query returned more rows than the store
+        accepts, only the first ``n_rows`` rows are kept.
+    :param database_identifier: the database the query ran on.
+    :param sql: the query.
+    """
+
+    handle: str
+    n_rows: int
+    page_rows: int
+    truncated: bool = False
+    database_identifier: str = ""
+    sql: str = ""
+
+    @property
+    def n_pages(self) -> int:
+        return max((self.n_rows + self.page_rows - 1) // self.page_rows, 1)
+
+    def get_page_range(self, page: int) -> tuple[int, int]:
+        """
+        Get the ``(start, stop)`` row indexes of a 1-based page number.
+        """
+        start = (page - 1) * self.page_rows
+        return start, min(start + self.page_rows, self.n_rows)
+
+
+@dataclasses.dataclass
+class ResultPage:
+    """
+    One page of a spilled result.
+
+    :param result: the spilled result metadata.
+    :param page: the 1-based page number.
+    :param columns: column names.
+    :param rows: row tuples of this page.
+    """
+
+    result: SpilledResult
+    page: int
+    columns: list[str]
+    rows: list[tuple]
+
+    def to_header(self) -> str:
+        """
+        Describe where this page is in the result, e.g.
+        ``page 2 of 50 (rows 101-200 of 4975), handle: 9f86d081884c7d65``.
+        """
+        start, stop = self.result.get_page_range(self.page)
+        n_rows = f"{self.result.n_rows}"
+        if self.result.truncated:
+            n_rows = f"{n_rows}+ (truncated)"
+        return (
+            f"page {self.page} of {self.result.n_pages} "
+            f"(rows {start + 1}-{stop} of {n_rows}), handle: {self.result.handle}"
+        )
+
+
+class SpillWriter:
+    """
+    Write a result into a new spill file page by page, created by
+    :meth:`SpillStore.new_writer`. The file shows up in the store once
+    :meth:`close` succeeds, :meth:`abort` deletes it.
+
+    The Arrow type of a column is taken from the first page that has a non
+    null value in it, the pages are held until every type is known.
+
+    :param store: the store that owns the file.
+    :param result: the metadata of the result, ``n_rows`` grows as pages
+        are written.
+    :param columns: column names.
+    """
+
+    def __init__(
+        self,
+        store: "SpillStore",
+        result: SpilledResult,
+        columns: list[str],
+    ):
+        self.store = store
+        self.result = result
+        self.columns = columns
+        self.path = store.get_path(result.handle)
+        self.tmp_path = self.path.with_suffix(".tmp")
+        self._schema: T.Optional["pa.Schema"] = None
+        self._sink = None
+        self._writer = None
+        # pages not written yet, the last one is written by close()
+        self._pending: list["pa.Table"] = []
+
+    def _get_schema(self) -> "pa.Schema":
+        """
+        Get the schema of the pending pages, a column has the null type
+        until one of them has a value in it.
+        """
+        fields = list(self._pending[0].schema)
+        for table in self._pending[1:]:
+            for ith, field in enumerate(table.schema):
+                if pa.types.is_null(fields[ith].type):
+                    fields[ith] = field
+        # duplicated column names are allowed in the buffer, but not in the
+        # metadata we read back, so they are stored separately
+        metadata = dataclasses.asdict(self.result)
+        metadata["columns"] = self.columns
+        return pa.schema(fields).with_metadata(
+            {_METADATA_KEY: json.dumps(metadata).encode("utf-8")}
+        )
+
+    def _flush(self, n_kept: int):
+        """
+        Write the pending pages but the last ``n_kept`` ones.
+        """
+        if self._writer is None:
+            self._schema = self._get_schema()
+            self.store.directory.mkdir(parents=True, exist_ok=True)
+            self._sink = pa.OSFile(str(self.tmp_path), "wb")
+            self._writer = pa.ipc.new_file(self._sink, self._schema)
+        while len(self._pending) > n_kept:
+            self._write(self._pending.pop(0))
+
+    def _write(self, table: "pa.Table", custom_metadata=None):
+        if table.num_rows:
+            batch = table.cast(self._schema).combine_chunks().to_batches()[0]
+        else:
+            batch = pa.record_batch(
+                [pa.array([], type=field.type) for field in self._schema],
+                schema=self._schema,
+            )
+        self._writer.write_batch(batch, custom_metadata=custom_metadata)
+
+    def write_page(
+        self,
+        rows: T.Union[ResultBuffer, T.Sequence[T.Sequence[T.Any]]],
+    ):
+        """
+        Write the next ``page_rows`` rows, only the last page can be shorter.
+
+        :raises pyarrow.ArrowException: if the rows can't be converted to
+            the Arrow types of the columns, e.g. SQLite columns mixing
+            integers and text.
+        """
+        if isinstance(rows, ResultBuffer):
+            buffer = rows
+        else:
+            buffer = ResultBuffer(self.columns)
+            buffer.append_rows(rows)
+        self._pending.append(buffer.to_arrow())
+        self.result.n_rows += len(buffer)
+        if self._writer is None and any(
+            pa.types.is_null(field.type) for field in self._get_schema()
+        ):
+            return
+        self._flush(n_kept=1)
+
+    def close(self, truncated: bool = False) -> SpilledResult:
+        """
+        Write the last page and move the file into the store.
+
+        :param truncated: see :class:`SpilledResult`.
+        """
+        self.result.truncated = truncated
+        try:
+            if len(self._pending) == 0:
+                self._pending.append(ResultBuffer(self.columns).to_arrow())
+            self._flush(n_kept=1)
+            metadata = {"n_rows": self.result.n_rows, "truncated": truncated}
+            self._write(
+                self._pending.pop(0),
+                custom_metadata={_METADATA_KEY: json.dumps(metadata).encode("utf-8")},
+            )
+            self._writer.close()
+            self._sink.close()
+        except Exception as e:
+            self.abort()
+            raise e
+        self.store.evict(reserve_bytes=self.tmp_path.stat().st_size)
+        os.replace(self.tmp_path, self.path)
+        return self.result
+
+    def abort(self):
+        """
+        Delete the partially written file, it is safe to call it more than once.
+        """
+        self._pending = []
+        for resource in [self._writer, self._sink]:
+            if resource is not None:
+                try:
+                    resource.close()
+                except Exception:  # pragma: no cover
+                    pass
+        self._writer = None
+        self._sink = None
+        try:
+            self.tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SpillStore:
+    """
+    Directory of spilled query results.
+
+    :param directory: where the files are written, created on demand.
+    :param max_age: number of seconds a spilled result is kept.
+    :param max_total_bytes: maximum total size of the directory, the oldest
+        results are evicted first.
+    """
+
+    def __init__(
+        self,
+        directory: T.Union[str, Path],
+        max_age: int = 3600,
+        max_total_bytes: int = 1_000_000_000,
+    ):
+        self.directory = Path(directory)
+        self.max_age = max_age
+        self.max_total_bytes = max_total_bytes
+
+    def get_path(self, handle: str) -> Path:
+        """
+        Get the file path of a handle.
+
+        :raises ResultHandleNotFoundError: if the handle is malformed, it
+            must never point outside the directory.
+        """
+        if not (handle and handle.isalnum() and handle.isascii()):
+            raise ResultHandleNotFoundError(handle)
+        return self.directory.joinpath(f"{handle}{SPILL_FILE_EXT}")
+
+    def list_files(self) -> list[tuple[Path, float, int]]:
+        """
+        List ``(path, mtime, size)`` of the spilled results, oldest first.
+        """
+        if self.directory.exists() is False:
+            return []
+        files = list()
+        for path in self.directory.glob(f"*{SPILL_FILE_EXT}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # pragma: no cover
+                continue
+            files.append((path, stat.st_mtime, stat.st_size))
+        files.sort(key=lambda x: x[1])
+        return files
+
+    def exists(self, handle: str) -> bool:
+        """
+        Check whether a spilled result is still there, it may have been
+        evicted.
+        """
+        return self.get_path(handle).exists()
+
+    def evict(self, reserve_bytes: int = 0) -> list[Path]:
+        """
+        Delete expired results, then the oldest results until the total size
+        plus ``reserve_bytes`` fits in ``max_total_bytes``.
+
+        :returns: the deleted paths.
+        """
+        now = time.time()
+        files = self.list_files()
+        total = sum(size for _, _, size in files) + reserve_bytes
+        deleted = list()
+        for path, mtime, size in files:
+            if now - mtime <= self.max_age and total <= self.max_total_bytes:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:  # pragma: no cover
+                pass
+            total -= size
+            deleted.append(path)
+        return deleted
+
+    def new_writer(
+        self,
+        columns: list[str],
+        page_rows: int,
+        database_identifier: str = "",
+        sql: str = "",
+    ) -> SpillWriter:
+        """
+        Start a new spilled result, written page by page with a
+        :class:`SpillWriter`.
+        """
+        result = SpilledResult(
+            handle=secrets.token_hex(8),
+            n_rows=0,
+            page_rows=page_rows,
+            database_identifier=database_identifier,
+            sql=sql,
+        )
+        return SpillWriter(store=self, result=result, columns=list(columns))
+
+    def put(
+        self,
+        buffer: ResultBuffer,
+        page_rows: int,
+        truncated: bool = False,
+        database_identifier: str = "",
+        sql: str = "",
+    ) -> SpilledResult:
+        """
+        Write a result buffer into a new file, one record batch per page.
+
+        :raises ImportError: if ``pyarrow`` is not installed.
+        :raises pyarrow.ArrowException: if the columns can't be converted
+            to Arrow, e.g. SQLite columns mixing integers and text.
+        """
+        writer = self.new_writer(
+            columns=buffer.columns,
+            page_rows=page_rows,
+            database_identifier=database_identifier,
+            sql=sql,
+        )
+        try:
+            for start in range(0, len(buffer), page_rows):
+                writer.write_page(buffer[start : start + page_rows])
+        except Exception as e:
+            writer.abort()
+            raise e
+        return writer.close(truncated=truncated)
+
+    def get_page(
+        self,
+        handle: str,
+        page: int,
+    ) -> ResultPage:
+        """
+        Read one page of a spilled result from the memory-mapped file.
+
+        :param handle: the handle returned by :meth:`put`.
+        :param page: the 1-based page number.
+
+        :raises ResultHandleNotFoundError: if the result doesn't exist.
+        :raises IndexError: if the page is out of range.
+        """
+        path = self.get_path(handle)
+        if path.exists() is False:
+            raise ResultHandleNotFoundError(handle)
+        with pa.memory_map(str(path), "r") as source:
+            reader = pa.ipc.open_file(source)
+            metadata = json.loads(reader.schema.metadata[_METADATA_KEY])
+            columns = metadata.pop("columns")
+            # the number of rows is in the metadata of the last page
+            _, last_metadata = reader.get_batch_with_custom_metadata(
+                reader.num_record_batches - 1
+            )
+            metadata.update(json.loads(last_metadata[_METADATA_KEY]))
+            result = SpilledResult(**metadata)
+            if not (1 <= page <= result.n_pages):
+                raise IndexError(
+                    f"Page {page} is out of range, the result has "
+                    f"{result.n_pages} pages"
+                )
+            # every page is one record batch
+            table = pa.Table.from_batches([reader.get_batch(page - 1)])
+            rows = list(zip(*[column.to_pylist() for column in table.columns]))
+        return ResultPage(result=result, page=page, columns=columns, rows=rows)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""
+Per-column profile of a query result, computed by the database, see
+:mod:`mcp_ohmy_sql.rewrite.summarize`.
+"""
+
+import typing as T
+import dataclasses
+
+from ..constants import ResultFormatEnum
+from ..rewrite.summarize import QUANTILES, get_summary_stats, get_summary_alias
+
+from .formats import encode_result
+
+#: the profile table columns, in order
+_PROFILE_COLUMNS = [
+    "column",
+    "type",
+    "null_ratio",
+    "distinct",
+    "min",
+    "max",
+    "mean",
+    *[f"p{round(quantile * 100)}" for quantile in QUANTILES],
+    "top_values",
+]
+
+
+def _round(value: T.Any) -> T.Any:
+    if isinstance(value, float):
+        return float(f"{value:.6g}")
+    return value
+
+
+@dataclasses.dataclass
+class ColumnProfile:
+    """
+    The profile of one column of a query result.
+
+    :param name: the column name.
+    :param kind: see :func:`~mcp_ohmy_sql.rewrite.summarize.get_column_kind`.
+    :param stats: the statistics computed by the database, by name, e.g.
+        ``{"non_null": 3490, "distinct": 3257, "min": ..., "p50": ...}``.
+    :param top_values: the most frequent values as text and their count.
+    """
+
+    name: str
+    kind: str
+    stats: dict[str, T.Any] = dataclasses.field(default_factory=dict)
+    top_values: T.Optional[list[tuple[str, int]]] = None
+
+    def to_row(self, n_rows: int) -> dict[str, T.Any]:
+        """
+        Get the cells of the column in the profile table.
+        """
+        row = {"column": self.name, "type": self.kind}
+        non_null = self.stats.get("non_null")
+        if non_null is not None and n_rows > 0:
+            row["null_ratio"] = round(1 - non_null / n_rows, 4)
+        for stat, value in self.stats.items():
+            if stat != "non_null":
+                row[stat] = _round(value)
+        if self.top_values:
+            row["top_values"] = ", ".join(
+                f"{value} ({count})" for value, count in self.top_values
+            )
+        return row
+
+
+def new_column_profiles(
+    columns: list[tuple[str, str]],
+    db_type: str,
+    summary: dict[str, T.Any],
+    quantiles: bool = True,
+) -> list[ColumnProfile]:
+    """
+    Create the profile of each column from the row of the summary query,
+    see :func:`~mcp_ohmy_sql.rewrite.summarize.get_summary_sql`.
+
+    :param columns: the ``(name, kind)`` of each column of the result.
+    :param summary: the summary row, by lower case column name, some
+        databases return upper case names.
+    """
+    profiles = list()
+    for ith, (name, kind) in enumerate(columns):
+        stats = dict()
+        for stat in get_summary_stats(kind, db_type, quantiles=quantiles):
+            stats[stat] = summary.get(get_summary_alias(ith, stat))
+        profiles.append(ColumnProfile(name=name, kind=kind, stats=stats))
+    return profiles
+
+
+def encode_summary(
+    n_rows: int,
+    profiles: list[ColumnProfile],
+    result_format: str = ResultFormatEnum.MARKDOWN.value,
+    max_chars: T.Optional[int] = None,
+    max_cell_chars: T.Optional[int] = None,
+) -> str:
+    """
+    Encode the profiles as a table with one row per column of the result.
+    The statistics no column has (e.g. quantiles on SQLite) are left out.
+    """
+    rows = [profile.to_row(n_rows) for profile in profiles]
+    columns = [
+        column
+        for column in _PROFILE_COLUMNS
+        if any(row.get(column) is not None for row in rows)
+    ]
+    return encode_result(
+        columns=columns,
+        rows=[[row.get(column) for column in columns] for row in rows],
+        result_format=result_format,
+        max_chars=max_chars,
+        max_cell_chars=max_cell_chars,
+    )
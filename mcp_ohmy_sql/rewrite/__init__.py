@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+"""
+SQL rewriting tools based on the `sqlglot <https://github.com/tobymao/sqlglot>`_ AST.
+"""
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+from .dialect import DB_TYPE_TO_SQLGLOT_DIALECT_MAPPING
+from .dialect import get_sqlglot_dialect
+from .parser import parse_sql
+from .parser import generate_sql
+from .parser import normalize_sql
+from .limit import get_row_limit
+from .limit import add_row_limit
+from .truncate import T_COLUMN_INDEX
+from .truncate import get_large_value_kind
+from .truncate import new_column_index
+from .truncate import wrap_large_value
+from .truncate import truncate_large_values
+from .partition import PartitionKey
+from .partition import T_PARTITION_KEY_INDEX
+from .partition import new_partition_key_index
+from .partition import find_partition_key
+from .partition import get_key_range_sql
+from .partition import split_key_range
+from .partition import get_partition_sqls
+from .incremental import get_incremental_key_hint
+from .incremental import find_incremental_key
+from .incremental import get_high_water_mark
+from .incremental import get_incremental_sql
+from .tables import T_TABLE
+from .tables import T_TABLE_INDEX
+from .tables import new_table_index
+from .tables import get_source_tables
+from .summarize import QUANTILES
+from .summarize import get_column_kind
+from .summarize import get_summary_stats
+from .summarize import has_quantiles
+from .summarize import is_distinct_approximate
+from .summarize import get_summary_alias
+from .summarize import get_summary_sql
+from .summarize import get_top_values_sql
+from .sample import get_sample_predicate
+from .sample import add_table_sample
+from .sample import get_table_sample_sql
+from .sample import get_sample_method
+from .sample import ApproximateQuery
+from .sample import get_approximate_sql
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+"""
+Mapping between :class:`~mcp_ohmy_sql.constants.DbTypeEnum` and sqlglot dialects.
+"""
+
+import typing as T
+
+from ..constants import DbTypeEnum
+
+DB_TYPE_TO_SQLGLOT_DIALECT_MAPPING: dict[str, str] = {
+    DbTypeEnum.SQLITE.value: "sqlite",
+    DbTypeEnum.POSTGRESQL.value: "postgres",
+    DbTypeEnum.MYSQL.value: "mysql",
+    DbTypeEnum.MSSQL.value: "tsql",
+    DbTypeEnum.ORACLE.value: "oracle",
+    DbTypeEnum.AWS_REDSHIFT.value: "redshift",
+    DbTypeEnum.SNOWFLAKE.value: "snowflake",
+}
+
+
+def get_sqlglot_dialect(db_type: T.Union[str, DbTypeEnum]) -> T.Optional[str]:
+    """
+    Get the sqlglot dialect name of a database type.
+
+    :param db_type: :class:`~mcp_ohmy_sql.constants.DbTypeEnum` or its value.
+
+    :returns: the sqlglot dialect name, or None if the database type doesn't
+        have a SQL dialect that sqlglot understands.
+    """
+    return DB_TYPE_TO_SQLGLOT_DIALECT_MAPPING.get(DbTypeEnum.ensure_str(db_type))
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fetch only the rows appended to a table since a cached result.
+
+Dashboard-style queries (e.g. "the latest orders") are polled again and
+again on append-only tables. If the table has an increasing key, the rows
+of a cached result are still valid, only the rows from its largest key, the
+high-water mark, on need to be fetched. They replace the rows of the cached
+result with that key, so rows inserted later with the same key value, e.g.
+the same timestamp, are not lost:
+
+>>> find_incremental_key("SELECT * FROM Invoice WHERE Total > 5", "sqlite", key_index)
+'InvoiceId'
+>>> get_incremental_sql("SELECT * FROM Invoice WHERE Total > 5", "sqlite", "InvoiceId", 412)
+'SELECT * FROM Invoice WHERE Total > 5 AND ("InvoiceId" >= 412)'
+
+The key is the column named by an ``incremental_key`` comment in the query,
+e.g. ``SELECT * FROM orders /* incremental_key: order_id */``, or else the
+non-nullable partition key of a table declared append-only, see
+:func:`~mcp_ohmy_sql.rewrite.partition.new_partition_key_index`. A primary
+key alone doesn't make a table append-only, its rows may be updated or
+deleted. Like for partitioning, only a plain
+``SELECT ... FROM table [WHERE ...]`` can be refreshed incrementally.
+"""
+
+import typing as T
+import re
+import decimal
+import datetime
+
+from sqlglot import exp
+
+from ..constants import DbTypeEnum
+
+from .parser import generate_sql
+from .partition import T_PARTITION_KEY_INDEX
+from .partition import _parse_select, _get_single_table, _get_table_key, _to_literal
+
+_ACTION = "refreshed incrementally"
+
+_INCREMENTAL_KEY_HINT_PATTERN = re.compile(
+    r"(?:--|/\*)\s*incremental_key\s*[:=]\s*[\"`\[]?([A-Za-z_][\w$]*)",
+    re.IGNORECASE,
+)
+
+
+def get_incremental_key_hint(sql: str) -> T.Optional[str]:
+    """
+    Get the column of an ``incremental_key`` comment, e.g.
+    ``-- incremental_key: order_id`` or ``/* incremental_key=order_id */``.
+    """
+    match = _INCREMENTAL_KEY_HINT_PATTERN.search(sql)
+    if match is None:
+        return None
+    return match.group(1)
+
+
+def find_incremental_key(
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+    key_index: T.Optional[T_PARTITION_KEY_INDEX] = None,
+) -> str:
+    """
+    Find the increasing key column of the table a SELECT statement reads.
+
+    :param key_index: the partition keys of the tables declared append-only,
+        used when the query has no ``incremental_key`` comment.
+
+    :raises ValueError: if the query is not a plain single table SELECT, or
+        no key is given and the table is not declared append-only with a
+        non-nullable numeric or date key. The message says why.
+    """
+    _, ast = _parse_select(sql, db_type, action=_ACTION)
+    table = _get_single_table(ast, action=_ACTION)
+    hint = get_incremental_key_hint(sql)
+    if hint is not None:
+        return hint
+    key = (key_index or {}).get(_get_table_key(table))
+    if key is None:
+        raise ValueError(
+            f"table {table.sql()} is not declared append-only with a numeric or "
+            f"date primary key or sort key, add an incremental_key comment to "
+            f"the query"
+        )
+    if key.nullable:
+        raise ValueError(f"the key {key.column} of table {table.sql()} may be NULL")
+    return key.column
+
+
+def get_high_water_mark(values: T.Iterable[T.Any]) -> T.Any:
+    """
+    Get the largest non-null key value of a result, None if there is none.
+
+    :raises ValueError: if the values can't be compared.
+    """
+    try:
+        return max((value for value in values if value is not None), default=None)
+    except TypeError:
+        raise ValueError("the key values can't be compared")
+
+
+def _to_high_water_mark_literal(
+    value: T.Any,
+    db_type: T.Union[str, DbTypeEnum],
+) -> exp.Expression:
+    if isinstance(value, bool):
+        raise ValueError(f"{value!r} can't be a high-water mark")
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return _to_literal(value, "number", db_type)
+    if isinstance(value, datetime.datetime):
+        return _to_literal(value, "datetime", db_type)
+    if isinstance(value, datetime.date):
+        return _to_literal(value, "date", db_type)
+    if isinstance(value, str):
+        return exp.Literal.string(value)
+    raise ValueError(f"{value!r} can't be a high-water mark")
+
+
+def get_incremental_sql(
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+    column: str,
+    high_water_mark: T.Any,
+    named_params: bool = True,
+) -> str:
+    """
+    Get the query of the rows from the high-water mark on,
+    ``... AND (key >= high_water_mark)``.
+
+    :raises ValueError: if the query is not a plain single table SELECT, or
+        the high-water mark is not a number, a date or a string.
+    """
+    dialect, ast = _parse_select(sql, db_type, action=_ACTION)
+    _get_single_table(ast, action=_ACTION)
+    predicate = exp.GTE(
+        this=exp.column(exp.to_identifier(column, quoted=True)),
+        expression=_to_high_water_mark_literal(high_water_mark, db_type),
+    )
+    query = ast.where(exp.paren(predicate), copy=False)
+    return generate_sql(query, dialect=dialect, named_params=named_params)
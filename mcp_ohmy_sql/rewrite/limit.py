@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+"""
+Push the row limit down to the database.
+
+Without a LIMIT, the database computes and ships the full result just for us
+to truncate it. This module injects a dialect-correct ``LIMIT`` / ``TOP`` /
+``FETCH FIRST`` into the query so the row cap is enforced by the database.
+"""
+
+import typing as T
+
+from sqlglot import exp
+
+from ..constants import DbTypeEnum
+
+from .dialect import get_sqlglot_dialect
+from .parser import parse_sql, generate_sql
+
+
+def get_row_limit(ast: exp.Expression) -> T.Optional[int]:
+    """
+    Get the literal row limit of the outermost query.
+
+    :returns: the limit, -1 if the query has a limit that is not a plain integer
+        literal (e.g. a bind parameter or ``TOP 50 PERCENT``), or None if
+        the query has no limit.
+    """
+    limit = ast.args.get("limit")
+    if limit is None:
+        return None
+    if isinstance(limit, exp.Fetch):
+        count = limit.args.get("count")
+    else:
+        count = limit.expression
+    limit_options = limit.args.get("limit_options")
+    if limit_options is not None and limit_options.args.get("percent"):
+        return -1
+    if isinstance(count, exp.Literal) and count.is_int:
+        return int(count.name)
+    return -1
+
+
+def add_row_limit(
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+    limit: int,
+    named_params: bool = True,
+) -> str:
+    """
+    Make sure the query returns at most ``limit`` rows.
+
+    - No limit: inject one.
+    - Existing limit larger than ``limit``: lower it.
+    - Existing limit smaller or equal: leave the query alone.
+
+    If the query cannot be parsed, or the existing limit is not a literal,
+    the original SQL is returned unchanged, the caller is expected to
+    cap the number of fetched rows anyway.
+
+    :param sql: the SELECT statement.
+    :param db_type: :class:`~mcp_ohmy_sql.constants.DbTypeEnum` of the target database.
+    :param limit: maximum number of rows.
+    :param named_params: see :func:`~mcp_ohmy_sql.rewrite.parser.generate_sql`.
+
+    :returns: the rewritten SQL.
+
+    Example:
+
+        >>> add_row_limit("SELECT * FROM t", DbTypeEnum.MSSQL, 101)
+        'SELECT TOP 101 * FROM t'
+    """
+    dialect = get_sqlglot_dialect(db_type)
+    if dialect is None:  # pragma: no cover
+        return sql
+    ast = parse_sql(sql, dialect)
+    if not isinstance(ast, exp.Query):
+        return sql
+    existing_limit = get_row_limit(ast)
+    if existing_limit is not None:
+        if existing_limit == -1 or existing_limit <= limit:
+            return sql
+    ast = ast.limit(limit, copy=False)
+    return generate_sql(ast, dialect, named_params=named_params)
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""
+Parse SQL into sqlglot AST and generate SQL back from it.
+"""
+
+import typing as T
+import re
+import functools
+
+import sqlglot
+import sqlglot.errors
+from sqlglot import exp
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_sql(
+    sql: str,
+    dialect: T.Optional[str],
+) -> T.Optional[exp.Expression]:
+    try:
+        statements = [
+            statement
+            for statement in sqlglot.parse(sql, read=dialect)
+            if statement is not None
+        ]
+    except sqlglot.errors.SqlglotError:
+        return None
+    # we only rewrite single statement
+    if len(statements) != 1:
+        return None
+    return statements[0]
+
+
+def parse_sql(
+    sql: str,
+    dialect: T.Optional[str],
+) -> T.Optional[exp.Expression]:
+    """
+    Parse a single SQL statement into a sqlglot AST.
+
+    Parsed ASTs are cached by the hash of ``(sql, dialect)``, agents tend to
+    send the same query again and again. A copy is returned so the caller
+    is free to mutate it.
+
+    :param sql: the SQL statement.
+    :param dialect: sqlglot dialect name, see
+        :func:`~mcp_ohmy_sql.rewrite.dialect.get_sqlglot_dialect`.
+
+    :returns: the AST, or None if the SQL cannot be parsed or contains
+        more than one statement.
+    """
+    ast = _parse_sql(sql, dialect)
+    if ast is None:
+        return None
+    return ast.copy()
+
+
+def to_named_placeholder(node: exp.Expression) -> exp.Expression:
+    """
+    Render named placeholders as ``:name``, which is what ``sqlalchemy.text()``
+    expects, regardless of the dialect's native param style.
+    """
+    if isinstance(node, exp.Placeholder) and node.name:
+        return exp.Var(this=f":{node.name}")
+    return node
+
+
+def generate_sql(
+    ast: exp.Expression,
+    dialect: T.Optional[str],
+    named_params: bool = True,
+) -> str:
+    """
+    Generate SQL from a sqlglot AST.
+
+    :param ast: the AST.
+    :param dialect: sqlglot dialect name.
+    :param named_params: if True, keep named placeholders in ``:name`` style
+        for ``sqlalchemy.text()``. Otherwise, use the dialect's param style,
+        e.g. ``%(name)s`` for Redshift.
+    """
+    if named_params:
+        ast = ast.transform(to_named_placeholder)
+    return ast.sql(dialect=dialect)
+
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_sql(
+    sql: str,
+    dialect: T.Optional[str],
+) -> str:
+    """
+    Normalize a SQL statement so that queries that only differ in whitespace,
+    keyword case or trailing semicolon share the same cache key.
+
+    :param sql: the SQL statement.
+    :param dialect: sqlglot dialect name.
+
+    :returns: the canonical SQL, or the whitespace-collapsed SQL if it cannot
+        be parsed.
+    """
+    ast = _parse_sql(sql, dialect)
+    if ast is None:
+        return _WHITESPACE_PATTERN.sub(" ", sql).strip().rstrip(";").strip()
+    return generate_sql(ast, dialect)
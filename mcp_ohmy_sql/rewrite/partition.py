@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+
+"""
+Split a single table SELECT into key range partitions.
+
+A large extract on one cursor is bound to one connection and one core of
+the database. If the table has a numeric or date key, the rows between its
+``MIN`` and ``MAX`` are split into ``n`` contiguous ranges, and each range
+becomes its own query, so the ranges can be read concurrently on separate
+connections:
+
+>>> key = find_partition_key("SELECT * FROM Track WHERE Bytes > 0", "sqlite", key_index)
+>>> get_key_range_sql("SELECT * FROM Track WHERE Bytes > 0", "sqlite", key)
+'SELECT MIN("TrackId"), MAX("TrackId") FROM Track WHERE Bytes > 0'
+>>> ranges = split_key_range(1, 3503, 4, key.kind)
+>>> get_partition_sqls("SELECT * FROM Track WHERE Bytes > 0", "sqlite", key, ranges)
+['SELECT * FROM Track WHERE Bytes > 0 AND ("TrackId" < 876)', ...]
+
+The first range has no lower bound and the last range no upper bound, so
+rows inserted outside ``[MIN, MAX]`` meanwhile are still exported once.
+
+The key is the first primary key column of a relational table, or the
+leading sort key column of a Redshift table, see :func:`new_partition_key_index`.
+Only a plain ``SELECT ... FROM table [WHERE ...]`` can be partitioned, the
+partitions of anything else (aggregates, joins, ``DISTINCT``, ``LIMIT``,
+``ORDER BY``) would not add up to the original result.
+"""
+
+import typing as T
+import datetime
+import dataclasses
+
+from sqlglot import exp
+
+from ..constants import DbTypeEnum, LLMTypeEnum
+
+from .dialect import get_sqlglot_dialect
+from .parser import parse_sql, generate_sql
+
+#: how the range of a key is split, by LLM type of the key column
+_LLM_TYPE_TO_KEY_KIND = {
+    LLMTypeEnum.INT.value: "int",
+    LLMTypeEnum.DEC.value: "number",
+    LLMTypeEnum.FLOAT.value: "number",
+    LLMTypeEnum.DATE.value: "date",
+    LLMTypeEnum.DT.value: "datetime",
+    LLMTypeEnum.TS.value: "datetime",
+}
+
+
+@dataclasses.dataclass
+class PartitionKey:
+    """
+    The column a table is partitioned by.
+
+    :param column: the column name.
+    :param kind: ``int``, ``number``, ``date`` or ``datetime``.
+    :param nullable: whether the column may be NULL, the NULL rows go to
+        the first partition.
+    """
+
+    column: str
+    kind: str
+    nullable: bool = True
+
+
+#: the clauses a partitioned query can't have, by sqlglot ``Select`` arg
+_UNPARTITIONABLE_CLAUSES = {
+    "with_": "WITH",
+    "with": "WITH",
+    "joins": "JOIN",
+    "group": "GROUP BY",
+    "having": "HAVING",
+    "distinct": "DISTINCT",
+    "limit": "LIMIT",
+    "offset": "OFFSET",
+    "order": "ORDER BY",
+}
+
+T_PARTITION_KEY_INDEX = dict[str, PartitionKey]
+"""
+Lower case ``table`` and ``schema.table`` to the partition key of the table.
+"""
+
+
+def _get_key_kind(column_info) -> T.Optional[str]:
+    if column_info.llm_type is None:
+        return None
+    return _LLM_TYPE_TO_KEY_KIND.get(LLMTypeEnum(column_info.llm_type).value)
+
+
+def _get_partition_key(table_info) -> T.Optional[PartitionKey]:
+    """
+    Get the partition key of a relational or Redshift ``TableInfo``.
+    """
+    columns = {column_info.name: column_info for column_info in table_info.columns}
+    # relational, the first primary key column
+    for column_name in getattr(table_info, "primary_key", []):
+        column_info = columns.get(column_name)
+        if column_info is None:  # pragma: no cover
+            return None
+        kind = _get_key_kind(column_info)
+        if kind is None:
+            return None
+        return PartitionKey(column=column_name, kind=kind, nullable=False)
+    # redshift, the leading sort key column
+    for column_info in table_info.columns:
+        if getattr(column_info, "sort_key_position", 0) == 1:
+            kind = _get_key_kind(column_info)
+            if kind is None:
+                return None
+            return PartitionKey(
+                column=column_info.name,
+                kind=kind,
+                nullable=not column_info.notnull,
+            )
+    return None
+
+
+def new_partition_key_index(database_info) -> T_PARTITION_KEY_INDEX:
+    """
+    Build the partition key index from a relational or Redshift ``DatabaseInfo``,
+    tables without a numeric or date key are not in the index.
+
+    :param database_info: :class:`mcp_ohmy_sql.db.relational.api.DatabaseInfo`
+        or :class:`mcp_ohmy_sql.db.aws_redshift.api.DatabaseInfo`.
+    """
+    key_index = dict()
+    for schema_info in database_info.schemas:
+        for table_info in schema_info.tables:
+            key = _get_partition_key(table_info)
+            if key is None:
+                continue
+            table_name = table_info.name.lower()
+            key_index.setdefault(table_name, key)
+            if schema_info.name:
+                key_index[f"{schema_info.name.lower()}.{table_name}"] = key
+    return key_index
+
+
+def _parse_select(
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+    action: str = "partitioned",
+) -> tuple[str, exp.Select]:
+    dialect = get_sqlglot_dialect(db_type)
+    ast = parse_sql(sql, dialect)
+    if not isinstance(ast, exp.Select):
+        raise ValueError(f"only a single SELECT statement can be {action}")
+    return dialect, ast
+
+
+def _get_single_table(
+    ast: exp.Select,
+    action: str = "partitioned",
+) -> exp.Table:
+    """
+    Get the table of a plain ``SELECT ... FROM table [WHERE ...]``.
+
+    :param action: what can't be done with another query, for the message.
+
+    :raises ValueError: if the query is anything else, the message says why.
+    """
+    for arg, clause in _UNPARTITIONABLE_CLAUSES.items():
+        if ast.args.get(arg):
+            raise ValueError(f"a query with {clause} can't be {action}")
+    for projection in ast.expressions:
+        if projection.find(exp.AggFunc, exp.Window):
+            raise ValueError(
+                f"a query with aggregate or window functions can't be {action}"
+            )
+    from_ = ast.args.get("from_") or ast.args.get("from")
+    table = from_.this if from_ else None
+    if not isinstance(table, exp.Table):
+        raise ValueError(f"only a query on a single table can be {action}")
+    return table
+
+
+def _get_table_key(table: exp.Table) -> str:
+    """
+    Get the key of a table in the partition key index.
+    """
+    table_name = table.name.lower()
+    if table.db:
+        table_name = f"{table.db.lower()}.{table_name}"
+    return table_name
+
+
+def find_partition_key(
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+    key_index: T_PARTITION_KEY_INDEX,
+) -> PartitionKey:
+    """
+    Find the partition key of the table a SELECT statement reads.
+
+    :raises ValueError: if the query is not a plain single table SELECT, or
+        the table has no numeric or date key. The message says why.
+    """
+    _, ast = _parse_select(sql, db_type)
+    table = _get_single_table(ast)
+    key = key_index.get(_get_table_key(table))
+    if key is None:
+        raise ValueError(
+            f"table {table.sql()} has no numeric or date primary key or sort key"
+        )
+    return key
+
+
+def _to_literal(
+    value: T.Any,
+    kind: str,
+    db_type: T.Union[str, DbTypeEnum],
+) -> exp.Expression:
+    if kind in ("int", "number"):
+        return exp.Literal.number(str(value))
+    # SQLite stores dates as text, compare them as text
+    literal = exp.Literal.string(str(value))
+    if db_type == DbTypeEnum.SQLITE.value:
+        return literal
+    return exp.cast(literal, "DATE" if kind == "date" else "TIMESTAMP")
+
+
+def get_key_range_sql(
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+    key: PartitionKey,
+    with_count: bool = False,
+    named_params: bool = True,
+) -> str:
+    """
+    Get the ``SELECT MIN(key), MAX(key)[, COUNT(*)]`` of the rows of the query.
+    """
+    dialect, ast = _parse_select(sql, db_type)
+    column = exp.column(exp.to_identifier(key.column, quoted=True))
+    projections = [exp.Min(this=column.copy()), exp.Max(this=column.copy())]
+    if with_count:
+        projections.append(exp.Count(this=exp.Star()))
+    ast.set("expressions", projections)
+    return generate_sql(ast, dialect=dialect, named_params=named_params)
+
+
+def _parse_key_value(value: T.Any, kind: str) -> T.Any:
+    """
+    Drivers without a native date type (e.g. SQLite) return dates as text.
+    """
+    if kind == "date" and isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, str) and kind in ("date", "datetime"):
+        try:
+            parsed = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"{value!r} is not a date")
+        return parsed.date() if kind == "date" else parsed
+    return value
+
+
+def split_key_range(
+    low: T.Any,
+    high: T.Any,
+    n: int,
+    kind: str,
+) -> list[tuple[T.Any, T.Optional[T.Any]]]:
+    """
+    Split ``[low, high]`` into at most ``n`` contiguous ranges.
+
+    :returns: the ``(start, stop)`` of each range, ``start`` is inclusive and
+        ``stop`` is exclusive. The ``stop`` of the last range is None, it
+        goes up to ``high`` included. Ranges that would be empty are merged,
+        e.g. an integer key from 1 to 3 gives at most 3 ranges.
+    """
+    low = _parse_key_value(low, kind)
+    high = _parse_key_value(high, kind)
+    if kind == "int":
+        low, high = int(low), int(high)
+        width = high - low + 1
+        bounds = [low + width * i // n for i in range(n)]
+    elif kind == "date":
+        days = (high - low).days + 1
+        bounds = [low + datetime.timedelta(days=days * i // n) for i in range(n)]
+    else:
+        bounds = [low + (high - low) * i / n for i in range(n)]
+    unique_bounds = list()
+    for bound in bounds:
+        if not unique_bounds or bound > unique_bounds[-1]:
+            unique_bounds.append(bound)
+    stops = unique_bounds[1:] + [None]
+    return list(zip(unique_bounds, stops))
+
+
+def get_partition_sqls(
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+    key: PartitionKey,
+    ranges: list[tuple[T.Any, T.Optional[T.Any]]],
+    named_params: bool = True,
+) -> list[str]:
+    """
+    Get one query per key range, see :func:`split_key_range`. The rows where
+    the key is NULL go to the first partition.
+    """
+    dialect, ast = _parse_select(sql, db_type)
+    column = exp.column(exp.to_identifier(key.column, quoted=True))
+    sqls = list()
+    for ith, (start, stop) in enumerate(ranges):
+        conditions = list()
+        if ith > 0:
+            literal = _to_literal(start, key.kind, db_type)
+            conditions.append(exp.GTE(this=column.copy(), expression=literal))
+        if stop is not None:
+            literal = _to_literal(stop, key.kind, db_type)
+            conditions.append(exp.LT(this=column.copy(), expression=literal))
+        if len(conditions) == 0:
+            sqls.append(generate_sql(ast, dialect=dialect, named_params=named_params))
+            continue
+        predicate = exp.and_(*conditions)
+        if ith == 0 and key.nullable:
+            is_null = exp.Is(this=column.copy(), expression=exp.Null())
+            predicate = exp.or_(predicate, is_null)
+        query = ast.copy().where(exp.paren(predicate), copy=False)
+        sqls.append(generate_sql(query, dialect=dialect, named_params=named_params))
+    return sqls
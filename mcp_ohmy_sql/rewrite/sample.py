@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+
+"""
+Read a random sample of a table with the sampling primitive of each database:
+
+- PostgreSQL: ``TABLESAMPLE SYSTEM (percent)``, random pages of the table.
+- SQL Server: ``TABLESAMPLE SYSTEM (percent PERCENT)``, random pages.
+- Oracle: ``SAMPLE (percent)``, random rows.
+- MySQL and Redshift: a ``RAND() < fraction`` / ``RANDOM() < fraction``
+  filter, the table is scanned but only the sampled rows leave the database.
+- SQLite: an ``ABS(RANDOM() % 1000000) < n`` filter, ``RANDOM()`` returns
+  a 64-bit integer.
+
+>>> get_table_sample_sql(None, "Track", ["Name", "Composer"], "sqlite", percent=1, limit=10000)
+'SELECT "Name", "Composer" FROM "Track" WHERE ABS(RANDOM() % 1000000) < 10000 LIMIT 10000'
+
+A query can also be answered approximately from a sample of its main table,
+see :func:`get_approximate_sql`:
+
+>>> get_approximate_sql("SELECT GenreId, COUNT(*) AS n FROM Track GROUP BY GenreId", "postgresql", percent=1).sql
+'SELECT GenreId, (COUNT(*) * 100) AS n FROM Track TABLESAMPLE SYSTEM (1) GROUP BY GenreId'
+"""
+
+import typing as T
+import math
+import dataclasses
+
+from sqlglot import exp
+
+from ..constants import DbTypeEnum
+
+from .dialect import get_sqlglot_dialect
+from .parser import parse_sql, generate_sql
+from .tables import T_TABLE_INDEX
+
+#: the databases sampled with a ``TABLESAMPLE`` / ``SAMPLE`` clause, and its method
+_TABLESAMPLE_METHODS = {
+    DbTypeEnum.POSTGRESQL.value: "SYSTEM",
+    DbTypeEnum.MSSQL.value: "SYSTEM",
+    DbTypeEnum.ORACLE.value: None,
+}
+
+#: the resolution of the SQLite random filter
+_SQLITE_RANDOM_RANGE = 1_000_000
+
+
+def get_sample_predicate(
+    db_type: T.Union[str, DbTypeEnum],
+    percent: float,
+) -> T.Optional[exp.Expression]:
+    """
+    Get the filter keeping about ``percent`` % of the rows, for the databases
+    that have no ``TABLESAMPLE`` clause.
+
+    :returns: the filter, or None if the database samples with a clause.
+    """
+    db_type = DbTypeEnum.ensure_str(db_type)
+    if db_type in _TABLESAMPLE_METHODS:
+        return None
+    if db_type == DbTypeEnum.SQLITE.value:
+        return exp.LT(
+            this=exp.Abs(
+                this=exp.Mod(
+                    this=exp.Anonymous(this="RANDOM"),
+                    expression=exp.Literal.number(_SQLITE_RANDOM_RANGE),
+                )
+            ),
+            expression=exp.Literal.number(
+                round(_SQLITE_RANDOM_RANGE * percent / 100)
+            ),
+        )
+    return exp.LT(
+        this=exp.Rand(),
+        expression=exp.Literal.number(percent / 100),
+    )
+
+
+def add_table_sample(
+    table: exp.Table,
+    db_type: T.Union[str, DbTypeEnum],
+    percent: float,
+) -> T.Optional[exp.Expression]:
+    """
+    Sample a table reference in place with ``TABLESAMPLE`` / ``SAMPLE``.
+
+    :returns: None if the table is sampled, otherwise the filter of
+        :func:`get_sample_predicate` to add to the ``WHERE`` clause of the
+        query that reads the table.
+    """
+    db_type = DbTypeEnum.ensure_str(db_type)
+    if db_type not in _TABLESAMPLE_METHODS:
+        return get_sample_predicate(db_type, percent)
+    method = _TABLESAMPLE_METHODS[db_type]
+    table.set(
+        "sample",
+        exp.TableSample(
+            method=exp.var(method) if method else None,
+            percent=exp.Literal.number(percent),
+        ),
+    )
+    return None
+
+
+def get_table_sample_sql(
+    schema_name: T.Optional[str],
+    table_name: str,
+    column_names: list[str],
+    db_type: T.Union[str, DbTypeEnum],
+    percent: T.Optional[float] = None,
+    limit: T.Optional[int] = 10_000,
+) -> str:
+    """
+    Get the query reading up to ``limit`` rows of a table, sampled at
+    ``percent`` % of its rows.
+
+    :param percent: the sampling rate, None or 100 reads the first rows.
+    :param limit: the maximum number of rows, None reads them all.
+    """
+    db_type = DbTypeEnum.ensure_str(db_type)
+    table = exp.table_(table_name, db=schema_name or None, quoted=True)
+    query = exp.select(
+        *[exp.column(exp.to_identifier(name, quoted=True)) for name in column_names]
+    ).from_(table, copy=False)
+    if percent is not None and percent < 100:
+        predicate = add_table_sample(table, db_type, percent)
+        if predicate is not None:
+            query = query.where(predicate, copy=False)
+    if limit is not None:
+        query = query.limit(limit, copy=False)
+    return query.sql(dialect=get_sqlglot_dialect(db_type))
+
+
+def get_sample_method(db_type: T.Union[str, DbTypeEnum]) -> str:
+    """
+    Get the name of the sampling primitive of a database, e.g.
+    ``TABLESAMPLE SYSTEM`` or ``RANDOM() filter``.
+    """
+    db_type = DbTypeEnum.ensure_str(db_type)
+    if db_type in _TABLESAMPLE_METHODS:
+        method = _TABLESAMPLE_METHODS[db_type]
+        if method is None:
+            return "SAMPLE"
+        return f"TABLESAMPLE {method}"
+    if db_type == DbTypeEnum.MYSQL.value:
+        return "RAND() filter"
+    return "RANDOM() filter"
+
+
+def _format_number(value: float) -> str:
+    return f"{value:.6g}"
+
+
+@dataclasses.dataclass
+class ApproximateQuery:
+    """
+    A query rewritten to run on a sample of its main table.
+
+    :param sql: the rewritten query.
+    :param percent: the sampling rate, in percent.
+    :param table: the sampled table, as written in the query.
+    :param method: the sampling primitive, see :func:`get_sample_method`.
+    :param n_scaled: the number of ``COUNT`` and ``SUM`` scaled up.
+    :param unscaled: the aggregates that are those of the sample, e.g.
+        ``COUNT(DISTINCT)``, ``MIN`` or ``MAX``.
+    """
+
+    sql: str
+    percent: float
+    table: str
+    method: str
+    n_scaled: int = 0
+    unscaled: list[str] = dataclasses.field(default_factory=list)
+
+    @property
+    def scale(self) -> float:
+        return 100 / self.percent
+
+    def get_note(self) -> str:
+        """
+        Describe the sampling, and the error of the scaled counts.
+
+        With Bernoulli sampling at rate ``p``, a count estimated from ``n``
+        sampled rows has a relative standard error of ``sqrt((1 - p) / n)``.
+        """
+        fraction = self.percent / 100
+        lines = [
+            f"Approximate result: {_format_number(self.percent)}% sample of "
+            f"{self.table} ({self.method})."
+        ]
+        if self.n_scaled:
+            errors = ", ".join(
+                f"±{100 * math.sqrt((1 - fraction) / n_rows):.1f}% "
+                f"from {n_rows} rows"
+                for n_rows in (10, 100, 1000)
+            )
+            lines.append(
+                f"COUNT and SUM are scaled by {_format_number(self.scale)}, "
+                f"a scaled count C comes from about "
+                f"C × {_format_number(fraction)} sampled rows, its relative "
+                f"standard error is about {errors}."
+            )
+        if self.method.startswith("TABLESAMPLE SYSTEM"):
+            lines.append(
+                "Pages are sampled, not rows, the error is larger when "
+                "similar rows are stored together."
+            )
+        if self.unscaled:
+            lines.append(
+                f"Not scaled, computed on the sample: {', '.join(self.unscaled)}."
+            )
+        return " ".join(lines)
+
+
+def _get_from_table(select: exp.Select) -> T.Optional[exp.Table]:
+    from_key = "from_" if "from_" in select.arg_types else "from"
+    from_ = select.args.get(from_key)
+    if from_ is None or not isinstance(from_.this, exp.Table):
+        return None
+    return from_.this
+
+
+def _is_base_table(
+    table: exp.Table,
+    cte_names: set[str],
+    table_index: T.Optional[T_TABLE_INDEX],
+) -> bool:
+    if not table.name or (table.name.lower() in cte_names and not table.db):
+        return False
+    if table_index is None:
+        return True
+    name = table.name.lower()
+    if table.db:
+        name = f"{table.db.lower()}.{name}"
+    return name in table_index
+
+
+def get_approximate_sql(
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+    percent: float,
+    table_index: T.Optional[T_TABLE_INDEX] = None,
+    named_params: bool = True,
+) -> ApproximateQuery:
+    """
+    Rewrite a query to run on a ``percent`` % sample of its main table, the
+    first table of its ``FROM`` clause, put the large fact table first.
+    Joined tables are read whole, so each row of the result is kept with the
+    same probability.
+
+    The ``COUNT`` and ``SUM`` of the query are multiplied by
+    ``100 / percent``, the other aggregates are unchanged: ``AVG`` is an
+    unbiased estimate, ``COUNT(DISTINCT)``, ``MIN`` and ``MAX`` are those of
+    the sample. A scaled column without alias keeps its original text as
+    its name.
+
+    :param table_index: the base tables of the database, see
+        :func:`~mcp_ohmy_sql.rewrite.tables.new_table_index`, a view can't
+        be sampled. None means any table but a CTE.
+
+    :raises ValueError: if the query can't be sampled, the message says why.
+    """
+    db_type = DbTypeEnum.ensure_str(db_type)
+    dialect = get_sqlglot_dialect(db_type)
+    ast = parse_sql(sql, dialect)
+    if not isinstance(ast, exp.Select):
+        raise ValueError("only a single SELECT statement can be sampled")
+    cte_names = {cte.alias_or_name.lower() for cte in ast.find_all(exp.CTE)}
+    table = _get_from_table(ast)
+    if table is None or not _is_base_table(table, cte_names, table_index):
+        raise ValueError(
+            "the first table of the FROM clause must be a base table, "
+            "not a subquery, a CTE or a view"
+        )
+    table_text = table.copy()
+    table_text.set("alias", None)
+    table_text = table_text.sql(dialect=dialect)
+
+    scale = 100 / percent
+    scale_literal = exp.Literal.number(
+        int(scale) if float(scale).is_integer() else round(scale, 6)
+    )
+    n_scaled = 0
+    unscaled = list()
+
+    def is_own(node: exp.Expression) -> bool:
+        return node.find_ancestor(exp.Select) is ast
+
+    # name the unaliased projections before they change
+    projections = list()
+    for projection in ast.expressions:
+        if not isinstance(projection, exp.Alias) and any(
+            is_own(node) for node in projection.find_all(exp.Count, exp.Sum)
+        ):
+            projection = exp.alias_(
+                projection, projection.sql(dialect=dialect), quoted=True
+            )
+        projections.append(projection)
+    ast.set("expressions", projections)
+
+    for node in list(ast.find_all(exp.Count, exp.Sum, exp.Min, exp.Max)):
+        if not is_own(node):
+            continue
+        if isinstance(node, (exp.Min, exp.Max)):
+            name = node.key.upper()
+        elif isinstance(node.this, exp.Distinct):
+            name = f"{node.key.upper()}(DISTINCT)"
+        else:
+            node.replace(
+                exp.paren(exp.Mul(this=node.copy(), expression=scale_literal.copy()))
+            )
+            n_scaled += 1
+            continue
+        if name not in unscaled:
+            unscaled.append(name)
+
+    predicate = add_table_sample(table, db_type, percent)
+    if predicate is not None:
+        ast = ast.where(predicate, copy=False)
+    return ApproximateQuery(
+        sql=generate_sql(ast, dialect=dialect, named_params=named_params),
+        percent=percent,
+        table=table_text,
+        method=get_sample_method(db_type),
+        n_scaled=n_scaled,
+        unscaled=unscaled,
+    )
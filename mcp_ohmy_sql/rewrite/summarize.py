@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+
+"""
+Profile the result of a SELECT without fetching its rows.
+
+The query is wrapped into one aggregate query, so the database computes the
+profile of every column in one pass and only returns one row:
+
+>>> columns = [("Name", "text"), ("Milliseconds", "number")]
+>>> get_summary_sql("SELECT Name, Milliseconds FROM Track", "sqlite", columns)
+'SELECT COUNT(*) AS n_rows, COUNT("Name") AS c0_non_null, COUNT(DISTINCT "Name") AS c0_distinct, ... FROM (SELECT Name, Milliseconds FROM Track) AS t'
+
+Which statistics are computed depends on the kind of the column (see
+:func:`get_column_kind`) and on the database:
+
+- distinct counts are ``APPROXIMATE COUNT(DISTINCT ...)`` on Redshift,
+  exact elsewhere.
+- quantiles are ``PERCENTILE_CONT`` on PostgreSQL and Oracle, and
+  ``APPROXIMATE PERCENTILE_DISC`` on Redshift. The other databases have
+  no percentile aggregate, their numeric columns only get the mean.
+
+The most frequent values of the text and boolean columns are counted by a
+second query, see :func:`get_top_values_sql`.
+"""
+
+import typing as T
+import decimal
+import datetime
+
+from sqlglot import exp
+
+from ..constants import DbTypeEnum
+
+from .dialect import get_sqlglot_dialect
+from .parser import parse_sql, generate_sql
+
+QUANTILES = (0.25, 0.5, 0.75)
+"""
+The quantiles of the numeric columns, named ``p25``, ``p50`` and ``p75``.
+"""
+
+#: the column statistics computed by the summary query, by column kind
+_KIND_TO_STATS = {
+    "number": ["non_null", "distinct", "min", "max", "mean"],
+    "datetime": ["non_null", "distinct", "min", "max"],
+    "text": ["non_null", "distinct", "min", "max"],
+    "bool": ["non_null", "distinct"],
+    "other": ["non_null"],
+    "unknown": ["non_null"],
+}
+
+
+def get_column_kind(values: T.Iterable[T.Any]) -> str:
+    """
+    Get the kind of a result column from its first values: ``number``,
+    ``datetime``, ``text``, ``bool``, ``other`` (e.g. binary or JSON values)
+    or ``unknown`` if they are all NULL.
+    """
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return "bool"
+        if isinstance(value, (int, float, decimal.Decimal)):
+            return "number"
+        if isinstance(value, (datetime.date, datetime.time)):
+            return "datetime"
+        if isinstance(value, str):
+            return "text"
+        return "other"
+    return "unknown"
+
+
+def get_summary_stats(
+    kind: str,
+    db_type: T.Union[str, DbTypeEnum],
+    quantiles: bool = True,
+) -> list[str]:
+    """
+    Get the names of the statistics of a column, e.g.
+    ``["non_null", "distinct", "min", "max", "mean", "p25", "p50", "p75"]``.
+    """
+    stats = list(_KIND_TO_STATS[kind])
+    if quantiles and kind == "number" and has_quantiles(db_type):
+        stats.extend(f"p{round(quantile * 100)}" for quantile in QUANTILES)
+    return stats
+
+
+def has_quantiles(db_type: T.Union[str, DbTypeEnum]) -> bool:
+    """
+    Check whether the database has a percentile aggregate function.
+    """
+    return DbTypeEnum.ensure_str(db_type) in (
+        DbTypeEnum.POSTGRESQL.value,
+        DbTypeEnum.ORACLE.value,
+        DbTypeEnum.AWS_REDSHIFT.value,
+    )
+
+
+def is_distinct_approximate(db_type: T.Union[str, DbTypeEnum]) -> bool:
+    return DbTypeEnum.ensure_str(db_type) == DbTypeEnum.AWS_REDSHIFT.value
+
+
+def _parse_query(
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+) -> tuple[T.Optional[str], exp.Query]:
+    """
+    Parse the query to summarize, so it can be wrapped as a subquery.
+
+    :returns: the sqlglot dialect and the parsed query.
+
+    :raises ValueError: if the query is not a single SELECT statement.
+    """
+    dialect = get_sqlglot_dialect(db_type)
+    ast = parse_sql(sql, dialect)
+    if not isinstance(ast, exp.Select):
+        raise ValueError("the query can't be parsed as a single SELECT statement")
+    # the order doesn't change the profile, and SQL Server rejects an
+    # ORDER BY in a subquery without TOP
+    if ast.args.get("order") and not (
+        ast.args.get("limit") or ast.args.get("offset") or ast.args.get("fetch")
+    ):
+        ast.set("order", None)
+    return dialect, ast
+
+
+def _quantile(
+    column: exp.Column,
+    quantile: float,
+    db_type: str,
+) -> exp.Expression:
+    if db_type == DbTypeEnum.AWS_REDSHIFT.value:
+        return exp.ApproxQuantile(
+            this=column,
+            quantile=exp.Literal.number(quantile),
+        )
+    return exp.WithinGroup(
+        this=exp.PercentileCont(this=exp.Literal.number(quantile)),
+        expression=exp.Order(expressions=[exp.Ordered(this=column.copy())]),
+    )
+
+
+def _get_stat_expression(
+    column_name: str,
+    stat: str,
+    db_type: str,
+) -> exp.Expression:
+    column = exp.column(exp.to_identifier(column_name, quoted=True))
+    if stat == "non_null":
+        return exp.Count(this=column)
+    if stat == "distinct":
+        if is_distinct_approximate(db_type):
+            return exp.ApproxDistinct(this=column)
+        return exp.Count(this=exp.Distinct(expressions=[column]))
+    if stat == "min":
+        return exp.Min(this=column)
+    if stat == "max":
+        return exp.Max(this=column)
+    if stat == "mean":
+        return exp.Avg(this=exp.cast(column, exp.DataType.build("double")))
+    if stat.startswith("p"):
+        return _quantile(column, int(stat[1:]) / 100, db_type)
+    raise ValueError(f"unknown statistic {stat!r}")  # pragma: no cover
+
+
+def get_summary_alias(ith: int, stat: str) -> str:
+    """
+    The result column of a statistic of the ``ith`` column.
+    """
+    return f"c{ith}_{stat}"
+
+
+def get_summary_sql(
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+    columns: list[tuple[str, str]],
+    quantiles: bool = True,
+    named_params: bool = True,
+) -> str:
+    """
+    Get the aggregate query of the profile of a query result. Its single
+    row has the ``n_rows`` column, then the statistics of each column named
+    by :func:`get_summary_alias`, see :func:`get_summary_stats`.
+
+    :param columns: the ``(name, kind)`` of each column of the result.
+    :param quantiles: whether to compute the quantiles of numeric columns.
+
+    :raises ValueError: if the query is not a single SELECT statement.
+    """
+    db_type = DbTypeEnum.ensure_str(db_type)
+    dialect, ast = _parse_query(sql, db_type)
+    expressions = [exp.alias_(exp.Count(this=exp.Star()), "n_rows")]
+    for ith, (column_name, kind) in enumerate(columns):
+        for stat in get_summary_stats(kind, db_type, quantiles=quantiles):
+            expressions.append(
+                exp.alias_(
+                    _get_stat_expression(column_name, stat, db_type),
+                    get_summary_alias(ith, stat),
+                )
+            )
+    query = exp.select(*expressions).from_(ast.subquery("t"))
+    return generate_sql(query, dialect=dialect, named_params=named_params)
+
+
+def get_top_values_sql(
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+    columns: list[tuple[int, str]],
+    top_k: int = 5,
+    max_value_chars: int = 100,
+    named_params: bool = True,
+) -> str:
+    """
+    Get the query of the ``top_k`` most frequent non-NULL values of some
+    columns of a query result, in one statement. Its rows are
+    ``(column_position, column_value, value_count)``, the values are cast to
+    text, most frequent first.
+
+    The statement must start with ``SELECT``, so the query is not shared
+    as a CTE, each column groups its own copy of the query.
+
+    :param columns: the ``(position, name)`` of each column.
+    :param max_value_chars: the values are cast to a text of this length.
+
+    :raises ValueError: if the query is not a single SELECT statement.
+    """
+    db_type = DbTypeEnum.ensure_str(db_type)
+    dialect, ast = _parse_query(sql, db_type)
+    value_type = exp.DataType.build(f"varchar({max_value_chars})")
+    counts = None
+    for position, column_name in columns:
+        column = exp.column(exp.to_identifier(column_name, quoted=True))
+        select = (
+            exp.select(
+                exp.alias_(exp.Literal.number(position), "column_position"),
+                exp.alias_(exp.cast(column, value_type), "column_value"),
+                exp.alias_(exp.Count(this=exp.Star()), "value_count"),
+            )
+            .from_(ast.subquery(f"t{position}", copy=True))
+            .where(exp.not_(exp.Is(this=column.copy(), expression=exp.Null())))
+            .group_by(column.copy())
+        )
+        if counts is None:
+            counts = select
+        else:
+            counts = exp.union(counts, select, distinct=False)
+    rank = exp.Window(
+        this=exp.RowNumber(),
+        partition_by=[exp.column("column_position")],
+        order=exp.Order(
+            expressions=[
+                exp.Ordered(this=exp.column("value_count"), desc=True),
+                exp.Ordered(this=exp.column("column_value")),
+            ]
+        ),
+    )
+    ranked = exp.select(
+        "column_position",
+        "column_value",
+        "value_count",
+        exp.alias_(rank, "value_rank"),
+    ).from_(counts.subquery("value_counts"))
+    query = (
+        exp.select("column_position", "column_value", "value_count")
+        .from_(ranked.subquery("r"))
+        .where(
+            exp.LTE(
+                this=exp.column("value_rank"),
+                expression=exp.Literal.number(top_k),
+            )
+        )
+        .order_by("column_position", "value_rank")
+    )
+    return generate_sql(query, dialect=dialect, named_params=named_params)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""
+Find the tables a query reads.
+
+A cached result is tagged with the tables it reads, so it stays valid as
+long as these tables don't change, see :mod:`mcp_ohmy_sql.table_version`.
+The tables are resolved against the (cached) schema info, only the base
+tables can be tracked: the changes of the tables under a view are not
+visible from its name.
+
+>>> table_index = new_table_index(database_info)
+>>> get_source_tables("SELECT * FROM Album JOIN Artist USING (ArtistId)", "sqlite", table_index)
+[(None, 'Album'), (None, 'Artist')]
+"""
+
+import typing as T
+
+from sqlglot import exp
+
+from ..constants import DbTypeEnum, ObjectTypeEnum
+
+from .dialect import get_sqlglot_dialect
+from .parser import parse_sql
+
+T_TABLE = tuple[T.Optional[str], str]
+"""
+``(schema_name, table_name)``, the schema name is None for the default schema.
+"""
+
+T_TABLE_INDEX = dict[str, T_TABLE]
+"""
+Lower case ``table`` and ``schema.table`` to the base table.
+"""
+
+
+def new_table_index(database_info) -> T_TABLE_INDEX:
+    """
+    Build the table index from a relational or Redshift ``DatabaseInfo``,
+    views and materialized views are not in the index.
+
+    :param database_info: :class:`mcp_ohmy_sql.db.relational.api.DatabaseInfo`
+        or :class:`mcp_ohmy_sql.db.aws_redshift.api.DatabaseInfo`.
+    """
+    table_index = dict()
+    for schema_info in database_info.schemas:
+        for table_info in schema_info.tables:
+            if table_info.object_type != ObjectTypeEnum.TABLE:
+                continue
+            table = (schema_info.name or None, table_info.name)
+            table_name = table_info.name.lower()
+            table_index.setdefault(table_name, table)
+            if schema_info.name:
+                table_index[f"{schema_info.name.lower()}.{table_name}"] = table
+    return table_index
+
+
+def get_source_tables(
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+    table_index: T_TABLE_INDEX,
+) -> list[T_TABLE]:
+    """
+    Get the base tables a query reads, without duplicates.
+
+    :raises ValueError: if the query can't be parsed, or reads anything but
+        the base tables of the schema, e.g. a view, a system table or a
+        table function. The message says why.
+    """
+    dialect = get_sqlglot_dialect(db_type)
+    ast = parse_sql(sql, dialect)
+    if not isinstance(ast, exp.Query):
+        raise ValueError("the query can't be parsed as a single SELECT statement")
+    cte_names = {cte.alias_or_name.lower() for cte in ast.find_all(exp.CTE)}
+    tables = list()
+    for table in ast.find_all(exp.Table):
+        if not table.name:
+            raise ValueError(f"{table.sql(dialect=dialect)} is not a table")
+        if not table.db and table.name.lower() in cte_names:
+            continue
+        if table.catalog:
+            raise ValueError(f"{table.sql(dialect=dialect)} is in another database")
+        table_name = table.name.lower()
+        if table.db:
+            table_name = f"{table.db.lower()}.{table_name}"
+        source = table_index.get(table_name)
+        if source is None:
+            raise ValueError(
+                f"{table.sql(dialect=dialect)} is not a table of the database schema"
+            )
+        if source not in tables:
+            tables.append(source)
+    if len(tables) == 0:
+        raise ValueError("the query doesn't read any table")
+    return tables
@@ -0,0 +1,412 @@
+# -*- coding: utf-8 -*-
+
+"""
+Push large value truncation down to the database.
+
+A SELECT on a table with BLOB, SUPER, JSON or long TEXT columns can ship
+megabytes per row, only for us to cut every cell to ``max_cell_chars``.
+This module rewrites the projection of the outermost SELECT, so that:
+
+- long text columns are cut to a prefix by the database (``SUBSTRING``)
+- JSON / SUPER columns are serialized and cut to a prefix
+- binary columns are replaced by their length and a hash prefix,
+  e.g. ``<5242880 bytes, md5 1b2cf535f27d>``
+
+Columns are resolved against a :data:`T_COLUMN_INDEX` built from the
+(cached) schema info, ``SELECT *`` is expanded when it covers a large column.
+A ``GROUP BY`` or ``ORDER BY`` item naming a shrunk column, by alias or
+position, is pointed back to the table column, so rows are still grouped
+and sorted by the full value.
+Anything we can't resolve is left alone, the client side truncation in
+:mod:`mcp_ohmy_sql.result.budget` still applies.
+"""
+
+import typing as T
+import re
+import functools
+
+import sqlglot
+from sqlglot import exp
+
+from ..constants import DbTypeEnum, LLMTypeEnum, LargeValueKindEnum
+
+from .dialect import get_sqlglot_dialect
+from .parser import parse_sql, generate_sql
+
+T_COLUMN_INDEX = dict[str, list[tuple[str, T.Optional[str]]]]
+"""
+Lower case ``table`` and ``schema.table`` to the list of
+``(column_name, large_value_kind)`` in table order, the kind is None
+for columns that are never large.
+"""
+
+_LENGTH_PATTERN = re.compile(r"\((\d+)\)")
+_TEXT_TYPE_PATTERN = re.compile(r"CHAR|TEXT|CLOB|STRING", re.IGNORECASE)
+_BINARY_TYPE_PATTERN = re.compile(r"BLOB|BYTEA|BINARY|VARBYTE|IMAGE", re.IGNORECASE)
+_JSON_TYPE_PATTERN = re.compile(r"^(JSON|SUPER)", re.IGNORECASE)
+
+_VALUE = "__value__"
+
+#: dialect specific SQL that summarizes a binary value, ``__value__`` is
+#: replaced by the column. SQLite has no hash function, it shows the first bytes.
+_BINARY_SUMMARY_TEMPLATES = {
+    "sqlite": f"'<' || LENGTH({_VALUE}) || ' bytes, 0x' || HEX(SUBSTR({_VALUE}, 1, 6)) || '...>'",
+    "postgres": f"'<' || OCTET_LENGTH({_VALUE}) || ' bytes, md5 ' || LEFT(MD5({_VALUE}), 12) || '>'",
+    "mysql": f"CONCAT('<', OCTET_LENGTH({_VALUE}), ' bytes, md5 ', LEFT(MD5({_VALUE}), 12), '>')",
+    "tsql": (
+        f"CONCAT('<', DATALENGTH({_VALUE}), ' bytes, md5 ', "
+        f"LEFT(CONVERT(VARCHAR(34), HASHBYTES('MD5', {_VALUE}), 2), 12), '>')"
+    ),
+    "oracle": f"'<' || DBMS_LOB.GETLENGTH({_VALUE}) || ' bytes>'",
+    "redshift": (
+        f"'<' || LEN({_VALUE}) || ' bytes, md5 ' "
+        f"|| LEFT(MD5(FROM_VARBYTE({_VALUE}, 'hex')), 12) || '>'"
+    ),
+}
+
+
+def get_large_value_kind(
+    type_name: str,
+    llm_type: T.Optional[str],
+    max_chars: int,
+) -> T.Optional[str]:
+    """
+    Decide if a column can hold values larger than ``max_chars``.
+
+    :param type_name: the database type, e.g. ``VARCHAR(160)``, ``super``.
+    :param llm_type: :class:`~mcp_ohmy_sql.constants.LLMTypeEnum` of the column.
+    :param max_chars: values up to this length are never truncated.
+
+    :returns: :class:`~mcp_ohmy_sql.constants.LargeValueKindEnum` value,
+        or None if the column is never large.
+    """
+    if _JSON_TYPE_PATTERN.match(type_name):
+        return LargeValueKindEnum.JSON.value
+    if llm_type in (LLMTypeEnum.BLOB.value, LLMTypeEnum.BIN.value) or (
+        _BINARY_TYPE_PATTERN.search(type_name)
+    ):
+        return LargeValueKindEnum.BINARY.value
+    if _TEXT_TYPE_PATTERN.search(type_name):
+        match = _LENGTH_PATTERN.search(type_name)
+        if match is None or int(match.group(1)) > max_chars:
+            return LargeValueKindEnum.TEXT.value
+    return None
+
+
+def new_column_index(
+    database_info,
+    max_chars: int,
+) -> T_COLUMN_INDEX:
+    """
+    Build the column index from a relational or Redshift ``DatabaseInfo``.
+
+    :param database_info: :class:`mcp_ohmy_sql.db.relational.api.DatabaseInfo`
+        or :class:`mcp_ohmy_sql.db.aws_redshift.api.DatabaseInfo`.
+    :param max_chars: see :func:`get_large_value_kind`.
+    """
+    column_index = dict()
+    for schema_info in database_info.schemas:
+        for table_info in schema_info.tables:
+            columns = [
+                (
+                    column_info.name,
+                    get_large_value_kind(
+                        column_info.type,
+                        column_info.llm_type,
+                        max_chars,
+                    ),
+                )
+                for column_info in table_info.columns
+            ]
+            table_name = table_info.name.lower()
+            column_index.setdefault(table_name, columns)
+            if schema_info.name:
+                column_index[f"{schema_info.name.lower()}.{table_name}"] = columns
+    return column_index
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_template(dialect: str) -> T.Optional[exp.Expression]:
+    template = _BINARY_SUMMARY_TEMPLATES.get(dialect)
+    if template is None:
+        return None
+    return sqlglot.parse_one(template, read=dialect)
+
+
+def wrap_large_value(
+    column: exp.Column,
+    kind: str,
+    dialect: str,
+    max_chars: int,
+) -> T.Optional[exp.Expression]:
+    """
+    Wrap a column reference into the SQL expression that shrinks its value.
+
+    Text is cut to ``max_chars + 1`` characters, so the client can still tell
+    the value was truncated.
+
+    :returns: the new expression, or None if the dialect is not supported.
+    """
+    if kind == LargeValueKindEnum.BINARY.value:
+        template = _parse_template(dialect)
+        if template is None:
+            return None
+        return template.transform(
+            lambda node: (
+                column.copy()
+                if isinstance(node, exp.Column) and node.name == _VALUE
+                else node
+            )
+        )
+    value = column.copy()
+    if kind == LargeValueKindEnum.JSON.value:
+        if dialect == "redshift":
+            value = exp.Anonymous(this="JSON_SERIALIZE", expressions=[value])
+        else:
+            value = exp.Cast(this=value, to=exp.DataType.build("text"))
+    return exp.Substring(
+        this=value,
+        start=exp.Literal.number(1),
+        length=exp.Literal.number(max_chars + 1),
+    )
+
+
+def _get_sources(
+    ast: exp.Select,
+    column_index: T_COLUMN_INDEX,
+) -> dict[str, T.Optional[list[tuple[str, T.Optional[str]]]]]:
+    """
+    Map the alias of every table in the FROM and JOIN clauses to its columns.
+    Subqueries, CTEs and unknown tables map to None.
+    """
+    sources = dict()
+    from_ = ast.args.get("from_")
+    if from_ is None:
+        return sources
+    cte_names = {cte.alias_or_name.lower() for cte in ast.ctes}
+    nodes = [from_.this] + [join.this for join in ast.args.get("joins") or []]
+    for node in nodes:
+        columns = None
+        if isinstance(node, exp.Table) and node.name.lower() not in cte_names:
+            key = node.name.lower()
+            if node.db:
+                key = f"{node.db.lower()}.{key}"
+            columns = column_index.get(key)
+        sources[node.alias_or_name.lower()] = columns
+    return sources
+
+
+def _resolve_kind(
+    column: exp.Column,
+    sources: dict[str, T.Optional[list[tuple[str, T.Optional[str]]]]],
+) -> T.Optional[str]:
+    """
+    Find the large value kind of a column reference, None if it is not large
+    or can't be resolved unambiguously.
+    """
+    if column.table:
+        candidates = [sources.get(column.table.lower())]
+    else:
+        candidates = list(sources.values())
+    name = column.name.lower()
+    matches = list()
+    for columns in candidates:
+        if columns is None:
+            return None
+        matches.extend(kind for col_name, kind in columns if col_name.lower() == name)
+    if len(matches) != 1:
+        return None
+    return matches[0]
+
+
+def _rewrite_projection(
+    projection: exp.Expression,
+    sources: dict[str, T.Optional[list[tuple[str, T.Optional[str]]]]],
+    dialect: str,
+    max_chars: int,
+) -> T.Optional[list[exp.Expression]]:
+    """
+    Rewrite one projection of the SELECT.
+
+    :returns: the replacing projections, or None to keep it as it is.
+    """
+    # SELECT * and SELECT t.*
+    if isinstance(projection, exp.Star) or (
+        isinstance(projection, exp.Column) and isinstance(projection.this, exp.Star)
+    ):
+        if isinstance(projection, exp.Star):
+            aliases = list(sources)
+        else:
+            aliases = [projection.table.lower()]
+        if len(aliases) == 0 or any(sources.get(alias) is None for alias in aliases):
+            return None
+        qualify = len(sources) > 1 or isinstance(projection, exp.Column)
+        expanded = list()
+        is_changed = False
+        for alias in aliases:
+            for col_name, kind in sources[alias]:
+                column = exp.column(col_name, table=alias if qualify else None)
+                new = None
+                if kind is not None:
+                    new = wrap_large_value(column, kind, dialect, max_chars)
+                if new is None:
+                    expanded.append(column)
+                else:
+                    expanded.append(exp.alias_(new, col_name))
+                    is_changed = True
+        return expanded if is_changed else None
+
+    if isinstance(projection, exp.Column):
+        column, alias = projection, projection.this.copy()
+    elif isinstance(projection, exp.Alias) and isinstance(projection.this, exp.Column):
+        column, alias = projection.this, projection.args["alias"].copy()
+    else:
+        return None
+    kind = _resolve_kind(column, sources)
+    if kind is None:
+        return None
+    new = wrap_large_value(column, kind, dialect, max_chars)
+    if new is None:
+        return None
+    return [exp.alias_(new, alias)]
+
+
+def _get_table_identifiers(ast: exp.Select) -> dict[str, exp.Identifier]:
+    """
+    Map the lower case alias of every table in the FROM and JOIN clauses to
+    the identifier that qualifies its columns, as written in the query.
+    """
+    identifiers = dict()
+    from_ = ast.args.get("from_")
+    if from_ is None:  # pragma: no cover
+        return identifiers
+    for node in [from_.this] + [join.this for join in ast.args.get("joins") or []]:
+        alias = node.args.get("alias")
+        if alias is not None and alias.this is not None:
+            identifiers[node.alias_or_name.lower()] = alias.this
+        elif isinstance(node, exp.Table):
+            identifiers[node.alias_or_name.lower()] = node.this
+    return identifiers
+
+
+def _get_table_column(
+    projection: exp.Alias,
+    sources: dict[str, T.Optional[list[tuple[str, T.Optional[str]]]]],
+    identifiers: dict[str, exp.Identifier],
+) -> T.Optional[exp.Column]:
+    """
+    Get the qualified table column a shrunk projection was made from, an
+    unqualified name in ``ORDER BY`` would resolve to the shrunk value.
+    """
+    column = projection.this.find(exp.Column)
+    if column is None:  # pragma: no cover
+        return None
+    if column.table:
+        return column.copy()
+    name = column.name.lower()
+    aliases = [
+        alias
+        for alias, columns in sources.items()
+        if columns is not None
+        and any(col_name.lower() == name for col_name, _ in columns)
+    ]
+    if len(aliases) != 1 or aliases[0] not in identifiers:  # pragma: no cover
+        return None
+    return exp.column(column.this.copy(), table=identifiers[aliases[0]].copy())
+
+
+def _keep_full_values(
+    ast: exp.Select,
+    projections: list[exp.Expression],
+    table_columns: dict[int, T.Optional[exp.Column]],
+) -> bool:
+    """
+    Point the ``GROUP BY`` and ``ORDER BY`` items that name a shrunk
+    projection, by alias or position, to its table column, so rows are
+    still grouped and sorted by the full value.
+
+    :param table_columns: the index of the shrunk projections to their table
+        column, see :func:`_get_table_column`.
+
+    :returns: False if an item can't be pointed to the table column.
+    """
+    by_name = {projections[ith].alias.lower(): ith for ith in table_columns}
+    items = list()
+    group = ast.args.get("group")
+    if group is not None:
+        items.extend(group.expressions)
+    order = ast.args.get("order")
+    if order is not None:
+        items.extend(ordered.this for ordered in order.expressions)
+    for key in items:
+        ith = None
+        if isinstance(key, exp.Literal) and key.is_int:
+            ith = int(key.name) - 1
+        elif isinstance(key, exp.Column) and not key.table:
+            ith = by_name.get(key.name.lower())
+        if ith not in table_columns:
+            continue
+        if table_columns[ith] is None:  # pragma: no cover
+            return False
+        key.replace(table_columns[ith].copy())
+    return True
+
+
+def truncate_large_values(
+    sql: str,
+    db_type: T.Union[str, DbTypeEnum],
+    column_index: T_COLUMN_INDEX,
+    max_chars: int,
+    named_params: bool = True,
+) -> str:
+    """
+    Rewrite the outermost SELECT so that large values are shrunk by the
+    database, see the module docstring.
+
+    The query is returned unchanged if it cannot be parsed, is not a plain
+    SELECT (e.g. UNION), uses DISTINCT (truncating would change the result),
+    or doesn't project any large column.
+
+    :param sql: the SELECT statement.
+    :param db_type: :class:`~mcp_ohmy_sql.constants.DbTypeEnum` of the target database.
+    :param column_index: see :func:`new_column_index`.
+    :param max_chars: maximum number of characters per value.
+    :param named_params: see :func:`~mcp_ohmy_sql.rewrite.parser.generate_sql`.
+
+    Example:
+
+        >>> truncate_large_values(
+        ...     "SELECT id, doc FROM t", DbTypeEnum.SQLITE,
+        ...     {"t": [("id", None), ("doc", "text")]}, 200,
+        ... )
+        'SELECT id, SUBSTRING(doc, 1, 201) AS doc FROM t'
+    """
+    dialect = get_sqlglot_dialect(db_type)
+    if dialect is None:  # pragma: no cover
+        return sql
+    ast = parse_sql(sql, dialect)
+    if not isinstance(ast, exp.Select) or ast.args.get("distinct"):
+        return sql
+    sources = _get_sources(ast, column_index)
+    identifiers = _get_table_identifiers(ast)
+    projections = list()
+    table_columns = dict()
+    is_changed = False
+    for projection in ast.expressions:
+        new = _rewrite_projection(projection, sources, dialect, max_chars)
+        if new is None:
+            projections.append(projection)
+            continue
+        for new_projection in new:
+            if isinstance(new_projection, exp.Alias):
+                table_columns[len(projections)] = _get_table_column(
+                    new_projection, sources, identifiers
+                )
+            projections.append(new_projection)
+        is_changed = True
+    if is_changed is False:
+        return sql
+    if _keep_full_values(ast, projections, table_columns) is False:  # pragma: no cover
+        return sql
+    ast.set("expressions", projections)
+    return generate_sql(ast, dialect, named_params=named_params)
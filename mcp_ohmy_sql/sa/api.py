@@ -2,5 +2,9 @@
 
 from .utils import get_create_view_sql
 from .utils import get_drop_view_sql
-# from .query import execute_count_query
+from .query import ensure_valid_select_query
+from .query import snapshot_connection
+from .query import execute_count_query
+from .query import fetch_select_result
+from .query import open_select_cursor
 from .query import execute_select_query
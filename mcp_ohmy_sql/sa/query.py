@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 
 import typing as T
+from contextlib import contextmanager
 
-from tabulate import tabulate
-
+from ..constants import ResultFormatEnum
 from ..lazy_import import sa, sa_exc
+from ..result.api import encode_result, fill_result_buffer, ResultBuffer
+from ..cursor import OpenCursor
 
 try:  # pragma: no cover
     from rich import print as rprint
@@ -12,11 +14,78 @@ except ImportError:  # pragma: no cover
     pass
 
 
+#: isolation level giving one consistent snapshot for all the statements
+#: of a transaction, by SQLAlchemy dialect name. MSSQL needs
+#: ``ALLOW_SNAPSHOT_ISOLATION`` enabled on the database.
+SNAPSHOT_ISOLATION_LEVELS = {
+    "sqlite": "SERIALIZABLE",
+    "postgresql": "REPEATABLE READ",
+    "mysql": "REPEATABLE READ",
+    "mssql": "SNAPSHOT",
+    "oracle": "SERIALIZABLE",
+}
+
+T_ENGINE_OR_CONNECTION = T.Union["sa.Engine", "sa.Connection"]
+
+
+@contextmanager
+def connect(
+    engine_or_connection: T_ENGINE_OR_CONNECTION,
+) -> T.Generator["sa.Connection", None, None]:
+    """
+    Open a new connection from an engine, or use the given connection as it is.
+    """
+    if isinstance(engine_or_connection, sa.Connection):
+        yield engine_or_connection
+    else:
+        with engine_or_connection.connect() as connection:
+            yield connection
+
+
+@contextmanager
+def snapshot_connection(
+    engine: "sa.Engine",
+) -> T.Generator["sa.Connection", None, None]:
+    """
+    Open a connection in a read-only transaction, every statement executed
+    on it sees the same snapshot of the database. The transaction is rolled
+    back at the end.
+    """
+    options = dict()
+    level = SNAPSHOT_ISOLATION_LEVELS.get(engine.dialect.name)
+    if level is not None:
+        options["isolation_level"] = level
+    if engine.dialect.name == "postgresql":  # pragma: no cover
+        options["postgresql_readonly"] = True
+    with engine.connect() as connection:
+        connection.execution_options(**options)
+        transaction = connection.begin()
+        try:
+            yield connection
+        finally:
+            transaction.rollback()
+
+
+def get_truncated_footer(max_rows: int) -> str:
+    """
+    The note appended to a result that has more than ``max_rows`` rows.
+    """
+    return (
+        f"... (result truncated to the first {max_rows} rows, "
+        f"refine the WHERE clause or add an aggregation to see the rest)"
+    )
+
+
 def format_result(
     result: T.Union["sa.CursorResult", "sa.Result"],
+    max_rows: T.Optional[int] = None,
+    max_chars: T.Optional[int] = None,
+    max_cell_chars: T.Optional[int] = None,
+    pad: bool = False,
+    result_format: str = ResultFormatEnum.MARKDOWN.value,
 ) -> str:
     """
-    Format SQL query result into a Markdown table.
+    Format SQL query result into a Markdown table, or another ``result_format``.
 
     .. note::
 
@@ -29,23 +98,40 @@ def format_result(
             enabling better understanding compared to nested JSON/XML structures
         - Balanced Readability: Maintains both machine parsability and human readability
             for seamless debugging and maintenance
+
+    :param result: the query result.
+    :param max_rows: if provided, only fetch up to this many rows and append
+        a note if there are more. Rows are fetched in batches into a
+        :class:`~mcp_ohmy_sql.result.buffer.ResultBuffer`.
+    :param max_chars: optional character budget of the table, see
+        :func:`~mcp_ohmy_sql.result.budget.render_markdown_table_with_budget`.
+    :param max_cell_chars: optional maximum number of characters per cell.
+    :param pad: if True, align the columns with padding, see
+        :func:`~mcp_ohmy_sql.result.markdown.render_markdown_table`.
+    :param result_format: the output format, see
+        :func:`~mcp_ohmy_sql.result.formats.encode_result`.
     """
-    records = result.fetchall()
+    records = fill_result_buffer(
+        columns=list(result.keys()),
+        fetchmany=result.fetchmany,
+        max_rows=max_rows,
+    )
+    truncated = max_rows is not None and len(records) > max_rows
+    if truncated:
+        records = records[:max_rows]
     if len(records) == 0:
         return "No result"
 
-    rows = list()
-    columns = result.keys()
-    rows.append(columns)
-    for record in records:
-        rows.append(list(record))
-
-    text = tabulate(
-        rows,
-        headers="firstrow",
-        tablefmt="pipe",
-        floatfmt=".4f",
+    text = encode_result(
+        columns=records.columns,
+        rows=records,
+        result_format=result_format,
+        max_chars=max_chars,
+        max_cell_chars=max_cell_chars,
+        pad=pad,
     )
+    if truncated:
+        text = f"{text}\n{get_truncated_footer(max_rows)}"
     return text
 
 
@@ -57,43 +143,141 @@ def ensure_valid_select_query(query: str):
         raise ValueError("Invalid query: must start with 'SELECT '")
 
 
+def get_count_query(
+    query: str,
+    alias: T.Optional[str] = "AS subquery",
+) -> str:
+    """
+    Wrap a SELECT statement into ``SELECT COUNT(*) FROM (...)``.
+
+    :param query: the SELECT statement.
+    :param alias: the derived table alias clause. Oracle doesn't accept ``AS``
+        in table aliases, use ``"subquery"`` for it.
+    """
+    query = query.strip()
+    while query.endswith(";"):
+        query = query[:-1].strip()
+    return f"SELECT COUNT(*) FROM ({query}) {alias}"
+
+
 def execute_count_query(
-    engine: "sa.Engine",
+    engine: T_ENGINE_OR_CONNECTION,
     query: str,
     params: T.Optional[dict[str, T.Any]] = None,
 ) -> int:
     """
     Executes a SQL SELECT query and returns the count of rows.
 
-    TODO: this function is used in query optimizer, we are not using it yet.
+    Used by the pre-flight cost guard when ``settings.preflight.exact_count``
+    is enabled.
+
+    :param engine: SQLAlchemy engine, or an open connection, see :func:`connect`.
     """
     ensure_valid_select_query(query)
-    query = query.strip()
 
     # use engine.dialect.name is the most reliable way to detect database type
-    if engine.dialect.name == "sqlite":
-        if query.endswith(";"):
-            query = query[:-1].strip()
-        count_query = f"SELECT COUNT(*) FROM ({query}) AS subquery"
-        count_stmt = sa.text(count_query)
-    else:  # pragma: no cover
-        raw_stmt = sa.text(query)
-        subq = raw_stmt.subquery("anon_subq")  # anonymous subquery
-        count_stmt = sa.select(sa.func.count()).select_from(subq)
+    if engine.dialect.name == "oracle":  # pragma: no cover
+        count_query = get_count_query(query, alias="subquery")
+    else:
+        count_query = get_count_query(query)
+    count_stmt = sa.text(count_query)
 
-    with engine.connect() as connection:
+    with connect(engine) as connection:
         result = connection.execute(count_stmt, params)
         count = result.fetchone()[0]
         return count
 
 
+def fetch_select_result(
+    engine: T_ENGINE_OR_CONNECTION,
+    query: str,
+    params: T.Optional[dict[str, T.Any]] = None,
+    max_rows: T.Optional[int] = None,
+) -> ResultBuffer:
+    """
+    Executes a SQL SELECT query and fetches the rows into a
+    :class:`~mcp_ohmy_sql.result.buffer.ResultBuffer`, without formatting.
+
+    :param engine: SQLAlchemy engine, or an open connection, see :func:`connect`.
+    :param query: the SELECT statement.
+    :param params: optional bind parameters.
+    :param max_rows: if provided, fetch at most ``max_rows + 1`` rows.
+
+    :raises ValueError: if the query is not a SELECT statement.
+    """
+    ensure_valid_select_query(query)
+    with connect(engine) as connection:
+        result = connection.execute(sa.text(query), params)
+        return fill_result_buffer(
+            columns=list(result.keys()),
+            fetchmany=result.fetchmany,
+            max_rows=max_rows,
+        )
+
+
+def open_select_cursor(
+    engine: "sa.Engine",
+    query: str,
+    params: T.Optional[dict[str, T.Any]] = None,
+    max_rows: T.Optional[int] = None,
+) -> OpenCursor:
+    """
+    Executes a SQL SELECT query with ``stream_results``, and returns the open
+    cursor. Rows are fetched from the database as they are consumed, on the
+    databases with server-side cursors. The caller must close the cursor to
+    release the connection.
+
+    :param engine: SQLAlchemy engine.
+    :param query: the SELECT statement.
+    :param params: optional bind parameters.
+    :param max_rows: see :class:`~mcp_ohmy_sql.cursor.OpenCursor`.
+
+    :raises ValueError: if the query is not a SELECT statement.
+    """
+    ensure_valid_select_query(query)
+    connection = engine.connect()
+    try:
+        result = connection.execution_options(stream_results=True).execute(
+            sa.text(query), params
+        )
+    except Exception as e:
+        connection.close()
+        raise e
+
+    def close():
+        try:
+            result.close()
+        finally:
+            connection.close()
+
+    return OpenCursor(
+        columns=list(result.keys()),
+        fetchmany=result.fetchmany,
+        close=close,
+        max_rows=max_rows,
+    )
+
+
 def execute_select_query(
-    engine: sa.Engine,
+    engine: T_ENGINE_OR_CONNECTION,
     query: str,
     params: T.Optional[dict[str, T.Any]] = None,
+    max_rows: T.Optional[int] = None,
+    max_chars: T.Optional[int] = None,
+    max_cell_chars: T.Optional[int] = None,
+    result_format: str = ResultFormatEnum.MARKDOWN.value,
 ) -> str:
     """
     Executes a SQL SELECT query and returns the result formatted as a Markdown table.
+
+    :param engine: SQLAlchemy engine, or an open connection, see :func:`connect`.
+    :param query: the SELECT statement.
+    :param params: optional bind parameters.
+    :param max_rows: optional maximum number of rows to fetch, see :func:`format_result`.
+    :param max_chars: optional character budget of the table.
+    :param max_cell_chars: optional maximum number of characters per cell.
+    :param result_format: the output format, e.g. ``csv``, see
+        :class:`~mcp_ohmy_sql.constants.ResultFormatEnum`.
     """
     try:
         ensure_valid_select_query(query)
@@ -101,7 +285,7 @@ def execute_select_query(
         return f"Error: {e}"
 
     stmt = sa.text(query)
-    with engine.connect() as connection:
+    with connect(engine) as connection:
         try:
             result = connection.execute(stmt, params)
         except sa_exc.OperationalError as e:  # pragma: no cover
@@ -110,7 +294,13 @@ def execute_select_query(
             return f"Error executing query: {e}"
 
         try:
-            text = format_result(result)
+            text = format_result(
+                result,
+                max_rows=max_rows,
+                max_chars=max_chars,
+                max_cell_chars=max_cell_chars,
+                result_format=result_format,
+            )
         except Exception as e:  # pragma: no cover
             return f"Error formatting result: {e}"
 
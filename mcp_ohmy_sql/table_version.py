@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cheap probes of whether tables have changed.
+
+A cached result stays valid as long as the tables it reads are unchanged.
+Before a cached result is served again, the version of its tables is
+fetched with one cheap query and compared with their version when the
+result was computed:
+
+- SQLite: ``PRAGMA data_version``. It changes when another connection
+  commits to the database file, so the probe keeps its own connection open.
+  It is the version of the whole database, not of each table.
+- PostgreSQL: the ``n_tup_ins``, ``n_tup_upd``, ``n_tup_del`` and
+  ``n_live_tup`` counters of ``pg_stat_user_tables``. The statistics are
+  reported asynchronously, a change may be seen up to about a second late.
+- Redshift: ``tbl_rows`` and ``estimated_visible_rows`` of ``SVV_TABLE_INFO``
+  and the last ``STL_INSERT`` end time of each table.
+
+Other databases have no probe, their cached results simply expire.
+
+Usage:
+
+>>> probe = TableVersionProbe(db_type="postgresql", conn_or_engine=engine)
+>>> version = probe.get_version([("public", "orders")])
+>>> ... # compute the result
+>>> probe.get_version([("public", "orders")]) == version  # still valid?
+True
+"""
+
+import typing as T
+import threading
+
+from .constants import DbTypeEnum
+from .lazy_import import redshift_connector, sa
+from .aws.aws_redshift.utils import Session, T_CONN_OR_ENGINE
+from .rewrite.tables import T_TABLE
+
+T_TABLE_VERSION = tuple[tuple, ...]
+"""
+The sorted rows returned by the probe query, compare them with ``==``.
+"""
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _get_table_filter(
+    schema_column: str,
+    table_column: str,
+    tables: list[T_TABLE],
+) -> str:
+    conditions = list()
+    for schema_name, table_name in tables:
+        condition = f"{table_column} = {_quote_literal(table_name)}"
+        if schema_name:
+            condition = (
+                f"({schema_column} = {_quote_literal(schema_name)} "
+                f"AND {condition})"
+            )
+        conditions.append(condition)
+    return " OR ".join(conditions)
+
+
+def get_table_version_sql(
+    db_type: T.Union[str, DbTypeEnum],
+    tables: list[T_TABLE],
+) -> T.Optional[str]:
+    """
+    Get the query that returns the version of the tables.
+
+    :returns: the query, or None if the database has no probe.
+    """
+    db_type = DbTypeEnum.ensure_str(db_type)
+    if db_type == DbTypeEnum.SQLITE.value:
+        return "PRAGMA data_version"
+    elif db_type == DbTypeEnum.POSTGRESQL.value:
+        table_filter = _get_table_filter("schemaname", "relname", tables)
+        return (
+            "SELECT schemaname, relname, n_tup_ins, n_tup_upd, n_tup_del, "
+            "n_live_tup FROM pg_stat_user_tables "
+            f"WHERE {table_filter}"
+        )
+    elif db_type == DbTypeEnum.AWS_REDSHIFT.value:
+        table_filter = _get_table_filter('t."schema"', 't."table"', tables)
+        return (
+            'SELECT t."schema", t."table", t.tbl_rows, '
+            "t.estimated_visible_rows, MAX(i.endtime) "
+            "FROM svv_table_info AS t "
+            "LEFT JOIN stl_insert AS i ON i.tbl = t.table_id "
+            f"WHERE {table_filter} "
+            "GROUP BY 1, 2, 3, 4"
+        )
+    else:
+        return None
+
+
+def is_append_only_change(
+    db_type: T.Union[str, DbTypeEnum],
+    old_version: T_TABLE_VERSION,
+    new_version: T_TABLE_VERSION,
+) -> bool:
+    """
+    Check whether the tables changed by inserts only, so a cached result can
+    be refreshed incrementally. Only PostgreSQL tells inserts from updates
+    and deletes. The SQLite ``data_version`` changes on any write, and the
+    Redshift row counts can't tell an update from a delete and an insert,
+    so their changes are never append-only and the result is recomputed.
+    """
+    if DbTypeEnum.ensure_str(db_type) != DbTypeEnum.POSTGRESQL.value:
+        return False
+    old_rows = {row[:2]: row for row in old_version}
+    new_rows = {row[:2]: row for row in new_version}
+    if old_rows.keys() != new_rows.keys():
+        return False
+    for table, new_row in new_rows.items():
+        old_row = old_rows[table]
+        # n_tup_upd and n_tup_del, a TRUNCATE only resets n_live_tup
+        if new_row[3:5] != old_row[3:5] or new_row[5] < old_row[5]:
+            return False
+    return True
+
+
+class TableVersionProbe:
+    """
+    Fetch the version of tables of one database.
+
+    :param db_type: :class:`~mcp_ohmy_sql.constants.DbTypeEnum` of the database.
+    :param conn_or_engine: Redshift connection or SQLAlchemy engine.
+    """
+
+    def __init__(
+        self,
+        db_type: T.Union[str, DbTypeEnum],
+        conn_or_engine: T_CONN_OR_ENGINE,
+    ):
+        self.db_type = DbTypeEnum.ensure_str(db_type)
+        self.conn_or_engine = conn_or_engine
+        self._sqlite_conn = None
+        self._lock = threading.Lock()
+
+    def is_supported(self) -> bool:
+        """
+        An in-memory SQLite database has a single connection, which is the
+        one writing, so its ``data_version`` never changes.
+        """
+        if self.db_type == DbTypeEnum.SQLITE.value:
+            database = self.conn_or_engine.url.database
+            return database not in (None, "", ":memory:")
+        return get_table_version_sql(self.db_type, []) is not None
+
+    def _fetch_rows(self, sql: str) -> list[tuple]:
+        if self.db_type == DbTypeEnum.SQLITE.value:
+            # data_version is per connection, always use the same one
+            with self._lock:
+                if self._sqlite_conn is None:
+                    self._sqlite_conn = self.conn_or_engine.raw_connection()
+                cursor = self._sqlite_conn.cursor()
+                try:
+                    cursor.execute(sql)
+                    return [tuple(row) for row in cursor.fetchall()]
+                finally:
+                    cursor.close()
+        elif isinstance(self.conn_or_engine, redshift_connector.Connection):
+            # a Redshift connection must not be used by two threads at once
+            with self._lock:
+                with Session(self.conn_or_engine) as cursor:
+                    cursor.execute(sql)
+                    return [tuple(row) for row in cursor.fetchall()]
+        elif isinstance(self.conn_or_engine, sa.Engine):
+            with self.conn_or_engine.connect() as conn:
+                return [tuple(row) for row in conn.execute(sa.text(sql)).fetchall()]
+        else:  # pragma: no cover
+            raise TypeError(
+                "conn_or_engine must be either a redshift_connector.Connection or a sqlalchemy.Engine"
+            )
+
+    def get_version(
+        self,
+        tables: list[T_TABLE],
+    ) -> T.Optional[T_TABLE_VERSION]:
+        """
+        Fetch the version of the tables.
+
+        :returns: the version, or None if the database has no probe.
+
+        :raises Exception: if the probe query fails, e.g. missing privileges.
+        """
+        if self.is_supported() is False:
+            return None
+        sql = get_table_version_sql(self.db_type, tables)
+        rows = self._fetch_rows(sql)
+        return tuple(sorted(rows, key=repr))
+
+    def close(self):
+        with self._lock:
+            if self._sqlite_conn is not None:
+                self._sqlite_conn.close()
+                self._sqlite_conn = None
@@ -2,11 +2,13 @@
 
 import typing as T
 import textwrap
+import functools
+
+import anyio
 
 from .server import mcp
 from .adapter.adapter_init import adapter
 
-
 def get_description(method: T.Callable) -> str:
     """
     Get the description of a function, falling back to its docstring if available.
@@ -14,11 +16,23 @@ def get_description(method: T.Callable) -> str:
     return textwrap.dedent(method.__doc__).strip()
 
 
+async def run_tool(method: T.Callable[..., str], **kwargs) -> str:
+    """
+    Run a blocking adapter tool method in a worker thread, so the event loop
+    keeps serving other requests (e.g. pings and cancellations) meanwhile.
+
+    Tool calls run concurrently, the admission control of each database
+    decides which of them run first, see
+    :meth:`~mcp_ohmy_sql.adapter.adapter.Adapter.admit`.
+    """
+    return await anyio.to_thread.run_sync(functools.partial(method, **kwargs))
+
+
 @mcp.tool(
     description=get_description(adapter.tool_list_databases),
 )
 async def list_databases() -> str:
-    return adapter.tool_list_databases()
+    return await run_tool(adapter.tool_list_databases)
 
 
 @mcp.tool(
@@ -28,7 +42,8 @@ async def list_tables(
     database_identifier: str,
     schema_name: T.Optional[str] = None,
 ) -> str:
-    return adapter.tool_list_tables(
+    return await run_tool(
+        adapter.tool_list_tables,
         database_identifier=database_identifier,
         schema_name=schema_name,
     )
@@ -38,7 +53,7 @@ async def list_tables(
     description=get_description(adapter.tool_get_all_database_details),
 )
 async def get_all_database_details() -> str:
-    return adapter.tool_get_all_database_details()
+    return await run_tool(adapter.tool_get_all_database_details)
 
 
 @mcp.tool(
@@ -47,10 +62,13 @@ async def get_all_database_details() -> str:
 async def get_schema_details(
     database_identifier: str,
     schema_name: T.Optional[str] = None,
+    include_profiles: bool = False,
 ) -> str:
-    return adapter.tool_get_schema_details(
+    return await run_tool(
+        adapter.tool_get_schema_details,
         database_identifier=database_identifier,
         schema_name=schema_name,
+        include_profiles=include_profiles,
     )
 
 
@@ -61,9 +79,240 @@ async def execute_select_statement(
     database_identifier: str,
     sql: str,
     params: T.Optional[dict[str, T.Any]] = None,
+    max_result_chars: T.Optional[int] = None,
+    format: str = "markdown",
+    approximate: bool = False,
+) -> str:
+    return await run_tool(
+        adapter.tool_execute_select_statement,
+        database_identifier=database_identifier,
+        sql=sql,
+        params=params,
+        max_result_chars=max_result_chars,
+        format=format,
+        approximate=approximate,
+    )
+
+
+@mcp.tool(
+    description=get_description(adapter.tool_execute_select_statements),
+)
+async def execute_select_statements(
+    statements: list[dict[str, T.Any]],
+    max_result_chars: T.Optional[int] = None,
+    format: str = "markdown",
+    snapshot: bool = False,
+) -> str:
+    return await run_tool(
+        adapter.tool_execute_select_statements,
+        statements=statements,
+        max_result_chars=max_result_chars,
+        format=format,
+        snapshot=snapshot,
+    )
+
+
+@mcp.tool(
+    description=get_description(adapter.tool_execute_fan_out_query),
+)
+async def execute_fan_out_query(
+    database_identifiers: list[str],
+    sql: str,
+    params: T.Optional[dict[str, T.Any]] = None,
+    max_result_chars: T.Optional[int] = None,
+    format: str = "markdown",
+) -> str:
+    return await run_tool(
+        adapter.tool_execute_fan_out_query,
+        database_identifiers=database_identifiers,
+        sql=sql,
+        params=params,
+        max_result_chars=max_result_chars,
+        format=format,
+    )
+
+
+@mcp.tool(
+    description=get_description(adapter.tool_execute_federated_query),
+)
+async def execute_federated_query(
+    sql: str,
+    max_result_chars: T.Optional[int] = None,
+    format: str = "markdown",
+) -> str:
+    return await run_tool(
+        adapter.tool_execute_federated_query,
+        sql=sql,
+        max_result_chars=max_result_chars,
+        format=format,
+    )
+
+
+@mcp.tool(
+    description=get_description(adapter.tool_fetch_result_page),
+)
+async def fetch_result_page(
+    handle: str,
+    page: int,
+    max_result_chars: T.Optional[int] = None,
+    format: str = "markdown",
+) -> str:
+    return await run_tool(
+        adapter.tool_fetch_result_page,
+        handle=handle,
+        page=page,
+        max_result_chars=max_result_chars,
+        format=format,
+    )
+
+
+@mcp.tool(
+    description=get_description(adapter.tool_query_local_result),
+)
+async def query_local_result(
+    sql: str,
+    max_result_chars: T.Optional[int] = None,
+    format: str = "markdown",
+) -> str:
+    return await run_tool(
+        adapter.tool_query_local_result,
+        sql=sql,
+        max_result_chars=max_result_chars,
+        format=format,
+    )
+
+
+@mcp.tool(
+    description=get_description(adapter.tool_export_query_result),
+)
+async def export_query_result(
+    database_identifier: str,
+    sql: str,
+    params: T.Optional[dict[str, T.Any]] = None,
+    format: str = "parquet",
+    file_name: T.Optional[str] = None,
+    partitions: int = 1,
+) -> str:
+    return await run_tool(
+        adapter.tool_export_query_result,
+        database_identifier=database_identifier,
+        sql=sql,
+        params=params,
+        format=format,
+        file_name=file_name,
+        partitions=partitions,
+    )
+
+
+@mcp.tool(
+    description=get_description(adapter.tool_summarize_query),
+)
+async def summarize_query(
+    database_identifier: str,
+    sql: str,
+    params: T.Optional[dict[str, T.Any]] = None,
+    top_k: int = 5,
+    max_result_chars: T.Optional[int] = None,
+    format: str = "markdown",
+) -> str:
+    return await run_tool(
+        adapter.tool_summarize_query,
+        database_identifier=database_identifier,
+        sql=sql,
+        params=params,
+        top_k=top_k,
+        max_result_chars=max_result_chars,
+        format=format,
+    )
+
+
+@mcp.tool(
+    description=get_description(adapter.tool_continue_query),
+)
+async def continue_query(
+    token: str,
+    max_result_chars: T.Optional[int] = None,
+    format: str = "markdown",
+) -> str:
+    return await run_tool(
+        adapter.tool_continue_query,
+        token=token,
+        max_result_chars=max_result_chars,
+        format=format,
+    )
+
+
+@mcp.tool(
+    description=get_description(adapter.tool_submit_query),
+)
+async def submit_query(
+    database_identifier: str,
+    sql: str,
+    params: T.Optional[dict[str, T.Any]] = None,
+) -> str:
+    return await run_tool(
+        adapter.tool_submit_query,
+        database_identifier=database_identifier,
+        sql=sql,
+        params=params,
+    )
+
+
+@mcp.tool(
+    description=get_description(adapter.tool_get_query_status),
+)
+async def get_query_status(
+    job_id: str,
+) -> str:
+    return await run_tool(
+        adapter.tool_get_query_status,
+        job_id=job_id,
+    )
+
+
+@mcp.tool(
+    description=get_description(adapter.tool_get_query_result),
+)
+async def get_query_result(
+    job_id: str,
+    page: int = 1,
+    max_result_chars: T.Optional[int] = None,
+    format: str = "markdown",
+) -> str:
+    return await run_tool(
+        adapter.tool_get_query_result,
+        job_id=job_id,
+        page=page,
+        max_result_chars=max_result_chars,
+        format=format,
+    )
+
+
+@mcp.tool(
+    description=get_description(adapter.tool_cancel_query),
+)
+async def cancel_query(
+    job_id: str,
+) -> str:
+    return await run_tool(
+        adapter.tool_cancel_query,
+        job_id=job_id,
+    )
+
+
+@mcp.tool(
+    description=get_description(adapter.tool_explain_query),
+)
+async def explain_query(
+    database_identifier: str,
+    sql: str,
+    params: T.Optional[dict[str, T.Any]] = None,
+    analyze: bool = False,
 ) -> str:
-    return adapter.tool_execute_select_statement(
+    return await run_tool(
+        adapter.tool_explain_query,
         database_identifier=database_identifier,
         sql=sql,
         params=params,
+        analyze=analyze,
     )
@@ -39,6 +39,22 @@ class TestAdapter:
         # rprint(database)  # for debug only
         # rprint(schema)  # for debug only
 
+    def test_admit(
+        self,
+        mcp_ohmy_sql_adapter,
+    ):
+        database = mcp_ohmy_sql_adapter.config.databases_mapping[
+            DatabaseEnum.chinook_sqlite.identifier
+        ]
+        controller = mcp_ohmy_sql_adapter.admission_controllers[database.identifier]
+        assert (
+            controller.max_concurrency
+            == mcp_ohmy_sql_adapter.config.settings.admission.max_concurrency
+        )
+        with mcp_ohmy_sql_adapter.admit(database):
+            assert controller.running == 1
+        assert controller.running == 0
+
 
 if __name__ == "__main__":
     from mcp_ohmy_sql.tests import run_cov_test
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+from mcp_ohmy_sql.config.api import Settings, PreflightSettings
+from mcp_ohmy_sql.adapter.adapter import Adapter
+from mcp_ohmy_sql.tests.test_config import DatabaseEnum
+
+
+class TestBatchAdapterMixin:
+    def test_tool_execute_select_statements(
+        self,
+        mcp_ohmy_sql_adapter,
+        sqlite_sa_engine_objs,
+    ):
+        adapter = mcp_ohmy_sql_adapter
+        database_identifier = DatabaseEnum.chinook_sqlite.identifier
+        statements = [
+            {
+                "database_identifier": database_identifier,
+                "sql": "SELECT COUNT(*) AS n FROM Album",
+            },
+            {
+                "database_identifier": database_identifier,
+                "sql": "SELECT AlbumId FROM Album WHERE AlbumId = :album_id",
+                "params": {"album_id": 2},
+            },
+            {
+                "database_identifier": database_identifier,
+                "sql": "SELECT * FROM NoSuchTable",
+            },
+        ]
+        for snapshot in [False, True]:
+            s = adapter.tool_execute_select_statements(
+                statements=statements,
+                format="csv",
+                snapshot=snapshot,
+            )
+            # print(s)  # for debug only
+            assert s.startswith("# Batch\n3 statements in ")
+            first, second, third = s.split("# Statement ")[1:]
+            assert first.startswith(f"1 ({database_identifier})\n# Execution Time")
+            assert "n:int\n40" in first
+            assert "AlbumId:int\n2" in second
+            assert "no such table" in third
+
+        s = adapter.tool_execute_select_statements(statements=[])
+        assert s == "Error: No statement to execute."
+        s = adapter.tool_execute_select_statements(statements=statements * 4)
+        assert s.startswith("Error: Too many statements, at most 10")
+        s = adapter.tool_execute_select_statements(statements=[{"sql": "SELECT 1"}])
+        assert s == (
+            "Error: Statement 1 must have 'database_identifier' and 'sql'."
+        )
+        s = adapter.tool_execute_select_statements(
+            statements=[{"database_identifier": "invalid database", "sql": "SELECT 1"}]
+        )
+        assert "Database 'invalid database' not found in configuration" in s
+        s = adapter.tool_execute_select_statements(statements=statements, format="xml")
+        assert s.startswith("Error: Unknown result format 'xml'")
+
+    def test_tool_execute_select_statements_preflight(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        settings = Settings(
+            preflight=PreflightSettings(
+                enabled=True,
+                max_estimated_rows=10,
+                exact_count=True,
+            ),
+        )
+        adapter = Adapter(
+            config=mcp_ohmy_sql_config.model_copy(update={"settings": settings})
+        )
+        statements = [
+            {
+                "database_identifier": DatabaseEnum.chinook_sqlite.identifier,
+                "sql": "SELECT TrackId FROM Track",
+            },
+        ]
+        # the statements of a snapshot share one open connection,
+        # the cost guard runs on it too
+        for snapshot in [False, True]:
+            s = adapter.tool_execute_select_statements(
+                statements=statements,
+                snapshot=snapshot,
+            )
+            # print(s)  # for debug only
+            assert "Error: Query rejected by the pre-flight cost guard" in s
+
+    def test_dedicated_connection(
+        self,
+        mcp_ohmy_sql_adapter,
+        sqlite_sa_engine_objs,
+    ):
+        # the SQLAlchemy engine gives each thread its own connection
+        database = mcp_ohmy_sql_adapter.config.databases_mapping[
+            DatabaseEnum.chinook_sqlite.identifier
+        ]
+        with mcp_ohmy_sql_adapter.dedicated_connection(database) as conn:
+            assert conn is None
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.adapter.batch_adapter",
+        preview=False,
+    )
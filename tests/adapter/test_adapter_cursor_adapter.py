@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+import re
+
+from mcp_ohmy_sql.config.api import Settings, CursorSettings
+from mcp_ohmy_sql.adapter.adapter import Adapter
+from mcp_ohmy_sql.tests.test_config import DatabaseEnum
+
+
+class TestCursorAdapterMixin:
+    def test_tool_continue_query(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        settings = Settings(
+            cursor=CursorSettings(enabled=True, page_rows=15, max_rows=35),
+        )
+        adapter = Adapter(
+            config=mcp_ohmy_sql_config.model_copy(update={"settings": settings})
+        )
+        database_identifier = DatabaseEnum.chinook_sqlite.identifier
+
+        # small results are returned as they are
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql="SELECT AlbumId FROM Album ORDER BY AlbumId LIMIT 3",
+            format="csv",
+        )
+        assert s.endswith("AlbumId:int\n1\n2\n3")
+        assert len(adapter.cursor_registry) == 0
+
+        # the test database has 40 albums
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql="SELECT AlbumId FROM Album ORDER BY AlbumId",
+            format="csv",
+        )
+        # print(s)  # for debug only
+        assert "AlbumId:int\n1\n2\n" in s
+        assert "15\n... (rows 1-15, more rows available" in s
+        token = re.search(r"token='(\w+)'", s).group(1)
+        assert len(adapter.cursor_registry) == 1
+
+        s = adapter.tool_continue_query(token=token, format="csv")
+        assert s.startswith("# Query Result\nAlbumId:int\n16\n")
+        assert f"30\n... (rows 16-30, more rows available, call continue_query with token='{token}'" in s
+
+        s = adapter.tool_continue_query(token=token, format="csv")
+        assert s.endswith(
+            "35\n... (rows 31-35, end of result, truncated to the first 35 rows)"
+        )
+        assert len(adapter.cursor_registry) == 0
+
+        s = adapter.tool_continue_query(token=token)
+        assert "not found or expired" in s
+        s = adapter.tool_continue_query(token=token, format="xml")
+        assert s.startswith("Error: Unknown result format 'xml'")
+
+    def test_tool_continue_query_with_budget(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        settings = Settings(
+            cursor=CursorSettings(enabled=True, page_rows=50),
+        )
+        adapter = Adapter(
+            config=mcp_ohmy_sql_config.model_copy(update={"settings": settings})
+        )
+        # the rows cut by the budget are on the next page
+        s = adapter.tool_execute_select_statement(
+            database_identifier=DatabaseEnum.chinook_sqlite.identifier,
+            sql="SELECT TrackId, Name FROM Track ORDER BY TrackId",
+            max_result_chars=300,
+            format="csv",
+        )
+        # print(s)  # for debug only
+        n_rows = int(re.search(r"\(rows 1-(\d+), more rows available", s).group(1))
+        assert n_rows < 50
+        assert f"\n{n_rows},Track {n_rows}\n..." in s
+        token = re.search(r"token='(\w+)'", s).group(1)
+
+        s = adapter.tool_continue_query(token=token, format="csv")
+        assert s.startswith(f"# Query Result\nTrackId:int,Name:str\n{n_rows + 1},")
+        assert f"(rows {n_rows + 1}-" in s
+        adapter.cursor_registry.close_all()
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.adapter.cursor_adapter",
+        preview=False,
+    )
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import shutil
+
+from mcp_ohmy_sql.paths import dir_tmp
+from mcp_ohmy_sql.config.api import Settings, ExportSettings
+from mcp_ohmy_sql.adapter.adapter import Adapter
+from mcp_ohmy_sql.tests.test_config import DatabaseEnum
+
+dir_export = dir_tmp.joinpath("test_adapter_export_adapter")
+
+
+class TestExportAdapterMixin:
+    def test_tool_export_query_result(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        shutil.rmtree(dir_export, ignore_errors=True)
+        database_identifier = DatabaseEnum.chinook_sqlite.identifier
+
+        # disabled by default
+        adapter = Adapter(config=mcp_ohmy_sql_config)
+        s = adapter.tool_export_query_result(
+            database_identifier=database_identifier,
+            sql="SELECT AlbumId FROM Album",
+        )
+        assert s.startswith("Error: Exporting results is disabled")
+
+        settings = Settings(
+            export=ExportSettings(
+                enabled=True, directory=str(dir_export), batch_size=7, max_rows=30
+            ),
+        )
+        adapter = Adapter(
+            config=mcp_ohmy_sql_config.model_copy(update={"settings": settings})
+        )
+        s = adapter.tool_export_query_result(
+            database_identifier=database_identifier,
+            sql="SELECT AlbumId, Title FROM Album WHERE AlbumId <= :n ORDER BY AlbumId",
+            params={"n": 20},
+            format="csv",
+            file_name="albums",
+        )
+        # print(s)  # for debug only
+        path = dir_export.joinpath("albums.csv.gz")
+        assert s.startswith(f"# Export\npath: {path}\nformat: csv\nrows: 20\n")
+        with gzip.open(path, "rt") as f:
+            lines = f.read().splitlines()
+        assert lines[0] == "AlbumId,Title"
+        assert len(lines) == 21
+
+        # max_rows is pushed down
+        s = adapter.tool_export_query_result(
+            database_identifier=database_identifier,
+            sql="SELECT AlbumId FROM Album",
+            format="jsonl",
+        )
+        assert "rows: 30 (truncated" in s
+
+        s = adapter.tool_export_query_result(
+            database_identifier=database_identifier,
+            sql="SELECT AlbumId FROM Album",
+            format="csv",
+            file_name="albums",
+        )
+        assert s.startswith("Error: File ") and "already exists" in s
+        s = adapter.tool_export_query_result(
+            database_identifier=database_identifier,
+            sql="SELECT * FROM NoSuchTable",
+            format="csv",
+        )
+        assert s.startswith("Error exporting query result: ")
+        s = adapter.tool_export_query_result(
+            database_identifier=database_identifier,
+            sql="DELETE FROM Album",
+        )
+        assert s.startswith("Error: Invalid query")
+        s = adapter.tool_export_query_result(
+            database_identifier="invalid",
+            sql="SELECT 1",
+        )
+        assert s.startswith("Error: Database 'invalid' not found")
+
+    def test_tool_export_query_result_partitioned(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        shutil.rmtree(dir_export, ignore_errors=True)
+        database_identifier = DatabaseEnum.chinook_sqlite.identifier
+        settings = Settings(
+            export=ExportSettings(
+                enabled=True, directory=str(dir_export), max_workers=2
+            ),
+        )
+        adapter = Adapter(
+            config=mcp_ohmy_sql_config.model_copy(update={"settings": settings})
+        )
+        s = adapter.tool_export_query_result(
+            database_identifier=database_identifier,
+            sql="SELECT AlbumId, Title FROM Album WHERE AlbumId <= 30",
+            format="csv",
+            file_name="albums_parts",
+            partitions=3,
+        )
+        # print(s)  # for debug only
+        assert "partition key: AlbumId" in s
+        assert "files: 3" in s
+        assert "rows: 30" in s
+        directory = dir_export.joinpath("albums_parts")
+        assert directory.joinpath("_manifest.json").exists()
+        album_ids = list()
+        for path in sorted(directory.glob("part-*.csv.gz")):
+            with gzip.open(path, "rt") as f:
+                lines = f.read().splitlines()
+            assert lines[0] == "AlbumId,Title"
+            album_ids.extend(int(line.split(",")[0]) for line in lines[1:])
+        assert sorted(album_ids) == list(range(1, 31))
+
+        # falls back to a single file
+        s = adapter.tool_export_query_result(
+            database_identifier=database_identifier,
+            sql="SELECT COUNT(*) AS n FROM Album",
+            format="csv",
+            partitions=2,
+        )
+        assert "Not partitioned: a query with aggregate" in s
+        assert "rows: 1" in s
+
+        s = adapter.tool_export_query_result(
+            database_identifier=database_identifier,
+            sql="SELECT AlbumId FROM Album",
+            partitions=0,
+        )
+        assert s.startswith("Error: ")
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.adapter.export_adapter",
+        preview=False,
+    )
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import typing as T
+
+from mcp_ohmy_sql.config.api import Config, Settings, PreflightSettings
+from mcp_ohmy_sql.adapter.adapter import Adapter
+from mcp_ohmy_sql.tests.test_config import DatabaseEnum
+
+
+def new_sharded_adapter(
+    config: Config,
+    settings: T.Optional[Settings] = None,
+) -> Adapter:
+    """
+    Two shards, both are the chinook sqlite database.
+    """
+    database = config.databases_mapping[DatabaseEnum.chinook_sqlite.identifier]
+    databases = [
+        database.model_copy(update={"identifier": f"shard {i}"}) for i in [1, 2]
+    ]
+    return Adapter(
+        config=Config(
+            version=config.version,
+            settings=settings or Settings(),
+            databases=databases,
+        )
+    )
+
+
+class TestFanOutAdapterMixin:
+    def test_resolve_databases(
+        self,
+        mcp_ohmy_sql_config,
+    ):
+        adapter = new_sharded_adapter(mcp_ohmy_sql_config)
+        databases = adapter.resolve_databases(["shard 2", "shard *"])
+        assert [db.identifier for db in databases] == ["shard 1", "shard 2"]
+
+    def test_tool_execute_fan_out_query(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        adapter = new_sharded_adapter(mcp_ohmy_sql_config)
+
+        # every row twice, in order
+        s = adapter.tool_execute_fan_out_query(
+            database_identifiers=["shard *"],
+            sql="SELECT AlbumId FROM Album ORDER BY AlbumId DESC LIMIT 3 OFFSET 1",
+            format="csv",
+        )
+        # print(s)  # for debug only
+        assert s.startswith("# Fan-out\n2 databases in ")
+        assert "2 succeeded\n" in s
+        assert "# Query Result\nAlbumId:int\n40\n39\n39\n" in s
+        assert "| shard 1 | 4 |" in s
+
+        # aggregates are combined
+        s = adapter.tool_execute_fan_out_query(
+            database_identifiers=["shard 1", "shard 2"],
+            sql=(
+                "SELECT COUNT(*) AS n, MIN(AlbumId) AS lo, MAX(AlbumId) AS hi "
+                "FROM Album"
+            ),
+            format="csv",
+        )
+        assert "n:int,lo:int,hi:int\n80,1,40\n" in s
+
+        # a failed shard is reported
+        s = adapter.tool_execute_fan_out_query(
+            database_identifiers=["shard *"],
+            sql="SELECT * FROM NoSuchTable",
+        )
+        assert "0 succeeded, 2 failed" in s
+        assert "no such table" in s
+
+        s = adapter.tool_execute_fan_out_query(
+            database_identifiers=["shard *"],
+            sql="SELECT AVG(Milliseconds) FROM Track",
+        )
+        assert s.startswith("Error: AVG(Milliseconds) can't be merged")
+        s = adapter.tool_execute_fan_out_query(
+            database_identifiers=["tenant *"],
+            sql="SELECT 1",
+        )
+        assert s.startswith("Error: Database 'tenant *' not found")
+        s = adapter.tool_execute_fan_out_query(database_identifiers=[], sql="SELECT 1")
+        assert s == "Error: No database to query."
+
+    def test_tool_execute_fan_out_query_preflight(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        settings = Settings(
+            preflight=PreflightSettings(
+                enabled=True,
+                max_estimated_rows=10,
+                exact_count=True,
+            ),
+        )
+        adapter = new_sharded_adapter(mcp_ohmy_sql_config, settings=settings)
+        # every shard is checked, a rejected shard is a failed database
+        s = adapter.tool_execute_fan_out_query(
+            database_identifiers=["shard *"],
+            sql="SELECT TrackId FROM Track",
+        )
+        # print(s)  # for debug only
+        assert "0 succeeded, 2 failed" in s
+        assert "Query rejected by the pre-flight cost guard" in s
+
+        s = adapter.tool_execute_fan_out_query(
+            database_identifiers=["shard *"],
+            sql="SELECT TrackId FROM Track WHERE TrackId <= 3",
+            format="csv",
+        )
+        assert "2 succeeded\n" in s
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.adapter.fanout_adapter",
+        preview=False,
+    )
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from mcp_ohmy_sql.config.api import Config, Settings, LocalEngineSettings
+from mcp_ohmy_sql.adapter.adapter import Adapter
+from mcp_ohmy_sql.local_engine import is_duckdb_available
+from mcp_ohmy_sql.tests.test_config import DatabaseEnum
+
+
+def new_two_database_adapter(
+    config: Config,
+    settings: Settings,
+) -> Adapter:
+    """
+    Two databases "sales" and "catalog", both are the chinook sqlite database.
+    """
+    database = config.databases_mapping[DatabaseEnum.chinook_sqlite.identifier]
+    databases = [
+        database.model_copy(update={"identifier": identifier})
+        for identifier in ["sales", "catalog"]
+    ]
+    return Adapter(
+        config=Config(version=config.version, settings=settings, databases=databases)
+    )
+
+
+class TestFederatedAdapterMixin:
+    @pytest.mark.skipif(is_duckdb_available() is False, reason="duckdb not installed")
+    def test_tool_execute_federated_query(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        settings = Settings(local_engine=LocalEngineSettings(max_source_rows=50))
+        adapter = new_two_database_adapter(mcp_ohmy_sql_config, settings)
+
+        s = adapter.tool_execute_federated_query(
+            sql=(
+                "SELECT a.AlbumId, r.Name FROM sales.Album AS a "
+                "JOIN catalog.Artist AS r ON a.ArtistId = r.ArtistId "
+                "WHERE a.AlbumId <= 3 ORDER BY a.AlbumId"
+            ),
+            format="csv",
+        )
+        # print(s)  # for debug only
+        assert s.startswith("# Federated Query\n2 sources in ")
+        assert "# Query Result\nAlbumId:int,Name:str\n1,Artist 2\n2,Artist 3\n3,Artist 4\n" in s
+        assert "SELECT AlbumId, ArtistId FROM Album WHERE AlbumId <= 3" in s
+        assert "| source_1 | sales | " in s
+
+        # a source with too many rows fails instead of a partial join
+        s = adapter.tool_execute_federated_query(
+            sql=(
+                "SELECT COUNT(*) FROM sales.Track AS t "
+                "JOIN catalog.Album AS a ON t.AlbumId = a.AlbumId"
+            ),
+        )
+        assert "Error: 1 sources failed" in s
+        assert "more than 50 rows, add a WHERE filter on t" in s
+
+        # the local query fails
+        s = adapter.tool_execute_federated_query(
+            sql="SELECT NoSuchColumn FROM sales.Album WHERE AlbumId = 1",
+        )
+        assert "# Query Result\nError: " in s
+
+        s = adapter.tool_execute_federated_query(sql="SELECT * FROM Album")
+        assert s.startswith("Error: Table Album must be qualified")
+        s = adapter.tool_execute_federated_query(sql="SELECT 1")
+        assert s.startswith("Error: The query doesn't use any table")
+        s = adapter.tool_execute_federated_query(sql="SELECT 1", format="xml")
+        assert s.startswith("Error: ")
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.adapter.federated_adapter",
+        preview=False,
+    )
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+import re
+import time
+
+from mcp_ohmy_sql.config.api import Settings, JobSettings
+from mcp_ohmy_sql.adapter.adapter import Adapter
+from mcp_ohmy_sql.result.api import SpilledResult, ResultBuffer
+from mcp_ohmy_sql.tests.test_config import DatabaseEnum
+
+
+def wait(adapter: Adapter, job_id: str, timeout: float = 5):
+    job = adapter.job_manager.get(job_id)
+    start = time.time()
+    while job.is_finished is False:
+        if time.time() - start > timeout:  # pragma: no cover
+            raise TimeoutError
+        time.sleep(0.01)
+    return job
+
+
+class TestJobAdapterMixin:
+    def test_query_job_tools(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        settings = Settings(jobs=JobSettings(page_rows=15))
+        adapter = Adapter(
+            config=mcp_ohmy_sql_config.model_copy(update={"settings": settings})
+        )
+        database_identifier = DatabaseEnum.chinook_sqlite.identifier
+        sql = "SELECT AlbumId FROM Album ORDER BY AlbumId"
+
+        s = adapter.tool_submit_query(database_identifier=database_identifier, sql=sql)
+        # print(s)  # for debug only
+        job_id = re.search(r"job_id: (\w+)", s).group(1)
+        job = wait(adapter, job_id)
+        assert job.rows_fetched == 40
+
+        s = adapter.tool_submit_query(
+            database_identifier=database_identifier,
+            sql=f"  {sql}  ;",
+        )
+        assert "An identical query was already submitted" in s
+        assert job_id in s
+
+        s = adapter.tool_get_query_status(job_id=job_id)
+        assert "status: succeeded" in s
+
+        s = adapter.tool_get_query_result(job_id=job_id, format="csv")
+        # print(s)  # for debug only
+        assert "# Query Result\nAlbumId:int\n1\n2\n" in s
+        assert (
+            f"15\n... (page 1 of 3 (rows 1-15 of 40), call get_query_result "
+            f"with job_id='{job_id}' and page=2 for the next page)"
+        ) in s
+        s = adapter.tool_get_query_result(job_id=job_id, page=3, format="csv")
+        assert s.endswith("40\n... (page 3 of 3 (rows 31-40 of 40))")
+        s = adapter.tool_get_query_result(job_id=job_id, page=4)
+        assert s == "Error: Page 4 is out of range, the result has 3 pages"
+        s = adapter.tool_get_query_result(job_id=job_id, format="xml")
+        assert s.startswith("Error: Unknown result format 'xml'")
+
+        # cancelling a finished job doesn't change it
+        s = adapter.tool_cancel_query(job_id=job_id)
+        assert "status: succeeded" in s
+
+        # a job whose spilled result was evicted is not reused
+        result, rows = job.result
+        if rows is None:
+            adapter.spill_store.get_path(result.handle).unlink()
+            s = adapter.tool_submit_query(
+                database_identifier=database_identifier,
+                sql=sql,
+            )
+            assert "An identical query was already submitted" not in s
+            assert job_id not in s
+            wait(adapter, re.search(r"job_id: (\w+)", s).group(1))
+
+        # results kept in memory when they can't be spilled
+        rows = ResultBuffer(["AlbumId"], use_arrow=False)
+        rows.append_rows([(i,) for i in range(1, 41)])
+        job.result = (
+            SpilledResult(handle=job_id, n_rows=40, page_rows=15),
+            rows,
+        )
+        s = adapter.tool_get_query_result(job_id=job_id, page=2, format="csv")
+        assert "AlbumId:int\n16\n" in s
+        assert "30\n... (page 2 of 3 (rows 16-30 of 40)" in s
+
+    def test_query_job_errors(
+        self,
+        mcp_ohmy_sql_adapter,
+        sqlite_sa_engine_objs,
+    ):
+        adapter = mcp_ohmy_sql_adapter
+        database_identifier = DatabaseEnum.chinook_sqlite.identifier
+
+        s = adapter.tool_submit_query(
+            database_identifier=database_identifier,
+            sql="SELECT * FROM NoSuchTable",
+        )
+        job_id = re.search(r"job_id: (\w+)", s).group(1)
+        wait(adapter, job_id)
+        s = adapter.tool_get_query_result(job_id=job_id)
+        assert s.startswith("Error: the job is failed")
+        assert "no such table" in s
+
+        s = adapter.tool_submit_query(
+            database_identifier=database_identifier,
+            sql="DELETE FROM Album",
+        )
+        assert s.startswith("Error: Invalid query")
+        s = adapter.tool_submit_query(
+            database_identifier="invalid database",
+            sql="SELECT 1",
+        )
+        assert "Database 'invalid database' not found in configuration" in s
+        for s in [
+            adapter.tool_get_query_status(job_id="invalid"),
+            adapter.tool_get_query_result(job_id="invalid"),
+            adapter.tool_cancel_query(job_id="invalid"),
+        ]:
+            assert s == "Error: Job 'invalid' not found or expired"
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.adapter.job_adapter",
+        preview=False,
+    )
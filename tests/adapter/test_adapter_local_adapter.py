@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from mcp_ohmy_sql.config.api import Settings, LocalEngineSettings
+from mcp_ohmy_sql.adapter.adapter import Adapter
+from mcp_ohmy_sql.local_engine import is_duckdb_available
+from mcp_ohmy_sql.tests.test_config import DatabaseEnum
+
+
+class TestLocalAdapterMixin:
+    @pytest.mark.skipif(is_duckdb_available() is False, reason="duckdb not installed")
+    def test_tool_query_local_result(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        settings = Settings(
+            local_engine=LocalEngineSettings(enabled=True, min_rows=10, preview_rows=3),
+        )
+        adapter = Adapter(
+            config=mcp_ohmy_sql_config.model_copy(update={"settings": settings})
+        )
+        database_identifier = DatabaseEnum.chinook_sqlite.identifier
+
+        # small results are returned inline
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql="SELECT AlbumId FROM Album ORDER BY AlbumId LIMIT 3",
+            format="csv",
+        )
+        assert s.endswith("AlbumId:int\n1\n2\n3")
+        assert len(adapter.local_engine) == 0
+
+        # large results are loaded, a preview is returned
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql="SELECT AlbumId, ArtistId FROM Album ORDER BY AlbumId",
+            format="csv",
+        )
+        # print(s)  # for debug only
+        assert "AlbumId:int,ArtistId:int\n1,2\n2,3\n3,4\n... (showing the first rows" in s
+        assert (
+            "local table result_1 (40 rows from 'chinook sqlite', "
+            "columns: AlbumId, ArtistId)"
+        ) in s
+
+        s = adapter.tool_query_local_result(
+            sql=(
+                "SELECT ArtistId, COUNT(*) AS n FROM result_1 "
+                "GROUP BY ArtistId ORDER BY n DESC, ArtistId LIMIT 2"
+            ),
+            format="csv",
+        )
+        assert s.startswith("# Execution Time\n")
+        assert s.endswith("# Query Result\nArtistId:int,n:int\n1,2\n2,2")
+
+        s = adapter.tool_query_local_result(sql="SELECT * FROM no_such_table")
+        assert s.startswith("Error: ")
+        assert "- result_1 (40 rows from 'chinook sqlite'" in s
+
+    def test_tool_query_local_result_disabled(
+        self,
+        mcp_ohmy_sql_adapter,
+    ):
+        s = mcp_ohmy_sql_adapter.tool_query_local_result(sql="SELECT 1")
+        assert s.startswith("Error: The local engine is disabled")
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.adapter.local_adapter",
+        preview=False,
+    )
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+import time
+import shutil
+
+from mcp_ohmy_sql.paths import dir_tmp
+from mcp_ohmy_sql.config.api import (
+    Settings,
+    MaterializationSettings,
+    Materialization,
+    Config,
+)
+from mcp_ohmy_sql.adapter.adapter import Adapter
+from mcp_ohmy_sql.tests.test_config import DatabaseEnum
+
+dir_materialized = dir_tmp.joinpath("test_adapter_materialize_adapter")
+
+
+def new_materialized_adapter(
+    config: Config,
+    materializations: list[Materialization],
+) -> Adapter:
+    shutil.rmtree(dir_materialized, ignore_errors=True)
+    database = config.databases_mapping[DatabaseEnum.chinook_sqlite.identifier]
+    settings = Settings(
+        materialization=MaterializationSettings(
+            enabled=True,
+            directory=str(dir_materialized),
+            batch_size=7,
+            check_interval=3600,
+        )
+    )
+    return Adapter(
+        config=Config(
+            version=config.version,
+            settings=settings,
+            databases=[database],
+            materializations=materializations,
+        )
+    )
+
+
+class TestMaterializeAdapterMixin:
+    def test_materialization(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        database_identifier = DatabaseEnum.chinook_sqlite.identifier
+        adapter = new_materialized_adapter(
+            mcp_ohmy_sql_config,
+            materializations=[
+                Materialization(
+                    name="album_count",
+                    database_identifier=database_identifier,
+                    sql=(
+                        "SELECT ArtistId, COUNT(*) AS n_albums "
+                        "FROM Album GROUP BY ArtistId"
+                    ),
+                ),
+                Materialization(
+                    name="broken",
+                    database_identifier=database_identifier,
+                    sql="SELECT * FROM NoSuchTable",
+                ),
+            ],
+        )
+        # disabled by default
+        assert Adapter(config=mcp_ohmy_sql_config).start_materializations() is False
+
+        # the scheduler refreshes the due materializations right away
+        assert adapter.start_materializations() is True
+        for _ in range(100):
+            if len(adapter.materialized_store.get_statuses()) == 2:
+                break
+            time.sleep(0.1)
+        adapter.materialization_scheduler.stop(timeout=10)
+        statuses = adapter.materialized_store.get_statuses()
+        assert statuses["album_count"].n_rows == 20
+        assert statuses["album_count"].error is None
+        assert "NoSuchTable" in statuses["broken"].error
+        assert statuses["broken"].refreshed_at is None
+
+        s = adapter.tool_list_databases()
+        assert "identifier='materialized'" in s
+        s = adapter.tool_list_tables("materialized")
+        assert "album_count" in s
+        assert "_materializations" in s
+
+        s = adapter.tool_execute_select_statement(
+            database_identifier="materialized",
+            sql="SELECT COUNT(*) AS n, SUM(n_albums) AS total FROM album_count",
+            format="csv",
+        )
+        # print(s)  # for debug only
+        assert "n:int,total:int\n20,40" in s
+        assert (
+            f"album_count materialized from {database_identifier!r} at" in s
+        )
+        s = adapter.tool_execute_select_statement(
+            database_identifier="materialized",
+            sql="SELECT name, n_rows, error FROM _materializations ORDER BY name",
+            format="csv",
+        )
+        assert "album_count,20,\n" in s
+        assert "broken,0,(sqlite3.OperationalError) no such table" in s
+
+        # the materialized database is read-only
+        database = adapter.config.databases_mapping["materialized"]
+        with database.connection.sa_engine.connect() as conn:
+            try:
+                conn.exec_driver_sql("DELETE FROM album_count")
+                raise AssertionError("the materialized database must be read-only")
+            except Exception as e:
+                assert "readonly" in str(e)
+
+        # nothing is due yet, but the failed refresh after retry_interval
+        assert adapter.refresh_due_materializations() == []
+        now = time.time() + 601
+        statuses = adapter.refresh_due_materializations(now=now)
+        assert [status.name for status in statuses] == ["broken"]
+        statuses = adapter.refresh_due_materializations(now=now + 86400)
+        assert [status.name for status in statuses] == ["album_count", "broken"]
+        assert statuses[0].n_rows == 20
+
+        # a changed query is refreshed right away
+        adapter.config.materializations[0].sql = "SELECT 1 AS n"
+        statuses = adapter.refresh_due_materializations()
+        assert [status.name for status in statuses] == ["album_count"]
+        s = adapter.tool_execute_select_statement(
+            database_identifier="materialized",
+            sql="SELECT * FROM album_count",
+            format="csv",
+        )
+        assert "n:int\n1" in s
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.adapter.materialize_adapter",
+        preview=False,
+    )
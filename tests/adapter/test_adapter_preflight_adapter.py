@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+from mcp_ohmy_sql.config.api import Settings, PreflightSettings
+from mcp_ohmy_sql.adapter.adapter import Adapter
+from mcp_ohmy_sql.tests.test_config import DatabaseEnum
+
+
+def new_adapter(config, **kwargs) -> Adapter:
+    settings = Settings(preflight=PreflightSettings(enabled=True, **kwargs))
+    return Adapter(config=config.model_copy(update={"settings": settings}))
+
+
+class TestPreflightAdapterMixin:
+    def test_get_query_plan(
+        self,
+        mcp_ohmy_sql_adapter,
+        sqlite_sa_engine_objs,
+    ):
+        database = mcp_ohmy_sql_adapter.config.databases_mapping[
+            DatabaseEnum.chinook_sqlite.identifier
+        ]
+        query_plan = mcp_ohmy_sql_adapter.get_query_plan(
+            database, "SELECT * FROM Album"
+        )
+        # normalized query hits the cache
+        assert (
+            mcp_ohmy_sql_adapter.get_query_plan(database, "select *  from Album;")
+            is query_plan
+        )
+
+    def test_run_preflight(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        adapter = Adapter(config=mcp_ohmy_sql_config)
+        database = adapter.config.databases_mapping[
+            DatabaseEnum.chinook_sqlite.identifier
+        ]
+        # disabled by default
+        assert adapter.run_preflight(database, "SELECT * FROM Album") is None
+
+        adapter = new_adapter(mcp_ohmy_sql_config, max_estimated_rows=3, exact_count=True)
+        result = adapter.run_preflight(database, "SELECT * FROM Album")
+        assert result.passed is False
+        result = adapter.run_preflight(
+            database, "SELECT * FROM Album WHERE AlbumId = :id", {"id": 1}
+        )
+        assert result.passed is True
+        assert result.exact_count == 1
+        # fail open on invalid SQL
+        assert adapter.run_preflight(database, "SELECT * FROM NotExists") is None
+
+    def test_tool_execute_select_statement(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        adapter = new_adapter(mcp_ohmy_sql_config, max_estimated_rows=3, exact_count=True)
+        s = adapter.tool_execute_select_statement(
+            database_identifier=DatabaseEnum.chinook_sqlite.identifier,
+            sql="SELECT * FROM Album",
+        )
+        assert s.startswith("Error: Query rejected by the pre-flight cost guard")
+
+        adapter = new_adapter(
+            mcp_ohmy_sql_config,
+            max_estimated_rows=3,
+            exact_count=True,
+            action="preview",
+            preview_rows=2,
+        )
+        s = adapter.tool_execute_select_statement(
+            database_identifier=DatabaseEnum.chinook_sqlite.identifier,
+            sql="SELECT * FROM Album",
+        )
+        # print(s)  # for debug only
+        assert s.startswith("# Warning")
+        assert "truncated to the first 2 rows" in s
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.adapter.preflight_adapter.py",
+        preview=False,
+    )
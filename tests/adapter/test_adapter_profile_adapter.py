@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+import re
+
+from mcp_ohmy_sql.config.api import Settings, ProfilingSettings, Config
+from mcp_ohmy_sql.adapter.adapter import Adapter
+from mcp_ohmy_sql.tests.test_config import DatabaseEnum
+
+
+def new_profiled_adapter(config: Config, **kwargs) -> Adapter:
+    database = config.databases_mapping[DatabaseEnum.chinook_sqlite.identifier]
+    return Adapter(
+        config=Config(
+            version=config.version,
+            settings=Settings(profiling=ProfilingSettings(enabled=True, **kwargs)),
+            databases=[database],
+        )
+    )
+
+
+class TestProfileAdapterMixin:
+    def test_tool_get_schema_details(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        database_identifier = DatabaseEnum.chinook_sqlite.identifier
+        adapter = new_profiled_adapter(mcp_ohmy_sql_config, sample_rows=30)
+
+        # the first call starts profiling in the background
+        s = adapter.tool_get_schema_details(database_identifier, include_profiles=True)
+        # print(s)  # for debug only
+        assert s.startswith("Schema default(")
+        assert "tables are being profiled in the background" in s
+        adapter.profile_store.shutdown()
+
+        s = adapter.tool_get_schema_details(database_identifier, include_profiles=True)
+        # print(s)  # for debug only
+        assert "being profiled" not in s
+        # small tables are read whole
+        assert "  Table MediaType(3 rows)(\n" in s
+        assert "    MediaTypeId:distinct=3,min=1,max=3,\n" in s
+        # large tables are sampled again at the rate giving about 30 rows
+        match = re.search(r"  Table Track\((\d+) sampled rows\)\(\n", s)
+        assert 0 < int(match.group(1)) <= 30
+        assert "    MediaTypeId:distinct~3,min=1,max=3,\n" in s
+        # low-cardinality text columns have their values
+        assert "Composer:null=" in s
+        assert "values=['Composer " in s
+        # views are not profiled
+        assert "Table AlbumSalesStats(" not in s.split("Profiles(")[1]
+
+        # profiles are only added on request
+        s = adapter.tool_get_schema_details(database_identifier)
+        assert "Profiles(" not in s
+
+    def test_profile_table(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        adapter = new_profiled_adapter(mcp_ohmy_sql_config, sample_percent=100)
+        database = adapter.config.databases[0]
+        profile = adapter.profile_table(
+            database=database,
+            schema_name=None,
+            table_name="Genre",
+            column_names=["GenreId", "Name"],
+        )
+        assert (profile.n_rows, profile.complete) == (5, True)
+        assert profile.columns[0].encode() == "GenreId:distinct=5,min=1,max=5"
+        # a small table is counted and read whole when its sample is too small
+        adapter = new_profiled_adapter(mcp_ohmy_sql_config, sample_percent=1)
+        profile = adapter.profile_table(
+            database=database,
+            schema_name=None,
+            table_name="Genre",
+            column_names=["GenreId", "Name"],
+        )
+        assert (profile.n_rows, profile.complete) == (5, True)
+        # the deadline has passed
+        assert (
+            adapter.profile_table(
+                database=database,
+                schema_name=None,
+                table_name="Genre",
+                column_names=["GenreId"],
+                deadline=0,
+            )
+            is None
+        )
+
+    def test_disabled(
+        self,
+        mcp_ohmy_sql_adapter,
+        sqlite_sa_engine_objs,
+    ):
+        s = mcp_ohmy_sql_adapter.tool_get_schema_details(
+            DatabaseEnum.chinook_sqlite.identifier,
+            include_profiles=True,
+        )
+        assert s.endswith(
+            "Column profiles are disabled, "
+            "set settings.profiling.enabled to compute them."
+        )
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.adapter.profile_adapter",
+        preview=False,
+    )
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+import typing as T
+import shutil
+
+import sqlalchemy as sa
+
+from mcp_ohmy_sql.paths import dir_tmp
+from mcp_ohmy_sql.config.api import (
+    Settings,
+    ResultCacheSettings,
+    SqlalchemyConnection,
+    Config,
+)
+from mcp_ohmy_sql.adapter.adapter import Adapter
+from mcp_ohmy_sql.tests.chinook.chinook_data_file import path_Chinook_Sqlite_sqlite
+from mcp_ohmy_sql.tests.test_config import DatabaseEnum
+
+dir_cache = dir_tmp.joinpath("test_adapter_result_cache_adapter")
+
+
+def new_appendable_adapter(
+    config: Config,
+    settings: Settings,
+    append_only_tables: T.Optional[list[str]] = None,
+) -> Adapter:
+    """
+    A copy of the chinook sqlite database we can insert rows into.
+    """
+    shutil.rmtree(dir_cache, ignore_errors=True)
+    dir_cache.mkdir(parents=True)
+    path = dir_cache.joinpath("chinook.sqlite")
+    shutil.copy(path_Chinook_Sqlite_sqlite, path)
+    database = config.databases_mapping[DatabaseEnum.chinook_sqlite.identifier]
+    schemas = [
+        schema.model_copy(update={"append_only_tables": append_only_tables or []})
+        for schema in database.schemas
+    ]
+    database = database.model_copy(
+        update={
+            "connection": SqlalchemyConnection(url=f"sqlite:///{path}"),
+            "schemas": schemas,
+        }
+    )
+    return Adapter(
+        config=Config(version=config.version, settings=settings, databases=[database])
+    )
+
+
+def insert_album(adapter: Adapter, album_id: int, artist_id: int = 1):
+    database = adapter.config.databases[0]
+    with database.connection.sa_engine.begin() as conn:
+        conn.execute(
+            sa.text(
+                "INSERT INTO Album (AlbumId, Title, ArtistId) "
+                "VALUES (:id, :title, :artist_id)"
+            ),
+            {"id": album_id, "title": f"New Album {album_id}", "artist_id": artist_id},
+        )
+
+
+class TestResultCacheAdapterMixin:
+    def test_tool_execute_select_statement(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        settings = Settings(result_cache=ResultCacheSettings(enabled=True, ttl=0))
+        adapter = new_appendable_adapter(
+            mcp_ohmy_sql_config, settings, append_only_tables=["Album"]
+        )
+        database_identifier = DatabaseEnum.chinook_sqlite.identifier
+        sql = "SELECT AlbumId, Title FROM Album WHERE AlbumId > 35"
+
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql=sql,
+            format="csv",
+        )
+        assert "AlbumId:int,Title:str\n36," in s
+        assert "cached result" not in s
+
+        # the SQLite probe can't tell an insert from an update, so a change
+        # of an append-only table still runs the query in full
+        insert_album(adapter, 41)
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql=sql,
+            format="csv",
+        )
+        # print(s)  # for debug only
+        assert s.endswith("40,Album 40\n41,New Album 41")
+        assert "cached result" not in s
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql=sql,
+            format="csv",
+        )
+        # the table is unchanged, no query runs
+        assert "cached result from 0 seconds ago, its tables are unchanged" in s
+
+        # a join is served while its tables are unchanged, it can't be
+        # refreshed incrementally, so it runs in full when they change
+        join_sql = (
+            "SELECT a.AlbumId, r.Name FROM Album AS a "
+            "JOIN Artist AS r ON a.ArtistId = r.ArtistId WHERE a.AlbumId > 40"
+        )
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql=join_sql,
+            format="csv",
+        )
+        assert "41,Artist 1" in s
+        assert "cached result" not in s
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql=join_sql,
+            format="csv",
+        )
+        assert "its tables are unchanged" in s
+        insert_album(adapter, 42)
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql=join_sql,
+            format="csv",
+        )
+        assert "42,Artist 1" in s
+        assert "cached result" not in s
+
+        # without change tracking, only the appended rows are fetched
+        settings = Settings(
+            result_cache=ResultCacheSettings(
+                enabled=True, ttl=0, track_table_changes=False
+            )
+        )
+        adapter = new_appendable_adapter(
+            mcp_ohmy_sql_config, settings, append_only_tables=["Album"]
+        )
+        adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql=sql,
+        )
+        insert_album(adapter, 41)
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql=sql,
+            format="csv",
+        )
+        assert "40,Album 40\n41,New Album 41\n" in s
+        assert "cached result refreshed incrementally, 1 new rows with AlbumId >= 40" in s
+
+        # a primary key alone doesn't make a table append-only
+        adapter = new_appendable_adapter(mcp_ohmy_sql_config, settings)
+        adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql=sql,
+        )
+        insert_album(adapter, 41)
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql=sql,
+            format="csv",
+        )
+        assert s.endswith("40,Album 40\n41,New Album 41")
+
+        # a hinted key may be repeated, the rows with the largest key are
+        # fetched again, so a later row with the same key is not lost
+        hint_sql = (
+            "SELECT AlbumId, ArtistId FROM Album WHERE AlbumId > 40 "
+            "/* incremental_key: ArtistId */"
+        )
+        insert_album(adapter, 42, artist_id=1000)
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql=hint_sql,
+            format="csv",
+        )
+        assert s.endswith("AlbumId:int,ArtistId:int\n41,1\n42,1000")
+        insert_album(adapter, 43, artist_id=1000)
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql=hint_sql,
+            format="csv",
+        )
+        # print(s)  # for debug only
+        assert "AlbumId:int,ArtistId:int\n41,1\n42,1000\n43,1000\n" in s
+        assert "1 new rows with ArtistId >= 1000" in s
+
+        # within the ttl, the cached result is served as it is
+        settings = Settings(result_cache=ResultCacheSettings(enabled=True, ttl=3600))
+        adapter = new_appendable_adapter(mcp_ohmy_sql_config, settings)
+        s1 = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql=sql,
+            format="csv",
+        )
+        insert_album(adapter, 41)
+        s2 = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql=sql,
+            format="csv",
+        )
+        assert "New Album 41" not in s2
+        assert "cached result from 0 seconds ago" in s2
+        assert len(adapter.result_cache) == 1
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.adapter.result_cache_adapter",
+        preview=False,
+    )
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+from mcp_ohmy_sql.config.api import Settings
+from mcp_ohmy_sql.adapter.adapter import Adapter
+from mcp_ohmy_sql.tests.test_config import DatabaseEnum
+
+
+class TestRewriteAdapterMixin:
+    def test_truncate_large_values(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        settings = Settings(push_down_truncation=True)
+        mcp_ohmy_sql_adapter = Adapter(
+            config=mcp_ohmy_sql_config.model_copy(update={"settings": settings})
+        )
+        database = mcp_ohmy_sql_adapter.config.databases_mapping[
+            DatabaseEnum.chinook_sqlite.identifier
+        ]
+        column_index = mcp_ohmy_sql_adapter.get_column_index(database)
+        # the test schema uses VARCHAR without length
+        assert dict(column_index["album"])["Title"] == "text"
+        assert dict(column_index["album"])["AlbumId"] is None
+        # cached
+        assert mcp_ohmy_sql_adapter.get_column_index(database) is column_index
+
+        sql = mcp_ohmy_sql_adapter.truncate_large_values(
+            database, "SELECT * FROM Album", column_index
+        )
+        assert sql == (
+            "SELECT AlbumId, SUBSTRING(Title, 1, 201) AS Title, ArtistId FROM Album"
+        )
+        sql = "SELECT AlbumId FROM Album"
+        assert (
+            mcp_ohmy_sql_adapter.truncate_large_values(database, sql, column_index)
+            == sql
+        )
+
+    def test_truncate_large_values_disabled(
+        self,
+        mcp_ohmy_sql_adapter,
+        sqlite_sa_engine_objs,
+    ):
+        # disabled by default
+        adapter = mcp_ohmy_sql_adapter
+        database = adapter.config.databases_mapping[
+            DatabaseEnum.chinook_sqlite.identifier
+        ]
+        column_index = adapter.get_column_index(database)
+        sql = "SELECT * FROM Album"
+        assert adapter.truncate_large_values(database, sql, column_index) == sql
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.adapter.rewrite_adapter",
+        preview=False,
+    )
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import re
+import shutil
+
+from mcp_ohmy_sql.config.api import Settings, SpillSettings
+from mcp_ohmy_sql.adapter.adapter import Adapter
+from mcp_ohmy_sql.paths import dir_tmp
+from mcp_ohmy_sql.tests.test_config import DatabaseEnum
+
+dir_spill = dir_tmp.joinpath("test_adapter_spill_adapter")
+
+
+class TestSpillAdapterMixin:
+    def test_tool_fetch_result_page(
+        self,
+        mcp_ohmy_sql_config,
+        sqlite_sa_engine_objs,
+    ):
+        shutil.rmtree(dir_spill, ignore_errors=True)
+        settings = Settings(
+            spill=SpillSettings(enabled=True, directory=str(dir_spill), page_rows=10),
+        )
+        adapter = Adapter(
+            config=mcp_ohmy_sql_config.model_copy(update={"settings": settings})
+        )
+        database_identifier = DatabaseEnum.chinook_sqlite.identifier
+
+        # small results are returned inline
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql="SELECT AlbumId FROM Album ORDER BY AlbumId LIMIT 3",
+            format="csv",
+        )
+        assert s.endswith("AlbumId:int\n1\n2\n3")
+
+        # large results are spilled, the first page is returned
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql="SELECT AlbumId FROM Album ORDER BY AlbumId",
+            format="csv",
+        )
+        # print(s)  # for debug only
+        assert "AlbumId:int\n1\n2\n" in s
+        assert "page 1 of 4 (rows 1-10 of 40)" in s
+        handle = re.search(r"handle: (\w+)", s).group(1)
+
+        s = adapter.tool_fetch_result_page(handle=handle, page=4, format="csv")
+        # print(s)  # for debug only
+        assert s.startswith("# Query Result\nAlbumId:int\n31\n")
+        assert "40\n... (page 4 of 4 (rows 31-40 of 40), handle: " in s
+        assert "next page" not in s
+
+        # the rows cut by the budget are on the same page
+        s = adapter.tool_fetch_result_page(
+            handle=handle, page=2, max_result_chars=20, format="csv"
+        )
+        # print(s)  # for debug only
+        assert "only 2 of the 10 rows of this page fit in max_result_chars" in s
+        assert f"handle={handle!r} and page=2 and a larger max_result_chars" in s
+
+        # rows that can't be spilled are returned inline
+        s = adapter.tool_execute_select_statement(
+            database_identifier=database_identifier,
+            sql=(
+                "SELECT CASE WHEN AlbumId <= 10 THEN AlbumId "
+                "ELSE 'album ' || AlbumId END AS v FROM Album ORDER BY AlbumId"
+            ),
+            format="csv",
+        )
+        assert "handle" not in s
+        assert s.endswith("\nalbum 40")
+
+        s = adapter.tool_fetch_result_page(handle=handle, page=5)
+        assert s == "Error: Page 5 is out of range, the result has 4 pages"
+        s = adapter.tool_fetch_result_page(handle="invalid", page=1)
+        assert "not found or expired" in s
+        s = adapter.tool_fetch_result_page(handle=handle, page=1, format="xml")
+        assert s.startswith("Error: Unknown result format 'xml'")
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.adapter.spill_adapter",
+        preview=False,
+    )
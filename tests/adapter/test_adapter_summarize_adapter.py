@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+from mcp_ohmy_sql.tests.test_config import DatabaseEnum
+
+
+class TestSummarizeAdapterMixin:
+    def test_tool_summarize_query(
+        self,
+        mcp_ohmy_sql_adapter,
+        sqlite_sa_engine_objs,
+    ):
+        adapter = mcp_ohmy_sql_adapter
+        database_identifier = DatabaseEnum.chinook_sqlite.identifier
+        s = adapter.tool_summarize_query(
+            database_identifier=database_identifier,
+            sql=(
+                "SELECT a.AlbumId, a.Title, r.Name AS ArtistName, "
+                "CASE WHEN a.AlbumId % 4 = 0 THEN NULL ELSE a.AlbumId * 0.5 END AS half "
+                "FROM Album AS a JOIN Artist AS r ON a.ArtistId = r.ArtistId "
+                "WHERE a.AlbumId <= :max_id"
+            ),
+            params={"max_id": 30},
+            format="csv",
+        )
+        # print(s)  # for debug only
+        assert "# Summary\n30 rows, 4 columns\n" in s
+        assert (
+            "column:str,type:str,null_ratio:float,distinct:int,"
+            "min:int,max:int,mean:float,top_values:str"
+        ) in s
+        assert "AlbumId,number,0.0,30,1,30,15.5," in s
+        assert "half,number,0.2333,23,0.5,15.0,7.67391," in s
+        # unique titles have no top values, repeated artists have
+        assert "Title,text,0.0,30,Album 1,Album 9,,\n" in s
+        assert "ArtistName,text,0.0,20,Artist 1,Artist 9,," in s
+        assert '"Artist 10 (2), Artist 11 (2), Artist 2 (2),' in s
+
+        s = adapter.tool_summarize_query(
+            database_identifier=database_identifier,
+            sql="SELECT Name FROM Artist",
+            top_k=0,
+        )
+        assert "top_values" not in s
+
+        s = adapter.tool_summarize_query(
+            database_identifier=database_identifier,
+            sql="SELECT * FROM NoSuchTable",
+        )
+        assert s.startswith("Error summarizing query: ")
+        s = adapter.tool_summarize_query(
+            database_identifier=database_identifier,
+            sql="DELETE FROM Album",
+        )
+        assert s.startswith("Error: ")
+        s = adapter.tool_summarize_query(
+            database_identifier=database_identifier,
+            sql="SELECT * FROM Album",
+            top_k=-1,
+        )
+        assert s == "Error: top_k must be between 0 and 100."
+        s = adapter.tool_summarize_query(
+            database_identifier="invalid",
+            sql="SELECT * FROM Album",
+        )
+        assert s.startswith("Error: Database 'invalid' not found")
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.adapter.summarize_adapter",
+        preview=False,
+    )
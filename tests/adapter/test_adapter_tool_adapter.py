@@ -94,12 +94,73 @@ class TestToolAdapterMixin:
         )
         # print(s)  # for debug only
 
+        s = mcp_ohmy_sql_adapter.tool_execute_select_statement(
+            database_identifier=DatabaseEnum.chinook_sqlite.identifier,
+            sql="SELECT * FROM Album",
+            max_result_chars=200,
+        )
+        # print(s)  # for debug only
+        assert "chars budget: showing" in s
+        assert "elided" not in s
+
+        s = mcp_ohmy_sql_adapter.tool_execute_select_statement(
+            database_identifier=DatabaseEnum.chinook_sqlite.identifier,
+            sql="SELECT AlbumId FROM Album ORDER BY AlbumId LIMIT 2",
+            format="jsonl",
+        )
+        # print(s)  # for debug only
+        assert '{"AlbumId": 1}\n{"AlbumId": 2}' in s
+
+        s = mcp_ohmy_sql_adapter.tool_execute_select_statement(
+            database_identifier=DatabaseEnum.chinook_sqlite.identifier,
+            sql="SELECT 1",
+            format="xml",
+        )
+        assert s.startswith("Error: Unknown result format 'xml'")
+
         s = mcp_ohmy_sql_adapter.tool_execute_select_statement(
             database_identifier="invalid database",
             sql="SELECT 1",
         )
         assert "Database 'invalid database' not found in configuration" in s
 
+    def test_tool_execute_select_statement_approximate(
+        self,
+        mcp_ohmy_sql_adapter,
+        sqlite_sa_engine_objs,
+    ):
+        # the default 1% sample of the 200 tracks keeps a handful of rows
+        s = mcp_ohmy_sql_adapter.tool_execute_select_statement(
+            database_identifier=DatabaseEnum.chinook_sqlite.identifier,
+            sql=(
+                "SELECT t.GenreId, COUNT(*) AS n_tracks, MAX(t.Bytes) AS max_bytes "
+                "FROM Track AS t JOIN Genre AS g ON t.GenreId = g.GenreId "
+                "GROUP BY t.GenreId"
+            ),
+            format="csv",
+            approximate=True,
+        )
+        # print(s)  # for debug only
+        assert (
+            "... (Approximate result: 1% sample of Track (RANDOM() filter). "
+            "COUNT and SUM are scaled by 100, "
+        ) in s
+        assert "±9.9% from 100 rows" in s
+        assert s.endswith("Not scaled, computed on the sample: MAX.)")
+        for line in s.split("# Query Result\n")[1].splitlines()[1:-1]:
+            assert int(line.split(",")[1]) % 100 == 0
+
+        # views can't be sampled
+        s = mcp_ohmy_sql_adapter.tool_execute_select_statement(
+            database_identifier=DatabaseEnum.chinook_sqlite.identifier,
+            sql="SELECT * FROM AlbumSalesStats",
+            approximate=True,
+        )
+        assert s == (
+            "Error: The query can't be approximated, the first table of the "
+            "FROM clause must be a base table, not a subquery, a CTE or a view."
+        )
+
     @pytest.mark.skipif(
         condition=runtime.is_local_runtime_group is False,
         reason="only run on local runtime",
@@ -115,6 +176,44 @@ class TestToolAdapterMixin:
         )
         # print(s)  # for debug only
 
+    def test_tool_explain_query(
+        self,
+        mcp_ohmy_sql_adapter,
+        sqlite_sa_engine_objs,
+    ):
+        s = mcp_ohmy_sql_adapter.tool_explain_query(
+            database_identifier=DatabaseEnum.chinook_sqlite.identifier,
+            sql="SELECT * FROM Album ORDER BY Title",
+        )
+        # print(s)  # for debug only
+        assert "# Query Plan" in s
+        assert "- Full scan on Album" in s
+
+        s = mcp_ohmy_sql_adapter.tool_explain_query(
+            database_identifier=DatabaseEnum.chinook_sqlite.identifier,
+            sql="SELECT * FROM Album",
+            analyze=True,
+        )
+        assert s.startswith("Note: analyze is not supported for sqlite")
+
+        s = mcp_ohmy_sql_adapter.tool_explain_query(
+            database_identifier=DatabaseEnum.chinook_sqlite.identifier,
+            sql="DELETE FROM Album",
+        )
+        assert s.startswith("Error: Invalid query")
+
+        s = mcp_ohmy_sql_adapter.tool_explain_query(
+            database_identifier=DatabaseEnum.chinook_sqlite.identifier,
+            sql="SELECT * FROM NotExists",
+        )
+        assert s.startswith("Error explaining query")
+
+        s = mcp_ohmy_sql_adapter.tool_explain_query(
+            database_identifier="invalid database",
+            sql="SELECT 1",
+        )
+        assert "Database 'invalid database' not found in configuration" in s
+
 
 if __name__ == "__main__":
     from mcp_ohmy_sql.tests import run_cov_test
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+import decimal
+
+from mcp_ohmy_sql.result.buffer import fill_result_buffer
+from mcp_ohmy_sql.aws.aws_redshift.query import format_result
+
+
+class FakeCursor:
+    """
+    Mimic ``redshift_connector.Cursor``, rows are lists and ``fetchmany``
+    returns a tuple.
+    """
+
+    def __init__(self, rows: list[list]):
+        self.rows = rows
+
+    def fetchmany(self, num: int) -> tuple:
+        batch, self.rows = self.rows[:num], self.rows[num:]
+        return tuple(batch)
+
+
+def test_format_result():
+    columns = ["id", "total"]
+    cursor = FakeCursor([[i, decimal.Decimal("1.50")] for i in range(1, 2501)])
+    rows = fill_result_buffer(columns, cursor.fetchmany, max_rows=2000)
+    assert len(rows) == 2001
+    text = format_result(columns, rows, max_rows=2000, result_format="csv")
+    lines = text.splitlines()
+    assert lines[:3] == ["id:int,total:dec", "1,1.50", "2,1.50"]
+    assert lines[-1].startswith("... (result truncated to the first 2000 rows")
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.aws.aws_redshift.query",
+        preview=False,
+    )
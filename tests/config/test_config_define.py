@@ -1,11 +1,17 @@
 # -*- coding: utf-8 -*-
 
+import pytest
+
 from mcp_ohmy_sql.config.define import (
+    PreflightSettings,
+    SpillSettings,
+    MaterializationSettings,
     Settings,
     TableFilter,
     Schema,
     SqlalchemyConnection,
     Database,
+    Materialization,
     Config,
 )
 from mcp_ohmy_sql.paths import path_sample_config
@@ -75,6 +81,81 @@ class TestConfig:
                 pass
 
 
+def test_preflight_settings():
+    assert PreflightSettings().enabled is False
+    assert PreflightSettings(action="preview").action == "preview"
+    with pytest.raises(ValueError):
+        PreflightSettings(action="invalid")
+
+
+def test_spill_settings():
+    assert SpillSettings().spill_dir.name == "mcp_ohmy_sql_spill"
+    assert str(SpillSettings(directory="/tmp/spill").spill_dir) == "/tmp/spill"
+
+
+def test_materializations():
+    database = Database(
+        identifier="chinook_sqlite",
+        db_type="sqlite",
+        connection=SqlalchemyConnection(url="sqlite://"),
+        schemas=[Schema()],
+    )
+    materialization = Materialization(
+        name="album_count",
+        database_identifier="chinook_sqlite",
+        sql="SELECT COUNT(*) AS n FROM Album",
+        refresh_hours=[1, 2],
+    )
+    settings = Settings(
+        materialization=MaterializationSettings(enabled=True, directory="/tmp/m")
+    )
+    config = Config(
+        version="0.1.1",
+        settings=settings,
+        databases=[database],
+        materializations=[materialization],
+    )
+    materialized = config.databases_mapping["materialized"]
+    assert materialized.connection.url == (
+        "sqlite:///file:/tmp/m/materialized.sqlite?mode=ro&uri=true"
+    )
+    assert "album_count" in materialized.description
+    # a dump of the config loads again
+    assert Config(**config.model_dump()) == config
+
+    # disabled, the database is not added
+    config = Config(
+        version="0.1.1",
+        databases=[database],
+        materializations=[materialization],
+    )
+    assert list(config.databases_mapping) == ["chinook_sqlite"]
+
+    with pytest.raises(ValueError):
+        Materialization(name="_x", database_identifier="chinook_sqlite", sql="...")
+    with pytest.raises(ValueError):
+        Materialization(
+            name="x",
+            database_identifier="chinook_sqlite",
+            sql="...",
+            refresh_hours=[24],
+        )
+    with pytest.raises(ValueError):
+        Config(
+            version="0.1.1",
+            databases=[database],
+            materializations=[
+                Materialization(name="x", database_identifier="invalid", sql="...")
+            ],
+        )
+    with pytest.raises(ValueError):
+        Config(
+            version="0.1.1",
+            databases=[database],
+            materializations=[materialization, materialization],
+        )
+
+
 if __name__ == "__main__":
     from mcp_ohmy_sql.tests import run_cov_test
 
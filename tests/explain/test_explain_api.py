@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+from mcp_ohmy_sql.explain import api
+
+
+def test():
+    _ = api
+    _ = api.PlanNode
+    _ = api.QueryPlan
+    _ = api.find_hotspots
+    _ = api.encode_query_plan
+    _ = api.get_explain_sql
+    _ = api.parse_explain_rows
+    _ = api.explain_query
+    _ = api.PlanCache
+    _ = api.PreflightResult
+    _ = api.check_query_plan
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.explain.api",
+        preview=False,
+    )
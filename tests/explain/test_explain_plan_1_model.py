@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+from mcp_ohmy_sql.constants import DbTypeEnum
+from mcp_ohmy_sql.explain.plan_1_model import PlanNode, QueryPlan
+
+
+def test_query_plan():
+    query_plan = QueryPlan(
+        db_type=DbTypeEnum.POSTGRESQL,
+        root=PlanNode(
+            node_type="Hash Join",
+            estimated_rows=10,
+            estimated_cost=500,
+            children=[
+                PlanNode(node_type="Seq Scan", relation="track", estimated_rows=3500),
+                PlanNode(node_type="Hash", children=[PlanNode(node_type="Seq Scan")]),
+            ],
+        ),
+    )
+    assert len(list(query_plan.walk())) == 4
+    assert query_plan.estimated_rows == 10
+    assert query_plan.estimated_cost == 500
+    assert query_plan.max_estimated_rows == 3500
+    assert query_plan.max_processed_rows == 3500
+
+    # a scan stops at the limit, unless it feeds a sort
+    scan = PlanNode(node_type="Seq Scan", relation="track", estimated_rows=3500)
+    query_plan = QueryPlan(
+        db_type=DbTypeEnum.POSTGRESQL,
+        root=PlanNode(node_type="Limit", estimated_rows=10, children=[scan]),
+    )
+    assert query_plan.max_estimated_rows == 3500
+    assert query_plan.max_processed_rows == 10
+    query_plan = QueryPlan(
+        db_type=DbTypeEnum.AWS_REDSHIFT,
+        root=PlanNode(
+            node_type="XN Limit",
+            estimated_rows=10,
+            children=[
+                PlanNode(node_type="XN Sort", estimated_rows=3500, children=[scan])
+            ],
+        ),
+    )
+    assert query_plan.max_processed_rows == 3500
+
+    query_plan = QueryPlan(
+        db_type=DbTypeEnum.SQLITE,
+        root=PlanNode(node_type="Query"),
+    )
+    assert query_plan.max_estimated_rows is None
+    assert query_plan.max_processed_rows is None
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.explain.plan_1_model",
+        preview=False,
+    )
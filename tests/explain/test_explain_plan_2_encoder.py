@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+from mcp_ohmy_sql.constants import DbTypeEnum
+from mcp_ohmy_sql.explain.plan_1_model import PlanNode, QueryPlan
+from mcp_ohmy_sql.explain.plan_2_encoder import (
+    encode_plan_node,
+    find_expensive_nodes,
+    find_full_scans,
+    find_sorts,
+    find_redistributions,
+    find_misestimates,
+    find_missing_statistics,
+    encode_query_plan,
+)
+
+REDSHIFT_QUERY_PLAN = QueryPlan(
+    db_type=DbTypeEnum.AWS_REDSHIFT,
+    root=PlanNode(
+        node_type="XN Hash Join DS_DIST_BOTH",
+        estimated_cost=1_000_000,
+        estimated_rows=5_000_000,
+        details=["----- Tables missing statistics: track -----"],
+        children=[
+            PlanNode(
+                node_type="XN Seq Scan",
+                relation="track",
+                estimated_cost=900_000,
+                estimated_rows=5_000_000,
+                details=["Filter: (milliseconds > 1000)"],
+            ),
+            PlanNode(
+                node_type="XN Hash",
+                estimated_cost=10,
+                children=[
+                    PlanNode(
+                        node_type="XN Seq Scan",
+                        relation="album",
+                        estimated_cost=10,
+                        estimated_rows=347,
+                    )
+                ],
+            ),
+        ],
+    ),
+)
+
+
+def test_encode_plan_node():
+    node = PlanNode(
+        node_type="Seq Scan",
+        relation="album",
+        estimated_cost=6.47,
+        estimated_rows=347,
+        actual_rows=2000,
+        actual_time=1.234,
+        details=["Filter: (id > 10)"],
+    )
+    assert encode_plan_node(node) == (
+        "Seq Scan on album (cost=6.47 rows=347 actual_rows=2.0K time=1.2ms) "
+        "[Filter: (id > 10)]"
+    )
+    assert encode_plan_node(PlanNode(node_type="Nested Loop")) == "Nested Loop"
+
+
+def test_find_hotspots():
+    lines = find_expensive_nodes(REDSHIFT_QUERY_PLAN)
+    assert lines == [
+        "- Expensive: XN Seq Scan on track, cost 900.0K (90% of total)",
+        "- Expensive: XN Hash Join DS_DIST_BOTH, cost 100.0K (10% of total)",
+    ]
+
+    lines = find_full_scans(REDSHIFT_QUERY_PLAN)
+    assert len(lines) == 1
+    assert lines[0].startswith("- Missing index?: full scan on track (~5.0M rows)")
+
+    lines = find_redistributions(REDSHIFT_QUERY_PLAN)
+    assert "distribute both tables on the join column" in lines[0]
+
+    lines = find_missing_statistics(REDSHIFT_QUERY_PLAN)
+    assert lines == [
+        "- Missing statistics: Tables missing statistics: track, run ANALYZE"
+    ]
+
+    query_plan = QueryPlan(
+        db_type=DbTypeEnum.SQLITE,
+        root=PlanNode(
+            node_type="Query",
+            children=[
+                PlanNode(node_type="Table Scan", relation="Album"),
+                PlanNode(node_type="USE TEMP B-TREE FOR ORDER BY"),
+            ],
+        ),
+    )
+    assert find_expensive_nodes(query_plan) == []
+    assert find_full_scans(query_plan) == ["- Full scan on Album"]
+    assert len(find_sorts(query_plan)) == 1
+
+    query_plan = QueryPlan(
+        db_type=DbTypeEnum.POSTGRESQL,
+        root=PlanNode(
+            node_type="Seq Scan",
+            relation="album",
+            estimated_rows=10,
+            actual_rows=5000,
+            actual_time=12.5,
+        ),
+        analyzed=True,
+    )
+    assert find_expensive_nodes(query_plan) == [
+        "- Expensive: Seq Scan on album, 12.5ms (100% of total)"
+    ]
+    assert "statistics may be stale" in find_misestimates(query_plan)[0]
+
+
+def test_encode_query_plan():
+    s = encode_query_plan(REDSHIFT_QUERY_PLAN)
+    # print(s)  # for debug only
+    assert s.startswith("# Query Plan\nXN Hash Join DS_DIST_BOTH")
+    assert "\n    XN Seq Scan on album" in s
+    assert "# Hotspots" in s
+
+    s = encode_query_plan(REDSHIFT_QUERY_PLAN, max_nodes=2)
+    assert "... (2 more nodes)" in s
+
+    s = encode_query_plan(
+        QueryPlan(db_type=DbTypeEnum.SQLITE, root=PlanNode(node_type="Query"))
+    )
+    assert s.endswith("No obvious hotspot found.")
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.explain.plan_2_encoder",
+        preview=False,
+    )
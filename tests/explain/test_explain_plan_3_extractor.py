@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from mcp_ohmy_sql.constants import DbTypeEnum
+from mcp_ohmy_sql.explain.plan_3_extractor import (
+    strip_sql,
+    get_explain_sql,
+    parse_postgres_plan,
+    parse_text_plan,
+    parse_mysql_plan,
+    parse_explain_rows,
+    explain_query,
+)
+
+POSTGRES_PLAN = [
+    {
+        "Plan": {
+            "Node Type": "Hash Join",
+            "Join Type": "Inner",
+            "Total Cost": 120.5,
+            "Plan Rows": 347,
+            "Hash Cond": "(album.artist_id = artist.artist_id)",
+            "Plans": [
+                {
+                    "Node Type": "Seq Scan",
+                    "Relation Name": "album",
+                    "Total Cost": 6.47,
+                    "Plan Rows": 347,
+                    "Actual Rows": 347,
+                    "Actual Loops": 1,
+                    "Actual Total Time": 0.05,
+                    "Shared Hit Blocks": 3,
+                    "Shared Read Blocks": 0,
+                },
+                {
+                    "Node Type": "Hash",
+                    "Total Cost": 4.75,
+                    "Plan Rows": 275,
+                    "Plans": [
+                        {
+                            "Node Type": "Index Scan",
+                            "Relation Name": "artist",
+                            "Index Name": "artist_pkey",
+                            "Total Cost": 4.75,
+                            "Plan Rows": 275,
+                            "Index Cond": "(artist_id > 10)",
+                        }
+                    ],
+                },
+            ],
+        }
+    }
+]
+
+REDSHIFT_PLAN = [
+    "XN Hash Join DS_BCAST_INNER  (cost=3.44..1060014.96 rows=347 width=45)",
+    "  Hash Cond: (\"outer\".artist_id = \"inner\".artist_id)",
+    "  ->  XN Seq Scan on album a  (cost=0.00..3.47 rows=347 width=27)",
+    "  ->  XN Hash  (cost=2.75..2.75 rows=275 width=22)",
+    "        ->  XN Seq Scan on artist  (cost=0.00..2.75 rows=275 width=22)",
+    "              Filter: (artist_id > 10)",
+    "----- Tables missing statistics: album -----",
+]
+
+MYSQL_PLAN = {
+    "query_block": {
+        "select_id": 1,
+        "cost_info": {"query_cost": "156.20"},
+        "ordering_operation": {
+            "using_filesort": True,
+            "nested_loop": [
+                {
+                    "table": {
+                        "table_name": "a",
+                        "access_type": "ALL",
+                        "possible_keys": ["ix_artist"],
+                        "rows_examined_per_scan": 347,
+                        "cost_info": {
+                            "read_cost": "0.75",
+                            "eval_cost": "34.70",
+                            "prefix_cost": "35.45",
+                        },
+                        "attached_condition": "(a.ArtistId > 10)",
+                    }
+                },
+                {
+                    "table": {
+                        "table_name": "ar",
+                        "access_type": "eq_ref",
+                        "key": "PRIMARY",
+                        "rows_examined_per_scan": 1,
+                        "cost_info": {
+                            "read_cost": "86.75",
+                            "eval_cost": "34.00",
+                            "prefix_cost": "156.20",
+                        },
+                    }
+                },
+            ],
+        },
+    }
+}
+
+
+def test_get_explain_sql():
+    assert strip_sql(" SELECT 1 ;; ") == "SELECT 1"
+    assert (
+        get_explain_sql("SELECT 1;", DbTypeEnum.POSTGRESQL)
+        == "EXPLAIN (FORMAT JSON) SELECT 1"
+    )
+    assert (
+        get_explain_sql("SELECT 1", DbTypeEnum.POSTGRESQL, analyze=True)
+        == "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT 1"
+    )
+    assert get_explain_sql("SELECT 1", DbTypeEnum.AWS_REDSHIFT) == "EXPLAIN SELECT 1"
+    assert (
+        get_explain_sql("SELECT 1", DbTypeEnum.MYSQL)
+        == "EXPLAIN FORMAT=JSON SELECT 1"
+    )
+    assert (
+        get_explain_sql("SELECT 1", DbTypeEnum.SQLITE)
+        == "EXPLAIN QUERY PLAN SELECT 1"
+    )
+    with pytest.raises(NotImplementedError):
+        get_explain_sql("SELECT 1", DbTypeEnum.MSSQL)
+
+
+def test_parse_postgres_plan():
+    root = parse_postgres_plan(POSTGRES_PLAN)
+    assert root.node_type == "Hash Join"
+    assert root.estimated_rows == 347
+    assert root.estimated_cost == 120.5
+    assert root.details == ["Hash Cond: (album.artist_id = artist.artist_id)"]
+    seq_scan = root.children[0]
+    assert seq_scan.relation == "album"
+    assert seq_scan.actual_rows == 347
+    assert "Buffers: shared hit=3 read=0" in seq_scan.details
+    index_scan = root.children[1].children[0]
+    assert index_scan.index == "artist_pkey"
+
+
+def test_parse_text_plan():
+    root = parse_text_plan(REDSHIFT_PLAN)
+    assert root.node_type == "XN Hash Join DS_BCAST_INNER"
+    assert root.estimated_cost == 1060014.96
+    assert root.estimated_rows == 347
+    assert len(root.children) == 2
+    assert root.children[0].node_type == "XN Seq Scan"
+    assert root.children[0].relation == "album"
+    assert root.children[0].details == []
+    assert root.children[1].children[0].relation == "artist"
+    assert root.children[1].children[0].details == ["Filter: (artist_id > 10)"]
+    assert root.details == [
+        'Hash Cond: ("outer".artist_id = "inner".artist_id)',
+        "----- Tables missing statistics: album -----",
+    ]
+
+    root = parse_text_plan(
+        [
+            "Limit  (cost=0.00..0.05 rows=3 width=4) (actual time=0.010..0.020 rows=3 loops=2)",
+        ]
+    )
+    assert root.actual_rows == 6
+    assert root.actual_time == 0.04
+
+    assert parse_text_plan([]).node_type == "Query"
+
+
+def test_parse_mysql_plan():
+    root = parse_mysql_plan(MYSQL_PLAN)
+    assert root.estimated_cost == 156.2
+    assert root.estimated_rows == 347
+    ordering = root.children[0]
+    assert ordering.node_type == "Ordering Operation"
+    assert ordering.details == ["using filesort"]
+    nested_loop = ordering.children[0]
+    assert [node.node_type for node in nested_loop.children] == [
+        "Table Scan",
+        "Unique Index Lookup",
+    ]
+    assert nested_loop.children[0].estimated_cost == 35.45
+    assert nested_loop.children[1].index == "PRIMARY"
+
+
+def test_parse_explain_rows():
+    query_plan = parse_explain_rows([(POSTGRES_PLAN,)], DbTypeEnum.POSTGRESQL)
+    assert query_plan.estimated_cost == 120.5
+    query_plan = parse_explain_rows(
+        [(line,) for line in REDSHIFT_PLAN], DbTypeEnum.AWS_REDSHIFT
+    )
+    assert query_plan.max_estimated_rows == 347
+    query_plan = parse_explain_rows([(MYSQL_PLAN,)], DbTypeEnum.MYSQL)
+    assert query_plan.estimated_rows == 347
+
+
+class TestExplainQuery:
+    def test_sqlite(self, sqlite_sa_engine_objs):
+        engine = sqlite_sa_engine_objs.engine
+        query_plan = explain_query(
+            conn_or_engine=engine,
+            sql="SELECT * FROM Album;",
+            db_type=DbTypeEnum.SQLITE,
+        )
+        assert query_plan.root.node_type == "Query"
+        node = query_plan.root.children[0]
+        assert node.node_type == "Table Scan"
+        assert node.relation == "Album"
+
+        query_plan = explain_query(
+            conn_or_engine=engine,
+            sql=(
+                "SELECT a.Title FROM Album a "
+                "JOIN Artist ar ON a.ArtistId = ar.ArtistId "
+                "WHERE ar.ArtistId = :artist_id "
+                "ORDER BY a.Title"
+            ),
+            db_type=DbTypeEnum.SQLITE,
+            params={"artist_id": 1},
+        )
+        node_types = [node.node_type for node in query_plan.walk()]
+        assert "Index Search" in node_types
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.explain.plan_3_extractor",
+        preview=False,
+    )
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+from mcp_ohmy_sql.constants import DbTypeEnum
+from mcp_ohmy_sql.config.api import PreflightSettings
+from mcp_ohmy_sql.explain.plan_1_model import PlanNode, QueryPlan
+from mcp_ohmy_sql.explain.preflight import (
+    PlanCache,
+    format_number,
+    check_query_plan,
+)
+
+
+def make_query_plan(cost: float, rows: float) -> QueryPlan:
+    return QueryPlan(
+        db_type=DbTypeEnum.POSTGRESQL,
+        root=PlanNode(
+            node_type="Aggregate",
+            estimated_cost=cost,
+            estimated_rows=1,
+            children=[PlanNode(node_type="Seq Scan", estimated_rows=rows)],
+        ),
+    )
+
+
+def test_plan_cache():
+    plan_cache = PlanCache(max_size=2)
+    key1 = plan_cache.make_key("db", "SELECT 1", {"b": 1, "a": 2})
+    key2 = plan_cache.make_key("db", "SELECT 2")
+    key3 = plan_cache.make_key("db", "SELECT 3")
+    assert key1 == plan_cache.make_key("db", "SELECT 1", {"a": 2, "b": 1})
+
+    plan = make_query_plan(cost=1, rows=1)
+    plan_cache.set(key1, plan)
+    plan_cache.set(key2, plan)
+    assert plan_cache.get(key1) is plan  # key1 is now the most recently used
+    plan_cache.set(key3, plan)
+    assert len(plan_cache) == 2
+    assert plan_cache.get(key2) is None
+    assert plan_cache.get(key1) is plan
+    plan_cache.clear()
+    assert len(plan_cache) == 0
+
+    plan_cache = PlanCache(max_size=0)
+    plan_cache.set(key1, plan)
+    assert plan_cache.get(key1) is None
+
+
+def test_format_number():
+    assert format_number(12) == "12"
+    assert format_number(1500) == "1.5K"
+    assert format_number(2_300_000) == "2.3M"
+    assert format_number(4e9) == "4.0B"
+
+
+def test_check_query_plan():
+    preflight_settings = PreflightSettings(
+        enabled=True,
+        max_estimated_cost=1_000_000,
+        max_estimated_rows=10_000_000,
+    )
+    result = check_query_plan(
+        make_query_plan(cost=100, rows=1000),
+        preflight_settings,
+    )
+    assert result.passed is True
+    assert result.estimated_rows == 1000
+
+    result = check_query_plan(
+        make_query_plan(cost=2_000_000, rows=50_000_000),
+        preflight_settings,
+    )
+    assert result.passed is False
+    assert len(result.reasons) == 2
+    assert "estimated cost 2.0M exceeds the limit of 1.0M" in result.message
+    assert "WHERE" in result.message
+
+    # a LIMIT without ORDER BY doesn't scan the whole table
+    query_plan = QueryPlan(
+        db_type=DbTypeEnum.POSTGRESQL,
+        root=PlanNode(
+            node_type="Limit",
+            estimated_cost=10,
+            estimated_rows=1001,
+            children=[PlanNode(node_type="Seq Scan", estimated_rows=50_000_000)],
+        ),
+    )
+    result = check_query_plan(query_plan, preflight_settings)
+    assert result.passed is True
+    assert result.estimated_rows == 1001
+
+    # no estimates, fall back to exact count
+    result = check_query_plan(None, preflight_settings, exact_count=20_000_000)
+    assert result.passed is False
+    assert "matches 20.0M rows" in result.message
+
+    result = check_query_plan(None, preflight_settings)
+    assert result.passed is True
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.explain.preflight",
+        preview=False,
+    )
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+from mcp_ohmy_sql.result import api
+
+
+def test():
+    _ = api
+    _ = api.format_value
+    _ = api.new_column_formatter
+    _ = api.render_markdown_table
+    _ = api.BudgetReport
+    _ = api.render_markdown_table_with_budget
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.result.api",
+        preview=False,
+    )
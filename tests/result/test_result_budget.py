@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+from mcp_ohmy_sql.result.budget import (
+    BudgetReport,
+    truncate_cells,
+    fit_cells,
+    render_markdown_table_with_budget,
+)
+
+
+def test_budget_report():
+    report = BudgetReport(n_rows=10, n_shown_rows=10)
+    assert report.is_lossless is True
+
+    report = BudgetReport(
+        max_chars=1000,
+        max_cell_chars=20,
+        n_truncated_cells=3,
+        elided_columns=[("payload", 512.0)],
+        n_rows=10,
+        n_shown_rows=4,
+    )
+    assert report.is_lossless is False
+    assert report.to_footer() == (
+        "... (to fit the 1000 chars budget: 3 cells truncated to 20 chars; "
+        "column 'payload' elided, avg 512 chars per cell; showing 4 of 10 rows)"
+    )
+
+
+def test_truncate_cells():
+    cells = [["abcdef", "ab"], ["abc", "abcd"]]
+    assert truncate_cells(cells, 3) == 2
+    assert cells == [["ab…", "ab"], ["abc", "ab…"]]
+
+
+def test_fit_cells():
+    headers = ["id", "payload"]
+    cells = [[str(i), "x" * 500] for i in range(10)]
+
+    # oversized column is elided, all rows fit
+    new_headers, new_cells, is_numeric, report = fit_cells(
+        headers, [list(row) for row in cells], [True, False], max_chars=1000
+    )
+    assert new_headers == ["id"]
+    assert new_cells[0] == ["0"]
+    assert is_numeric == [True]
+    assert report.elided_columns == [("payload", 500.0)]
+    assert report.n_shown_rows == 10
+
+    # balanced columns are kept, rows are cut instead
+    headers = ["a", "b"]
+    cells = [["x" * 50, "y" * 50] for _ in range(10)]
+    new_headers, new_cells, _, report = fit_cells(
+        headers, cells, [False, False], max_chars=400
+    )
+    assert new_headers == headers
+    assert 1 <= report.n_shown_rows < 10
+    assert len(new_cells) == report.n_shown_rows
+
+    # at least one row is kept
+    _, new_cells, _, report = fit_cells(headers, cells, [False, False], max_chars=100)
+    assert len(new_cells) == 1
+
+    # no budget
+    _, new_cells, _, report = fit_cells(headers, cells, [False, False])
+    assert report.is_lossless is True
+
+
+def test_render_markdown_table_with_budget():
+    rows = [(i, "x" * 300) for i in range(3)]
+    text = render_markdown_table_with_budget(["id", "payload"], rows)
+    assert "..." not in text
+
+    text = render_markdown_table_with_budget(
+        ["id", "payload"], rows, max_cell_chars=10
+    )
+    assert "| 0 | xxxxxxxxx… |" in text
+    assert text.endswith("... (3 cells truncated to 10 chars)")
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.result.budget",
+        preview=False,
+    )
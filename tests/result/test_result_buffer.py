@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+import decimal
+import datetime
+
+import pytest
+
+from mcp_ohmy_sql.result.buffer import (
+    is_arrow_available,
+    ResultBuffer,
+    fill_result_buffer,
+)
+
+COLUMNS = ["id", "name", "total"]
+ROWS = [
+    (1, "a", decimal.Decimal("1.99")),
+    (2, None, decimal.Decimal("0.99")),
+    (3, "c", None),
+]
+
+
+def new_fetchmany(rows: list[tuple]):
+    rows = list(rows)
+
+    def fetchmany(size: int) -> list[tuple]:
+        batch = rows[:size]
+        del rows[:size]
+        return batch
+
+    return fetchmany
+
+
+@pytest.mark.parametrize("use_arrow", [True, False])
+def test_result_buffer(use_arrow: bool):
+    buffer = fill_result_buffer(
+        COLUMNS,
+        new_fetchmany(ROWS * 3),
+        max_rows=4,
+        batch_size=2,
+        use_arrow=use_arrow,
+    )
+    assert buffer.use_arrow is (use_arrow and is_arrow_available())
+    assert len(buffer) == 5  # max_rows + 1
+    assert list(buffer) == (ROWS * 2)[:5]
+    assert buffer[1] == ROWS[1]
+    assert buffer.column_values(0) == [1, 2, 3, 1, 2]
+
+    head = buffer[:2]
+    assert isinstance(head, ResultBuffer)
+    assert list(head) == ROWS[:2]
+    assert len(buffer[3:100]) == 2
+
+    buffer = fill_result_buffer(COLUMNS, new_fetchmany([]), use_arrow=use_arrow)
+    assert len(buffer) == 0
+    assert list(buffer) == []
+
+
+@pytest.mark.skipif(is_arrow_available() is False, reason="pyarrow not installed")
+def test_result_buffer_arrow():
+    buffer = ResultBuffer(["id", "note"])
+    # the type of a column is only known from the first non-null batch
+    buffer.append_rows([(1, None), (2, None)])
+    buffer.append_rows([(3, "x")])
+    buffer.append_rows([(None, None)])
+    assert buffer.use_arrow is True
+    assert buffer.is_arrow_column(0) and buffer.is_arrow_column(1)
+    table = buffer.to_arrow()
+    assert table.num_rows == 4
+    assert str(table.schema.field("note").type) == "string"
+    assert table.column("id").to_pylist() == [1, 2, 3, None]
+
+    # a batch of another type is not cast, the column falls back to a list
+    buffer.append_rows([(4.5, None)])
+    assert buffer.is_arrow_column(0) is False
+    assert buffer.is_arrow_column(1) is True
+    assert buffer.column_values(0) == [1, 2, 3, None, 4.5]
+
+    # mixed types (e.g. SQLite) fall back to python lists
+    buffer.append_rows([("five", "y")])
+    assert buffer.column_values(0) == [1, 2, 3, None, 4.5, "five"]
+    assert buffer.column_values(1) == [None, None, "x", None, None, "y"]
+    assert list(buffer[:1]) == [(1, None)]
+    assert list(buffer[4:]) == [(4.5, None), ("five", "y")]
+
+
+@pytest.mark.skipif(is_arrow_available() is False, reason="pyarrow not installed")
+def test_result_buffer_exact_values():
+    utc = datetime.timezone.utc
+    paris = datetime.timezone(datetime.timedelta(hours=2))
+    rows_1 = [
+        ({"a": 1}, decimal.Decimal("1.10"), datetime.datetime(2024, 1, 1, 12, tzinfo=paris)),
+        ({"b": 2}, decimal.Decimal("2.123456789"), None),
+    ]
+    rows_2 = [
+        ({"b": 3}, decimal.Decimal("3"), datetime.datetime(2024, 1, 1, 10, tzinfo=utc)),
+        ([1, {"c": None}], None, datetime.datetime(2024, 1, 1, 9, tzinfo=utc)),
+    ]
+    buffer = ResultBuffer(["meta", "amount", "created_at"])
+    buffer.append_rows(rows_1)
+    buffer.append_rows(rows_2)
+    # JSON, decimal and timezone-aware values come back as they were fetched
+    assert list(buffer) == rows_1 + rows_2
+    assert [buffer.is_arrow_column(ith) for ith in range(3)] == [False] * 3
+    assert [str(value) for value in buffer.column_values(1)[:3]] == [
+        "1.10",
+        "2.123456789",
+        "3",
+    ]
+    assert buffer.column_values(2)[2].utcoffset() == datetime.timedelta(0)
+    assert list(buffer[1:3]) == [rows_1[1], rows_2[0]]
+
+    # nested values are exported as JSON text
+    table = buffer.to_arrow()
+    assert table.column("meta").to_pylist() == [
+        '{"a": 1}',
+        '{"b": 2}',
+        '{"b": 3}',
+        '[1, {"c": null}]',
+    ]
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.result.buffer",
+        preview=False,
+    )
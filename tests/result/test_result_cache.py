@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+from mcp_ohmy_sql.result.buffer import ResultBuffer
+from mcp_ohmy_sql.result.cache import CachedResult, ResultCache
+
+
+def new_cached_result(sql: str) -> CachedResult:
+    rows = ResultBuffer(["id"])
+    rows.append_rows([(1,), (2,)])
+    return CachedResult(
+        database_identifier="db",
+        sql=sql,
+        rows=rows,
+        truncated=False,
+        created_at=0,
+        refreshed_at=0,
+        checked_at=0,
+    )
+
+
+class TestResultCache:
+    def test_get_and_set(self):
+        cache = ResultCache(max_size=2)
+        key1 = cache.make_key("db", "SELECT 1", {"b": 2, "a": 1})
+        key2 = cache.make_key("db", "SELECT 2")
+        key3 = cache.make_key("db", "SELECT 3")
+        assert key1 == cache.make_key("db", "SELECT 1", {"a": 1, "b": 2})
+        assert cache.get(key1) is None
+
+        cache.set(key1, new_cached_result("SELECT 1"))
+        cache.set(key2, new_cached_result("SELECT 2"))
+        assert cache.get(key1).sql == "SELECT 1"
+        # key2 is the least recently used
+        cache.set(key3, new_cached_result("SELECT 3"))
+        assert len(cache) == 2
+        assert cache.get(key2) is None
+
+        cache.clear()
+        assert len(cache) == 0
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.result.cache",
+        preview=False,
+    )
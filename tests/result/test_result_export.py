@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import json
+import shutil
+import decimal
+import datetime
+import itertools
+
+import pytest
+
+from mcp_ohmy_sql.paths import dir_tmp
+from mcp_ohmy_sql.cursor import OpenCursor
+from mcp_ohmy_sql.result.buffer import is_arrow_available
+from mcp_ohmy_sql.result.export import (
+    get_export_path,
+    get_file_sha256,
+    export_cursor,
+)
+
+dir_export = dir_tmp.joinpath("test_result_export")
+
+
+def new_cursor(rows: list[tuple], max_rows=None) -> OpenCursor:
+    iterator = iter(rows)
+    return OpenCursor(
+        columns=["id", "name"],
+        fetchmany=lambda n: list(itertools.islice(iterator, n)),
+        close=lambda: None,
+        max_rows=max_rows,
+    )
+
+
+@pytest.fixture
+def directory():
+    shutil.rmtree(dir_export, ignore_errors=True)
+    return dir_export
+
+
+def test_get_export_path(directory):
+    path = get_export_path(directory, "tracks", "csv")
+    assert path == directory.joinpath("tracks.csv.gz")
+    assert get_export_path(directory, "tracks.parquet", "parquet").name == "tracks.parquet"
+    for file_name in ["../tracks", "a/b", ".hidden", "a..b", ""]:
+        with pytest.raises(ValueError, match="Invalid file name"):
+            get_export_path(directory, file_name, "csv")
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        get_export_path(directory, "tracks", "xlsx")
+
+    directory.mkdir(parents=True, exist_ok=True)
+    path.write_text("")
+    with pytest.raises(ValueError, match="already exists"):
+        get_export_path(directory, "tracks", "csv")
+
+
+def test_export_csv_and_jsonl(directory):
+    rows = [
+        (1, "a,b"),
+        (None, decimal.Decimal("1.50")),
+        (datetime.date(2024, 1, 2), b"\x00"),
+    ]
+    path = get_export_path(directory, "rows", "csv")
+    manifest = export_cursor(new_cursor(rows), path, "csv", batch_size=2, sql="SELECT 1")
+    with gzip.open(path, "rt") as f:
+        assert f.read() == 'id,name\n1,"a,b"\n,1.50\n2024-01-02,AA==\n'
+    assert manifest.n_rows == 3
+    assert manifest.truncated is False
+    assert manifest.n_bytes == path.stat().st_size
+    assert manifest.sha256 == get_file_sha256(path)
+    assert json.loads(manifest.manifest_path.read_text())["sql"] == "SELECT 1"
+
+    # the same rows give the same file
+    manifest_2 = export_cursor(
+        new_cursor(rows), get_export_path(directory, "rows_2", "csv"), "csv"
+    )
+    assert manifest_2.sha256 == manifest.sha256
+
+    path = get_export_path(directory, "rows", "jsonl")
+    manifest = export_cursor(new_cursor(rows, max_rows=2), path, "jsonl")
+    with gzip.open(path, "rt") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == [{"id": 1, "name": "a,b"}, {"id": None, "name": "1.50"}]
+    assert manifest.n_rows == 2
+    assert manifest.truncated is True
+    assert "rows: 2 (truncated" in manifest.to_summary()
+
+
+@pytest.mark.skipif(is_arrow_available() is False, reason="pyarrow not installed")
+def test_export_parquet(directory):
+    import pyarrow.parquet as pq
+
+    # the first rows are NULL, the type comes from the next rows
+    rows = [(None, "x")] * 3 + [(i, f"name {i}") for i in range(20)]
+    path = get_export_path(directory, "rows", "parquet")
+    manifest = export_cursor(new_cursor(rows), path, "parquet", batch_size=5)
+    table = pq.read_table(path)
+    assert table.num_rows == manifest.n_rows == 23
+    assert str(table.schema.field("id").type) == "int64"
+    assert pq.ParquetFile(path).metadata.row_group(0).column(0).compression == "ZSTD"
+
+    # empty result
+    path = get_export_path(directory, "empty", "parquet")
+    manifest = export_cursor(new_cursor([]), path, "parquet")
+    assert manifest.n_rows == 0
+    assert pq.read_table(path).column_names == ["id", "name"]
+
+    # mixed types can't be written, no file is left behind
+    path = get_export_path(directory, "mixed", "parquet")
+    with pytest.raises(ValueError, match="export as csv or jsonl"):
+        export_cursor(new_cursor([(1, "a"), ("b", "c")]), path, "parquet")
+    assert list(directory.glob("mixed*")) == []
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.result.export",
+        preview=False,
+    )
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import json
+import datetime
+import decimal
+
+import pytest
+
+from mcp_ohmy_sql.constants import ResultFormatEnum
+from mcp_ohmy_sql.result.budget import BudgetReport
+from mcp_ohmy_sql.result.formats import (
+    get_llm_type,
+    encode_csv,
+    encode_tsv,
+    encode_jsonl,
+    encode_columnar,
+    register_encoder,
+    get_encoder,
+    encode_result,
+    RESULT_ENCODERS,
+)
+
+COLUMNS = ["id", "name", "total", "created_at", "payload"]
+ROWS = [
+    (1, 'a, "b"', decimal.Decimal("1.99"), datetime.datetime(2020, 1, 1), b"\x01"),
+    (2, None, decimal.Decimal("0.99"), None, None),
+    (3, "x" * 50, decimal.Decimal("2.00"), None, None),
+]
+
+
+def test_get_llm_type():
+    assert get_llm_type(None) == "null"
+    assert get_llm_type(True) == "bool"
+    assert get_llm_type(decimal.Decimal("1")) == "dec"
+    assert get_llm_type(datetime.datetime.now(datetime.timezone.utc)) == "ts"
+    assert get_llm_type([1]) == "str"
+
+
+def test_encode_csv():
+    assert encode_csv(COLUMNS, ROWS[:2]).splitlines() == [
+        "id:int,name:str,total:dec,created_at:dt,payload:bin",
+        '1,"a, ""b""",1.99,2020-01-01 00:00:00,0x01',
+        "2,,0.99,,",
+    ]
+    assert encode_tsv(COLUMNS, ROWS[1:2]).splitlines()[1] == "2\t\t0.99\t\t"
+
+    text = encode_csv(COLUMNS, ROWS, max_chars=110, max_cell_chars=20)
+    assert "xxx" not in text  # the third row doesn't fit
+    assert text.endswith("(to fit the 110 chars budget: showing 2 of 3 rows)")
+
+
+def test_encode_jsonl():
+    lines = encode_jsonl(COLUMNS, ROWS, max_cell_chars=20).splitlines()
+    assert json.loads(lines[0]) == {
+        "id": 1,
+        "name": 'a, "b"',
+        "total": "1.99",
+        "created_at": "2020-01-01T00:00:00",
+        "payload": "0x01",
+    }
+    assert json.loads(lines[1])["total"] == "0.99"
+    assert json.loads(lines[2])["name"] == "x" * 19 + "…"
+    # every line is JSON, the footer too
+    assert json.loads(lines[3]) == {
+        "_meta": {
+            "n_rows": 3,
+            "n_shown_rows": 3,
+            "n_truncated_cells": 1,
+            "note": "... (1 cells truncated to 20 chars)",
+        }
+    }
+
+    # NaN and infinity are not valid JSON
+    rows = [(float("nan"), float("inf"), decimal.Decimal("NaN"), 0.5)]
+    text = encode_jsonl(["a", "b", "c", "d"], rows)
+    assert json.loads(text) == {"a": "nan", "b": "inf", "c": "NaN", "d": 0.5}
+
+
+def test_encode_columnar():
+    assert encode_columnar(COLUMNS[:3], [row[:3] for row in ROWS[:2]]).splitlines() == [
+        "id:int | 1 | 2",
+        'name:str | a, "b" | ',
+        "total:dec | 1.9900 | 0.9900",
+    ]
+
+
+def test_encode_result():
+    assert len(RESULT_ENCODERS) == len(ResultFormatEnum)
+    text = encode_result(COLUMNS, ROWS, ResultFormatEnum.MARKDOWN)
+    assert text.startswith("| id | name |")
+    with pytest.raises(ValueError):
+        get_encoder("xml")
+
+    # the report tells how many rows fit in the budget
+    for result_format in ResultFormatEnum:
+        report = BudgetReport()
+        encode_result(COLUMNS, ROWS, result_format, max_chars=1, report=report)
+        assert (report.n_rows, report.n_shown_rows) == (3, 1)
+        report = BudgetReport()
+        encode_result(COLUMNS, ROWS, result_format, report=report)
+        assert (report.n_rows, report.n_shown_rows) == (3, 3)
+
+    register_encoder("count", lambda columns, rows, **kwargs: str(len(rows)))
+    try:
+        assert encode_result(COLUMNS, ROWS, "count") == "3"
+        # an encoder without report shows all the rows
+        report = BudgetReport()
+        encode_result(COLUMNS, ROWS, "count", max_chars=1, report=report)
+        assert report.n_shown_rows == 3
+    finally:
+        RESULT_ENCODERS.pop("count")
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.result.formats",
+        preview=False,
+    )
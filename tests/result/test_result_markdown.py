@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import decimal
+import textwrap
+
+from mcp_ohmy_sql.result.markdown import (
+    format_value,
+    new_column_formatter,
+    get_samples,
+    render_markdown_table,
+)
+
+COLUMNS = ["id", "price", "name", "amount", "created"]
+ROWS = [
+    (1, 1.5, None, decimal.Decimal("2.5"), datetime.date(2020, 1, 1)),
+    (22, 2.25, "a|b\nc", decimal.Decimal("3"), None),
+]
+
+
+def test_format_value():
+    assert format_value(None) == ""
+    assert format_value("a|b") == "a\\|b"
+    assert format_value(True) == "True"
+    assert format_value(1.5) == "1.5000"
+    assert format_value(decimal.Decimal("1")) == "1.0000"
+    assert format_value(b"\x01\xff") == "0x01ff"
+    assert format_value(datetime.date(2020, 1, 1)) == "2020-01-01"
+
+
+def test_new_column_formatter():
+    formatter = new_column_formatter(1)
+    assert formatter(5) == "5"
+    # mixed types fall back to the generic formatter
+    assert formatter(2.5) == "2.5000"
+    assert formatter(None) == ""
+    assert new_column_formatter(None)("x") == "x"
+    assert new_column_formatter(object()) is format_value
+
+
+def test_get_samples():
+    assert get_samples(3, [(None, 1, None), (2, 3, None)]) == [2, 1, None]
+
+
+def test_render_markdown_table():
+    text = render_markdown_table(COLUMNS, ROWS)
+    expected = textwrap.dedent(
+        """
+        | id | price | name | amount | created |
+        | ---: | ---: | --- | ---: | --- |
+        | 1 | 1.5000 |  | 2.5000 | 2020-01-01 |
+        | 22 | 2.2500 | a\\|b c | 3.0000 |  |
+        """
+    ).strip()
+    assert text == expected
+
+    text = render_markdown_table(COLUMNS, ROWS, pad=True)
+    expected = textwrap.dedent(
+        """
+        | id |  price | name   | amount | created    |
+        |---:|-------:|:-------|-------:|:-----------|
+        |  1 | 1.5000 |        | 2.5000 | 2020-01-01 |
+        | 22 | 2.2500 | a\\|b c | 3.0000 |            |
+        """
+    ).strip()
+    assert text == expected
+
+    text = render_markdown_table(["a"], [])
+    assert text == "| a |\n| --- |"
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.result.markdown",
+        preview=False,
+    )
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import shutil
+
+import pytest
+
+from mcp_ohmy_sql.paths import dir_tmp
+from mcp_ohmy_sql.result.buffer import ResultBuffer
+from mcp_ohmy_sql.result.spill import (
+    ResultHandleNotFoundError,
+    SpillStore,
+)
+
+dir_spill = dir_tmp.joinpath("test_result_spill")
+
+
+def new_buffer(n_rows: int) -> ResultBuffer:
+    buffer = ResultBuffer(["id", "name", "id"])
+    buffer.append_rows([(i, f"name {i}", i * 10) for i in range(1, n_rows + 1)])
+    return buffer
+
+
+@pytest.fixture
+def store() -> SpillStore:
+    shutil.rmtree(dir_spill, ignore_errors=True)
+    return SpillStore(directory=dir_spill)
+
+
+class TestSpillStore:
+    def test_put_and_get_page(self, store):
+        result = store.put(new_buffer(250), page_rows=100, sql="SELECT 1")
+        assert result.n_rows == 250
+        assert result.n_pages == 3
+
+        page = store.get_page(result.handle, 1)
+        assert page.columns == ["id", "name", "id"]
+        assert page.rows[0] == (1, "name 1", 10)
+        assert len(page.rows) == 100
+        assert page.result.sql == "SELECT 1"
+
+        page = store.get_page(result.handle, 3)
+        assert page.rows[-1] == (250, "name 250", 2500)
+        assert len(page.rows) == 50
+        assert page.to_header() == (
+            f"page 3 of 3 (rows 201-250 of 250), handle: {result.handle}"
+        )
+
+        with pytest.raises(IndexError):
+            store.get_page(result.handle, 4)
+        with pytest.raises(IndexError):
+            store.get_page(result.handle, 0)
+
+    def test_truncated(self, store):
+        result = store.put(new_buffer(10), page_rows=4, truncated=True)
+        page = store.get_page(result.handle, 2)
+        assert page.to_header().startswith("page 2 of 3 (rows 5-8 of 10+ (truncated))")
+
+    def test_new_writer(self, store):
+        # the type of a column is known once it has a value
+        writer = store.new_writer(columns=["id", "note"], page_rows=2)
+        writer.write_page([(1, None), (2, None)])
+        writer.write_page([(3, None), (4, "four")])
+        writer.write_page([(5, None)])
+        assert store.list_files() == []
+        result = writer.close(truncated=True)
+        assert result.n_rows == 5
+        page = store.get_page(result.handle, 2)
+        assert page.rows == [(3, None), (4, "four")]
+        assert page.result.n_pages == 3
+        assert page.result.truncated is True
+
+        # a page that doesn't match the column types
+        writer = store.new_writer(columns=["id"], page_rows=2)
+        writer.write_page([(1,), (2,)])
+        with pytest.raises(Exception):
+            writer.write_page([("x",), ("y",)])
+            writer.close()
+        writer.abort()
+        assert writer.tmp_path.exists() is False
+        assert len(store.list_files()) == 1
+
+    def test_handle_not_found(self, store):
+        with pytest.raises(ResultHandleNotFoundError) as e:
+            store.get_page("0123456789abcdef", 1)
+        assert "not found or expired" in str(e.value)
+        # never read outside the directory
+        with pytest.raises(ResultHandleNotFoundError):
+            store.get_page("../secret", 1)
+
+    def test_evict(self, store):
+        old = store.put(new_buffer(10), page_rows=5)
+        new = store.put(new_buffer(10), page_rows=5)
+        path = store.get_path(old.handle)
+        mtime = time.time() - 7200
+        os.utime(path, (mtime, mtime))
+        assert store.evict() == [path]
+        with pytest.raises(ResultHandleNotFoundError):
+            store.get_page(old.handle, 1)
+
+        # the oldest results are evicted when the directory is too big
+        store.max_total_bytes = store.get_path(new.handle).stat().st_size
+        newer = store.put(new_buffer(10), page_rows=5)
+        assert [path for path, _, _ in store.list_files()] == [
+            store.get_path(newer.handle)
+        ]
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.result.spill",
+        preview=False,
+    )
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+from mcp_ohmy_sql.constants import DbTypeEnum, ResultFormatEnum
+from mcp_ohmy_sql.result.summary import (
+    ColumnProfile,
+    new_column_profiles,
+    encode_summary,
+)
+
+
+def test_column_profile():
+    profile = ColumnProfile(
+        name="Genre",
+        kind="text",
+        stats={"non_null": 75, "distinct": 3, "min": "Jazz", "max": "Rock"},
+        top_values=[("Rock", 50), ("Jazz", 25)],
+    )
+    assert profile.to_row(n_rows=100) == {
+        "column": "Genre",
+        "type": "text",
+        "null_ratio": 0.25,
+        "distinct": 3,
+        "min": "Jazz",
+        "max": "Rock",
+        "top_values": "Rock (50), Jazz (25)",
+    }
+    assert "null_ratio" not in profile.to_row(n_rows=0)
+
+
+def test_new_column_profiles_and_encode_summary():
+    summary = {
+        "n_rows": 4,
+        "c0_non_null": 4,
+        "c0_distinct": 4,
+        "c0_min": 1,
+        "c0_max": 4,
+        "c0_mean": 2.5,
+        "c0_p25": 1.75,
+        "c0_p50": 2.5,
+        "c0_p75": 3.25,
+        "c1_non_null": 3,
+        "c1_distinct": 2,
+        "c1_min": "a",
+        "c1_max": "b",
+    }
+    columns = [("id", "number"), ("name", "text")]
+    profiles = new_column_profiles(columns, DbTypeEnum.POSTGRESQL, summary)
+    assert profiles[0].stats["p75"] == 3.25
+    assert profiles[1].stats == {
+        "non_null": 3,
+        "distinct": 2,
+        "min": "a",
+        "max": "b",
+    }
+    text = encode_summary(4, profiles, result_format=ResultFormatEnum.CSV.value)
+    assert text.splitlines()[1:] == [
+        "id,number,0.0,4,1,4,2.5,1.75,2.5,3.25",
+        "name,text,0.25,2,a,b,,,,",
+    ]
+    assert "top_values" not in text
+
+    # no quantiles
+    profiles = new_column_profiles(
+        columns, DbTypeEnum.POSTGRESQL, summary, quantiles=False
+    )
+    text = encode_summary(4, profiles, result_format=ResultFormatEnum.CSV.value)
+    assert "p50" not in text
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.result.summary",
+        preview=False,
+    )
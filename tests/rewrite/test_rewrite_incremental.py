@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+
+import pytest
+
+from mcp_ohmy_sql.constants import DbTypeEnum
+from mcp_ohmy_sql.rewrite.partition import PartitionKey
+from mcp_ohmy_sql.rewrite.incremental import (
+    get_incremental_key_hint,
+    find_incremental_key,
+    get_high_water_mark,
+    get_incremental_sql,
+)
+
+
+def test_get_incremental_key_hint():
+    assert get_incremental_key_hint("SELECT * FROM t") is None
+    assert (
+        get_incremental_key_hint("SELECT * FROM t -- incremental_key: order_id")
+        == "order_id"
+    )
+    assert (
+        get_incremental_key_hint('SELECT * FROM t /* INCREMENTAL_KEY="id" */')
+        == "id"
+    )
+
+
+def test_find_incremental_key():
+    key_index = {
+        "album": PartitionKey("AlbumId", "int", False),
+        "events": PartitionKey("created_at", "datetime", True),
+    }
+    sql = "SELECT * FROM Album WHERE ArtistId = 1"
+    assert find_incremental_key(sql, DbTypeEnum.SQLITE, key_index) == "AlbumId"
+    sql = "SELECT * FROM logs /* incremental_key: seq */"
+    assert find_incremental_key(sql, DbTypeEnum.SQLITE) == "seq"
+
+    for sql, reason in [
+        ("SELECT * FROM Album ORDER BY AlbumId DESC", "ORDER BY"),
+        ("SELECT COUNT(*) FROM Album", "aggregate"),
+        ("SELECT * FROM Album AS a JOIN Artist AS b ON a.ArtistId = b.ArtistId", "JOIN"),
+        ("SELECT * FROM Track", "not declared append-only"),
+        ("SELECT * FROM events", "may be NULL"),
+        ("DELETE FROM Album", "single SELECT statement"),
+    ]:
+        with pytest.raises(ValueError, match=reason):
+            find_incremental_key(sql, DbTypeEnum.SQLITE, key_index)
+
+
+def test_get_high_water_mark():
+    assert get_high_water_mark([3, None, 7, 5]) == 7
+    assert get_high_water_mark([None]) is None
+    with pytest.raises(ValueError):
+        get_high_water_mark([1, "a"])
+
+
+def test_get_incremental_sql():
+    sql = "SELECT * FROM Album WHERE ArtistId = :artist_id"
+    assert get_incremental_sql(sql, DbTypeEnum.SQLITE, "AlbumId", 347) == (
+        'SELECT * FROM Album WHERE ArtistId = :artist_id AND ("AlbumId" >= 347)'
+    )
+    sql = "SELECT * FROM events"
+    value = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    assert get_incremental_sql(sql, DbTypeEnum.POSTGRESQL, "created_at", value) == (
+        "SELECT * FROM events "
+        "WHERE (\"created_at\" >= CAST('2024-01-02 03:04:05' AS TIMESTAMP))"
+    )
+    assert get_incremental_sql(sql, DbTypeEnum.SQLITE, "created_at", value) == (
+        "SELECT * FROM events WHERE (\"created_at\" >= '2024-01-02 03:04:05')"
+    )
+    with pytest.raises(ValueError):
+        get_incremental_sql(sql, DbTypeEnum.SQLITE, "created_at", True)
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.rewrite.incremental",
+        preview=False,
+    )
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+from mcp_ohmy_sql.constants import DbTypeEnum
+from mcp_ohmy_sql.rewrite.parser import parse_sql
+from mcp_ohmy_sql.rewrite.limit import get_row_limit, add_row_limit
+
+
+def test_get_row_limit():
+    assert get_row_limit(parse_sql("SELECT * FROM t", "sqlite")) is None
+    assert get_row_limit(parse_sql("SELECT * FROM t LIMIT 5", "sqlite")) == 5
+    assert get_row_limit(parse_sql("SELECT * FROM t LIMIT :n", "sqlite")) == -1
+    assert get_row_limit(parse_sql("SELECT TOP 5 * FROM t", "tsql")) == 5
+    assert get_row_limit(parse_sql("SELECT TOP 5 PERCENT * FROM t", "tsql")) == -1
+    assert (
+        get_row_limit(parse_sql("SELECT * FROM t FETCH FIRST 5 ROWS ONLY", "oracle"))
+        == 5
+    )
+
+
+def test_add_row_limit():
+    # inject
+    assert (
+        add_row_limit("SELECT * FROM t", DbTypeEnum.SQLITE, 101)
+        == "SELECT * FROM t LIMIT 101"
+    )
+    assert (
+        add_row_limit("SELECT * FROM t", DbTypeEnum.MSSQL, 101)
+        == "SELECT TOP 101 * FROM t"
+    )
+    assert (
+        add_row_limit("SELECT * FROM t", DbTypeEnum.ORACLE, 101)
+        == "SELECT * FROM t FETCH FIRST 101 ROWS ONLY"
+    )
+    assert (
+        add_row_limit("SELECT a FROM t UNION SELECT a FROM s", DbTypeEnum.POSTGRESQL, 101)
+        == "SELECT a FROM t UNION SELECT a FROM s LIMIT 101"
+    )
+    # keep params in the right style
+    assert (
+        add_row_limit("SELECT * FROM t WHERE a = :a", DbTypeEnum.POSTGRESQL, 101)
+        == "SELECT * FROM t WHERE a = :a LIMIT 101"
+    )
+    assert (
+        add_row_limit(
+            "SELECT * FROM t WHERE a = %(a)s",
+            DbTypeEnum.AWS_REDSHIFT,
+            101,
+            named_params=False,
+        )
+        == "SELECT * FROM t WHERE a = %(a)s LIMIT 101"
+    )
+    # lower a larger limit, keep offset
+    assert (
+        add_row_limit("SELECT * FROM t LIMIT 500 OFFSET 3", DbTypeEnum.SQLITE, 101)
+        == "SELECT * FROM t LIMIT 101 OFFSET 3"
+    )
+    # leave smaller or unknown limits and unparsable SQL alone
+    sql = "SELECT * FROM t LIMIT 5;"
+    assert add_row_limit(sql, DbTypeEnum.SQLITE, 101) == sql
+    sql = "SELECT * FROM t LIMIT :n"
+    assert add_row_limit(sql, DbTypeEnum.SQLITE, 101) == sql
+    sql = "SELECT * FROM ("
+    assert add_row_limit(sql, DbTypeEnum.SQLITE, 101) == sql
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.rewrite.limit",
+        preview=False,
+    )
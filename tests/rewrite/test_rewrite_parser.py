@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+from mcp_ohmy_sql.rewrite.parser import parse_sql, generate_sql, normalize_sql
+
+
+def test_parse_sql():
+    ast = parse_sql("SELECT * FROM Album", "sqlite")
+    assert ast.sql("sqlite") == "SELECT * FROM Album"
+    # the cached AST is not shared with the caller
+    ast.limit(5, copy=False)
+    assert parse_sql("SELECT * FROM Album", "sqlite").args.get("limit") is None
+
+    assert parse_sql("SELECT 1; SELECT 2", "sqlite") is None
+    assert parse_sql("SELECT * FROM (", "sqlite") is None
+
+
+def test_generate_sql():
+    ast = parse_sql("SELECT * FROM Album WHERE ArtistId = :artist_id", "postgres")
+    assert (
+        generate_sql(ast, "postgres")
+        == "SELECT * FROM Album WHERE ArtistId = :artist_id"
+    )
+    assert (
+        generate_sql(ast, "postgres", named_params=False)
+        == "SELECT * FROM Album WHERE ArtistId = %(artist_id)s"
+    )
+
+
+def test_normalize_sql():
+    assert normalize_sql("select *\n  from Album;", "sqlite") == "SELECT * FROM Album"
+    assert normalize_sql("SELECT  * FROM (;", "sqlite") == "SELECT * FROM ("
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.rewrite.parser",
+        preview=False,
+    )
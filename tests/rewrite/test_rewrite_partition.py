@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+
+import pytest
+
+from mcp_ohmy_sql.constants import DbTypeEnum, ObjectTypeEnum
+from mcp_ohmy_sql.db.aws_redshift import api as aws_redshift
+from mcp_ohmy_sql.rewrite.partition import (
+    PartitionKey,
+    new_partition_key_index,
+    find_partition_key,
+    get_key_range_sql,
+    split_key_range,
+    get_partition_sqls,
+)
+
+
+def test_new_partition_key_index():
+    database_info = aws_redshift.DatabaseInfo(
+        name="dev",
+        schemas=[
+            aws_redshift.SchemaInfo(
+                name="public",
+                tables=[
+                    aws_redshift.TableInfo(
+                        object_type=ObjectTypeEnum.TABLE,
+                        name="events",
+                        dist_style="EVEN",
+                        owner="admin",
+                        columns=[
+                            aws_redshift.ColumnInfo(
+                                name="id", type="bigint", llm_type="int",
+                                sort_key_position=0,
+                            ),
+                            aws_redshift.ColumnInfo(
+                                name="created_at", type="timestamp",
+                                llm_type="dt", sort_key_position=1,
+                                notnull=True,
+                            ),
+                        ],
+                    ),
+                    aws_redshift.TableInfo(
+                        object_type=ObjectTypeEnum.TABLE,
+                        name="logs",
+                        dist_style="EVEN",
+                        owner="admin",
+                        columns=[
+                            aws_redshift.ColumnInfo(
+                                name="message", type="varchar", llm_type="str",
+                                sort_key_position=1,
+                            ),
+                        ],
+                    ),
+                ],
+            )
+        ],
+    )
+    key_index = new_partition_key_index(database_info)
+    assert key_index["events"] == PartitionKey("created_at", "datetime", False)
+    assert key_index["public.events"] == key_index["events"]
+    assert "logs" not in key_index
+
+
+def test_find_partition_key():
+    key = PartitionKey("id", "int", False)
+    key_index = {"t": key, "s.t": key}
+    assert find_partition_key("SELECT a FROM t WHERE b = 1", "sqlite", key_index) is key
+    assert find_partition_key("SELECT * FROM s.t", "postgresql", key_index) is key
+    for sql, reason in [
+        ("SELECT COUNT(*) FROM t", "aggregate"),
+        ("SELECT a FROM t ORDER BY a", "ORDER BY"),
+        ("SELECT a FROM t LIMIT 5", "LIMIT"),
+        ("SELECT a FROM t JOIN u ON t.id = u.id", "JOIN"),
+        ("SELECT DISTINCT a FROM t", "DISTINCT"),
+        ("SELECT a FROM (SELECT 1 AS a) AS x", "single table"),
+        ("SELECT a FROM u", "no numeric or date"),
+        ("DELETE FROM t", "single SELECT"),
+    ]:
+        with pytest.raises(ValueError, match=reason):
+            find_partition_key(sql, "sqlite", key_index)
+
+
+def test_split_key_range():
+    assert split_key_range(1, 10, 3, "int") == [(1, 4), (4, 7), (7, None)]
+    # empty ranges are merged
+    assert split_key_range(1, 2, 4, "int") == [(1, 2), (2, None)]
+    assert split_key_range(5, 5, 4, "int") == [(5, None)]
+    assert split_key_range(0.0, 1.0, 2, "number") == [(0.0, 0.5), (0.5, None)]
+    # dates returned as text
+    assert split_key_range("2024-01-01", "2024-01-04", 2, "date") == [
+        (datetime.date(2024, 1, 1), datetime.date(2024, 1, 3)),
+        (datetime.date(2024, 1, 3), None),
+    ]
+    assert split_key_range(
+        datetime.datetime(2024, 1, 1), datetime.datetime(2024, 1, 2), 2, "datetime"
+    ) == [
+        (datetime.datetime(2024, 1, 1), datetime.datetime(2024, 1, 1, 12)),
+        (datetime.datetime(2024, 1, 1, 12), None),
+    ]
+    with pytest.raises(ValueError):
+        split_key_range("x", "y", 2, "date")
+
+
+def test_get_partition_sqls():
+    key = PartitionKey("id", "int", False)
+    sql = "SELECT a FROM t WHERE b = :b"
+    assert get_key_range_sql(sql, DbTypeEnum.SQLITE, key, with_count=True) == (
+        'SELECT MIN("id"), MAX("id"), COUNT(*) FROM t WHERE b = :b'
+    )
+    ranges = split_key_range(1, 10, 3, "int")
+    assert get_partition_sqls(sql, DbTypeEnum.SQLITE, key, ranges) == [
+        'SELECT a FROM t WHERE b = :b AND ("id" < 4)',
+        'SELECT a FROM t WHERE b = :b AND ("id" >= 4 AND "id" < 7)',
+        'SELECT a FROM t WHERE b = :b AND ("id" >= 7)',
+    ]
+
+    # NULL keys go to the first partition, dates are cast
+    key = PartitionKey("d", "date", True)
+    ranges = split_key_range("2024-01-01", "2024-01-04", 2, "date")
+    sqls = get_partition_sqls("SELECT * FROM t", DbTypeEnum.POSTGRESQL, key, ranges)
+    assert sqls == [
+        "SELECT * FROM t WHERE (\"d\" < CAST('2024-01-03' AS DATE) OR \"d\" IS NULL)",
+        "SELECT * FROM t WHERE (\"d\" >= CAST('2024-01-03' AS DATE))",
+    ]
+    # SQLite compares dates as text
+    sqls = get_partition_sqls("SELECT * FROM t", DbTypeEnum.SQLITE, key, ranges)
+    assert sqls[1] == "SELECT * FROM t WHERE (\"d\" >= '2024-01-03')"
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.rewrite.partition",
+        preview=False,
+    )
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from mcp_ohmy_sql.constants import DbTypeEnum
+from mcp_ohmy_sql.rewrite.sample import (
+    get_table_sample_sql,
+    ApproximateQuery,
+    get_approximate_sql,
+)
+
+
+def test_get_table_sample_sql():
+    def get_sql(db_type, percent=1.5, schema_name="s") -> str:
+        return get_table_sample_sql(
+            schema_name=schema_name,
+            table_name="Track",
+            column_names=["Name", "Composer"],
+            db_type=db_type,
+            percent=percent,
+            limit=100,
+        )
+
+    assert get_sql(DbTypeEnum.SQLITE, schema_name=None) == (
+        'SELECT "Name", "Composer" FROM "Track" '
+        "WHERE ABS(RANDOM() % 1000000) < 15000 LIMIT 100"
+    )
+    assert get_sql(DbTypeEnum.POSTGRESQL) == (
+        'SELECT "Name", "Composer" FROM "s"."Track" TABLESAMPLE SYSTEM (1.5) LIMIT 100'
+    )
+    assert get_sql(DbTypeEnum.MSSQL) == (
+        "SELECT TOP 100 [Name], [Composer] FROM [s].[Track] "
+        "TABLESAMPLE SYSTEM (1.5 PERCENT)"
+    )
+    assert get_sql(DbTypeEnum.ORACLE) == (
+        'SELECT "Name", "Composer" FROM "s"."Track" SAMPLE (1.5) '
+        "FETCH FIRST 100 ROWS ONLY"
+    )
+    assert get_sql(DbTypeEnum.MYSQL) == (
+        "SELECT `Name`, `Composer` FROM `s`.`Track` WHERE RAND() < 0.015 LIMIT 100"
+    )
+    assert get_sql(DbTypeEnum.AWS_REDSHIFT) == (
+        'SELECT "Name", "Composer" FROM "s"."Track" WHERE RANDOM() < 0.015 LIMIT 100'
+    )
+
+    # no sampling
+    assert get_sql(DbTypeEnum.POSTGRESQL, percent=None) == (
+        'SELECT "Name", "Composer" FROM "s"."Track" LIMIT 100'
+    )
+    assert get_sql(DbTypeEnum.POSTGRESQL, percent=100) == (
+        'SELECT "Name", "Composer" FROM "s"."Track" LIMIT 100'
+    )
+
+    # no limit
+    assert get_table_sample_sql(
+        schema_name=None,
+        table_name="Track",
+        column_names=["Name"],
+        db_type=DbTypeEnum.SQLITE,
+        limit=None,
+    ) == 'SELECT "Name" FROM "Track"'
+
+
+def test_get_approximate_sql():
+    sql = (
+        "SELECT t.GenreId, COUNT(*), SUM(t.Milliseconds) AS ms, "
+        "SUM(t.Bytes) / COUNT(*) AS avg_bytes, AVG(t.Bytes) AS avg_bytes_2, "
+        "COUNT(DISTINCT t.AlbumId) AS albums, MAX(t.Bytes) AS max_bytes, "
+        "(SELECT COUNT(*) FROM Genre) AS n_genres "
+        "FROM Track AS t JOIN Genre AS g ON t.GenreId = g.GenreId "
+        "WHERE t.UnitPrice > :price GROUP BY t.GenreId HAVING COUNT(*) > 5"
+    )
+    query = get_approximate_sql(sql, DbTypeEnum.SQLITE, percent=1)
+    assert query.sql == (
+        'SELECT t.GenreId, (COUNT(*) * 100) AS "COUNT(*)", '
+        "(SUM(t.Milliseconds) * 100) AS ms, "
+        "(SUM(t.Bytes) * 100) / (COUNT(*) * 100) AS avg_bytes, "
+        "AVG(t.Bytes) AS avg_bytes_2, "
+        "COUNT(DISTINCT t.AlbumId) AS albums, MAX(t.Bytes) AS max_bytes, "
+        "(SELECT COUNT(*) FROM Genre) AS n_genres "
+        "FROM Track AS t JOIN Genre AS g ON t.GenreId = g.GenreId "
+        "WHERE t.UnitPrice > :price AND ABS(RANDOM() % 1000000) < 10000 "
+        "GROUP BY t.GenreId HAVING (COUNT(*) * 100) > 5"
+    )
+    assert (query.table, query.method, query.n_scaled) == ("Track", "RANDOM() filter", 5)
+    assert query.unscaled == ["COUNT(DISTINCT)", "MAX"]
+
+    query = get_approximate_sql(
+        "SELECT COUNT(*) AS n FROM sales.orders WHERE id > %(id)s",
+        DbTypeEnum.AWS_REDSHIFT,
+        percent=0.5,
+        table_index={"sales.orders": ("sales", "orders")},
+        named_params=False,
+    )
+    assert query.sql == (
+        "SELECT (COUNT(*) * 200) AS n FROM sales.orders "
+        "WHERE id > %(id)s AND RANDOM() < 0.005"
+    )
+    assert query.table == "sales.orders"
+
+    query = get_approximate_sql(
+        "SELECT COUNT(*) AS n FROM Track", DbTypeEnum.POSTGRESQL, percent=1.5
+    )
+    assert query.sql == (
+        "SELECT (COUNT(*) * 66.666667) AS n FROM Track TABLESAMPLE SYSTEM (1.5)"
+    )
+    query = get_approximate_sql("SELECT * FROM Track", DbTypeEnum.ORACLE, percent=10)
+    assert query.sql == "SELECT * FROM Track SAMPLE (10)"
+    assert query.n_scaled == 0
+
+    for sql, table_index in [
+        ("SELECT * FROM (SELECT * FROM Track) AS t", None),
+        ("WITH t AS (SELECT * FROM Track) SELECT * FROM t", None),
+        ("SELECT * FROM AlbumSalesStats", {"track": (None, "Track")}),
+        ("SELECT 1", None),
+        ("SELECT 1 UNION SELECT 2", None),
+        ("DELETE FROM Track", None),
+    ]:
+        with pytest.raises(ValueError):
+            get_approximate_sql(sql, DbTypeEnum.SQLITE, 1, table_index=table_index)
+
+
+def test_approximate_query_get_note():
+    query = ApproximateQuery(
+        sql="",
+        percent=1,
+        table="Track",
+        method="TABLESAMPLE SYSTEM",
+        n_scaled=1,
+        unscaled=["MIN", "MAX"],
+    )
+    assert query.get_note() == (
+        "Approximate result: 1% sample of Track (TABLESAMPLE SYSTEM). "
+        "COUNT and SUM are scaled by 100, a scaled count C comes from about "
+        "C × 0.01 sampled rows, its relative standard error is about "
+        "±31.5% from 10 rows, ±9.9% from 100 rows, ±3.1% from 1000 rows. "
+        "Pages are sampled, not rows, the error is larger when similar rows "
+        "are stored together. "
+        "Not scaled, computed on the sample: MIN, MAX."
+    )
+    query = ApproximateQuery(sql="", percent=10, table="t", method="SAMPLE")
+    assert query.get_note() == "Approximate result: 10% sample of t (SAMPLE)."
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.rewrite.sample",
+        preview=False,
+    )
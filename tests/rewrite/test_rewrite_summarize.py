@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import decimal
+
+import pytest
+
+from mcp_ohmy_sql.constants import DbTypeEnum
+from mcp_ohmy_sql.rewrite.summarize import (
+    get_column_kind,
+    get_summary_stats,
+    get_summary_sql,
+    get_top_values_sql,
+)
+
+COLUMNS = [("Name", "text"), ("Milliseconds", "number")]
+
+
+def test_get_column_kind():
+    assert get_column_kind([None, 1]) == "number"
+    assert get_column_kind([1.5]) == "number"
+    assert get_column_kind([decimal.Decimal("1.5")]) == "number"
+    assert get_column_kind([True]) == "bool"
+    assert get_column_kind([datetime.date(2024, 1, 1)]) == "datetime"
+    assert get_column_kind([datetime.datetime(2024, 1, 1)]) == "datetime"
+    assert get_column_kind(["a"]) == "text"
+    assert get_column_kind([b"a"]) == "other"
+    assert get_column_kind([None, None]) == "unknown"
+    assert get_column_kind([]) == "unknown"
+
+
+def test_get_summary_stats():
+    assert get_summary_stats("number", DbTypeEnum.SQLITE) == [
+        "non_null",
+        "distinct",
+        "min",
+        "max",
+        "mean",
+    ]
+    assert get_summary_stats("number", DbTypeEnum.POSTGRESQL)[-3:] == [
+        "p25",
+        "p50",
+        "p75",
+    ]
+    assert "p50" not in get_summary_stats(
+        "number", DbTypeEnum.POSTGRESQL, quantiles=False
+    )
+    assert get_summary_stats("text", DbTypeEnum.POSTGRESQL) == [
+        "non_null",
+        "distinct",
+        "min",
+        "max",
+    ]
+    assert get_summary_stats("unknown", DbTypeEnum.SQLITE) == ["non_null"]
+
+
+def test_get_summary_sql():
+    sql = "SELECT Name, Milliseconds FROM Track WHERE GenreId = :genre_id ORDER BY Name"
+    assert get_summary_sql(sql, DbTypeEnum.SQLITE, COLUMNS) == (
+        'SELECT COUNT(*) AS n_rows, COUNT("Name") AS c0_non_null, '
+        'COUNT(DISTINCT "Name") AS c0_distinct, MIN("Name") AS c0_min, '
+        'MAX("Name") AS c0_max, COUNT("Milliseconds") AS c1_non_null, '
+        'COUNT(DISTINCT "Milliseconds") AS c1_distinct, '
+        'MIN("Milliseconds") AS c1_min, MAX("Milliseconds") AS c1_max, '
+        'AVG(CAST("Milliseconds" AS REAL)) AS c1_mean '
+        "FROM (SELECT Name, Milliseconds FROM Track WHERE GenreId = :genre_id) AS t"
+    )
+
+    # exact quantiles
+    new_sql = get_summary_sql(sql, DbTypeEnum.POSTGRESQL, COLUMNS)
+    assert (
+        'PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY "Milliseconds") AS c1_p50'
+        in new_sql
+    )
+    assert "APPROXIMATE" not in new_sql
+    new_sql = get_summary_sql(sql, DbTypeEnum.POSTGRESQL, COLUMNS, quantiles=False)
+    assert "PERCENTILE" not in new_sql
+
+    # approximate distinct counts and quantiles
+    new_sql = get_summary_sql(
+        sql, DbTypeEnum.AWS_REDSHIFT, COLUMNS, named_params=False
+    )
+    assert 'APPROXIMATE COUNT(DISTINCT "Name") AS c0_distinct' in new_sql
+    assert (
+        'APPROXIMATE PERCENTILE_DISC(0.25) WITHIN GROUP (ORDER BY "Milliseconds")'
+        in new_sql
+    )
+    assert "GenreId = %(genre_id)s" in new_sql
+
+    # the order is kept when it selects the rows
+    new_sql = get_summary_sql(f"{sql} LIMIT 10", DbTypeEnum.SQLITE, COLUMNS)
+    assert "ORDER BY Name LIMIT 10) AS t" in new_sql
+
+    with pytest.raises(ValueError):
+        get_summary_sql("DELETE FROM Track", DbTypeEnum.SQLITE, COLUMNS)
+
+
+def test_get_top_values_sql():
+    sql = "SELECT Name, Composer FROM Track"
+    assert get_top_values_sql(
+        sql, DbTypeEnum.SQLITE, [(0, "Name"), (1, "Composer")], top_k=3
+    ) == (
+        "SELECT column_position, column_value, value_count FROM ("
+        "SELECT column_position, column_value, value_count, "
+        "ROW_NUMBER() OVER (PARTITION BY column_position "
+        "ORDER BY value_count DESC, column_value NULLS LAST) AS value_rank "
+        "FROM ("
+        'SELECT 0 AS column_position, CAST("Name" AS TEXT(100)) AS column_value, '
+        "COUNT(*) AS value_count FROM (SELECT Name, Composer FROM Track) AS t0 "
+        'WHERE NOT "Name" IS NULL GROUP BY "Name" '
+        "UNION ALL "
+        'SELECT 1 AS column_position, CAST("Composer" AS TEXT(100)) AS column_value, '
+        "COUNT(*) AS value_count FROM (SELECT Name, Composer FROM Track) AS t1 "
+        'WHERE NOT "Composer" IS NULL GROUP BY "Composer"'
+        ") AS value_counts) AS r "
+        "WHERE value_rank <= 3 ORDER BY column_position, value_rank"
+    )
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.rewrite.summarize",
+        preview=False,
+    )
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from mcp_ohmy_sql.constants import DbTypeEnum, ObjectTypeEnum
+from mcp_ohmy_sql.db.aws_redshift import api as aws_redshift
+from mcp_ohmy_sql.rewrite.tables import new_table_index, get_source_tables
+
+
+def test_new_table_index():
+    database_info = aws_redshift.DatabaseInfo(
+        name="dev",
+        schemas=[
+            aws_redshift.SchemaInfo(
+                name="public",
+                tables=[
+                    aws_redshift.TableInfo(
+                        object_type=ObjectTypeEnum.TABLE,
+                        name="Orders",
+                        dist_style="EVEN",
+                        owner="admin",
+                        columns=[],
+                    ),
+                    aws_redshift.TableInfo(
+                        object_type=ObjectTypeEnum.VIEW,
+                        name="daily_orders",
+                        dist_style="EVEN",
+                        owner="admin",
+                        columns=[],
+                    ),
+                ],
+            )
+        ],
+    )
+    table_index = new_table_index(database_info)
+    assert table_index == {
+        "orders": ("public", "Orders"),
+        "public.orders": ("public", "Orders"),
+    }
+
+
+def test_get_source_tables():
+    table_index = {
+        "album": (None, "Album"),
+        "artist": (None, "Artist"),
+    }
+    sql = (
+        "WITH a AS (SELECT * FROM Album) "
+        "SELECT * FROM a JOIN Artist AS r ON a.ArtistId = r.ArtistId "
+        "WHERE a.AlbumId IN (SELECT AlbumId FROM album)"
+    )
+    tables = get_source_tables(sql, DbTypeEnum.SQLITE, table_index)
+    assert sorted(tables) == [(None, "Album"), (None, "Artist")]
+
+    for sql, reason in [
+        ("SELECT * FROM daily_orders", "not a table of the database schema"),
+        ("SELECT * FROM generate_series(1, 3)", "is not a table"),
+        ("SELECT * FROM other.main.Album", "in another database"),
+        ("SELECT 1", "doesn't read any table"),
+        ("DELETE FROM Album", "can't be parsed"),
+    ]:
+        with pytest.raises(ValueError, match=reason):
+            get_source_tables(sql, DbTypeEnum.POSTGRESQL, table_index)
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.rewrite.tables",
+        preview=False,
+    )
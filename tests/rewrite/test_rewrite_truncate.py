@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+import sqlalchemy as sa
+
+from mcp_ohmy_sql.constants import DbTypeEnum, LLMTypeEnum
+from mcp_ohmy_sql.rewrite.truncate import (
+    get_large_value_kind,
+    truncate_large_values,
+)
+
+COLUMN_INDEX = {
+    "doc": [
+        ("id", None),
+        ("body", "text"),
+        ("payload", "binary"),
+        ("meta", "json"),
+    ],
+    "author": [("id", None), ("name", None)],
+}
+
+
+def test_get_large_value_kind():
+    assert get_large_value_kind("VARCHAR(160)", LLMTypeEnum.STR.value, 200) is None
+    assert get_large_value_kind("VARCHAR(4000)", LLMTypeEnum.STR.value, 200) == "text"
+    assert get_large_value_kind("TEXT", LLMTypeEnum.STR.value, 200) == "text"
+    assert get_large_value_kind("BLOB", LLMTypeEnum.BLOB.value, 200) == "binary"
+    assert get_large_value_kind("BYTEA", "BYTEA", 200) == "binary"
+    assert get_large_value_kind("JSONB", LLMTypeEnum.BLOB.value, 200) == "json"
+    assert get_large_value_kind("super", LLMTypeEnum.STR.value, 200) == "json"
+    assert get_large_value_kind("INTEGER", LLMTypeEnum.INT.value, 200) is None
+    assert get_large_value_kind("UUID", LLMTypeEnum.STR.value, 200) is None
+
+
+def test_truncate_large_values():
+    def rewrite(sql: str, db_type=DbTypeEnum.SQLITE) -> str:
+        return truncate_large_values(sql, db_type, COLUMN_INDEX, 200)
+
+    assert rewrite("SELECT id, body AS b FROM doc") == (
+        "SELECT id, SUBSTRING(body, 1, 201) AS b FROM doc"
+    )
+    assert rewrite("SELECT * FROM doc", DbTypeEnum.POSTGRESQL) == (
+        "SELECT id, SUBSTRING(body FROM 1 FOR 201) AS body, "
+        "'<' || OCTET_LENGTH(payload) || ' bytes, md5 ' || LEFT(MD5(payload), 12) "
+        "|| '>' AS payload, "
+        "SUBSTRING(CAST(meta AS TEXT) FROM 1 FOR 201) AS meta FROM doc"
+    )
+    assert "JSON_SERIALIZE(meta)" in rewrite(
+        "SELECT meta FROM doc", DbTypeEnum.AWS_REDSHIFT
+    )
+    assert "HASHBYTES('MD5', payload)" in rewrite(
+        "SELECT payload FROM doc", DbTypeEnum.MSSQL
+    )
+    # star of one table in a join, qualified columns
+    assert rewrite(
+        "SELECT a.name, d.* FROM doc d JOIN author a ON d.id = a.id"
+    ) == (
+        "SELECT a.name, d.id, SUBSTRING(d.body, 1, 201) AS body, "
+        "'<' || LENGTH(d.payload) || ' bytes, 0x' || HEX(SUBSTRING(d.payload, 1, 6)) "
+        "|| '...>' AS payload, SUBSTRING(CAST(d.meta AS TEXT), 1, 201) AS meta "
+        "FROM doc AS d JOIN author AS a ON d.id = a.id"
+    )
+
+    # ORDER BY sorts by the full value, not the shrunk one
+    assert rewrite("SELECT id, body AS b FROM doc ORDER BY b DESC, id") == (
+        "SELECT id, SUBSTRING(body, 1, 201) AS b FROM doc ORDER BY doc.body DESC, id"
+    )
+    assert rewrite("SELECT d.* FROM doc AS d ORDER BY 2, 1").endswith(
+        "FROM doc AS d ORDER BY d.body, 1"
+    )
+    assert rewrite(
+        'SELECT a.name, body FROM "doc" JOIN author a ON "doc".id = a.id ORDER BY body'
+    ).endswith('ORDER BY "doc".body')
+    # GROUP BY groups by the full value too
+    assert rewrite("SELECT body, COUNT(*) AS n FROM doc GROUP BY 1 ORDER BY 1") == (
+        "SELECT SUBSTRING(body, 1, 201) AS body, COUNT(*) AS n FROM doc "
+        "GROUP BY doc.body ORDER BY doc.body"
+    )
+    assert rewrite("SELECT body AS b FROM doc AS d GROUP BY b").endswith(
+        "FROM doc AS d GROUP BY d.body"
+    )
+
+    # left alone
+    for sql in [
+        "SELECT id, name FROM author",
+        "SELECT * FROM author",
+        "SELECT DISTINCT body FROM doc",
+        "SELECT body FROM doc UNION SELECT name FROM author",
+        "SELECT body FROM (SELECT * FROM doc) AS t",
+        "WITH doc AS (SELECT name AS body FROM author) SELECT body FROM doc",
+        "SELECT id FROM doc JOIN author ON doc.id = author.id",
+        "SELECT * FROM unknown_table",
+        "not a sql",
+    ]:
+        assert rewrite(sql) == sql
+
+
+def test_truncate_large_values_on_sqlite():
+    engine = sa.create_engine("sqlite:///:memory:")
+    with engine.begin() as conn:
+        conn.execute(
+            sa.text(
+                "CREATE TABLE doc (id INTEGER, body TEXT, payload BLOB, meta JSON)"
+            )
+        )
+        conn.execute(
+            sa.text("INSERT INTO doc VALUES (1, :body, :payload, '{}')"),
+            {"body": "a" * 5_000_000, "payload": b"\x01\x02" * 2_500_000},
+        )
+        sql = truncate_large_values(
+            "SELECT * FROM doc WHERE id = :id",
+            DbTypeEnum.SQLITE,
+            COLUMN_INDEX,
+            200,
+        )
+        row = conn.execute(sa.text(sql), {"id": 1}).one()
+    assert row.id == 1
+    assert len(row.body) == 201
+    assert row.payload == "<5000000 bytes, 0x010201020102...>"
+    assert row.meta == "{}"
+
+    # values only differing after max_chars are still sorted
+    with engine.begin() as conn:
+        conn.execute(
+            sa.text("INSERT INTO doc VALUES (2, :body, NULL, NULL)"),
+            {"body": "a" * 5_000_000 + "b"},
+        )
+        sql = truncate_large_values(
+            "SELECT id, body FROM doc ORDER BY body DESC",
+            DbTypeEnum.SQLITE,
+            COLUMN_INDEX,
+            200,
+        )
+        rows = conn.execute(sa.text(sql)).all()
+    assert [row.id for row in rows] == [2, 1]
+
+    # and still grouped
+    sql = truncate_large_values(
+        "SELECT body, COUNT(*) AS n FROM doc GROUP BY 1",
+        DbTypeEnum.SQLITE,
+        COLUMN_INDEX,
+        200,
+    )
+    with engine.connect() as conn:
+        rows = conn.execute(sa.text(sql)).all()
+    assert [row.n for row in rows] == [1, 1]
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.rewrite.truncate",
+        preview=False,
+    )
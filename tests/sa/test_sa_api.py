@@ -7,7 +7,8 @@ def test():
     _ = api
     _ = api.get_create_view_sql
     _ = api.get_drop_view_sql
-    # _ = api.execute_count_query
+    _ = api.ensure_valid_select_query
+    _ = api.execute_count_query
     _ = api.execute_select_query
 
 
@@ -4,6 +4,9 @@ from mcp_ohmy_sql.sa.query import (
     ensure_valid_select_query,
     execute_count_query,
     execute_select_query,
+    snapshot_connection,
+    fetch_select_result,
+    open_select_cursor,
 )
 
 import pytest
@@ -62,6 +65,48 @@ class TestSqlalchemyQuery:
         # print(result)  # for debug only
         assert "No result" in result
 
+        result = execute_select_query(
+            engine=engine,
+            query="SELECT * FROM Album LIMIT 3",
+            max_rows=2,
+        )
+        # print(result)  # for debug only
+        assert "truncated to the first 2 rows" in result
+
+        result = execute_select_query(
+            engine=engine,
+            query="SELECT AlbumId, Title FROM Album LIMIT 3",
+            max_cell_chars=5,
+        )
+        # print(result)  # for debug only
+        assert "cells truncated to 5 chars" in result
+
+        result = execute_select_query(
+            engine=engine,
+            query="SELECT AlbumId, Title FROM Album LIMIT 2",
+            result_format="csv",
+        )
+        # print(result)  # for debug only
+        assert result.splitlines()[0] == "AlbumId:int,Title:str"
+
+    def test_fetch_select_result(self, sqlite_sa_engine_objs):
+        engine = sqlite_sa_engine_objs.engine
+        sql = "SELECT AlbumId FROM Album ORDER BY AlbumId"
+        rows = fetch_select_result(engine, sql, max_rows=5)
+        assert len(rows) == 6
+        # statements in a snapshot share one connection and transaction
+        with snapshot_connection(engine) as connection:
+            assert list(fetch_select_result(connection, sql, max_rows=1)) == [(1,), (2,)]
+            text = execute_select_query(connection, sql, max_rows=1, result_format="csv")
+            assert text.startswith("AlbumId:int\n1\n...")
+
+    def test_open_select_cursor(self, sqlite_sa_engine_objs):
+        engine = sqlite_sa_engine_objs.engine
+        cursor = open_select_cursor(engine, "SELECT AlbumId FROM Album ORDER BY AlbumId")
+        assert cursor.columns == ["AlbumId"]
+        assert cursor.fetch(2) == ([(1,), (2,)], True)
+        cursor.close()
+
 
 if __name__ == "__main__":
     from mcp_ohmy_sql.tests import run_cov_test
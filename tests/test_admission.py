@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+
+import pytest
+
+from mcp_ohmy_sql.admission import (
+    PriorityEnum,
+    AdmissionRejectedError,
+    AdmissionController,
+)
+
+
+class TestAdmissionController:
+    def test_admit(self):
+        controller = AdmissionController(name="test", max_concurrency=2)
+        with controller.admit():
+            assert controller.running == 1
+            # re-entrant, doesn't take another slot
+            with controller.admit(priority=PriorityEnum.METADATA):
+                assert controller.running == 1
+            assert controller.running == 1
+        assert controller.running == 0
+
+    def test_queue_full(self):
+        controller = AdmissionController(
+            name="test",
+            max_concurrency=1,
+            max_queue_size=0,
+        )
+        holding = threading.Event()
+        done = threading.Event()
+
+        def hold():
+            with controller.admit():
+                holding.set()
+                done.wait(5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        holding.wait(5)
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            controller.acquire()
+        assert "retry after" in str(exc_info.value)
+        assert exc_info.value.retry_after >= 1
+        done.set()
+        thread.join()
+        assert controller.running == 0
+
+    def test_queue_timeout(self):
+        controller = AdmissionController(
+            name="test",
+            max_concurrency=1,
+            queue_timeout=0.05,
+        )
+        holding = threading.Event()
+        done = threading.Event()
+
+        def hold():
+            with controller.admit():
+                holding.set()
+                done.wait(5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        holding.wait(5)
+        with pytest.raises(AdmissionRejectedError):
+            controller.acquire()
+        assert controller.waiting == 0
+        done.set()
+        thread.join()
+
+    def test_priority(self):
+        controller = AdmissionController(name="test", max_concurrency=1)
+        order = list()
+        holding = threading.Event()
+        done = threading.Event()
+
+        def hold():
+            with controller.admit():
+                holding.set()
+                done.wait(5)
+
+        def run(priority: PriorityEnum):
+            with controller.admit(priority=priority):
+                order.append(priority)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        holding.wait(5)
+
+        threads = [
+            threading.Thread(target=run, args=(PriorityEnum.QUERY,)),
+            threading.Thread(target=run, args=(PriorityEnum.METADATA,)),
+        ]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)  # make sure the query is queued first
+        assert controller.waiting == 2
+        done.set()
+        holder.join()
+        for thread in threads:
+            thread.join()
+        assert order == [PriorityEnum.METADATA, PriorityEnum.QUERY]
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.admission",
+        preview=False,
+    )
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+import pytest
+
+from mcp_ohmy_sql.cursor import (
+    CursorNotFoundError,
+    OpenCursor,
+    CursorRegistry,
+)
+
+
+class FakeResult:
+    def __init__(self, n_rows: int):
+        self.rows = [(i,) for i in range(1, n_rows + 1)]
+        self.closed = False
+
+    def fetchmany(self, n: int) -> list[tuple]:
+        rows, self.rows = self.rows[:n], self.rows[n:]
+        return rows
+
+    def close(self):
+        self.closed = True
+
+
+def new_cursor(n_rows: int, max_rows=None) -> tuple[OpenCursor, FakeResult]:
+    result = FakeResult(n_rows)
+    cursor = OpenCursor(
+        columns=["id"],
+        fetchmany=result.fetchmany,
+        close=result.close,
+        max_rows=max_rows,
+    )
+    return cursor, result
+
+
+class TestOpenCursor:
+    def test_fetch(self):
+        cursor, result = new_cursor(5)
+        assert cursor.fetch(2) == ([(1,), (2,)], True)
+        assert cursor.fetch(3) == ([(3,), (4,), (5,)], False)
+        assert cursor.fetch(3) == ([], False)
+        assert cursor.n_fetched == 5
+        assert cursor.truncated is False
+
+        cursor.close()
+        cursor.close()
+        assert result.closed is True
+        assert cursor.fetch(3) == ([], False)
+
+    def test_max_rows(self):
+        cursor, _ = new_cursor(10, max_rows=4)
+        assert cursor.fetch(3) == ([(1,), (2,), (3,)], True)
+        assert cursor.fetch(3) == ([(4,)], False)
+        assert cursor.truncated is True
+
+        cursor, _ = new_cursor(4, max_rows=4)
+        assert cursor.fetch(4) == ([(1,), (2,), (3,), (4,)], False)
+        assert cursor.truncated is False
+
+    def test_push_back(self):
+        cursor, _ = new_cursor(10, max_rows=4)
+        rows, has_more = cursor.fetch(4)
+        assert cursor.truncated is True
+        cursor.push_back(rows[2:])
+        assert cursor.n_fetched == 2
+        assert cursor.truncated is False
+        assert cursor.fetch(3) == ([(3,), (4,)], False)
+        assert cursor.truncated is True
+
+        cursor, _ = new_cursor(3)
+        rows, has_more = cursor.fetch(3)
+        assert has_more is False
+        cursor.push_back(rows[1:])
+        assert cursor.fetch(3) == ([(2,), (3,)], False)
+
+
+class TestCursorRegistry:
+    def test_add_get_close(self):
+        registry = CursorRegistry(max_open_cursors=2)
+        cursor, result = new_cursor(5)
+        registry.add(cursor, database_identifier="db")
+        assert registry.get(cursor.token) is cursor
+        registry.close(cursor.token)
+        assert result.closed is True
+        with pytest.raises(CursorNotFoundError) as e:
+            registry.get(cursor.token)
+        assert "not found or expired" in str(e.value)
+        registry.close(cursor.token)  # unknown tokens are ignored
+
+    def test_max_open_cursors(self):
+        registry = CursorRegistry(max_open_cursors=2)
+        c1, r1 = new_cursor(5)
+        c2, r2 = new_cursor(5)
+        c3, r3 = new_cursor(5)
+        c4, r4 = new_cursor(5)
+        registry.add(c1, database_identifier="db")
+        registry.add(c2, database_identifier="db")
+        registry.get(c1.token)  # c2 is now the least recently used
+        registry.add(c3, database_identifier="db")
+        assert r2.closed is True
+        assert r1.closed is False
+        # the limit is per database
+        registry.add(c4, database_identifier="other")
+        assert len(registry) == 3
+
+        registry.close_all()
+        assert len(registry) == 0
+        assert all(r.closed for r in [r1, r3, r4])
+
+    def test_idle_timeout(self):
+        registry = CursorRegistry(idle_timeout=60)
+        cursor, result = new_cursor(5)
+        registry.add(cursor, database_identifier="db")
+        cursor.last_used = time.time() - 120
+        assert registry.close_idle() == [cursor.token]
+        assert result.closed is True
+        with pytest.raises(CursorNotFoundError):
+            registry.get(cursor.token)
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.cursor",
+        preview=False,
+    )
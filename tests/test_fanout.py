@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+
+import pytest
+
+from mcp_ohmy_sql.fanout import (
+    OrderKey,
+    new_merge_plan,
+    merge_rows,
+    reaggregate,
+    ShardResult,
+    render_shard_report,
+)
+
+
+def test_new_merge_plan():
+    # order by, the limit is pushed down with the offset
+    plan = new_merge_plan(
+        "SELECT a, b AS x FROM t ORDER BY x DESC, 1 LIMIT 5 OFFSET 10", "sqlite"
+    )
+    assert plan.shard_sql == "SELECT a, b AS x FROM t ORDER BY x DESC, 1 LIMIT 15"
+    assert plan.order_by == [
+        OrderKey(column=1, desc=True, nulls_first=False),
+        OrderKey(column=0, desc=False, nulls_first=True),
+    ]
+    assert plan.is_aggregate is False
+    assert (plan.limit, plan.offset) == (5, 10)
+
+    # select * is resolved by column name
+    plan = new_merge_plan("SELECT * FROM t ORDER BY a", "postgresql")
+    assert plan.order_by == [OrderKey(column="a", desc=False, nulls_first=False)]
+
+    # aggregates, all the groups are needed from every shard
+    plan = new_merge_plan(
+        "SELECT g, COUNT(*) AS n, SUM(x), MIN(x), MAX(x) FROM t "
+        "GROUP BY g ORDER BY n DESC LIMIT 3",
+        "sqlite",
+    )
+    assert plan.shard_sql == (
+        "SELECT g, COUNT(*) AS n, SUM(x), MIN(x), MAX(x) FROM t GROUP BY g"
+    )
+    assert plan.group_by == [0]
+    assert plan.aggregates == {1: "sum", 2: "sum", 3: "min", 4: "max"}
+    assert plan.limit == 3
+
+    plan = new_merge_plan("SELECT COUNT(*) FROM t", "sqlite")
+    assert plan.group_by == []
+
+    # union
+    assert new_merge_plan("SELECT a FROM t UNION SELECT a FROM s", "sqlite").distinct
+    assert new_merge_plan("SELECT DISTINCT a FROM t", "sqlite").distinct
+
+    for sql, error in [
+        ("SELECT AVG(x) FROM t", "select SUM(x) and COUNT(x) instead"),
+        ("SELECT COUNT(DISTINCT x) FROM t", "COUNT(DISTINCT x) can't be merged"),
+        ("SELECT SUM(x) / COUNT(x) FROM t", "only plain COUNT, SUM, MIN and MAX"),
+        ("SELECT g, COUNT(*) FROM t GROUP BY g HAVING COUNT(*) > 1", "HAVING"),
+        ("SELECT COUNT(*) FROM t GROUP BY g", "GROUP BY g must be in the select"),
+        ("SELECT g, x, COUNT(*) FROM t GROUP BY g", "x must be in GROUP BY"),
+        ("SELECT a FROM t ORDER BY b", "ORDER BY b must be in the select list"),
+        ("SELECT a, ROW_NUMBER() OVER (ORDER BY a) FROM t", "Window function"),
+        ("SELECT a FROM t LIMIT :n", "must be integer literals"),
+        ("DELETE FROM t", "single SELECT"),
+    ]:
+        with pytest.raises(ValueError) as e:
+            new_merge_plan(sql, "sqlite")
+        assert error in str(e.value)
+
+
+def test_merge_rows_order_by():
+    plan = new_merge_plan("SELECT a, b FROM t ORDER BY a DESC, b", "postgresql")
+    shards = [
+        [(None, "z"), (3, "x"), (1, "y")],
+        [(None, "a"), (2, "b"), (1, "a")],
+        [],
+    ]
+    rows = list(merge_rows(plan, ["a", "b"], shards))
+    # postgres sorts nulls first in descending order
+    assert rows == [(None, "a"), (None, "z"), (3, "x"), (2, "b"), (1, "a"), (1, "y")]
+
+    plan = new_merge_plan("SELECT a FROM t ORDER BY a LIMIT 2 OFFSET 1", "sqlite")
+    rows = list(merge_rows(plan, ["a"], [[(1,), (4,)], [(2,), (3,)]]))
+    assert rows == [(2,), (3,)]
+
+    # merged lazily, a shard can be an endless stream
+    plan = new_merge_plan("SELECT a FROM t ORDER BY a", "sqlite")
+    evens = ((i,) for i in itertools.count(2, 2))
+    stream = merge_rows(plan, ["a"], [iter([(1,), (3,)]), evens])
+    assert [next(stream) for _ in range(3)] == [(1,), (2,), (3,)]
+
+
+def test_merge_rows_aggregate():
+    plan = new_merge_plan(
+        "SELECT g, COUNT(*) AS n, SUM(x), MIN(x), MAX(x) FROM t "
+        "GROUP BY g ORDER BY n DESC, g LIMIT 2",
+        "sqlite",
+    )
+    shards = [
+        [("a", 2, 10, 1, 9), ("b", 1, None, None, None)],
+        [("b", 3, 6, 1, 3), ("c", 1, 5, 5, 5)],
+    ]
+    rows = list(merge_rows(plan, ["g", "n", "s", "mi", "ma"], shards))
+    assert rows == [("b", 4, 6, 1, 3), ("a", 2, 10, 1, 9)]
+
+    plan = new_merge_plan("SELECT COUNT(*) AS n FROM t", "sqlite")
+    assert list(merge_rows(plan, ["n"], [[(3,)], [(4,)]])) == [(7,)]
+
+
+def test_merge_rows_concat():
+    plan = new_merge_plan("SELECT DISTINCT a FROM t", "sqlite")
+    rows = list(merge_rows(plan, ["a"], [[(1,), (2,)], [(2,), (3,)]]))
+    assert rows == [(1,), (2,), (3,)]
+
+    plan = new_merge_plan("SELECT a FROM t LIMIT 3", "sqlite")
+    rows = list(merge_rows(plan, ["a"], [[(1,), (2,)], [(2,), (3,)]]))
+    assert rows == [(1,), (2,), (2,)]
+
+
+def test_reaggregate():
+    rows = reaggregate(
+        [("a", 1), ("b", 2), ("a", 3)],
+        group_by=[0],
+        aggregates={1: "sum"},
+    )
+    assert rows == [("a", 4), ("b", 2)]
+
+
+def test_render_shard_report():
+    s = render_shard_report(
+        [
+            ShardResult(database_identifier="a", duration=0.1, rows=[(1,)]),
+            ShardResult(database_identifier="b", duration=0.2, error="boom"),
+        ]
+    )
+    assert s.splitlines()[0] == "| database | rows | seconds | error |"
+    assert "| a | 1 | 0.100 |  |" in s
+    assert "| b |  | 0.200 | boom |" in s
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.fanout",
+        preview=False,
+    )
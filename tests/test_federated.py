@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from mcp_ohmy_sql.federated import new_federated_plan
+
+
+def test_new_federated_plan():
+    plan = new_federated_plan(
+        'SELECT a.Title, r.Name, a.AlbumId AS x FROM "chinook sqlite".main.Album AS a '
+        'JOIN pg.public."Artist" AS r ON a.ArtistId = r.ArtistId '
+        "WHERE a.AlbumId > 5 AND r.Name LIKE 'A%' AND a.Title <> r.Name "
+        "ORDER BY x",
+        ["chinook sqlite", "pg"],
+    )
+    s1, s2 = plan.sources
+    assert s1.name == "source_1"
+    assert s1.database_identifier == "chinook sqlite"
+    assert s2.database_identifier == "pg"
+    # only the used columns, only the single table filters
+    assert s1.to_sql("sqlite") == (
+        "SELECT Title, AlbumId, ArtistId FROM main.Album WHERE AlbumId > 5"
+    )
+    assert s2.to_sql("postgresql") == (
+        "SELECT Name, ArtistId FROM public.\"Artist\" WHERE Name LIKE 'A%'"
+    )
+    assert "FROM source_1 AS a JOIN source_2 AS r" in plan.local_sql
+    assert "a.Title <> r.Name" in plan.local_sql
+    assert "ORDER BY x" in plan.local_sql
+
+    # the nullable side of an outer join keeps its filter locally
+    plan = new_federated_plan(
+        "SELECT * FROM db1.Album AS a LEFT JOIN db2.Artist AS r "
+        "ON a.ArtistId = r.ArtistId WHERE r.Name IS NULL AND a.AlbumId < 3",
+        ["db1", "db2"],
+    )
+    s1, s2 = plan.sources
+    assert s1.to_sql("sqlite") == "SELECT * FROM Album WHERE AlbumId < 3"
+    assert s2.to_sql("sqlite") == "SELECT * FROM Artist"
+
+    # one source, unqualified columns belong to it
+    plan = new_federated_plan(
+        "SELECT Title FROM db1.Album WHERE AlbumId = 1", ["db1"]
+    )
+    assert plan.sources[0].to_sql("sqlite") == (
+        "SELECT Title, AlbumId FROM Album WHERE AlbumId = 1"
+    )
+    assert plan.local_sql == (
+        "SELECT Title FROM source_1 AS Album WHERE AlbumId = 1"
+    )
+
+    # a subquery disables the push-down, CTE names are not sources
+    plan = new_federated_plan(
+        "WITH t AS (SELECT AlbumId FROM db1.Album) "
+        "SELECT * FROM t WHERE AlbumId IN (SELECT AlbumId FROM db2.Track)",
+        ["db1", "db2"],
+    )
+    assert len(plan.sources) == 2
+    assert plan.sources[0].to_sql("sqlite") == "SELECT * FROM Album"
+
+    with pytest.raises(ValueError, match="must be qualified"):
+        new_federated_plan("SELECT * FROM Album", ["db1"])
+    with pytest.raises(ValueError, match="not found in configuration"):
+        new_federated_plan("SELECT * FROM db3.Album", ["db1"])
+    with pytest.raises(ValueError):
+        new_federated_plan("DELETE FROM db1.Album", ["db1"])
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.federated",
+        preview=False,
+    )
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+
+import pytest
+
+from mcp_ohmy_sql.constants import JobStatusEnum
+from mcp_ohmy_sql.jobs import (
+    JobNotFoundError,
+    QueryJob,
+    JobManager,
+)
+
+
+def wait(job: QueryJob, timeout: float = 5):
+    start = time.time()
+    while job.is_finished is False:
+        if time.time() - start > timeout:  # pragma: no cover
+            raise TimeoutError
+        time.sleep(0.01)
+
+
+class TestJobManager:
+    def test_submit(self):
+        manager = JobManager(max_workers=1)
+        event = threading.Event()
+
+        def run(job: QueryJob):
+            event.wait(5)
+            job.rows_fetched = 3
+            return [1, 2, 3]
+
+        job, is_new = manager.submit("key", "db", "SELECT 1", run=run)
+        assert is_new is True
+        # identical submissions are deduplicated
+        assert manager.submit("key", "db", "SELECT 1", run=run) == (job, False)
+        event.set()
+        wait(job)
+        assert job.status == JobStatusEnum.SUCCEEDED.value
+        assert job.result == [1, 2, 3]
+        assert "rows fetched: 3" in job.to_status()
+        assert manager.get(job.job_id) is job
+        # succeeded jobs are reused too
+        assert manager.submit("key", "db", "SELECT 1", run=run) == (job, False)
+        # unless their result is gone
+        new_job, is_new = manager.submit(
+            "key", "db", "SELECT 1", run=run, is_result_valid=lambda job: False
+        )
+        assert is_new is True
+        assert new_job is not job
+        wait(new_job)
+
+        with pytest.raises(JobNotFoundError) as e:
+            manager.get("invalid")
+        assert "not found or expired" in str(e.value)
+        manager.shutdown()
+
+    def test_failed(self):
+        manager = JobManager()
+
+        def run(job: QueryJob):
+            raise ValueError("no such table: t")
+
+        job, _ = manager.submit("key", "db", "SELECT * FROM t", run=run)
+        wait(job)
+        assert job.status == JobStatusEnum.FAILED.value
+        assert "error: no such table: t" in job.to_status()
+        # failed jobs are not reused
+        assert manager.submit("key", "db", "SELECT * FROM t", run=run)[1] is True
+        manager.shutdown()
+
+    def test_cancel(self):
+        manager = JobManager(max_workers=1)
+        started = threading.Event()
+
+        def run(job: QueryJob):
+            started.set()
+            while True:
+                job.check_cancelled()
+                time.sleep(0.01)
+
+        running, _ = manager.submit("k1", "db", "SELECT 1", run=run)
+        queued, _ = manager.submit("k2", "db", "SELECT 2", run=run)
+        started.wait(5)
+        assert queued.status == JobStatusEnum.QUEUED.value
+        assert manager.cancel(queued.job_id).status == JobStatusEnum.CANCELLED.value
+        manager.cancel(running.job_id)
+        wait(running)
+        assert running.status == JobStatusEnum.CANCELLED.value
+        manager.shutdown()
+
+    def test_evict(self):
+        manager = JobManager(max_jobs=2, job_ttl=60)
+        jobs = [manager.submit(i, "db", "SELECT 1", run=lambda job: 1)[0] for i in range(2)]
+        for job in jobs:
+            wait(job)
+        jobs[0].finished_at -= 120
+        with pytest.raises(JobNotFoundError):
+            manager.get(jobs[0].job_id)
+        # the oldest finished jobs are dropped when there are too many
+        job, _ = manager.submit(2, "db", "SELECT 1", run=lambda job: 1)
+        wait(job)
+        manager.submit(3, "db", "SELECT 1", run=lambda job: 1)
+        assert len(manager) == 2
+        with pytest.raises(JobNotFoundError):
+            manager.get(jobs[1].job_id)
+        manager.shutdown()
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.jobs",
+        preview=False,
+    )
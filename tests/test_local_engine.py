@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from mcp_ohmy_sql.result.buffer import ResultBuffer
+from mcp_ohmy_sql.local_engine import LocalTable, LocalEngine, is_duckdb_available
+
+
+def new_buffer(n_rows: int) -> ResultBuffer:
+    buffer = ResultBuffer(["id", "name"])
+    buffer.append_rows([(i, f"name {i % 3}") for i in range(1, n_rows + 1)])
+    return buffer
+
+
+def test_local_table():
+    table = LocalTable(
+        name="result_1",
+        columns=["id", "name"],
+        n_rows=100,
+        n_bytes=1000,
+        truncated=True,
+        database_identifier="chinook",
+        sql="SELECT * FROM t",
+    )
+    assert table.to_description() == (
+        "result_1 (100+ (truncated) rows from 'chinook', columns: id, name)"
+    )
+
+
+@pytest.mark.skipif(is_duckdb_available() is False, reason="duckdb not installed")
+class TestLocalEngine:
+    def test_query(self):
+        engine = LocalEngine()
+        t1 = engine.add(new_buffer(30), database_identifier="db", sql="SELECT 1")
+        t2 = engine.add(new_buffer(5), database_identifier="db", sql="SELECT 2")
+        assert (t1.name, t2.name) == ("result_1", "result_2")
+        assert (t1.n_rows, t1.truncated) == (30, False)
+
+        rows = engine.query(
+            "SELECT name, COUNT(*) AS n FROM result_1 GROUP BY name ORDER BY name"
+        )
+        assert rows.columns == ["name", "n"]
+        assert list(rows) == [("name 0", 10), ("name 1", 10), ("name 2", 10)]
+
+        # join two results
+        rows = engine.query(
+            "SELECT COUNT(*) FROM result_1 AS a JOIN result_2 AS b ON a.id = b.id"
+        )
+        assert list(rows) == [(5,)]
+
+        rows = engine.query("SELECT id FROM result_1", max_rows=10)
+        assert len(rows) == 11
+
+        with pytest.raises(ValueError):
+            engine.query("DROP VIEW result_1")
+        # no file system access
+        with pytest.raises(Exception):
+            engine.query("SELECT * FROM read_csv('/etc/passwd')")
+
+        engine.drop("result_1")
+        assert [table.name for table in engine.list_tables()] == ["result_2"]
+        with pytest.raises(Exception):
+            engine.query("SELECT * FROM result_1")
+        engine.close()
+        assert len(engine) == 0
+
+    def test_evict(self):
+        engine = LocalEngine(max_tables=2)
+        for _ in range(3):
+            engine.add(new_buffer(3), database_identifier="db", sql="SELECT 1")
+        assert [table.name for table in engine.list_tables()] == [
+            "result_2",
+            "result_3",
+        ]
+
+        n_bytes = engine.list_tables()[0].n_bytes
+        engine = LocalEngine(max_total_bytes=n_bytes * 2)
+        for _ in range(3):
+            engine.add(new_buffer(3), database_identifier="db", sql="SELECT 1")
+        assert len(engine) == 2
+        with pytest.raises(ValueError):
+            engine.add(new_buffer(100), database_identifier="db", sql="SELECT 1")
+
+        engine = LocalEngine(table_ttl=0)
+        engine.add(new_buffer(3), database_identifier="db", sql="SELECT 1")
+        assert engine.list_tables() == []
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.local_engine",
+        preview=False,
+    )
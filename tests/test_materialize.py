@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+import time
+import shutil
+import sqlite3
+import decimal
+import datetime
+import threading
+
+import pytest
+
+from mcp_ohmy_sql.paths import dir_tmp
+from mcp_ohmy_sql.cursor import OpenCursor
+from mcp_ohmy_sql.materialize import (
+    get_sqlite_type,
+    to_sqlite_value,
+    get_column_names,
+    MaterializationStatus,
+    get_next_refresh_time,
+    MaterializedStore,
+    MaterializationScheduler,
+)
+
+dir_materialize = dir_tmp.joinpath("test_materialize")
+
+
+def new_cursor(
+    columns: list[str],
+    rows: list[tuple],
+    max_rows: int = None,
+) -> OpenCursor:
+    iterator = iter(rows)
+
+    def fetchmany(n: int):
+        return [row for _, row in zip(range(n), iterator)]
+
+    return OpenCursor(
+        columns=columns,
+        fetchmany=fetchmany,
+        close=lambda: None,
+        max_rows=max_rows,
+    )
+
+
+def test_get_sqlite_type():
+    assert get_sqlite_type(True) == "INTEGER"
+    assert get_sqlite_type(1) == "INTEGER"
+    assert get_sqlite_type(1.5) == "REAL"
+    assert get_sqlite_type(decimal.Decimal("1.5")) == "NUMERIC"
+    assert get_sqlite_type(b"a") == "BLOB"
+    assert get_sqlite_type("a") == "TEXT"
+    assert get_sqlite_type(datetime.date(2026, 1, 1)) == "TEXT"
+
+
+def test_to_sqlite_value():
+    assert to_sqlite_value(None) is None
+    assert to_sqlite_value(decimal.Decimal("1.50")) == "1.50"
+    assert (
+        to_sqlite_value(datetime.datetime(2026, 1, 2, 3, 4, 5))
+        == "2026-01-02 03:04:05"
+    )
+    assert to_sqlite_value(datetime.date(2026, 1, 2)) == "2026-01-02"
+    assert to_sqlite_value(memoryview(b"ab")) == b"ab"
+    assert to_sqlite_value({"a": 1}) == '{"a": 1}'
+
+
+def test_get_column_names():
+    assert get_column_names(["id", "ID", "name", "id"]) == [
+        "id",
+        "ID_2",
+        "name",
+        "id_3",
+    ]
+    assert get_column_names([""]) == ["column"]
+
+
+def test_get_next_refresh_time():
+    assert get_next_refresh_time(None, refresh_interval=60) == 0.0
+    refreshed_at = datetime.datetime(2026, 1, 1, 10, 30).timestamp()
+    status = MaterializationStatus(
+        name="t",
+        database_identifier="db",
+        sql="SELECT 1",
+        refreshed_at=refreshed_at,
+        attempted_at=refreshed_at,
+    )
+    assert get_next_refresh_time(status, refresh_interval=60) == refreshed_at + 60
+    # waits for the next off-peak hour
+    assert get_next_refresh_time(
+        status, refresh_interval=60, refresh_hours=[2, 3]
+    ) == datetime.datetime(2026, 1, 2, 2, 0).timestamp()
+    # already in an off-peak hour
+    assert (
+        get_next_refresh_time(status, refresh_interval=60, refresh_hours=[10])
+        == refreshed_at + 60
+    )
+    # a failed refresh is retried later
+    status.error = "boom"
+    status.attempted_at = refreshed_at + 3600
+    assert (
+        get_next_refresh_time(status, refresh_interval=60, retry_interval=600)
+        == refreshed_at + 4200
+    )
+
+
+class TestMaterializedStore:
+    def test(self):
+        shutil.rmtree(dir_materialize, ignore_errors=True)
+        store = MaterializedStore(dir_materialize.joinpath("materialized.sqlite"))
+        assert store.get_statuses() == {}
+        store.initialize(names=["album"])
+
+        cursor = new_cursor(
+            ["id", "title", "price", "ID"],
+            [(i, f"Album {i}", decimal.Decimal("9.99"), None) for i in range(1, 26)],
+        )
+        assert store.write_cursor("album", cursor, batch_size=10) == 25
+        conn = sqlite3.connect(store.path)
+        rows = conn.execute("SELECT * FROM album ORDER BY id").fetchall()
+        assert len(rows) == 25
+        assert rows[0] == (1, "Album 1", 9.99, None)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(album)")]
+        assert columns == ["id", "title", "price", "ID_2"]
+
+        # the new table replaces the old one
+        cursor = new_cursor(["n"], [(1,), (2,), (3,)], max_rows=2)
+        assert store.write_cursor("album", cursor) == 2
+        assert cursor.truncated is True
+        assert conn.execute("SELECT * FROM album").fetchall() == [(1,), (2,)]
+
+        # a failed refresh keeps the old table
+        def fetchmany(n: int):
+            raise ValueError("boom")
+
+        cursor = OpenCursor(columns=["x"], fetchmany=fetchmany, close=lambda: None)
+        with pytest.raises(ValueError):
+            store.write_cursor("album", cursor)
+        assert conn.execute("SELECT * FROM album").fetchall() == [(1,), (2,)]
+        tables = [
+            row[0]
+            for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        ]
+        assert sorted(tables) == ["_materializations", "album"]
+        conn.close()
+
+        now = time.time()
+        status = MaterializationStatus(
+            name="album",
+            database_identifier="chinook",
+            sql="SELECT * FROM Album",
+            refreshed_at=now,
+            attempted_at=now,
+            n_rows=2,
+            truncated=True,
+        )
+        store.set_status(status)
+        statuses = store.get_statuses()
+        assert statuses["album"].n_rows == 2
+        assert statuses["album"].truncated is True
+        assert abs(statuses["album"].refreshed_at - now) < 1
+        assert "album materialized from 'chinook' at" in statuses[
+            "album"
+        ].to_freshness(now)
+        assert "2+ (truncated) rows" in statuses["album"].to_freshness(now)
+
+        # the tables no longer configured are dropped
+        store.initialize(names=["other"])
+        assert store.get_statuses() == {}
+        conn = sqlite3.connect(store.path)
+        tables = [
+            row[0]
+            for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        ]
+        assert tables == ["_materializations"]
+        conn.close()
+
+
+def test_materialization_scheduler():
+    event = threading.Event()
+    calls = list()
+
+    def run():
+        calls.append(1)
+        event.set()
+
+    scheduler = MaterializationScheduler(run=run, check_interval=60)
+    assert scheduler.start() is True
+    assert scheduler.start() is False
+    assert event.wait(5)
+    assert scheduler.is_running
+    scheduler.stop(timeout=5)
+    assert scheduler.is_running is False
+    assert calls == [1]
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.materialize",
+        preview=False,
+    )
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+
+from mcp_ohmy_sql.profiling import (
+    new_column_stats,
+    new_table_profile,
+    encode_table_profiles,
+    ProfileStore,
+)
+
+
+def test_new_column_stats():
+    # low-cardinality text
+    stats = new_column_stats(
+        "status", ["ACTIVE", "CLOSED", None, "ACTIVE", "O'NEIL"]
+    )
+    assert stats.null_ratio == 0.2
+    assert stats.distinct == 3
+    assert stats.values == ["ACTIVE", "CLOSED", "O'NEIL"]
+    assert stats.encode() == (
+        "status:null=20%,distinct=3,values=['ACTIVE', 'CLOSED', 'O''NEIL']"
+    )
+    assert stats.encode(complete=False).startswith("status:null=20%,distinct~3,")
+
+    # unique, too many or too long values are not listed
+    assert new_column_stats("name", ["a", "b", "c"]).values is None
+    assert new_column_stats("code", ["a", "b", "c", "a"], max_values=2).values is None
+    assert new_column_stats("doc", ["abc", "abc"], max_value_chars=2).values is None
+
+    # numbers and dates have a range
+    stats = new_column_stats("price", [0.99, 1.99, 0.99])
+    assert (stats.min, stats.max, stats.values) == (0.99, 1.99, None)
+    assert stats.encode() == "price:distinct=2,min=0.99,max=1.99"
+    stats = new_column_stats(
+        "day", [datetime.date(2024, 1, 2), datetime.date(2024, 1, 1)]
+    )
+    assert stats.encode() == "day:distinct=2,min=2024-01-01,max=2024-01-02"
+
+    # unhashable and empty columns
+    assert new_column_stats("meta", [{"a": 1}, {"a": 1}]).distinct == 1
+    stats = new_column_stats("empty", [None, None])
+    assert stats.encode() == "empty:null=100%,distinct=0"
+    assert new_column_stats("empty", []).null_ratio == 0.0
+
+
+def test_encode_table_profiles():
+    profile = new_table_profile(
+        schema_name=None,
+        table_name="Invoice",
+        column_names=["InvoiceId", "BillingCountry"],
+        column_values=[[1, 2, 3], ["USA", "USA", "Canada"]],
+        complete=True,
+    )
+    assert profile.n_rows == 3
+    sampled = new_table_profile(
+        schema_name=None,
+        table_name="Track",
+        column_names=["TrackId"],
+        column_values=[[1, 2]],
+        complete=False,
+    )
+    assert encode_table_profiles([profile, sampled]) == (
+        "Profiles(\n"
+        "  Table Invoice(3 rows)(\n"
+        "    InvoiceId:distinct=3,min=1,max=3,\n"
+        "    BillingCountry:distinct=2,values=['USA', 'Canada'],\n"
+        "  )\n"
+        "  Table Track(2 sampled rows)(\n"
+        "    TrackId:distinct~2,min=1,max=2,\n"
+        "  )\n"
+        ")"
+    )
+
+
+class TestProfileStore:
+    def test(self):
+        store = ProfileStore(max_workers=2)
+        key = ("chinook", None, "Invoice")
+
+        def run():
+            return new_table_profile(
+                schema_name=None,
+                table_name="Invoice",
+                column_names=["InvoiceId"],
+                column_values=[[1, 2]],
+                complete=True,
+            )
+
+        def fail():
+            raise ValueError("no such table: Track\n[SQL: SELECT ...]")
+
+        assert store.submit(key, run=run) is True
+        assert store.submit(("chinook", None, "Track"), run=fail) is True
+        assert store.submit(("chinook", None, "Skipped"), run=lambda: None) is True
+        store.shutdown()
+        assert store.is_pending(key) is False
+        assert store.get(key).n_rows == 2
+        assert store.get(("chinook", None, "Skipped")) is None
+        profiles = store.get_schema("chinook", None)
+        assert [profile.table_name for profile in profiles] == ["Invoice", "Track"]
+        assert profiles[1].encode() == "Table Track(not profiled: no such table: Track)"
+        assert store.get_schema("chinook", "other") == []
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.profiling",
+        preview=False,
+    )
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+import shutil
+
+import sqlalchemy as sa
+
+from mcp_ohmy_sql.paths import dir_tmp
+from mcp_ohmy_sql.constants import DbTypeEnum
+from mcp_ohmy_sql.table_version import (
+    get_table_version_sql,
+    is_append_only_change,
+    TableVersionProbe,
+)
+
+dir_table_version = dir_tmp.joinpath("test_table_version")
+
+
+def test_get_table_version_sql():
+    tables = [("public", "orders"), (None, "it's")]
+    assert get_table_version_sql(DbTypeEnum.SQLITE, tables) == "PRAGMA data_version"
+    sql = get_table_version_sql(DbTypeEnum.POSTGRESQL, tables)
+    assert sql.endswith(
+        "FROM pg_stat_user_tables "
+        "WHERE (schemaname = 'public' AND relname = 'orders') OR relname = 'it''s'"
+    )
+    sql = get_table_version_sql(DbTypeEnum.AWS_REDSHIFT, tables)
+    assert "FROM svv_table_info AS t LEFT JOIN stl_insert AS i" in sql
+    assert get_table_version_sql(DbTypeEnum.MYSQL, tables) is None
+
+
+def test_is_append_only_change():
+    old = (("public", "orders", 10, 1, 1, 8),)
+    assert is_append_only_change(
+        DbTypeEnum.POSTGRESQL, old, (("public", "orders", 12, 1, 1, 10),)
+    )
+    # an update
+    assert not is_append_only_change(
+        DbTypeEnum.POSTGRESQL, old, (("public", "orders", 10, 2, 1, 8),)
+    )
+    # a truncate
+    assert not is_append_only_change(
+        DbTypeEnum.POSTGRESQL, old, (("public", "orders", 10, 1, 1, 0),)
+    )
+    assert not is_append_only_change(DbTypeEnum.POSTGRESQL, old, ())
+    # the other probes can't tell inserts from updates
+    assert not is_append_only_change(DbTypeEnum.SQLITE, ((1,),), ((2,),))
+    redshift_old = (("public", "orders", 10, 10, None),)
+    redshift_new = (("public", "orders", 12, 11, None),)
+    assert not is_append_only_change(
+        DbTypeEnum.AWS_REDSHIFT, redshift_old, redshift_new
+    )
+
+
+def test_table_version_probe_sqlite():
+    shutil.rmtree(dir_table_version, ignore_errors=True)
+    dir_table_version.mkdir(parents=True)
+    path = dir_table_version.joinpath("test.sqlite")
+    engine = sa.create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(sa.text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+
+    probe = TableVersionProbe(db_type=DbTypeEnum.SQLITE, conn_or_engine=engine)
+    assert probe.is_supported()
+    tables = [(None, "t")]
+    version = probe.get_version(tables)
+    assert probe.get_version(tables) == version
+    with engine.begin() as conn:
+        conn.execute(sa.text("INSERT INTO t (id) VALUES (1)"))
+    new_version = probe.get_version(tables)
+    assert new_version != version
+    assert probe.get_version(tables) == new_version
+    probe.close()
+    engine.dispose()
+
+    engine = sa.create_engine("sqlite:///:memory:")
+    probe = TableVersionProbe(db_type=DbTypeEnum.SQLITE, conn_or_engine=engine)
+    assert probe.is_supported() is False
+    assert probe.get_version(tables) is None
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.table_version",
+        preview=False,
+    )
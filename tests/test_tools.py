@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import time
+import functools
+
+import anyio
+
+from mcp_ohmy_sql.tests.test_config import setup_test_config, DatabaseEnum
+
+setup_test_config()
+
+from mcp_ohmy_sql.tools import run_tool
+
+# a 200 x 200 x 200 rows cross join, it takes about a second on SQLite
+SLOW_SQL = (
+    "SELECT COUNT(*) AS n FROM Track a, Track b, Track c "
+    "WHERE a.Milliseconds + b.Milliseconds + c.Milliseconds > 0"
+)
+
+
+class TestRunTool:
+    def test_metadata_call_is_not_blocked_by_slow_query(
+        self,
+        mcp_ohmy_sql_adapter,
+        sqlite_sa_engine_objs,
+    ):
+        adapter = mcp_ohmy_sql_adapter
+        database_identifier = DatabaseEnum.chinook_sqlite.identifier
+        results = dict()
+        finished = dict()
+
+        async def call(name: str, method, **kwargs):
+            results[name] = await run_tool(method, **kwargs)
+            finished[name] = time.monotonic()
+
+        async def main():
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(
+                    functools.partial(
+                        call,
+                        "query",
+                        adapter.tool_execute_select_statement,
+                        database_identifier=database_identifier,
+                        sql=SLOW_SQL,
+                    )
+                )
+                await anyio.sleep(0.1)
+                tg.start_soon(
+                    functools.partial(
+                        call,
+                        "metadata",
+                        adapter.tool_explain_query,
+                        database_identifier=database_identifier,
+                        sql="SELECT * FROM Track",
+                    )
+                )
+
+        anyio.run(main)
+        assert "8000000" in results["query"]
+        assert "Query Plan" in results["metadata"]
+        # the metadata call didn't wait for the slow query
+        assert finished["metadata"] < finished["query"]
+
+
+if __name__ == "__main__":
+    from mcp_ohmy_sql.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "mcp_ohmy_sql.tools.py",
+        preview=False,
+    )
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the memory held by a fetched result as a list of row tuples with
+:class:`~mcp_ohmy_sql.result.buffer.ResultBuffer` in Python and Arrow mode,
+and the time to fill them batch by batch.
+
+Rows are generated lazily, like a cursor does, so only the memory the result
+keeps is measured. Arrow memory is not seen by ``tracemalloc``, it is read
+from ``pyarrow.total_allocated_bytes()``.
+
+Usage::
+
+    python tests_load/bench_result_buffer.py
+"""
+
+import random
+import datetime
+import decimal
+import time
+import tracemalloc
+
+from mcp_ohmy_sql.lazy_import import pa
+from mcp_ohmy_sql.result.buffer import is_arrow_available, fill_result_buffer
+
+COLUMNS = ["InvoiceId", "CustomerId", "InvoiceDate", "BillingCity", "Total", "Rate"]
+
+
+def new_fetchmany(n: int):
+    random.seed(n)
+    cities = ["Oslo", "Paris", "Berlin", "São Paulo", "Prague"]
+    start = datetime.datetime(2020, 1, 1)
+    cursor = (
+        (
+            ith,
+            random.randint(1, 59),
+            start + datetime.timedelta(hours=ith),
+            random.choice(cities) + str(ith % 100) if ith % 7 else None,
+            decimal.Decimal(random.randint(99, 2599)) / 100,
+            random.random(),
+        )
+        for ith in range(n)
+    )
+
+    def fetchmany(size: int) -> list[tuple]:
+        return [row for _, row in zip(range(size), cursor)]
+
+    return fetchmany
+
+
+def measure(func) -> float:
+    tracemalloc.start()
+    arrow_before = pa.total_allocated_bytes() if is_arrow_available() else 0
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if is_arrow_available():
+        size += pa.total_allocated_bytes() - arrow_before
+    del result
+    return size / 1024 / 1024
+
+
+def main():
+    cases = {
+        "tuples": lambda n: new_fetchmany(n)(n),
+        "python": lambda n: fill_result_buffer(
+            COLUMNS, new_fetchmany(n), use_arrow=False
+        ),
+        "arrow": lambda n: fill_result_buffer(COLUMNS, new_fetchmany(n)),
+    }
+    print(f"{'rows':>8} | {'mode':>8} | {'fill':>9} | {'memory':>9}")
+    for n in [10_000, 100_000]:
+        for mode, func in cases.items():
+            start = time.perf_counter()
+            func(n)
+            elapsed = time.perf_counter() - start
+            size = measure(lambda: func(n))
+            print(f"{n:>8} | {mode:>8} | {elapsed:>8.3f}s | {size:>7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
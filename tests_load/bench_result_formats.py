@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark the encode time and the token count of every result format
+(see :mod:`mcp_ohmy_sql.result.formats`) on Chinook queries.
+
+Token counts use ``tiktoken`` (``cl100k_base``) if it is installed,
+otherwise they are estimated as one token per four characters.
+
+Usage::
+
+    python tests_load/bench_result_formats.py
+"""
+
+import timeit
+
+import sqlalchemy as sa
+
+from mcp_ohmy_sql.constants import DbTypeEnum, ResultFormatEnum
+from mcp_ohmy_sql.result.formats import encode_result
+from mcp_ohmy_sql.tests.chinook.chinook_data_model import Base
+from mcp_ohmy_sql.tests.setup_relational_database import setup_relational_database
+
+try:
+    import tiktoken
+
+    encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count_tokens(text: str) -> int:
+        return len(encoding.encode(text))
+
+    TOKENIZER = "cl100k_base"
+except ImportError:  # pragma: no cover
+
+    def count_tokens(text: str) -> int:
+        return len(text) // 4
+
+    TOKENIZER = "chars / 4"
+
+QUERIES = {
+    "narrow text (Album)": "SELECT * FROM Album",
+    "wide mixed (Track)": "SELECT * FROM Track",
+    "numeric (InvoiceLine)": "SELECT * FROM InvoiceLine",
+    "aggregation (Invoice by country)": (
+        "SELECT BillingCountry, COUNT(*) AS n, SUM(Total) AS total, "
+        "AVG(Total) AS avg_total, MIN(InvoiceDate) AS first, MAX(InvoiceDate) AS last "
+        "FROM Invoice GROUP BY BillingCountry"
+    ),
+}
+
+
+def main():
+    engine = sa.create_engine("sqlite:///:memory:")
+    setup_relational_database(
+        engine=engine,
+        metadata=Base.metadata,
+        db_type=DbTypeEnum.SQLITE,
+    )
+    print(f"tokenizer: {TOKENIZER}")
+    for name, sql in QUERIES.items():
+        with engine.connect() as conn:
+            result = conn.execute(sa.text(sql))
+            columns = list(result.keys())
+            rows = result.fetchall()
+        print()
+        print(f"{name}: {len(rows)} rows x {len(columns)} columns")
+        print(f"{'format':>10} | {'encode':>10} | {'chars':>8} | {'tokens':>8} | vs markdown")
+        baseline = None
+        for result_format in ResultFormatEnum:
+            number = 20
+            elapsed = (
+                timeit.timeit(
+                    lambda: encode_result(columns, rows, result_format.value),
+                    number=number,
+                )
+                / number
+            )
+            text = encode_result(columns, rows, result_format.value)
+            tokens = count_tokens(text)
+            if baseline is None:
+                baseline = tokens
+            print(
+                f"{result_format.value:>10} | {elapsed * 1000:>8.2f}ms | "
+                f"{len(text):>8} | {tokens:>8} | {tokens / baseline:.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark :func:`~mcp_ohmy_sql.result.markdown.render_markdown_table`
+against ``tabulate(..., tablefmt="pipe")`` on 1k, 10k and 100k rows.
+
+Usage::
+
+    python tests_load/bench_result_markdown.py
+"""
+
+import random
+import datetime
+import decimal
+import timeit
+
+from tabulate import tabulate
+
+from mcp_ohmy_sql.result.markdown import render_markdown_table
+
+COLUMNS = ["InvoiceId", "CustomerId", "InvoiceDate", "BillingCity", "Total", "Rate"]
+
+
+def make_rows(n: int) -> list[tuple]:
+    random.seed(n)
+    cities = ["Oslo", "Paris", "Berlin", "São Paulo", "Prague", None]
+    start = datetime.datetime(2020, 1, 1)
+    return [
+        (
+            ith,
+            random.randint(1, 59),
+            start + datetime.timedelta(hours=ith),
+            random.choice(cities),
+            decimal.Decimal(random.randint(99, 2599)) / 100,
+            random.random(),
+        )
+        for ith in range(n)
+    ]
+
+
+def run_tabulate(rows: list[tuple]) -> str:
+    return tabulate(
+        [COLUMNS, *rows],
+        headers="firstrow",
+        tablefmt="pipe",
+        floatfmt=".4f",
+    )
+
+
+def main():
+    print(f"{'rows':>8} | {'tabulate':>10} | {'markdown':>10} | {'padded':>10} | speedup")
+    for n in [1_000, 10_000, 100_000]:
+        rows = make_rows(n)
+        number = max(1, 10_000 // n)
+        t_tabulate = timeit.timeit(lambda: run_tabulate(rows), number=number) / number
+        t_markdown = (
+            timeit.timeit(lambda: render_markdown_table(COLUMNS, rows), number=number)
+            / number
+        )
+        t_padded = (
+            timeit.timeit(
+                lambda: render_markdown_table(COLUMNS, rows, pad=True),
+                number=number,
+            )
+            / number
+        )
+        print(
+            f"{n:>8} | {t_tabulate:>9.4f}s | {t_markdown:>9.4f}s | "
+            f"{t_padded:>9.4f}s | {t_tabulate / t_markdown:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()